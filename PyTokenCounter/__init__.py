@@ -1,7 +1,28 @@
 # PyTokenCounter/__init__.py
 
+from PyTokenCounter._async import (
+    aGetNumTokenDir,
+    aGetNumTokenFile,
+    aGetNumTokenStr,
+    aTokenizeFiles,
+)
+from PyTokenCounter._cache import TokenCache
+from PyTokenCounter._chunk import ChunkDir, ChunkFile, ChunkStr, TextChunk
+from PyTokenCounter._counter import TokenCounter
+from PyTokenCounter._manifest import TokenManifest
+from PyTokenCounter._progress import (
+    CallbackProgressReporter,
+    LoggingProgressReporter,
+    NullProgressReporter,
+    ProgressReporter,
+    ProgressTask,
+    ProgressUpdate,
+    RichProgressReporter,
+)
+from PyTokenCounter._server import ServeTokens, TokenServerClient
 from PyTokenCounter._utils import UnsupportedEncodingError
 from PyTokenCounter.core import (
+    DirFileResult,
     GetEncoding,
     GetEncodingForModel,
     GetEncodingNameForModel,
@@ -9,15 +30,27 @@ from PyTokenCounter.core import (
     GetModelForEncodingName,
     GetModelMappings,
     GetNumTokenDir,
+    GetNumTokenDirIncremental,
     GetNumTokenFile,
     GetNumTokenFiles,
     GetNumTokenStr,
+    GetNumTokenStrs,
     GetValidEncodings,
     GetValidModels,
+    IsWithinTokenLimit,
+    IterCountDir,
+    IterCountFile,
+    IterTokenizeDir,
+    IterTokenizeFile,
     TokenizeDir,
     TokenizeFile,
     TokenizeFiles,
     TokenizeStr,
+    TokenizeStrs,
+    TokenLimitResult,
+    TruncateFile,
+    TruncateResult,
+    TruncateStr,
 )
 
 # Define the public API of the package
@@ -30,13 +63,46 @@ __all__ = [
     "GetModelForEncoding",
     "GetEncodingNameForModel",
     "GetEncoding",
+    "TokenCounter",
     "TokenizeStr",
     "GetNumTokenStr",
+    "IsWithinTokenLimit",
+    "TokenLimitResult",
+    "TruncateStr",
+    "TruncateResult",
+    "TokenizeStrs",
+    "GetNumTokenStrs",
     "TokenizeFile",
     "GetNumTokenFile",
+    "IterTokenizeFile",
+    "IterCountFile",
+    "TruncateFile",
     "TokenizeFiles",
     "GetNumTokenFiles",
     "TokenizeDir",
     "GetNumTokenDir",
+    "GetNumTokenDirIncremental",
+    "IterTokenizeDir",
+    "IterCountDir",
+    "DirFileResult",
+    "ChunkStr",
+    "ChunkFile",
+    "ChunkDir",
+    "TextChunk",
+    "TokenCache",
+    "TokenManifest",
+    "ProgressReporter",
+    "ProgressTask",
+    "ProgressUpdate",
+    "NullProgressReporter",
+    "RichProgressReporter",
+    "LoggingProgressReporter",
+    "CallbackProgressReporter",
+    "aGetNumTokenStr",
+    "aGetNumTokenFile",
+    "aGetNumTokenDir",
+    "aTokenizeFiles",
+    "ServeTokens",
+    "TokenServerClient",
     "UnsupportedEncodingError",
 ]
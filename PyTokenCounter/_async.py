@@ -0,0 +1,966 @@
+"""
+_async.py
+
+Asynchronous counterparts of the counting and tokenizing functions, for services
+that run on an asyncio event loop and must not block it.
+
+Files are read, decoded and tokenized on a worker pool rather than on the event
+loop: a thread pool shared by every asynchronous call, unless an "executor" is
+given. tiktoken releases the GIL while encoding, so the threads of the pool encode
+in parallel. Encodings are also resolved on the pool, as the first use of an
+encoding loads it from disk. Strings of at most SHORT_COUNT_CHARS characters are
+counted on the event loop itself once their encoding is loaded, since handing them
+to the pool would cost more than counting them.
+
+The directory and file list functions hand files to the pool in batches, as
+_MapFileJobs does, since a round trip through the pool costs more than reading
+and counting a small file, and keep at most "concurrency" batches in flight at
+once. Cancelling a call cancels the batches it has not started yet. Batches
+already being read or tokenized finish on the pool and their results are
+discarded.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import aclosing
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ._cache import TokenCache
+from ._utils import (
+    DETECTION_STRATEGIES,
+    DETECTION_STRATEGIES_STR,
+    ReadTextFile,
+    UnsupportedEncodingError,
+)
+from .core import (
+    RETURN_TYPES,
+    RETURN_TYPES_STR,
+    SHORT_COUNT_CHARS,
+    GetNumTokenFile,
+    GetNumTokenStr,
+    TokenizeFile,
+    _CountTokens,
+    _EncodeText,
+    _GetPathFilter,
+    _GetRelativePath,
+    _GetRelativePathPrefixLength,
+    _ProcessFileBatch,
+    _ResolveEncoding,
+    _WalkDirFiles,
+)
+
+if TYPE_CHECKING:
+
+    import asyncio
+    from array import array
+
+    import numpy
+    import tiktoken
+
+    from ._filter import PathFilter
+
+# Number of threads of the pool shared by the asynchronous functions, the default
+# of ThreadPoolExecutor
+ASYNC_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_sharedExecutor: ThreadPoolExecutor | None = None
+_sharedExecutorLock = threading.Lock()
+
+# The (model, encodingName) pairs already resolved, and so loaded, on the pool
+_resolvedEncodingKeys: set[tuple[str | None, str | None]] = set()
+
+
+def _GetSharedExecutor() -> ThreadPoolExecutor:
+    """
+    Internal function to get the thread pool shared by the asynchronous functions,
+    started on first use and kept for the life of the process.
+    """
+
+    global _sharedExecutor
+
+    with _sharedExecutorLock:
+
+        if _sharedExecutor is None:
+
+            _sharedExecutor = ThreadPoolExecutor(
+                max_workers=ASYNC_WORKERS, thread_name_prefix="PyTokenCounter"
+            )
+
+        return _sharedExecutor
+
+
+def _CheckPoolOptions(concurrency: int | None, executor: Executor | None) -> int:
+    """
+    Internal function to check the "concurrency" and "executor" parameters of the
+    asynchronous functions, returning the number of batches to keep in flight.
+    """
+
+    if concurrency is not None and (
+        not isinstance(concurrency, int) or isinstance(concurrency, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "concurrency". Expected type: int. Given type: {type(concurrency)}'
+        )
+
+    if concurrency is not None and concurrency < 1:
+
+        raise ValueError(
+            f'"concurrency" must be at least 1. Given value: {concurrency}'
+        )
+
+    if executor is not None and not isinstance(executor, Executor):
+
+        raise TypeError(
+            f'Unexpected type for parameter "executor". Expected type: concurrent.futures.Executor. Given type: {type(executor)}'
+        )
+
+    return concurrency if concurrency is not None else 2 * ASYNC_WORKERS
+
+
+async def _RunOnPool(
+    executor: Executor | None, function: Callable[..., Any], /, **kwargs
+) -> Any:
+    """
+    Internal function to run a function on the given worker pool, or on the
+    shared one, without blocking the event loop. Cancelling the caller cancels the
+    function if it has not started yet.
+    """
+
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor if executor is not None else _GetSharedExecutor(),
+        partial(function, **kwargs),
+    )
+
+
+def _RunFileBatch(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    countOnly: bool,
+    detectionStrategy: str,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+) -> list[list[int] | array | memoryview | int | UnsupportedEncodingError]:
+    """
+    Internal function run on the worker pool to tokenize or count the tokens of a
+    batch of files, returning their results in order. Files are read and tokenized
+    one after another, as in _IterBatchedFileJobs but without its threads, since
+    the pool already runs batches in parallel. With a cache, files go through
+    _ProcessFileBatch instead.
+    """
+
+    if cache is not None:
+
+        return _ProcessFileBatch(
+            filePaths=filePaths,
+            countOnly=countOnly,
+            detectionStrategy=detectionStrategy,
+            encoding=encoding,
+            cache=cache,
+            returnType=returnType,
+        )
+
+    results = []
+
+    for filePath in filePaths:
+
+        try:
+
+            text = ReadTextFile(filePath=filePath, detectionStrategy=detectionStrategy)
+
+        except UnsupportedEncodingError as e:
+
+            results.append(e)
+
+            continue
+
+        if countOnly:
+
+            results.append(_CountTokens(encoding=encoding, text=text))
+
+        else:
+
+            results.append(
+                _EncodeText(encoding=encoding, text=text, returnType=returnType)
+            )
+
+    return results
+
+
+async def _IterFileJobsAsync(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    countOnly: bool,
+    detectionStrategy: str,
+    concurrency: int,
+    executor: Executor | None,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+) -> AsyncIterator[
+    tuple[Path, list[int] | array | memoryview | int | UnsupportedEncodingError]
+]:
+    """
+    Internal function to tokenize or count the tokens of files on a worker pool
+    with _RunFileBatch, yielding each file with its result in the order given.
+    Batches are sized as in _MapFileJobs, and at most "concurrency" of them are in
+    flight at once. The batches still in flight are cancelled when the generator
+    is closed, so it must be closed explicitly, with contextlib.aclosing, when its
+    caller stops early, raises or is cancelled.
+    """
+
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    pool = executor if executor is not None else _GetSharedExecutor()
+    job = partial(
+        _RunFileBatch,
+        countOnly=countOnly,
+        detectionStrategy=detectionStrategy,
+        encoding=encoding,
+        cache=cache,
+        returnType=returnType,
+    )
+    batchSize = max(1, min(64, len(filePaths) // (concurrency * 4)))
+    inFlight: deque[tuple[list[Path], asyncio.Future]] = deque()
+
+    try:
+
+        for batchStart in range(0, len(filePaths), batchSize):
+
+            batch = filePaths[batchStart : batchStart + batchSize]
+            inFlight.append((batch, loop.run_in_executor(pool, job, batch)))
+
+            if len(inFlight) >= concurrency:
+
+                doneBatch, future = inFlight.popleft()
+
+                for filePath, result in zip(doneBatch, await future):
+
+                    yield filePath, result
+
+        while inFlight:
+
+            doneBatch, future = inFlight.popleft()
+
+            for filePath, result in zip(doneBatch, await future):
+
+                yield filePath, result
+
+    finally:
+
+        for _, future in inFlight:
+
+            future.cancel()
+
+
+def _ListDirJobs(
+    dirPath: Path | str,
+    model: str | None,
+    encodingName: str | None,
+    encoding: tiktoken.Encoding | None,
+    recursive: bool,
+    pathFilter: PathFilter | None,
+) -> tuple[Path, tiktoken.Encoding, list[Path]]:
+    """
+    Internal function run on the worker pool to resolve the encoding, check the
+    directory and list its files, all of which may wait on the disk.
+    """
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+    dirPath = Path(dirPath).resolve()
+
+    if not dirPath.is_dir():
+
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+    return (
+        dirPath,
+        _encoding,
+        _WalkDirFiles(dirPath=dirPath, recursive=recursive, pathFilter=pathFilter),
+    )
+
+
+def _ListFileListJobs(
+    filePaths: list[Path],
+    model: str | None,
+    encodingName: str | None,
+    encoding: tiktoken.Encoding | None,
+) -> tiktoken.Encoding:
+    """
+    Internal function run on the worker pool to resolve the encoding and check that
+    every path of a list is a file.
+    """
+
+    nonFiles = [entry for entry in filePaths if not entry.is_file()]
+
+    if nonFiles:
+
+        raise ValueError(f"Given list contains non-file entries: {nonFiles}")
+
+    return _ResolveEncoding(model=model, encodingName=encodingName, encoding=encoding)
+
+
+def _GetPathKind(path: Path) -> str | None:
+    """
+    Internal function run on the worker pool to tell whether a path is a file or
+    a directory, returning "file", "dir" or None.
+    """
+
+    if path.is_file():
+
+        return "file"
+
+    if path.is_dir():
+
+        return "dir"
+
+    return None
+
+
+async def aGetNumTokenStr(
+    string: str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    maxTokens: int | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Asynchronously get the number of tokens in a string based on the specified
+    model or encoding. Strings longer than SHORT_COUNT_CHARS characters are counted
+    on the worker pool, and shorter ones on the event loop once their encoding is
+    loaded.
+
+    Parameters
+    ----------
+    string : str
+        The string to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    maxTokens : int or None, optional
+        Stop counting as soon as the count exceeds this many tokens (default is
+        None). The count returned is then greater than "maxTokens", but may be less
+        than the full count.
+    executor : concurrent.futures.Executor or None, optional
+        The worker pool to count on (default is None, which uses the thread pool
+        shared by the asynchronous functions).
+
+    Returns
+    -------
+    int
+        The number of tokens in the string, or a partial count greater than
+        "maxTokens" if counting stopped early.
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "model", "encodingName", "encoding", "maxTokens"
+        or "executor" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model and encoding name, or between the provided
+        encoding and the derived encoding, or if "maxTokens" is negative.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from PyTokenCounter import aGetNumTokenStr
+    >>> asyncio.run(aGetNumTokenStr(string="Hail to the Victors!", model="gpt-4o"))
+    7
+    """
+
+    _CheckPoolOptions(concurrency=None, executor=executor)
+
+    encodingKey = (model, encodingName)
+    countString = partial(
+        GetNumTokenStr,
+        string=string,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        quiet=True,
+        maxTokens=maxTokens,
+    )
+
+    if (
+        isinstance(string, str)
+        and len(string) <= SHORT_COUNT_CHARS
+        and (encodingKey == (None, None) or encodingKey in _resolvedEncodingKeys)
+    ):
+
+        return countString()
+
+    numTokens = await _RunOnPool(executor, countString)
+    _resolvedEncodingKeys.add(encodingKey)
+
+    return numTokens
+
+
+async def aGetNumTokenFile(
+    filePath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    detectionStrategy: str = "full",
+    chunkSize: int | None = None,
+    cache: TokenCache | None = None,
+    maxTokens: int | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Asynchronously get the number of tokens in a file based on the specified model
+    or encoding. The file is read and counted on the worker pool.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8 (default is "full"). See GetNumTokenFile.
+    chunkSize : int or None, optional
+        Read and count the file in chunks of this many bytes, in constant memory
+        (default is None, which reads it whole).
+    cache : TokenCache or None, optional
+        A token cache to look the file up in and store its count to (default is
+        None).
+    maxTokens : int or None, optional
+        Stop counting as soon as the count exceeds this many tokens (default is
+        None).
+    executor : concurrent.futures.Executor or None, optional
+        The worker pool to read and count on (default is None, which uses the
+        thread pool shared by the asynchronous functions).
+
+    Returns
+    -------
+    int
+        The number of tokens in the file, or a partial count greater than
+        "maxTokens" if counting stopped early.
+
+    Raises
+    ------
+    TypeError
+        If the types of the parameters are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if they do not match
+        each other or the provided encoding, or if the path is not a file.
+    FileNotFoundError
+        If the file does not exist.
+    UnsupportedEncodingError
+        If the file's encoding is not supported.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from PyTokenCounter import aGetNumTokenFile
+    >>> asyncio.run(aGetNumTokenFile(filePath="TestFile1.txt", model="gpt-4o"))
+    221
+    """
+
+    _CheckPoolOptions(concurrency=None, executor=executor)
+
+    return await _RunOnPool(
+        executor,
+        GetNumTokenFile,
+        filePath=filePath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        quiet=True,
+        detectionStrategy=detectionStrategy,
+        chunkSize=chunkSize,
+        cache=cache,
+        maxTokens=maxTokens,
+    )
+
+
+async def aGetNumTokenDir(
+    dirPath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
+    detectionStrategy: str = "full",
+    cache: TokenCache | None = None,
+    maxTokens: int | None = None,
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+    concurrency: int | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Asynchronously get the number of tokens in all files within a directory based
+    on the specified model or encoding. The directory is listed, and its files
+    read and counted, on the worker pool, with at most "concurrency" batches of
+    files in flight at once. Files with an unsupported encoding are skipped.
+
+    Parameters
+    ----------
+    dirPath : Path or str
+        The path to the directory to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    recursive : bool, optional
+        Whether to count tokens in files in subdirectories recursively (default is
+        True).
+    detectionStrategy : str, optional
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8 (default is "full"). See GetNumTokenDir.
+    cache : TokenCache or None, optional
+        A token cache to look files up in and store their counts to (default is
+        None).
+    maxTokens : int or None, optional
+        Stop counting further files, cancelling those in flight, once the total
+        exceeds this many tokens (default is None).
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to count (default is
+        None, which counts every file).
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+    respectGitignore : bool, optional
+        Whether to leave out the files and directories ignored by ".gitignore"
+        files, and ".git" itself (default is False).
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
+    concurrency : int or None, optional
+        The most batches of files to have in flight on the worker pool at once
+        (default is None, which allows two per thread of the shared pool). Each
+        batch holds up to 64 files.
+    executor : concurrent.futures.Executor or None, optional
+        The worker pool to list, read and count on (default is None, which uses the
+        thread pool shared by the asynchronous functions).
+
+    Returns
+    -------
+    int
+        The total number of tokens in the files of the directory, or a partial
+        total greater than "maxTokens" if counting stopped early.
+
+    Raises
+    ------
+    TypeError
+        If the types of the parameters are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if they do not match
+        each other or the provided encoding, if the path is not a directory, if
+        "maxTokens" or "maxFileSize" is negative, or if "concurrency" is less than
+        1.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from PyTokenCounter import aGetNumTokenDir
+    >>> asyncio.run(aGetNumTokenDir(dirPath="TestDirectory", model="gpt-4o", concurrency=4))
+    1321
+    """
+
+    if not isinstance(dirPath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
+        )
+
+    if not isinstance(recursive, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
+
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if maxTokens is not None and (
+        not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens is not None and maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
+    _concurrency = _CheckPoolOptions(concurrency=concurrency, executor=executor)
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    _, _encoding, filePaths = await _RunOnPool(
+        executor,
+        _ListDirJobs,
+        dirPath=dirPath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        recursive=recursive,
+        pathFilter=pathFilter,
+    )
+
+    runningTokenTotal = 0
+
+    async with aclosing(
+        _IterFileJobsAsync(
+            filePaths=filePaths,
+            encoding=_encoding,
+            countOnly=True,
+            detectionStrategy=detectionStrategy,
+            concurrency=_concurrency,
+            executor=executor,
+            cache=cache,
+        )
+    ) as results:
+
+        async for _, numTokens in results:
+
+            if isinstance(numTokens, UnsupportedEncodingError):
+
+                continue
+
+            runningTokenTotal += numTokens
+
+            if maxTokens is not None and runningTokenTotal > maxTokens:
+
+                break
+
+    return runningTokenTotal
+
+
+async def aTokenizeFiles(
+    inputPath: Path | str | list[Path | str],
+    /,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
+    exitOnListError: bool = True,
+    detectionStrategy: str = "full",
+    returnType: str = "list",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+    concurrency: int | None = None,
+    executor: Executor | None = None,
+) -> (
+    list[int]
+    | array
+    | memoryview
+    | numpy.ndarray
+    | dict[str, list[int] | array | memoryview | numpy.ndarray | dict]
+):
+    """
+    Asynchronously tokenize a file, a list of files or all files within a
+    directory using the specified model or encoding, returning what TokenizeFiles
+    returns. Paths are checked, directories listed, and files read and tokenized
+    on the worker pool, with at most "concurrency" batches of files in flight at
+    once.
+
+    Parameters
+    ----------
+    inputPath : Path, str, or list of Path or str
+        The path to a file or directory, or a list of file paths to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    recursive : bool, default True
+        If inputPath is a directory, whether to tokenize files in subdirectories
+        recursively.
+    exitOnListError : bool, default True
+        If True, raise the error of the first file of a list with an unsupported
+        encoding, cancelling the files in flight. If False, skip such files.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. See TokenizeFiles.
+    returnType : str, default "list"
+        The container to return the token IDs in. One of "list", "array",
+        "numpy" or "buffer". See TokenizeFiles.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep when inputPath
+        is a directory (default is None, which keeps every file).
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by ".gitignore"
+        files, and ".git" itself.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
+    concurrency : int or None, optional
+        The most batches of files to have in flight on the worker pool at once
+        (default is None, which allows two per thread of the shared pool). Each
+        batch holds up to 64 files.
+    executor : concurrent.futures.Executor or None, optional
+        The worker pool to read and tokenize on (default is None, which uses the
+        thread pool shared by the asynchronous functions).
+
+    Returns
+    -------
+    list[int] | dict[str, list[int] | dict]
+        As returned by TokenizeFiles: the tokens of a file, a dictionary of the
+        tokens of each file of a list keyed by file name, or a dictionary nesting
+        the tokens of the files of a directory by subdirectory.
+
+    Raises
+    ------
+    TypeError
+        If the types of the parameters are incorrect.
+    ValueError
+        If any of the provided file paths in a list are not files, if
+        "returnType" or "detectionStrategy" is not valid, if "maxFileSize" is
+        negative, or if "concurrency" is less than 1.
+    UnsupportedEncodingError
+        If a single file, or a file of a list with "exitOnListError", has an
+        unsupported encoding.
+    RuntimeError
+        If the provided "inputPath" is neither a file, a directory, nor a list.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from PyTokenCounter import aTokenizeFiles
+    >>> tokens = asyncio.run(aTokenizeFiles(["TestFile1.txt", "TestFile2.txt"], model="gpt-4o"))
+    >>> print(list(tokens))
+    ['TestFile1.txt', 'TestFile2.txt']
+    """
+
+    import tiktoken
+
+    if not isinstance(inputPath, (str, Path, list)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "inputPath". Expected type: str, pathlib.Path, or list. Given type: {type(inputPath)}'
+        )
+
+    if isinstance(inputPath, list):
+
+        if not all(isinstance(item, (str, Path)) for item in inputPath):
+
+            listTypes = set(type(item) for item in inputPath)
+
+            raise TypeError(
+                f'Unexpected type for parameter "inputPath". Expected type: list of str or pathlib.Path. Given list contains types: {listTypes}'
+            )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(recursive, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
+
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    _concurrency = _CheckPoolOptions(concurrency=concurrency, executor=executor)
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    if isinstance(inputPath, list):
+
+        filePaths = [Path(entry) for entry in inputPath]
+        _encoding = await _RunOnPool(
+            executor,
+            _ListFileListJobs,
+            filePaths=filePaths,
+            model=model,
+            encodingName=encodingName,
+            encoding=encoding,
+        )
+        tokenizedFiles = {}
+
+        async with aclosing(
+            _IterFileJobsAsync(
+                filePaths=filePaths,
+                encoding=_encoding,
+                countOnly=False,
+                detectionStrategy=detectionStrategy,
+                concurrency=_concurrency,
+                executor=executor,
+                returnType=returnType,
+            )
+        ) as results:
+
+            async for filePath, tokens in results:
+
+                if isinstance(tokens, UnsupportedEncodingError):
+
+                    if exitOnListError:
+
+                        raise tokens
+
+                    continue
+
+                tokenizedFiles[filePath.name] = tokens
+
+        return tokenizedFiles
+
+    inputPath = Path(inputPath)
+    pathKind = await _RunOnPool(executor, _GetPathKind, path=inputPath)
+
+    if pathKind == "file":
+
+        return await _RunOnPool(
+            executor,
+            TokenizeFile,
+            filePath=inputPath,
+            model=model,
+            encodingName=encodingName,
+            encoding=encoding,
+            quiet=True,
+            detectionStrategy=detectionStrategy,
+            returnType=returnType,
+        )
+
+    if pathKind != "dir":
+
+        raise RuntimeError(
+            f'Unexpected error. Given inputPath "{inputPath}" is neither a file, a directory, nor a list.'
+        )
+
+    dirPath, _encoding, filePaths = await _RunOnPool(
+        executor,
+        _ListDirJobs,
+        dirPath=inputPath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        recursive=recursive,
+        pathFilter=pathFilter,
+    )
+    prefixLength = _GetRelativePathPrefixLength(dirPath=dirPath)
+    tokenizedDir = {}
+
+    async with aclosing(
+        _IterFileJobsAsync(
+            filePaths=filePaths,
+            encoding=_encoding,
+            countOnly=False,
+            detectionStrategy=detectionStrategy,
+            concurrency=_concurrency,
+            executor=executor,
+            returnType=returnType,
+        )
+    ) as results:
+
+        async for filePath, tokens in results:
+
+            if isinstance(tokens, UnsupportedEncodingError):
+
+                continue
+
+            *parts, fileName = _GetRelativePath(
+                filePath=filePath, prefixLength=prefixLength
+            ).split("/")
+            subDir = tokenizedDir
+
+            for part in parts:
+
+                subDir = subDir.setdefault(part, {})
+
+            subDir[fileName] = tokens
+
+    return tokenizedDir
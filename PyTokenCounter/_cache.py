@@ -0,0 +1,488 @@
+"""
+_cache.py
+
+A persistent on-disk cache of token counts, and optionally token IDs, stored in a
+SQLite database.
+
+Entries are keyed by the SHA-256 hash of a file's raw bytes, the encoding name and
+the detection strategy used to decode it, so a file that is renamed, moved or
+copied still hits the cache, and an edited file never returns a stale count. The
+detection strategy is part of the key because it can change how a file that is
+not valid UTF-8 is decoded.
+
+The cache is bounded by an approximate size in bytes. When it grows past its size
+limit, the least recently used entries are evicted until it is back under it.
+
+The default database lives at "$XDG_CACHE_HOME/PyTokenCounter/tokens.sqlite",
+falling back to "~/.cache/PyTokenCounter/tokens.sqlite".
+"""
+
+import os
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+
+DEFAULT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Approximate bytes taken by an entry besides its token IDs: the hash, the key
+# columns and SQLite's per-row and index overhead
+_ENTRY_OVERHEAD = 128
+
+# Check the size limit after this many new entries rather than after every write
+_PRUNE_INTERVAL = 1000
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def GetDefaultCachePath() -> Path:
+    """
+    Get the default location of the token cache database.
+
+    Returns
+    -------
+    Path
+        "$XDG_CACHE_HOME/PyTokenCounter/tokens.sqlite", or
+        "~/.cache/PyTokenCounter/tokens.sqlite" if XDG_CACHE_HOME is not set.
+    """
+
+    cacheHome = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(cacheHome, "PyTokenCounter", "tokens.sqlite")
+
+
+def HashBytes(data: bytes) -> bytes:
+    """
+    Hash the raw contents of a file for use as a cache key.
+
+    Parameters
+    ----------
+    data : bytes
+        The raw contents of the file.
+
+    Returns
+    -------
+    bytes
+        The SHA-256 digest of the data.
+    """
+
+    import hashlib
+
+    return hashlib.sha256(data).digest()
+
+
+def HashFile(filePath: Path | str) -> bytes:
+    """
+    Hash the raw contents of a file in constant memory for use as a cache key.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to hash.
+
+    Returns
+    -------
+    bytes
+        The SHA-256 digest of the file's contents.
+    """
+
+    import hashlib
+
+    digest = hashlib.sha256()
+
+    with Path(filePath).open("rb") as binaryFile:
+
+        while chunk := binaryFile.read(_HASH_CHUNK_SIZE):
+
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+class TokenCache:
+    """
+    A persistent cache mapping file contents to token counts and, optionally, token
+    IDs.
+
+    A cache can be shared between threads, and between processes through the same
+    database file. It is passed to worker processes by path and reopened there.
+
+    Attributes
+    ----------
+    path : Path
+        The path to the SQLite database file.
+    maxSize : int
+        The approximate maximum size of the cached data in bytes.
+    storeTokens : bool
+        Whether token IDs are cached alongside token counts.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetNumTokenDir, TokenCache
+    >>> cache = TokenCache()
+    >>> GetNumTokenDir(dirPath="./Data", model="gpt-4o", cache=cache)
+    1500
+    >>> GetNumTokenDir(dirPath="./Data", model="gpt-4o", cache=cache)  # served from the cache
+    1500
+    >>> cache.Stats()
+    {'path': '/home/user/.cache/PyTokenCounter/tokens.sqlite', 'entries': 12, 'sizeBytes': 1536, 'maxSize': 1073741824, 'storeTokens': False}
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        maxSize: int = DEFAULT_CACHE_MAX_SIZE,
+        storeTokens: bool = False,
+    ):
+        """
+        Open the cache database, creating it if it does not exist.
+
+        Parameters
+        ----------
+        path : Path, str or None, optional
+            The path to the SQLite database file. Defaults to GetDefaultCachePath().
+        maxSize : int, optional
+            The approximate maximum size of the cached data in bytes (default is
+            1 GiB).
+        storeTokens : bool, optional
+            Whether to cache token IDs as well as token counts (default is False).
+
+        Raises
+        ------
+        TypeError
+            If the types of "path", "maxSize" or "storeTokens" are incorrect.
+        ValueError
+            If "maxSize" is negative.
+        """
+
+        import sqlite3
+
+        if path is not None and not isinstance(path, (str, Path)):
+
+            raise TypeError(
+                f'Unexpected type for parameter "path". Expected type: str or pathlib.Path. Given type: {type(path)}'
+            )
+
+        if not isinstance(maxSize, int) or isinstance(maxSize, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "maxSize". Expected type: int. Given type: {type(maxSize)}'
+            )
+
+        if maxSize < 0:
+
+            raise ValueError(f'"maxSize" must not be negative. Given value: {maxSize}')
+
+        if not isinstance(storeTokens, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "storeTokens". Expected type: bool. Given type: {type(storeTokens)}'
+            )
+
+        self.path = Path(path) if path is not None else GetDefaultCachePath()
+        self.maxSize = maxSize
+        self.storeTokens = storeTokens
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._newEntries = 0
+        self._connection = sqlite3.connect(
+            self.path, timeout=60, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                hash BLOB NOT NULL,
+                encodingName TEXT NOT NULL,
+                detectionStrategy TEXT NOT NULL,
+                numTokens INTEGER NOT NULL,
+                tokens BLOB,
+                size INTEGER NOT NULL,
+                lastUsed REAL NOT NULL,
+                PRIMARY KEY (hash, encodingName, detectionStrategy)
+            )
+            """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS entriesLastUsed ON entries (lastUsed)"
+        )
+
+    def __reduce__(self):
+        # Reopen the same database in the receiving process rather than pickling
+        # the connection
+        return (self.__class__, (self.path, self.maxSize, self.storeTokens))
+
+    def __repr__(self) -> str:
+
+        return f"TokenCache(path={str(self.path)!r}, maxSize={self.maxSize}, storeTokens={self.storeTokens})"
+
+    def _Lookup(
+        self, digest: bytes, encodingName: str, detectionStrategy: str, column: str
+    ) -> object:
+        """
+        Internal method to fetch a column of an entry and mark the entry as used.
+        """
+
+        key = (digest, encodingName, detectionStrategy)
+
+        with self._lock:
+
+            row = self._connection.execute(
+                f"SELECT {column} FROM entries WHERE hash = ? AND encodingName = ? AND detectionStrategy = ?",
+                key,
+            ).fetchone()
+
+            if row is None:
+
+                return None
+
+            self._connection.execute(
+                "UPDATE entries SET lastUsed = ? WHERE hash = ? AND encodingName = ? AND detectionStrategy = ?",
+                (time.time(), *key),
+            )
+
+        return row[0]
+
+    def GetNumTokens(
+        self, digest: bytes, encodingName: str, detectionStrategy: str = "full"
+    ) -> int | None:
+        """
+        Look up the token count of a file's contents.
+
+        Parameters
+        ----------
+        digest : bytes
+            The hash of the file's contents, from HashBytes or HashFile.
+        encodingName : str
+            The name of the encoding the tokens were counted with.
+        detectionStrategy : str, optional
+            The detection strategy the file was decoded with (default is "full").
+
+        Returns
+        -------
+        int or None
+            The cached token count, or None if the contents are not cached.
+        """
+
+        return self._Lookup(digest, encodingName, detectionStrategy, "numTokens")
+
+    def GetTokens(
+        self, digest: bytes, encodingName: str, detectionStrategy: str = "full"
+    ) -> list[int] | None:
+        """
+        Look up the token IDs of a file's contents.
+
+        Parameters
+        ----------
+        digest : bytes
+            The hash of the file's contents, from HashBytes or HashFile.
+        encodingName : str
+            The name of the encoding the file was tokenized with.
+        detectionStrategy : str, optional
+            The detection strategy the file was decoded with (default is "full").
+
+        Returns
+        -------
+        list[int] or None
+            The cached token IDs, or None if the contents are not cached or were
+            cached without their token IDs.
+        """
+
+        tokenBytes = self._Lookup(digest, encodingName, detectionStrategy, "tokens")
+
+        if tokenBytes is None:
+
+            return None
+
+        tokens = array("I")
+        tokens.frombytes(tokenBytes)
+
+        if sys.byteorder != "little":
+
+            tokens.byteswap()
+
+        return tokens.tolist()
+
+    def Set(
+        self,
+        digest: bytes,
+        encodingName: str,
+        numTokens: int,
+        tokens: list[int] | None = None,
+        detectionStrategy: str = "full",
+    ) -> None:
+        """
+        Store the token count, and the token IDs if "storeTokens" is set, of a
+        file's contents.
+
+        Parameters
+        ----------
+        digest : bytes
+            The hash of the file's contents, from HashBytes or HashFile.
+        encodingName : str
+            The name of the encoding the file was tokenized with.
+        numTokens : int
+            The number of tokens in the file.
+        tokens : list[int] or None, optional
+            The token IDs of the file. Ignored unless "storeTokens" is set.
+        detectionStrategy : str, optional
+            The detection strategy the file was decoded with (default is "full").
+        """
+
+        tokenBytes = None
+
+        if self.storeTokens and tokens is not None:
+
+            tokenArray = array("I", tokens)
+
+            if sys.byteorder != "little":
+
+                tokenArray.byteswap()
+
+            tokenBytes = tokenArray.tobytes()
+
+        size = _ENTRY_OVERHEAD + (len(tokenBytes) if tokenBytes is not None else 0)
+
+        with self._lock:
+
+            self._connection.execute(
+                """
+                INSERT INTO entries (hash, encodingName, detectionStrategy, numTokens, tokens, size, lastUsed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hash, encodingName, detectionStrategy) DO UPDATE SET
+                    numTokens = excluded.numTokens,
+                    tokens = COALESCE(excluded.tokens, entries.tokens),
+                    size = MAX(excluded.size, entries.size),
+                    lastUsed = excluded.lastUsed
+                """,
+                (
+                    digest,
+                    encodingName,
+                    detectionStrategy,
+                    numTokens,
+                    tokenBytes,
+                    size,
+                    time.time(),
+                ),
+            )
+
+            self._newEntries += 1
+            shouldPrune = self._newEntries >= _PRUNE_INTERVAL
+
+        if shouldPrune:
+
+            self.Prune()
+
+    def Prune(self, maxSize: int | None = None) -> int:
+        """
+        Evict the least recently used entries until the cache is under its size
+        limit.
+
+        Parameters
+        ----------
+        maxSize : int or None, optional
+            The size limit in bytes to prune down to. Defaults to the cache's
+            "maxSize".
+
+        Returns
+        -------
+        int
+            The number of entries evicted.
+        """
+
+        if maxSize is None:
+
+            maxSize = self.maxSize
+
+        with self._lock:
+
+            self._newEntries = 0
+
+            totalSize = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+
+            if totalSize <= maxSize:
+
+                return 0
+
+            cursor = self._connection.execute(
+                """
+                DELETE FROM entries WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, size,
+                            SUM(size) OVER (ORDER BY lastUsed, rowid) AS evictedSize
+                        FROM entries
+                    )
+                    WHERE evictedSize - size < ?
+                )
+                """,
+                (totalSize - maxSize,),
+            )
+
+            return cursor.rowcount
+
+    def Clear(self) -> int:
+        """
+        Remove every entry from the cache.
+
+        Returns
+        -------
+        int
+            The number of entries removed.
+        """
+
+        with self._lock:
+
+            cursor = self._connection.execute("DELETE FROM entries")
+            self._connection.execute("VACUUM")
+
+            return cursor.rowcount
+
+    def Stats(self) -> dict:
+        """
+        Get statistics about the cache.
+
+        Returns
+        -------
+        dict
+            The database "path", the number of "entries", their approximate
+            "sizeBytes", the "maxSize" limit and whether the cache "storeTokens".
+        """
+
+        with self._lock:
+
+            numEntries, totalSize = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        return {
+            "path": str(self.path),
+            "entries": numEntries,
+            "sizeBytes": totalSize,
+            "maxSize": self.maxSize,
+            "storeTokens": self.storeTokens,
+        }
+
+    def Close(self) -> None:
+        """
+        Close the connection to the cache database.
+        """
+
+        with self._lock:
+
+            self._connection.close()
+
+    def __enter__(self) -> "TokenCache":
+
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+
+        self.Close()
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TokenCache.__module__ = "PyTokenCounter"
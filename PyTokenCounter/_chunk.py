@@ -0,0 +1,788 @@
+"""
+_chunk.py
+
+Token-based chunking of strings, files and directories for retrieval pipelines.
+
+Text is split into consecutive chunks of at most "chunkTokens" tokens, each
+starting about "overlapTokens" tokens before the previous one ended. Chunks end at
+the last paragraph break in the second half of the longest run of text that fits,
+failing that at the last line break, and failing that before the last space, so a
+chunk only ends mid-word when the words near its end are longer than half a chunk.
+Overlaps start at a line start, or failing that at a space, in the same way. Each
+chunk is yielded as a TextChunk of its text, its exact token count and the byte
+offset of its first character.
+
+Only a window of text around the chunk being cut is tokenized, never a whole file at
+once, and files are streamed in chunks of bytes, so memory use is bounded by the
+read size and the chunk size rather than the file size.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from ._utils import (
+    DETECTION_STRATEGIES,
+    DETECTION_STRATEGIES_STR,
+    STREAM_CHUNK_SIZE,
+    UnsupportedEncodingError,
+)
+from .core import (
+    COUNT_SEGMENT_CHARS,
+    LIMIT_MIN_SEGMENT_CHARS,
+    PARALLEL_BACKENDS,
+    PARALLEL_BACKENDS_STR,
+    _CountDecodedChars,
+    _CountTokens,
+    _EncodeToBuffer,
+    _GetLimitSegmentChars,
+    _GetPathFilter,
+    _PrepareFileStream,
+    _RaiseOnSpecialTokens,
+    _ResolveEncoding,
+    _TruncateHead,
+    _WalkDirFiles,
+)
+
+if TYPE_CHECKING:
+
+    import tiktoken
+
+
+class TextChunk(NamedTuple):
+    """
+    A chunk of text cut by ChunkStr, ChunkFile or ChunkDir.
+
+    Attributes
+    ----------
+    text : str
+        The text of the chunk.
+    numTokens : int
+        The exact number of tokens in "text".
+    byteOffset : int
+        The offset of the chunk's first character in the UTF-8 encoding of the whole
+        text, which is its position in the file for a UTF-8 file with "\\n" line
+        endings.
+    """
+
+    text: str
+    numTokens: int
+    byteOffset: int
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TextChunk.__module__ = "PyTokenCounter"
+
+
+# The encoding each process pool worker uses, set once per worker by
+# _InitChunkWorker so that it is not pickled again for every file
+_workerEncoding: tiktoken.Encoding | None = None
+
+
+def _ValidateChunkArgs(chunkTokens: int, overlapTokens: int) -> None:
+    """
+    Internal function to validate the chunk size and overlap shared by the chunking
+    functions.
+    """
+
+    if not isinstance(chunkTokens, int) or isinstance(chunkTokens, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "chunkTokens". Expected type: int. Given type: {type(chunkTokens)}'
+        )
+
+    if chunkTokens < 1:
+
+        raise ValueError(
+            f'"chunkTokens" must be at least 1. Given value: {chunkTokens}'
+        )
+
+    if not isinstance(overlapTokens, int) or isinstance(overlapTokens, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "overlapTokens". Expected type: int. Given type: {type(overlapTokens)}'
+        )
+
+    if not 0 <= overlapTokens < chunkTokens:
+
+        raise ValueError(
+            f'"overlapTokens" must be at least 0 and less than "chunkTokens". Given value: {overlapTokens}'
+        )
+
+
+def _FindChunkEnd(text: str, minEnd: int) -> int:
+    """
+    Internal function to find where to end a chunk within the longest text that
+    fits: after the last paragraph break, failing that after the last line break,
+    and failing that before the last space, past "minEnd" and in the second half of
+    the text, or at its end if there is none.
+    """
+
+    minEnd = max(minEnd, len(text) // 2, 1)
+
+    for boundary in ("\n\n", "\n"):
+
+        index = text.rfind(boundary, minEnd)
+
+        if index != -1:
+
+            return index + len(boundary)
+
+    index = text.rfind(" ", minEnd)
+
+    return index if index != -1 else len(text)
+
+
+def _IterTextChunks(
+    encoding: tiktoken.Encoding,
+    segments: Iterable[str],
+    chunkTokens: int,
+    overlapTokens: int,
+) -> Iterator[TextChunk]:
+    """
+    Internal function to cut a text, given as consecutive pieces split at arbitrary
+    positions, into chunks.
+
+    The text from the start of each chunk is tokenized in a window sized from the
+    characters per token of the previous chunk, and widened until it has more than
+    "chunkTokens" tokens. The first "chunkTokens" token IDs are decoded to find the
+    longest run of text that fits, the chunk is ended at a break within it, and the
+    chunk alone is counted again to give its exact count. The overlap is measured
+    on the same token IDs, so the next chunk starts about "overlapTokens" tokens
+    before the end of this one, moved forward to the start of a line if the overlap
+    spans one.
+
+    The pieces are appended to a pending text only once a window reaches its end,
+    and the text before the start of the current chunk is dropped when they are, so
+    only about one piece and one chunk are held at once.
+    """
+
+    segments = iter(segments)
+    windowChars = _GetLimitSegmentChars(
+        maxTokens=chunkTokens, maxChars=COUNT_SEGMENT_CHARS
+    )
+
+    pending = ""
+    position = 0
+    byteOffset = 0
+    overlapChars = 0
+    isExhausted = False
+
+    while True:
+
+        window = pending[position : position + windowChars]
+
+        _RaiseOnSpecialTokens(encoding=encoding, text=window)
+
+        tokens = _EncodeToBuffer(encoding=encoding, text=window)
+
+        if len(tokens) <= chunkTokens:
+
+            if position + len(window) < len(pending):
+
+                windowChars *= 2
+
+            elif not isExhausted:
+
+                # The rest of the pending text fits in a chunk, so whether it is the
+                # last one depends on what follows
+                try:
+
+                    pending = pending[position:] + next(segments)
+                    position = 0
+
+                except StopIteration:
+
+                    isExhausted = True
+
+            else:
+
+                if window:
+
+                    yield TextChunk(
+                        text=window, numTokens=len(tokens), byteOffset=byteOffset
+                    )
+
+                return
+
+            continue
+
+        headText = window[
+            : _CountDecodedChars(encoding=encoding, tokens=tokens[:chunkTokens])
+        ]
+
+        # Size the next window from the characters per token of this one
+        windowChars = max(LIMIT_MIN_SEGMENT_CHARS, len(headText) * 5 // 4)
+        # Ending the chunk past the overlap makes sure it adds new text
+        chunkText = headText[: _FindChunkEnd(text=headText, minEnd=overlapChars + 1)]
+        numTokens = _CountTokens(encoding=encoding, text=chunkText)
+
+        if numTokens > chunkTokens:
+
+            # Counted alone, the text ends in more tokens than it did in context
+            chunkText, numTokens = _TruncateHead(
+                encoding=encoding, segments=(chunkText,), maxTokens=chunkTokens
+            )
+
+        if not chunkText:
+
+            # A single character takes more tokens than a chunk holds, so it is
+            # given a chunk of its own
+            chunkText = pending[position]
+            numTokens = _CountTokens(encoding=encoding, text=chunkText)
+
+        yield TextChunk(text=chunkText, numTokens=numTokens, byteOffset=byteOffset)
+
+        overlapStart = len(chunkText)
+
+        if overlapTokens > 0 and numTokens > overlapTokens:
+
+            overlapStart = _CountDecodedChars(
+                encoding=encoding, tokens=tokens[: numTokens - overlapTokens]
+            )
+            # The overlap starts at a line start or a space when it spans one, and
+            # is dropped if it holds nothing but the whitespace ending the chunk
+            contentEnd = len(chunkText.rstrip())
+            lineStart = chunkText.find("\n", overlapStart, contentEnd)
+            spaceStart = chunkText.find(" ", overlapStart, contentEnd)
+
+            if lineStart != -1:
+
+                overlapStart = lineStart + 1
+
+            elif spaceStart != -1:
+
+                overlapStart = spaceStart
+
+            if not 0 < overlapStart < contentEnd:
+
+                overlapStart = len(chunkText)
+
+        byteOffset += len(
+            chunkText[:overlapStart].encode("utf-8", errors="surrogatepass")
+        )
+        position += overlapStart
+        overlapChars = len(chunkText) - overlapStart
+
+
+def _InitChunkWorker(encoding: tiktoken.Encoding) -> None:
+    """
+    Internal function run once in each process pool worker to store the encoding
+    used by _ChunkFileJob.
+    """
+
+    global _workerEncoding
+
+    _workerEncoding = encoding
+
+
+def _ChunkFileJob(
+    filePath: Path,
+    chunkTokens: int,
+    overlapTokens: int,
+    detectionStrategy: str,
+    encoding: tiktoken.Encoding | None = None,
+) -> list[TextChunk] | UnsupportedEncodingError:
+    """
+    Internal function run by a pool worker to chunk a single file. A file with an
+    unsupported encoding returns its error rather than raising it, so that the
+    caller can skip it.
+    """
+
+    try:
+
+        return list(
+            ChunkFile(
+                filePath=filePath,
+                chunkTokens=chunkTokens,
+                overlapTokens=overlapTokens,
+                encoding=encoding if encoding is not None else _workerEncoding,
+                detectionStrategy=detectionStrategy,
+            )
+        )
+
+    except UnsupportedEncodingError as e:
+
+        return e
+
+
+def _IterDirChunks(
+    dirPath: Path,
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    chunkTokens: int,
+    overlapTokens: int,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+) -> Iterator[tuple[str, TextChunk]]:
+    """
+    Internal function backing ChunkDir.
+
+    With one worker, each file is streamed chunk by chunk in this process. With
+    more, each worker chunks whole files, and at most two files per worker are in
+    flight at once, so that chunks are not cut far ahead of the consumer.
+    """
+
+    if workers == 1:
+
+        for filePath in filePaths:
+
+            relativePath = filePath.relative_to(dirPath).as_posix()
+
+            try:
+
+                for chunk in ChunkFile(
+                    filePath=filePath,
+                    chunkTokens=chunkTokens,
+                    overlapTokens=overlapTokens,
+                    encoding=encoding,
+                    detectionStrategy=detectionStrategy,
+                ):
+
+                    yield relativePath, chunk
+
+            except UnsupportedEncodingError:
+
+                continue
+
+        return
+
+    job = partial(
+        _ChunkFileJob,
+        chunkTokens=chunkTokens,
+        overlapTokens=overlapTokens,
+        detectionStrategy=detectionStrategy,
+    )
+
+    if backend == "thread":
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        job = partial(job, encoding=encoding)
+
+    else:
+
+        # Imported here as it pulls in multiprocessing, which is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_InitChunkWorker,
+            initargs=(encoding,),
+        )
+
+    inFlight: deque[tuple[Path, Future]] = deque()
+    filePathIter = iter(filePaths)
+
+    try:
+
+        while True:
+
+            for filePath in filePathIter:
+
+                inFlight.append((filePath, executor.submit(job, filePath)))
+
+                if len(inFlight) >= workers * 2:
+
+                    break
+
+            if not inFlight:
+
+                return
+
+            filePath, future = inFlight.popleft()
+            chunks = future.result()
+
+            if isinstance(chunks, UnsupportedEncodingError):
+
+                continue
+
+            relativePath = filePath.relative_to(dirPath).as_posix()
+
+            for chunk in chunks:
+
+                yield relativePath, chunk
+
+    finally:
+
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def ChunkStr(
+    string: str,
+    chunkTokens: int,
+    overlapTokens: int = 0,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+) -> Iterator[TextChunk]:
+    """
+    Split a string into consecutive chunks of at most "chunkTokens" tokens,
+    preferring to end them at paragraph or line breaks.
+
+    Parameters
+    ----------
+    string : str
+        The string to chunk.
+    chunkTokens : int
+        The maximum number of tokens in a chunk.
+    overlapTokens : int, optional
+        The maximum number of tokens each chunk repeats from the end of the previous
+        one (default is 0). The overlap starts at a line start when it spans one.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+
+    Yields
+    ------
+    TextChunk
+        A named tuple of the chunk's "text", its exact token count "numTokens" and
+        the "byteOffset" of its first character in the UTF-8 encoding of the
+        string.
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "chunkTokens", "overlapTokens", "model",
+        "encodingName", or "encoding" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model, encoding name and encoding, if "chunkTokens" is
+        less than 1, if "overlapTokens" is negative or not less than
+        "chunkTokens", or if the string contains a special token.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import ChunkStr
+    >>> for chunk in ChunkStr(document, chunkTokens=512, overlapTokens=64, model="gpt-4o"):
+    ...     Index(chunk.text, offset=chunk.byteOffset)
+    """
+
+    import tiktoken
+
+    if not isinstance(string, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+        )
+
+    _ValidateChunkArgs(chunkTokens=chunkTokens, overlapTokens=overlapTokens)
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    return _IterTextChunks(
+        encoding=_encoding,
+        segments=(string,),
+        chunkTokens=chunkTokens,
+        overlapTokens=overlapTokens,
+    )
+
+
+def ChunkFile(
+    filePath: Path | str,
+    chunkTokens: int,
+    overlapTokens: int = 0,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    chunkSize: int = STREAM_CHUNK_SIZE,
+    detectionStrategy: str = "full",
+) -> Iterator[TextChunk]:
+    """
+    Split the contents of a file into consecutive chunks of at most "chunkTokens"
+    tokens, preferring to end them at paragraph or line breaks. The file is
+    streamed, so neither its contents nor its tokens are held in memory at once.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to chunk.
+    chunkTokens : int
+        The maximum number of tokens in a chunk.
+    overlapTokens : int, optional
+        The maximum number of tokens each chunk repeats from the end of the previous
+        one (default is 0). The overlap starts at a line start when it spans one.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    chunkSize : int, optional
+        The number of bytes to read from the file at a time (default is 1 MiB).
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        In streaming mode the encoding is decided from the first chunk.
+
+    Yields
+    ------
+    TextChunk
+        A named tuple of the chunk's "text", its exact token count "numTokens" and
+        the "byteOffset" of its first character, which is its position in the file
+        for a UTF-8 file with "\\n" line endings, and in the UTF-8 encoding of the
+        decoded text, whose line endings are translated to "\\n", otherwise.
+
+    Raises
+    ------
+    TypeError
+        If the types of "filePath", "chunkTokens", "overlapTokens", "model",
+        "encodingName", "encoding" or "chunkSize" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model, encoding name and encoding, if "chunkTokens" is
+        less than 1, if "overlapTokens" is negative or not less than
+        "chunkTokens", if "chunkSize" is not positive, or if the file contains a
+        special token.
+    UnsupportedEncodingError
+        If the file's encoding is not supported.
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import ChunkFile
+    >>> chunks = list(ChunkFile("./PyTokenCounter/Tests/Input/TestFile1.txt", chunkTokens=100, model="gpt-4o"))
+    >>> [chunk.numTokens for chunk in chunks]
+    [97, 100, 24]
+    """
+
+    _ValidateChunkArgs(chunkTokens=chunkTokens, overlapTokens=overlapTokens)
+
+    _encoding, textChunks = _PrepareFileStream(
+        filePath=filePath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        chunkSize=chunkSize,
+        detectionStrategy=detectionStrategy,
+    )
+
+    return _IterTextChunks(
+        encoding=_encoding,
+        segments=textChunks,
+        chunkTokens=chunkTokens,
+        overlapTokens=overlapTokens,
+    )
+
+
+def ChunkDir(
+    dirPath: Path | str,
+    chunkTokens: int,
+    overlapTokens: int = 0,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> Iterator[tuple[str, TextChunk]]:
+    """
+    Split every file within a directory into consecutive chunks of at most
+    "chunkTokens" tokens, preferring to end them at paragraph or line breaks.
+    Files with an unsupported encoding are skipped.
+
+    Parameters
+    ----------
+    dirPath : Path or str
+        The path to the directory to chunk.
+    chunkTokens : int
+        The maximum number of tokens in a chunk.
+    overlapTokens : int, optional
+        The maximum number of tokens each chunk repeats from the end of the previous
+        one in the same file (default is 0).
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    recursive : bool, default True
+        Whether to chunk files in subdirectories recursively.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+    workers : int, default 1
+        The number of workers to spread the files across. With 1, each file is
+        streamed chunk by chunk in this process. With more, each worker chunks
+        whole files. The chunks are the same, and in the same order, for any
+        number of workers.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1. "process"
+        spreads the work across processes; "thread" uses threads, which start
+        faster and hand chunks back without pickling them.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
+
+    Yields
+    ------
+    tuple[str, TextChunk]
+        The POSIX-style path of the file relative to "dirPath", and each of its
+        chunks, in the order the directory is walked.
+
+    Raises
+    ------
+    TypeError
+        If the types of "dirPath", "chunkTokens", "overlapTokens", "model",
+        "encodingName", "encoding", "recursive", "workers", "backend", "include",
+        "exclude", "respectGitignore", or "maxFileSize" are incorrect.
+    ValueError
+        If the provided "dirPath" is not a directory, if "chunkTokens" is less than
+        1, if "overlapTokens" is negative or not less than "chunkTokens", if
+        "workers" is less than 1, if "backend" is not a valid backend, or if
+        "maxFileSize" is negative.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import ChunkDir
+    >>> for relativePath, chunk in ChunkDir("./Docs", chunkTokens=512, overlapTokens=64, model="gpt-4o", workers=8):
+    ...     Index(chunk.text, source=relativePath, offset=chunk.byteOffset)
+    """
+
+    import tiktoken
+
+    if not isinstance(dirPath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
+        )
+
+    _ValidateChunkArgs(chunkTokens=chunkTokens, overlapTokens=overlapTokens)
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(recursive, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if not isinstance(workers, int) or isinstance(workers, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
+
+    if workers < 1:
+
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    if not isinstance(backend, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
+
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
+
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    dirPath = Path(dirPath).resolve()
+
+    if not dirPath.is_dir():
+
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+    return _IterDirChunks(
+        dirPath=dirPath,
+        filePaths=_WalkDirFiles(
+            dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+        ),
+        encoding=_encoding,
+        chunkTokens=chunkTokens,
+        overlapTokens=overlapTokens,
+        detectionStrategy=detectionStrategy,
+        workers=workers,
+        backend=backend,
+    )
@@ -0,0 +1,721 @@
+"""
+_counter.py
+
+A TokenCounter binds an encoding, its I/O options, a token cache, directory filters
+and a worker pool once, so that services making many calls do not pay for setting
+them up on every one of them.
+
+The free functions resolve their "model", "encodingName" and "encoding" arguments
+on each call. Resolution is memoized per (model, encodingName), but the arguments
+are still type checked and compared each time. A TokenCounter does all of that once,
+in its constructor, and its methods hand the bound encoding straight to the
+tokenizer. Its directory methods also reuse the compiled directory filters, and a
+worker pool that is started on first use and kept until the counter is closed,
+rather than one started and shut down on every call.
+
+The methods share their implementation with the free functions, through the
+internal functions of PyTokenCounter.core.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ._cache import TokenCache
+from ._progress import GetProgressReporter, ProgressReporter
+from ._utils import DETECTION_STRATEGIES, DETECTION_STRATEGIES_STR
+from .core import (
+    PARALLEL_BACKENDS,
+    PARALLEL_BACKENDS_STR,
+    RESULT_ORDERS,
+    RESULT_ORDERS_STR,
+    RETURN_TYPES,
+    RETURN_TYPES_STR,
+    DirFileResult,
+    GetNumTokenFile,
+    GetNumTokenStr,
+    GetNumTokenStrs,
+    IsWithinTokenLimit,
+    TokenizeFile,
+    TokenizeStr,
+    TokenizeStrs,
+    TokenLimitResult,
+    TruncateResult,
+    TruncateStr,
+    _CountTokens,
+    _CreateFileExecutor,
+    _EncodeText,
+    _GetNumTokenDirFiles,
+    _GetPathFilter,
+    _IterDirResults,
+    _ResolveEncoding,
+    _TokenizeDirFiles,
+    _WalkDirFiles,
+)
+
+if TYPE_CHECKING:
+
+    import numpy
+    import tiktoken
+
+
+class TokenCounter:
+    """
+    Tokenizes and counts tokens of strings, files and directories with an encoding,
+    options and a worker pool set up once, when the counter is created.
+
+    With "workers" greater than 1, the directory methods run on a worker pool that
+    is started on their first call and kept until Close() is called. A
+    TokenCounter can be used as a context manager, which closes it on exit.
+
+    Attributes
+    ----------
+    encoding : tiktoken.Encoding
+        The bound encoding.
+    quiet : bool
+        Whether progress updates are suppressed.
+    progress : ProgressReporter or None
+        The reporter each call reports its progress to, if not the default.
+    detectionStrategy : str
+        How the encoding of files is detected.
+    workers : int
+        The number of workers the directory methods use.
+    backend : str
+        Whether the workers are processes or threads.
+    cache : TokenCache or None
+        The token cache used to count files, if any.
+    recursive : bool
+        Whether the directory methods include subdirectories.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TokenCounter
+    >>> counter = TokenCounter(model="gpt-4o", quiet=True)
+    >>> counter.GetNumTokenStr("Hail to the Victors!")
+    7
+    >>> counter.TokenizeStr("2024 National Champions")
+    [1323, 19, 6743, 40544]
+    >>> with TokenCounter(model="gpt-4o", quiet=True, workers=4) as counter:
+    ...     for dirPath in ["./Tests/Input", "./Tests/Answers"]:
+    ...         print(counter.GetNumTokenDir(dirPath))
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        encodingName: str | None = None,
+        encoding: tiktoken.Encoding | None = None,
+        quiet: bool = False,
+        progress: ProgressReporter | None = None,
+        detectionStrategy: str = "full",
+        workers: int = 1,
+        backend: str = "process",
+        cache: TokenCache | None = None,
+        recursive: bool = True,
+        include: str | list[str] | None = None,
+        exclude: str | list[str] | None = None,
+        respectGitignore: bool = False,
+        maxFileSize: int | None = None,
+    ):
+        """
+        Resolve and validate the encoding and options to bind.
+
+        Parameters
+        ----------
+        model : str or None, optional
+            The name of the model to use for encoding. If provided, the encoding
+            associated with the model will be used.
+        encodingName : str or None, optional
+            The name of the encoding to use. If provided, it must match the encoding
+            associated with the specified model.
+        encoding : tiktoken.Encoding or None, optional
+            An existing tiktoken.Encoding object to use for tokenization. If
+            provided, it must match the encoding derived from the model or
+            encodingName.
+        quiet : bool, optional
+            If True, suppress progress updates (default is False).
+        progress : ProgressReporter or None, optional
+            The reporter each call reports its progress to (default is None, which
+            draws progress bars with "rich"). Ignored if "quiet" is True.
+        detectionStrategy : str, optional
+            How to detect the encoding of files (default is "full"). See
+            PyTokenCounter.TokenizeFile.
+        workers : int, optional
+            The number of workers the directory methods tokenize files across
+            (default is 1, which tokenizes them in this process).
+        backend : str, optional
+            "process" or "thread" workers (default is "process"). See
+            PyTokenCounter.GetNumTokenDir.
+        cache : TokenCache or None, optional
+            A token cache to count files through (default is None).
+        recursive : bool, optional
+            Whether the directory methods include subdirectories (default is True).
+        include : str, list of str or None, optional
+            Glob patterns of the files the directory methods keep (default is None,
+            which keeps all).
+        exclude : str, list of str or None, optional
+            Glob patterns of the files and directories the directory methods leave
+            out (default is None).
+        respectGitignore : bool, optional
+            Whether the directory methods leave out what ".gitignore" files ignore,
+            and ".git" (default is False).
+        maxFileSize : int or None, optional
+            The size in bytes above which the directory methods leave files out
+            (default is None).
+
+        Raises
+        ------
+        TypeError
+            If the types of any of the parameters are incorrect.
+        ValueError
+            If the provided "model" or "encodingName" is invalid, if the arguments
+            do not match each other, if none of them is provided, if
+            "detectionStrategy" or "backend" is not valid, or if "workers" is less
+            than 1 or "maxFileSize" is negative.
+        """
+
+        import tiktoken
+
+        if model is not None and not isinstance(model, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+            )
+
+        if encodingName is not None and not isinstance(encodingName, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+            )
+
+        if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+            raise TypeError(
+                f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+            )
+
+        if not isinstance(quiet, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "quiet". Expected type: bool. Given type: {type(quiet)}'
+            )
+
+        if progress is not None and not isinstance(progress, ProgressReporter):
+
+            raise TypeError(
+                f'Unexpected type for parameter "progress". Expected type: PyTokenCounter.ProgressReporter. Given type: {type(progress)}'
+            )
+
+        if not isinstance(detectionStrategy, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+            )
+
+        if detectionStrategy not in DETECTION_STRATEGIES:
+
+            raise ValueError(
+                f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+            )
+
+        if not isinstance(workers, int) or isinstance(workers, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+            )
+
+        if workers < 1:
+
+            raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+        if not isinstance(backend, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+            )
+
+        if backend not in PARALLEL_BACKENDS:
+
+            raise ValueError(
+                f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+            )
+
+        if cache is not None and not isinstance(cache, TokenCache):
+
+            raise TypeError(
+                f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+            )
+
+        if not isinstance(recursive, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+            )
+
+        self.pathFilter = _GetPathFilter(
+            include=include,
+            exclude=exclude,
+            respectGitignore=respectGitignore,
+            maxFileSize=maxFileSize,
+        )
+        self.encoding = _ResolveEncoding(
+            model=model, encodingName=encodingName, encoding=encoding
+        )
+        self.quiet = quiet
+        self.progress = progress
+        self.detectionStrategy = detectionStrategy
+        self.workers = workers
+        self.backend = backend
+        self.cache = cache
+        self.recursive = recursive
+
+        self._executor: Executor | None = None
+        self._executorLock = threading.Lock()
+
+    def __repr__(self) -> str:
+
+        return (
+            f"TokenCounter(encodingName={self.encoding.name!r}, quiet={self.quiet}, "
+            f"workers={self.workers}, backend={self.backend!r})"
+        )
+
+    def __enter__(self) -> "TokenCounter":
+
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+
+        self.Close()
+
+    def Close(self) -> None:
+        """
+        Shut down the worker pool, if one was started. The counter can still be
+        used afterwards, and starts a new pool when it next needs one.
+        """
+
+        with self._executorLock:
+
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _GetExecutor(self) -> Executor | None:
+        """
+        Internal method to get the worker pool, starting it on first use, or None
+        when files are tokenized in this process.
+        """
+
+        if self.workers == 1:
+
+            return None
+
+        with self._executorLock:
+
+            if self._executor is None:
+
+                self._executor = _CreateFileExecutor(
+                    encoding=self.encoding,
+                    workers=self.workers,
+                    backend=self.backend,
+                    cache=self.cache,
+                )
+
+            return self._executor
+
+    def _ResolveDirPath(self, dirPath: Path | str) -> Path:
+        """
+        Internal method to validate and resolve the directory path given to a
+        directory method.
+        """
+
+        if not isinstance(dirPath, (str, Path)):
+
+            raise TypeError(
+                f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
+            )
+
+        dirPath = Path(dirPath).resolve()
+
+        if not dirPath.is_dir():
+
+            raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+        return dirPath
+
+    def TokenizeStr(
+        self, string: str, returnType: str = "list"
+    ) -> list[int] | array | memoryview | numpy.ndarray:
+        """
+        Tokenize a string into token IDs. See PyTokenCounter.TokenizeStr.
+
+        Parameters
+        ----------
+        string : str
+            The string to tokenize.
+        returnType : str, optional
+            The container to return the token IDs in (default is "list"). One of
+            "list", "array", "numpy" or "buffer".
+
+        Returns
+        -------
+        list of int, array.array, numpy.ndarray or memoryview
+            The token IDs of the string, in the container named by "returnType".
+
+        Raises
+        ------
+        TypeError
+            If the types of "string" or "returnType" are incorrect.
+        ValueError
+            If "returnType" is invalid.
+        """
+
+        if not self.quiet:
+
+            return TokenizeStr(
+                string=string,
+                encoding=self.encoding,
+                quiet=False,
+                progress=self.progress,
+                returnType=returnType,
+            )
+
+        if not isinstance(string, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+            )
+
+        if returnType not in RETURN_TYPES:
+
+            if not isinstance(returnType, str):
+
+                raise TypeError(
+                    f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+                )
+
+            raise ValueError(
+                f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+            )
+
+        return _EncodeText(encoding=self.encoding, text=string, returnType=returnType)
+
+    def GetNumTokenStr(self, string: str, maxTokens: int | None = None) -> int:
+        """
+        Count the tokens in a string. See PyTokenCounter.GetNumTokenStr.
+
+        Parameters
+        ----------
+        string : str
+            The string to count tokens for.
+        maxTokens : int or None, optional
+            Stop counting as soon as the count exceeds this many tokens (default is
+            None).
+
+        Returns
+        -------
+        int
+            The number of tokens in the string, or a partial count greater than
+            "maxTokens" if counting stopped early.
+
+        Raises
+        ------
+        TypeError
+            If the types of "string" or "maxTokens" are incorrect.
+        ValueError
+            If "maxTokens" is negative.
+        """
+
+        if not self.quiet or maxTokens is not None:
+
+            return GetNumTokenStr(
+                string=string,
+                encoding=self.encoding,
+                quiet=self.quiet,
+                progress=self.progress,
+                maxTokens=maxTokens,
+            )
+
+        if not isinstance(string, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+            )
+
+        return _CountTokens(encoding=self.encoding, text=string)
+
+    def IsWithinTokenLimit(self, string: str, limit: int) -> TokenLimitResult:
+        """
+        Check whether a string has no more tokens than a limit. See
+        PyTokenCounter.IsWithinTokenLimit.
+        """
+
+        return IsWithinTokenLimit(string=string, limit=limit, encoding=self.encoding)
+
+    def TruncateStr(
+        self, string: str, maxTokens: int, side: str = "head"
+    ) -> TruncateResult:
+        """
+        Truncate a string to at most a number of tokens. See
+        PyTokenCounter.TruncateStr.
+        """
+
+        return TruncateStr(
+            string=string, maxTokens=maxTokens, side=side, encoding=self.encoding
+        )
+
+    def TokenizeStrs(
+        self, strings: list[str], returnType: str = "list"
+    ) -> list[list[int] | array | memoryview | numpy.ndarray]:
+        """
+        Tokenize a list of strings in batches. See PyTokenCounter.TokenizeStrs.
+        """
+
+        return TokenizeStrs(
+            strings=strings,
+            encoding=self.encoding,
+            quiet=self.quiet,
+            progress=self.progress,
+            returnType=returnType,
+        )
+
+    def GetNumTokenStrs(self, strings: list[str]) -> list[int]:
+        """
+        Count the tokens in each of a list of strings in batches. See
+        PyTokenCounter.GetNumTokenStrs.
+        """
+
+        return GetNumTokenStrs(
+            strings=strings,
+            encoding=self.encoding,
+            quiet=self.quiet,
+            progress=self.progress,
+        )
+
+    def TokenizeFile(
+        self, filePath: Path | str, returnType: str = "list"
+    ) -> list[int] | array | memoryview | numpy.ndarray:
+        """
+        Tokenize a file into token IDs. See PyTokenCounter.TokenizeFile.
+        """
+
+        return TokenizeFile(
+            filePath=filePath,
+            encoding=self.encoding,
+            quiet=self.quiet,
+            progress=self.progress,
+            detectionStrategy=self.detectionStrategy,
+            cache=self.cache,
+            returnType=returnType,
+        )
+
+    def GetNumTokenFile(
+        self, filePath: Path | str, maxTokens: int | None = None
+    ) -> int:
+        """
+        Count the tokens in a file. See PyTokenCounter.GetNumTokenFile.
+        """
+
+        return GetNumTokenFile(
+            filePath=filePath,
+            encoding=self.encoding,
+            quiet=self.quiet,
+            progress=self.progress,
+            detectionStrategy=self.detectionStrategy,
+            cache=self.cache,
+            maxTokens=maxTokens,
+        )
+
+    def TokenizeDir(
+        self, dirPath: Path | str, returnType: str = "list"
+    ) -> dict[str, list[int] | array | memoryview | numpy.ndarray | dict]:
+        """
+        Tokenize all files in a directory into a nested dictionary of token IDs. See
+        PyTokenCounter.TokenizeDir.
+
+        Parameters
+        ----------
+        dirPath : Path or str
+            The path to the directory to tokenize.
+        returnType : str, optional
+            The container to return the token IDs of each file in (default is
+            "list"). One of "list", "array", "numpy" or "buffer".
+
+        Returns
+        -------
+        dict
+            The token IDs of each file, keyed by file name, with a nested dictionary
+            for each subdirectory.
+
+        Raises
+        ------
+        TypeError
+            If the types of "dirPath" or "returnType" are incorrect.
+        ValueError
+            If "dirPath" is not a directory or "returnType" is invalid.
+        """
+
+        if returnType not in RETURN_TYPES:
+
+            if not isinstance(returnType, str):
+
+                raise TypeError(
+                    f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+                )
+
+            raise ValueError(
+                f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+            )
+
+        return _TokenizeDirFiles(
+            dirPath=self._ResolveDirPath(dirPath),
+            encoding=self.encoding,
+            recursive=self.recursive,
+            progress=GetProgressReporter(quiet=self.quiet, progress=self.progress),
+            detectionStrategy=self.detectionStrategy,
+            workers=self.workers,
+            backend=self.backend,
+            returnType=returnType,
+            pathFilter=self.pathFilter,
+            executor=self._GetExecutor(),
+        )
+
+    def GetNumTokenDir(self, dirPath: Path | str, maxTokens: int | None = None) -> int:
+        """
+        Count the tokens in all files in a directory. See
+        PyTokenCounter.GetNumTokenDir.
+
+        Parameters
+        ----------
+        dirPath : Path or str
+            The path to the directory to count tokens for.
+        maxTokens : int or None, optional
+            A total token budget. No further files are counted once the total
+            exceeds it (default is None).
+
+        Returns
+        -------
+        int
+            The total number of tokens in the files of the directory, or a partial
+            total greater than "maxTokens" if counting stopped early.
+
+        Raises
+        ------
+        TypeError
+            If the types of "dirPath" or "maxTokens" are incorrect.
+        ValueError
+            If "dirPath" is not a directory or "maxTokens" is negative.
+        """
+
+        if maxTokens is not None and (
+            not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+        ):
+
+            raise TypeError(
+                f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+            )
+
+        if maxTokens is not None and maxTokens < 0:
+
+            raise ValueError(
+                f'"maxTokens" must be at least 0. Given value: {maxTokens}'
+            )
+
+        return _GetNumTokenDirFiles(
+            dirPath=self._ResolveDirPath(dirPath),
+            encoding=self.encoding,
+            recursive=self.recursive,
+            progress=GetProgressReporter(quiet=self.quiet, progress=self.progress),
+            detectionStrategy=self.detectionStrategy,
+            workers=self.workers,
+            backend=self.backend,
+            cache=self.cache,
+            maxTokens=maxTokens,
+            pathFilter=self.pathFilter,
+            executor=self._GetExecutor(),
+        )
+
+    def IterTokenizeDir(
+        self, dirPath: Path | str, returnType: str = "list", order: str = "walk"
+    ) -> Iterator[DirFileResult]:
+        """
+        Tokenize all files in a directory, yielding the tokens of each file as soon
+        as it is done. See PyTokenCounter.IterTokenizeDir.
+        """
+
+        return self._IterDir(
+            dirPath=dirPath, countOnly=False, returnType=returnType, order=order
+        )
+
+    def IterCountDir(
+        self, dirPath: Path | str, order: str = "walk"
+    ) -> Iterator[DirFileResult]:
+        """
+        Count the tokens of all files in a directory, yielding the count of each
+        file as soon as it is done. See PyTokenCounter.IterCountDir.
+        """
+
+        return self._IterDir(dirPath=dirPath, countOnly=True, order=order)
+
+    def _IterDir(
+        self,
+        dirPath: Path | str,
+        countOnly: bool,
+        returnType: str = "list",
+        order: str = "walk",
+    ) -> Iterator[DirFileResult]:
+        """
+        Internal method backing IterTokenizeDir and IterCountDir.
+        """
+
+        if returnType not in RETURN_TYPES:
+
+            if not isinstance(returnType, str):
+
+                raise TypeError(
+                    f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+                )
+
+            raise ValueError(
+                f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+            )
+
+        if not isinstance(order, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "order". Expected type: str. Given type: {type(order)}'
+            )
+
+        if order not in RESULT_ORDERS:
+
+            raise ValueError(
+                f"Invalid order: {order}\n\nValid orders:\n{RESULT_ORDERS_STR}"
+            )
+
+        dirPath = self._ResolveDirPath(dirPath)
+
+        return _IterDirResults(
+            dirPath=dirPath,
+            filePaths=_WalkDirFiles(
+                dirPath=dirPath, recursive=self.recursive, pathFilter=self.pathFilter
+            ),
+            encoding=self.encoding,
+            countOnly=countOnly,
+            detectionStrategy=self.detectionStrategy,
+            workers=self.workers,
+            backend=self.backend,
+            cache=self.cache,
+            returnType=returnType,
+            order=order,
+            executor=self._GetExecutor(),
+        )
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TokenCounter.__module__ = "PyTokenCounter"
@@ -0,0 +1,475 @@
+"""
+_filter.py
+
+Filters applied while a directory is walked, used by TokenizeDir, GetNumTokenDir
+and the other directory functions to leave out files before they are read.
+
+A PathFilter combines:
+
+- "include" glob patterns: only files matching one of them, or inside a directory
+  matching one of them, are kept.
+- "exclude" glob patterns: matching files are left out, and matching directories
+  are pruned, so they are never descended into.
+- ".gitignore" files: with "respectGitignore", the rules of every ".gitignore"
+  file in the walked tree, and in its parent directories up to the root of the
+  enclosing git repository, are applied the way git applies them, and ".git"
+  itself is skipped. ".git/info/exclude" is read as well.
+- A maximum file size in bytes, checked from the directory entry before the file
+  is opened.
+
+Glob patterns use the ".gitignore" syntax: "*" and "?" do not match "/", "**"
+matches any number of directories, a pattern without a "/" matches a name at any
+depth, a pattern with one is anchored to the walked directory, and a trailing "/"
+matches directories only. In ".gitignore" files, a leading "!" re-includes paths
+matched by an earlier rule.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+
+class IgnorePattern(NamedTuple):
+    """
+    A compiled ".gitignore"-style pattern.
+    """
+
+    regex: re.Pattern
+    isNegated: bool
+    dirOnly: bool
+
+
+class IgnoreRules(NamedTuple):
+    """
+    The patterns of one ignore file. A path relative to the walked directory is
+    matched as "prefix" followed by the path with its first "stripChars" characters
+    removed, which makes it relative to the directory of the ignore file.
+    """
+
+    stripChars: int
+    prefix: str
+    patterns: tuple[IgnorePattern, ...]
+
+
+def _TranslateGlob(pattern: str) -> str:
+    """
+    Internal function to translate the body of a ".gitignore"-style pattern into a
+    regular expression matching whole relative paths.
+    """
+
+    parts = []
+    index = 0
+
+    while index < len(pattern):
+
+        char = pattern[index]
+
+        if pattern.startswith("**/", index) and (
+            index == 0 or pattern[index - 1] == "/"
+        ):
+
+            # Zero or more leading directories
+            parts.append("(?:.*/)?")
+            index += 3
+
+            continue
+
+        if pattern.startswith("/**", index) and index + 3 == len(pattern):
+
+            # Everything inside the directory
+            parts.append("/.*")
+            index += 3
+
+            continue
+
+        if char == "*":
+
+            parts.append("[^/]*")
+
+            while index + 1 < len(pattern) and pattern[index + 1] == "*":
+
+                index += 1
+
+        elif char == "?":
+
+            parts.append("[^/]")
+
+        elif char == "[":
+
+            classEnd = pattern.find("]", index + 2)
+
+            if classEnd == -1:
+
+                parts.append(re.escape(char))
+
+            else:
+
+                content = pattern[index + 1 : classEnd]
+
+                if content.startswith("!"):
+
+                    content = "^" + content[1:]
+
+                elif content.startswith("^"):
+
+                    content = "\\" + content
+
+                parts.append(f"(?!/)[{content}]")
+                index = classEnd
+
+        elif char == "\\" and index + 1 < len(pattern):
+
+            parts.append(re.escape(pattern[index + 1]))
+            index += 1
+
+        else:
+
+            parts.append(re.escape(char))
+
+        index += 1
+
+    return "".join(parts)
+
+
+def CompileIgnorePattern(line: str) -> IgnorePattern | None:
+    """
+    Compile one line of a ".gitignore" file, or one include or exclude pattern.
+
+    Parameters
+    ----------
+    line : str
+        The pattern.
+
+    Returns
+    -------
+    IgnorePattern or None
+        The compiled pattern, or None for a blank line or a comment.
+    """
+
+    line = line.rstrip("\r\n")
+    stripped = line.rstrip(" ")
+
+    # Trailing spaces are kept only when escaped with a backslash
+    if stripped.endswith("\\") and len(stripped) < len(line):
+
+        stripped += " "
+
+    line = stripped
+
+    if not line or line.startswith("#"):
+
+        return None
+
+    isNegated = line.startswith("!")
+
+    if isNegated:
+
+        line = line[1:]
+
+    dirOnly = line.endswith("/")
+    line = line.rstrip("/")
+
+    if not line:
+
+        return None
+
+    isAnchored = "/" in line
+
+    if line.startswith("/"):
+
+        line = line[1:]
+
+    regex = _TranslateGlob(line)
+
+    if not isAnchored:
+
+        regex = "(?:.*/)?" + regex
+
+    return IgnorePattern(
+        regex=re.compile(regex, re.DOTALL), isNegated=isNegated, dirOnly=dirOnly
+    )
+
+
+def ReadIgnoreFile(filePath: Path | str) -> tuple[IgnorePattern, ...]:
+    """
+    Read and compile the patterns of a ".gitignore" file.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the ignore file.
+
+    Returns
+    -------
+    tuple[IgnorePattern, ...]
+        The compiled patterns in file order, or an empty tuple if the file does not
+        exist or cannot be read.
+    """
+
+    try:
+
+        with open(filePath, encoding="utf-8", errors="replace") as ignoreFile:
+
+            lines = ignoreFile.readlines()
+
+    except OSError:
+
+        return ()
+
+    return tuple(
+        pattern
+        for pattern in (CompileIgnorePattern(line) for line in lines)
+        if pattern is not None
+    )
+
+
+def FindRepoRoot(dirPath: Path) -> Path | None:
+    """
+    Find the root of the git repository containing a directory.
+
+    Parameters
+    ----------
+    dirPath : Path
+        The resolved path to the directory.
+
+    Returns
+    -------
+    Path or None
+        The closest directory, starting from "dirPath" itself, that contains a
+        ".git" entry, or None if there is none.
+    """
+
+    for candidate in (dirPath, *dirPath.parents):
+
+        if os.path.lexists(os.path.join(candidate, ".git")):
+
+            return candidate
+
+    return None
+
+
+def _MatchesAny(
+    patterns: tuple[IgnorePattern, ...], relativePath: str, isDir: bool
+) -> bool:
+    """
+    Internal function to check whether a path matches any of a list of patterns,
+    ignoring negation.
+    """
+
+    return any(
+        (isDir or not pattern.dirOnly) and pattern.regex.fullmatch(relativePath)
+        for pattern in patterns
+    )
+
+
+class PathFilter:
+    """
+    Decides which entries a directory walk keeps. See the module docstring for the
+    rules applied.
+
+    Parameters
+    ----------
+    include : list[str] or None, optional
+        Glob patterns of the files to keep (default is None, which keeps all).
+    exclude : list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+    respectGitignore : bool, optional
+        Whether to apply ".gitignore" rules and skip ".git" (default is False).
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out (default is None).
+    """
+
+    def __init__(
+        self,
+        include: list[str] | None = None,
+        exclude: list[str] | None = None,
+        respectGitignore: bool = False,
+        maxFileSize: int | None = None,
+    ) -> None:
+
+        self.includePatterns = tuple(
+            pattern
+            for pattern in map(CompileIgnorePattern, include or [])
+            if pattern is not None
+        )
+        self.excludePatterns = tuple(
+            pattern
+            for pattern in map(CompileIgnorePattern, exclude or [])
+            if pattern is not None
+        )
+        self.respectGitignore = respectGitignore
+        self.maxFileSize = maxFileSize
+
+    def GetRootRules(self, dirPath: Path) -> tuple[IgnoreRules, ...]:
+        """
+        Get the ignore rules that apply to the walked directory from outside it:
+        those of ".git/info/exclude" and of the ".gitignore" files of its parent
+        directories, up to the root of its git repository.
+
+        Parameters
+        ----------
+        dirPath : Path
+            The resolved path to the walked directory.
+
+        Returns
+        -------
+        tuple[IgnoreRules, ...]
+            The rules, outermost first.
+        """
+
+        if not self.respectGitignore:
+
+            return ()
+
+        repoRoot = FindRepoRoot(dirPath=dirPath)
+
+        if repoRoot is None:
+
+            return ()
+
+        rules = []
+        ancestors = [
+            ancestor
+            for ancestor in reversed(dirPath.parents)
+            if ancestor.is_relative_to(repoRoot)
+        ]
+
+        for ancestor, ignorePath in [
+            (repoRoot, Path(repoRoot, ".git", "info", "exclude")),
+            *((ancestor, Path(ancestor, ".gitignore")) for ancestor in ancestors),
+        ]:
+
+            patterns = ReadIgnoreFile(filePath=ignorePath)
+
+            if patterns:
+
+                prefix = dirPath.relative_to(ancestor).as_posix()
+                rules.append(
+                    IgnoreRules(
+                        stripChars=0,
+                        prefix="" if prefix == "." else prefix + "/",
+                        patterns=patterns,
+                    )
+                )
+
+        return tuple(rules)
+
+    def GetDirRules(
+        self, dirPath: str, relativeDir: str, rules: tuple[IgnoreRules, ...]
+    ) -> tuple[IgnoreRules, ...]:
+        """
+        Add the rules of a directory's own ".gitignore" file to the rules inherited
+        from its parents.
+
+        Parameters
+        ----------
+        dirPath : str
+            The path to the directory.
+        relativeDir : str
+            The path of the directory relative to the walked directory, with a
+            trailing "/", or an empty string for the walked directory itself.
+        rules : tuple[IgnoreRules, ...]
+            The rules that apply to the directory.
+
+        Returns
+        -------
+        tuple[IgnoreRules, ...]
+            The rules that apply to the entries of the directory.
+        """
+
+        if not self.respectGitignore:
+
+            return rules
+
+        patterns = ReadIgnoreFile(filePath=os.path.join(dirPath, ".gitignore"))
+
+        if not patterns:
+
+            return rules
+
+        return (
+            *rules,
+            IgnoreRules(stripChars=len(relativeDir), prefix="", patterns=patterns),
+        )
+
+    def Accepts(
+        self,
+        entry: os.DirEntry,
+        relativePath: str,
+        isDir: bool,
+        rules: tuple[IgnoreRules, ...],
+    ) -> bool:
+        """
+        Check whether the walk keeps a file, or descends into a directory.
+
+        Parameters
+        ----------
+        entry : os.DirEntry
+            The directory entry.
+        relativePath : str
+            The POSIX-style path of the entry relative to the walked directory.
+        isDir : bool
+            Whether the entry is a directory.
+        rules : tuple[IgnoreRules, ...]
+            The ignore rules that apply to the entry.
+
+        Returns
+        -------
+        bool
+            Whether the entry is kept.
+        """
+
+        if self.respectGitignore and entry.name == ".git":
+
+            return False
+
+        if _MatchesAny(self.excludePatterns, relativePath, isDir):
+
+            return False
+
+        isIgnored = False
+
+        for ruleSet in rules:
+
+            subPath = ruleSet.prefix + relativePath[ruleSet.stripChars :]
+
+            for pattern in ruleSet.patterns:
+
+                if (isDir or not pattern.dirOnly) and pattern.regex.fullmatch(subPath):
+
+                    isIgnored = not pattern.isNegated
+
+        if isIgnored:
+
+            return False
+
+        if isDir:
+
+            return True
+
+        if self.includePatterns and not (
+            _MatchesAny(self.includePatterns, relativePath, False)
+            or any(
+                _MatchesAny(self.includePatterns, relativePath[:index], True)
+                for index, char in enumerate(relativePath)
+                if char == "/"
+            )
+        ):
+
+            return False
+
+        if self.maxFileSize is not None:
+
+            try:
+
+                if entry.stat().st_size > self.maxFileSize:
+
+                    return False
+
+            except OSError:
+
+                # Left for reading the file to report
+                pass
+
+        return True
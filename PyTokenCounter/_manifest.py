@@ -0,0 +1,262 @@
+"""
+_manifest.py
+
+A persistent record of the files counted in a directory, stored in a SQLite
+database, used by GetNumTokenDirIncremental to recount only what changed since the
+previous run.
+
+Each file is recorded with its size, modification time in nanoseconds, inode
+number and token count, per directory, encoding and detection strategy. A file
+whose stat signature still matches its record is not read again: its stored count
+is reused. Only files that are new, or whose signature changed, are read and
+tokenized.
+
+The default database lives at "$XDG_CACHE_HOME/PyTokenCounter/manifest.sqlite",
+falling back to "~/.cache/PyTokenCounter/manifest.sqlite".
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+
+class ManifestEntry(NamedTuple):
+    """
+    The recorded stat signature and token count of a file. "numTokens" is None for
+    a file that was skipped because its encoding is unsupported.
+    """
+
+    size: int
+    mtimeNs: int
+    inode: int
+    numTokens: int | None
+
+
+def GetDefaultManifestPath() -> Path:
+    """
+    Get the default location of the manifest database.
+
+    Returns
+    -------
+    Path
+        "$XDG_CACHE_HOME/PyTokenCounter/manifest.sqlite", or
+        "~/.cache/PyTokenCounter/manifest.sqlite" if XDG_CACHE_HOME is not set.
+    """
+
+    cacheHome = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(cacheHome, "PyTokenCounter", "manifest.sqlite")
+
+
+class TokenManifest:
+    """
+    A persistent record of the stat signatures and token counts of the files in
+    counted directories.
+
+    Attributes
+    ----------
+    path : Path
+        The path to the SQLite database file.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetNumTokenDirIncremental, TokenManifest
+    >>> with TokenManifest() as manifest:
+    ...     result = GetNumTokenDirIncremental(dirPath="./Data", model="gpt-4o", manifest=manifest)
+    >>> result["numTokens"], result["changed"]
+    (1500, {'notes/todo.txt': 42})
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        """
+        Open the manifest database, creating it if it does not exist.
+
+        Parameters
+        ----------
+        path : Path, str or None, optional
+            The path to the SQLite database file. Defaults to
+            GetDefaultManifestPath().
+
+        Raises
+        ------
+        TypeError
+            If the type of "path" is incorrect.
+        """
+
+        import sqlite3
+
+        if path is not None and not isinstance(path, (str, Path)):
+
+            raise TypeError(
+                f'Unexpected type for parameter "path". Expected type: str or pathlib.Path. Given type: {type(path)}'
+            )
+
+        self.path = Path(path) if path is not None else GetDefaultManifestPath()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, timeout=60, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                root TEXT NOT NULL,
+                encodingName TEXT NOT NULL,
+                detectionStrategy TEXT NOT NULL,
+                relativePath TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtimeNs INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                numTokens INTEGER,
+                PRIMARY KEY (root, encodingName, detectionStrategy, relativePath)
+            )
+            """)
+
+    def __repr__(self) -> str:
+
+        return f"TokenManifest(path={str(self.path)!r})"
+
+    def Load(
+        self, root: Path | str, encodingName: str, detectionStrategy: str = "full"
+    ) -> dict[str, ManifestEntry]:
+        """
+        Load the recorded files of a directory.
+
+        Parameters
+        ----------
+        root : Path or str
+            The resolved path of the directory.
+        encodingName : str
+            The name of the encoding the files were counted with.
+        detectionStrategy : str, optional
+            The detection strategy the files were decoded with (default is "full").
+
+        Returns
+        -------
+        dict[str, ManifestEntry]
+            The recorded entries keyed by POSIX-style path relative to "root".
+        """
+
+        with self._lock:
+
+            rows = self._connection.execute(
+                """
+                SELECT relativePath, size, mtimeNs, inode, numTokens FROM files
+                WHERE root = ? AND encodingName = ? AND detectionStrategy = ?
+                """,
+                (str(root), encodingName, detectionStrategy),
+            ).fetchall()
+
+        return {row[0]: ManifestEntry(*row[1:]) for row in rows}
+
+    def Update(
+        self,
+        root: Path | str,
+        encodingName: str,
+        entries: Iterable[tuple[str, ManifestEntry]],
+        removed: Iterable[str] = (),
+        detectionStrategy: str = "full",
+    ) -> None:
+        """
+        Record new and changed files of a directory and forget removed ones, in a
+        single transaction.
+
+        Parameters
+        ----------
+        root : Path or str
+            The resolved path of the directory.
+        encodingName : str
+            The name of the encoding the files were counted with.
+        entries : Iterable[tuple[str, ManifestEntry]]
+            The relative paths and entries of the files to record.
+        removed : Iterable[str], optional
+            The relative paths of the files to forget.
+        detectionStrategy : str, optional
+            The detection strategy the files were decoded with (default is "full").
+        """
+
+        key = (str(root), encodingName, detectionStrategy)
+
+        with self._lock:
+
+            self._connection.execute("BEGIN")
+
+            try:
+
+                self._connection.executemany(
+                    """
+                    INSERT OR REPLACE INTO files
+                    (root, encodingName, detectionStrategy, relativePath, size, mtimeNs, inode, numTokens)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    ((*key, relativePath, *entry) for relativePath, entry in entries),
+                )
+                self._connection.executemany(
+                    """
+                    DELETE FROM files
+                    WHERE root = ? AND encodingName = ? AND detectionStrategy = ? AND relativePath = ?
+                    """,
+                    ((*key, relativePath) for relativePath in removed),
+                )
+
+            except BaseException:
+
+                self._connection.execute("ROLLBACK")
+                raise
+
+            self._connection.execute("COMMIT")
+
+    def Clear(self, root: Path | str | None = None) -> int:
+        """
+        Forget the recorded files of a directory, or of every directory.
+
+        Parameters
+        ----------
+        root : Path, str or None, optional
+            The resolved path of the directory to forget. Defaults to every
+            directory.
+
+        Returns
+        -------
+        int
+            The number of file records removed.
+        """
+
+        with self._lock:
+
+            if root is None:
+
+                cursor = self._connection.execute("DELETE FROM files")
+
+            else:
+
+                cursor = self._connection.execute(
+                    "DELETE FROM files WHERE root = ?", (str(root),)
+                )
+
+            return cursor.rowcount
+
+    def Close(self) -> None:
+        """
+        Close the connection to the manifest database.
+        """
+
+        with self._lock:
+
+            self._connection.close()
+
+    def __enter__(self) -> "TokenManifest":
+
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+
+        self.Close()
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TokenManifest.__module__ = "PyTokenCounter"
@@ -0,0 +1,580 @@
+"""
+_progress.py
+
+Progress reporting for the tokenizing and counting functions.
+
+Each call that reports progress starts its own ProgressTask on the reporter it is
+given, updates only that task, and finishes it before returning. No state is
+shared between calls beyond the reporter object passed to them, so calls made
+concurrently from several threads never see each other's tasks.
+
+The reporters are:
+
+- NullProgressReporter: reports nothing. Used when "quiet" is True.
+- RichProgressReporter: draws progress bars with "rich". A call that is not quiet
+  and is given no reporter draws its bars on a new one.
+- LoggingProgressReporter: logs each update through the "logging" module.
+- CallbackProgressReporter: passes each update to a function as a ProgressUpdate.
+
+A reporter can be shared by any number of calls and threads.
+
+The rich, logging and callback reporters report a task's updates at most once per
+refresh interval (0.1 seconds unless given), always reporting when the task starts
+and when it finishes. Work done between reports is summed into the next one. A
+description can be given as a function returning it, which is only called when the
+description is reported.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+
+    from rich.progress import Progress, TaskID
+
+# The default number of seconds between two reports of a task's updates
+DEFAULT_REFRESH_INTERVAL = 0.1
+
+# A description, or a function returning it when it is reported
+Description = str | Callable[[], str]
+
+
+class ProgressUpdate(NamedTuple):
+    """
+    The state of a task passed to the callback of a CallbackProgressReporter.
+
+    Attributes
+    ----------
+    description : str
+        The current description of the task.
+    completed : int
+        The amount of work done so far.
+    total : int
+        The total work of the task.
+    finished : bool
+        Whether the task has finished. A task can finish before "completed" reaches
+        "total", if its call stops early or raises.
+    """
+
+    description: str
+    completed: int
+    total: int
+    finished: bool
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+ProgressUpdate.__module__ = "PyTokenCounter"
+
+
+class ProgressTask:
+    """
+    The progress of a single call, started by ProgressReporter.StartTask. The base
+    class ignores every update. Used as a context manager, the task is finished on
+    exit.
+    """
+
+    def Advance(self, advance: int = 1, description: Description | None = None) -> None:
+        """
+        Add to the work done and optionally change the description.
+
+        Parameters
+        ----------
+        advance : int, optional
+            The amount of work to add (default is 1).
+        description : str or Callable[[], str] or None, optional
+            A new description for the task, or a function returning it, called only
+            if the description is reported (default is None, which keeps it).
+        """
+
+    def Finish(self) -> None:
+        """
+        Mark the task as finished. Calling it again has no effect.
+        """
+
+    def __enter__(self) -> "ProgressTask":
+
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+
+        self.Finish()
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+ProgressTask.__module__ = "PyTokenCounter"
+
+# Returned by reporters that report nothing, as a task holds no state of its own
+_NULL_TASK = ProgressTask()
+
+
+class ProgressReporter:
+    """
+    Base class of the progress reporters. Subclasses override StartTask to return
+    their own ProgressTask. The base class reports nothing.
+    """
+
+    def StartTask(self, description: str, total: int) -> ProgressTask:
+        """
+        Start reporting the progress of a call.
+
+        Parameters
+        ----------
+        description : str
+            The initial description of the task.
+        total : int
+            The total work of the task.
+
+        Returns
+        -------
+        ProgressTask
+            The task, which only the call that started it updates.
+        """
+
+        return _NULL_TASK
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+ProgressReporter.__module__ = "PyTokenCounter"
+
+
+class NullProgressReporter(ProgressReporter):
+    """
+    A reporter that reports nothing.
+    """
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+NullProgressReporter.__module__ = "PyTokenCounter"
+
+# The reporter used by quiet calls
+NULL_PROGRESS_REPORTER = NullProgressReporter()
+
+
+def _CheckRefreshInterval(refreshInterval: float) -> None:
+    """
+    Internal function to check the "refreshInterval" of a reporter.
+    """
+
+    if not isinstance(refreshInterval, (int, float)) or isinstance(
+        refreshInterval, bool
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "refreshInterval". Expected type: float. Given type: {type(refreshInterval)}'
+        )
+
+    if refreshInterval < 0:
+
+        raise ValueError(
+            f'"refreshInterval" must be at least 0. Given value: {refreshInterval}'
+        )
+
+
+class _ThrottledTask(ProgressTask, ABC):
+    """
+    Internal base of the tasks that report their updates at most once per refresh
+    interval. Updates in between only add to the work done and replace the
+    description, which is resolved when it is next reported. Subclasses report
+    through _Report.
+    """
+
+    def __init__(self, description: str, total: int, refreshInterval: float) -> None:
+
+        self._description: Description = description
+        self._completed = 0
+        self._total = total
+        self._refreshInterval = refreshInterval
+        self._nextRefresh = time.monotonic() + refreshInterval
+        self._isFinished = False
+
+    def Advance(self, advance: int = 1, description: Description | None = None) -> None:
+
+        if self._isFinished:
+
+            return
+
+        self._completed += advance
+
+        if description is not None:
+
+            self._description = description
+
+        if self._refreshInterval <= 0 or time.monotonic() >= self._nextRefresh:
+
+            self._Refresh(finished=False)
+
+    def Finish(self) -> None:
+
+        if self._isFinished:
+
+            return
+
+        self._isFinished = True
+        self._Refresh(finished=True)
+
+    def _Refresh(self, finished: bool) -> None:
+        """
+        Internal method to report the current state of the task.
+        """
+
+        if callable(self._description):
+
+            self._description = self._description()
+
+        self._Report(description=self._description, finished=finished)
+        self._nextRefresh = time.monotonic() + self._refreshInterval
+
+    @abstractmethod
+    def _Report(self, description: str, finished: bool) -> None:
+        """
+        Internal method, implemented by subclasses, to report the state of the task.
+        """
+
+
+class _CallbackTask(_ThrottledTask):
+    """
+    Internal task of a CallbackProgressReporter.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[ProgressUpdate], None],
+        description: str,
+        total: int,
+        refreshInterval: float,
+    ) -> None:
+
+        super().__init__(
+            description=description, total=total, refreshInterval=refreshInterval
+        )
+        self._callback = callback
+
+        callback(ProgressUpdate(description, 0, total, False))
+
+    def _Report(self, description: str, finished: bool) -> None:
+
+        self._callback(
+            ProgressUpdate(description, self._completed, self._total, finished)
+        )
+
+
+class CallbackProgressReporter(ProgressReporter):
+    """
+    A reporter that passes a ProgressUpdate to a function when a task starts, at
+    most once per refresh interval while it runs, and when it finishes.
+
+    The function is called from the thread of the call being reported. When
+    several calls share the reporter, it may be called from several threads at
+    once.
+
+    Parameters
+    ----------
+    callback : Callable[[ProgressUpdate], None]
+        The function to call.
+    refreshInterval : float, optional
+        The least number of seconds between two updates of a task passed to the
+        function (default is 0.1). With 0, every update is passed.
+
+    Raises
+    ------
+    TypeError
+        If "callback" is not callable or the type of "refreshInterval" is
+        incorrect.
+    ValueError
+        If "refreshInterval" is negative.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[ProgressUpdate], None],
+        refreshInterval: float = DEFAULT_REFRESH_INTERVAL,
+    ) -> None:
+
+        if not callable(callback):
+
+            raise TypeError(
+                f'Unexpected type for parameter "callback". Expected type: callable. Given type: {type(callback)}'
+            )
+
+        _CheckRefreshInterval(refreshInterval=refreshInterval)
+
+        self.callback = callback
+        self.refreshInterval = refreshInterval
+
+    def StartTask(self, description: str, total: int) -> ProgressTask:
+
+        return _CallbackTask(
+            callback=self.callback,
+            description=description,
+            total=total,
+            refreshInterval=self.refreshInterval,
+        )
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+CallbackProgressReporter.__module__ = "PyTokenCounter"
+
+
+class LoggingProgressReporter(CallbackProgressReporter):
+    """
+    A reporter that logs a message when a task starts, at most once per refresh
+    interval while it runs, and when it finishes.
+
+    Parameters
+    ----------
+    logger : logging.Logger or None, optional
+        The logger to log to (default is None, which logs to the "PyTokenCounter"
+        logger).
+    level : int, optional
+        The level to log at (default is logging.INFO).
+    refreshInterval : float, optional
+        The least number of seconds between two messages about a task (default is
+        0.1). With 0, every update is logged.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger | None = None,
+        level: int = logging.INFO,
+        refreshInterval: float = DEFAULT_REFRESH_INTERVAL,
+    ) -> None:
+
+        if logger is not None and not isinstance(logger, logging.Logger):
+
+            raise TypeError(
+                f'Unexpected type for parameter "logger". Expected type: logging.Logger. Given type: {type(logger)}'
+            )
+
+        if not isinstance(level, int) or isinstance(level, bool):
+
+            raise TypeError(
+                f'Unexpected type for parameter "level". Expected type: int. Given type: {type(level)}'
+            )
+
+        self.logger = (
+            logger if logger is not None else logging.getLogger("PyTokenCounter")
+        )
+        self.level = level
+
+        super().__init__(callback=self._Log, refreshInterval=refreshInterval)
+
+    def _Log(self, update: ProgressUpdate) -> None:
+        """
+        Internal method to log a progress update.
+        """
+
+        if update.finished:
+
+            self.logger.log(
+                self.level,
+                "%s (finished, %d/%d)",
+                update.description,
+                update.completed,
+                update.total,
+            )
+
+        else:
+
+            self.logger.log(
+                self.level,
+                "%s (%d/%d)",
+                update.description,
+                update.completed,
+                update.total,
+            )
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+LoggingProgressReporter.__module__ = "PyTokenCounter"
+
+
+class _RichTask(_ThrottledTask):
+    """
+    Internal task of a RichProgressReporter, a task of its "rich" progress bar.
+    """
+
+    def __init__(
+        self,
+        reporter: RichProgressReporter,
+        taskId: TaskID,
+        description: str,
+        total: int,
+        refreshInterval: float,
+    ) -> None:
+
+        super().__init__(
+            description=description, total=total, refreshInterval=refreshInterval
+        )
+        self._reporter = reporter
+        self._taskId = taskId
+
+    def _Report(self, description: str, finished: bool) -> None:
+
+        with self._reporter._lock:
+
+            self._reporter._progress.update(
+                self._taskId, completed=self._completed, description=description
+            )
+
+            if finished:
+
+                self._reporter._FinishTask()
+
+
+class RichProgressReporter(ProgressReporter):
+    """
+    A reporter that draws a progress bar per task with "rich". The bars of tasks
+    running at the same time are drawn together, and the display is stopped once
+    they have all finished.
+
+    "rich" can only draw one live display at a time. If another one is already
+    being drawn when a task starts, for instance by a reporter in another thread,
+    this reporter draws nothing until its tasks have all finished.
+
+    Parameters
+    ----------
+    refreshInterval : float, optional
+        The least number of seconds between two updates of a task's bar (default
+        is 0.1). With 0, every update is drawn.
+
+    Raises
+    ------
+    TypeError
+        If the type of "refreshInterval" is incorrect.
+    ValueError
+        If "refreshInterval" is negative.
+    """
+
+    def __init__(self, refreshInterval: float = DEFAULT_REFRESH_INTERVAL) -> None:
+
+        _CheckRefreshInterval(refreshInterval=refreshInterval)
+
+        self.refreshInterval = refreshInterval
+        self._lock = threading.Lock()
+        self._progress: Progress | None = None
+        self._numActive = 0
+
+    def _CreateProgress(self) -> Progress:
+        """
+        Internal method to import "rich" and create the progress bar.
+        """
+
+        from rich.progress import (
+            BarColumn,
+            MofNCompleteColumn,
+            Progress,
+            TextColumn,
+            TimeElapsedColumn,
+            TimeRemainingColumn,
+        )
+        from rich.table import Column
+
+        return Progress(
+            TextColumn(
+                "[bold blue]{task.description}",
+                justify="left",
+                table_column=Column(width=50),
+            ),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            BarColumn(bar_width=None),
+            MofNCompleteColumn(),
+            TextColumn("•"),
+            TimeElapsedColumn(),
+            TextColumn("•"),
+            TimeRemainingColumn(),
+            expand=True,
+        )
+
+    def StartTask(self, description: str, total: int) -> ProgressTask:
+
+        from rich.errors import LiveError
+
+        with self._lock:
+
+            if self._progress is None:
+
+                self._progress = self._CreateProgress()
+
+                try:
+
+                    self._progress.start()
+
+                except LiveError:
+
+                    # Another live display is being drawn
+                    pass
+
+            self._numActive += 1
+
+            return _RichTask(
+                reporter=self,
+                taskId=self._progress.add_task(description, total=total),
+                description=description,
+                total=total,
+                refreshInterval=self.refreshInterval,
+            )
+
+    def _FinishTask(self) -> None:
+        """
+        Internal method, called with the lock held, to stop the display once every
+        task has finished. The next task starts a new one.
+        """
+
+        self._numActive -= 1
+
+        if self._numActive == 0:
+
+            self._progress.stop()
+            self._progress = None
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+RichProgressReporter.__module__ = "PyTokenCounter"
+
+
+def GetProgressReporter(
+    quiet: bool, progress: ProgressReporter | None = None
+) -> ProgressReporter:
+    """
+    Get the reporter a call reports its progress to.
+
+    Parameters
+    ----------
+    quiet : bool
+        Whether the call is quiet, which reports nothing.
+    progress : ProgressReporter or None, optional
+        The reporter given to the call (default is None, which draws progress bars
+        on a new RichProgressReporter unless the call is quiet).
+
+    Returns
+    -------
+    ProgressReporter
+        The reporter.
+
+    Raises
+    ------
+    TypeError
+        If the types of "quiet" or "progress" are incorrect.
+    """
+
+    if progress is not None and not isinstance(progress, ProgressReporter):
+
+        raise TypeError(
+            f'Unexpected type for parameter "progress". Expected type: PyTokenCounter.ProgressReporter. Given type: {type(progress)}'
+        )
+
+    if quiet:
+
+        return NULL_PROGRESS_REPORTER
+
+    if progress is None:
+
+        return RichProgressReporter()
+
+    return progress
@@ -0,0 +1,889 @@
+"""
+_server.py
+
+A long-lived token counting server, and its client, that keep tiktoken encodings
+loaded between requests so that each count costs microseconds rather than the
+interpreter startup, imports and BPE table loading of a fresh "tokencount" run.
+
+The server listens on a Unix domain socket or a localhost TCP port and speaks a
+line-delimited JSON protocol. Each request is one JSON object on its own line:
+
+    {"command": "count-str", "string": "Hello, world!", "model": "gpt-4o"}
+
+and each response is one JSON object on its own line, holding either the "result"
+of the request or the "error" message and "errorType" it raised. A request "id",
+if given, is echoed back in the response. A connection can carry any number of
+requests, one after the other. A request line longer than MAX_REQUEST_BYTES is
+answered with an error, and the connection is closed.
+
+Commands
+--------
+- "ping": The server's process ID and the names of its loaded encodings.
+- "count-str": The number of tokens in "string".
+- "tokenize-str": The token IDs of "string".
+- "count-file": The number of tokens in the file at "filePath", an absolute path,
+  decoded with "detectionStrategy" and looked up in the token cache at "cache" if
+  given: "" for the default cache location, or the absolute path of one of the
+  caches the server was started with.
+
+Every command but "ping" accepts "model" and/or "encodingName". Without either,
+the server's default encoding is used.
+
+The default socket is "$XDG_RUNTIME_DIR/PyTokenCounter/tokencount.sock", falling
+back to a per-user directory in the temporary directory. The TOKENCOUNT_SOCKET
+environment variable overrides it, and TOKENCOUNT_PORT points clients at a TCP
+server on localhost instead.
+
+Only the current user can connect to the Unix domain socket. A TCP port is open to
+every local user, so a TCP server only binds to loopback addresses and writes a
+random token to a file only the current user can read, by default
+"tokencount-<port>.token" next to the default socket. Every request to a TCP
+server must carry that token as "token".
+"""
+
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ._cache import TokenCache
+from ._utils import UnsupportedEncodingError
+
+if TYPE_CHECKING:
+
+    import socketserver
+
+    import tiktoken
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+
+SERVER_COMMANDS = ["ping", "count-str", "tokenize-str", "count-file"]
+
+# The longest request line, newline included, that the server reads
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# Exceptions rebuilt by type on the client side; anything else is a RuntimeError
+_SERVER_ERROR_TYPES = {
+    errorType.__name__: errorType
+    for errorType in (
+        FileNotFoundError,
+        KeyError,
+        PermissionError,
+        RuntimeError,
+        TypeError,
+        ValueError,
+    )
+}
+
+
+def GetDefaultSocketPath() -> Path:
+    """
+    Get the default location of the server's Unix domain socket.
+
+    Returns
+    -------
+    Path
+        The TOKENCOUNT_SOCKET environment variable if set, otherwise
+        "$XDG_RUNTIME_DIR/PyTokenCounter/tokencount.sock", or
+        "PyTokenCounter-<uid>/tokencount.sock" in the temporary directory if
+        XDG_RUNTIME_DIR is not set.
+    """
+
+    if os.environ.get("TOKENCOUNT_SOCKET"):
+
+        return Path(os.environ["TOKENCOUNT_SOCKET"])
+
+    if os.environ.get("XDG_RUNTIME_DIR"):
+
+        return Path(os.environ["XDG_RUNTIME_DIR"], "PyTokenCounter", "tokencount.sock")
+
+    return Path(
+        tempfile.gettempdir(), f"PyTokenCounter-{os.getuid()}", "tokencount.sock"
+    )
+
+
+def GetDefaultTokenPath(port: int) -> Path:
+    """
+    Get the default location of the file holding a TCP server's access token.
+
+    Parameters
+    ----------
+    port : int
+        The TCP port of the server.
+
+    Returns
+    -------
+    Path
+        "tokencount-<port>.token" in the directory of GetDefaultSocketPath().
+    """
+
+    return GetDefaultSocketPath().parent / f"tokencount-{port}.token"
+
+
+def GetDefaultServerPort() -> int | None:
+    """
+    Get the localhost TCP port clients connect to instead of the Unix domain socket.
+
+    Returns
+    -------
+    int or None
+        The TOKENCOUNT_PORT environment variable if set, otherwise None. On
+        platforms without Unix domain sockets, None means there is no server to
+        connect to.
+    """
+
+    port = os.environ.get("TOKENCOUNT_PORT")
+
+    return int(port) if port else None
+
+
+def _IsLoopbackHost(host: str) -> bool:
+    """
+    Internal function to check that a host name or address only reaches this
+    machine.
+    """
+
+    if host == "localhost":
+
+        return True
+
+    try:
+
+        return ipaddress.ip_address(host).is_loopback
+
+    except ValueError:
+
+        return False
+
+
+def _MakePrivateDir(directory: Path) -> None:
+    """
+    Internal function to create a directory only the current user can enter, and
+    check that an existing one belongs to the current user.
+    """
+
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    if directory.stat().st_uid != os.getuid():
+
+        raise RuntimeError(f"The directory {directory} belongs to another user.")
+
+
+def _WriteToken(tokenPath: Path) -> str:
+    """
+    Internal function to write a new random access token to a file only the
+    current user can read.
+    """
+
+    token = secrets.token_hex(32)
+    _MakePrivateDir(tokenPath.parent)
+    tokenPath.unlink(missing_ok=True)
+    fd = os.open(tokenPath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+
+    with os.fdopen(fd, "w", encoding="ascii") as file:
+
+        file.write(token)
+
+    return token
+
+
+def _EncodeError(error: Exception) -> dict:
+    """
+    Internal function to describe an exception raised by a request as the fields
+    of an error response.
+    """
+
+    response = {"error": str(error), "errorType": type(error).__name__}
+
+    if isinstance(error, UnsupportedEncodingError):
+
+        response["encoding"] = error.encoding
+        response["filePath"] = str(error.filePath)
+        response["message"] = error._baseMessage
+
+    return response
+
+
+def _DecodeError(response: dict) -> Exception:
+    """
+    Internal function to rebuild the exception described by an error response.
+    """
+
+    errorType = response.get("errorType")
+
+    if errorType == "UnsupportedEncodingError":
+
+        return UnsupportedEncodingError(
+            encoding=response.get("encoding"),
+            filePath=response.get("filePath"),
+            message=response.get("message", "File encoding is not supported"),
+        )
+
+    return _SERVER_ERROR_TYPES.get(errorType, RuntimeError)(response["error"])
+
+
+class _TokenServerMixin:
+    """
+    The request handling shared by the Unix domain socket and TCP servers: keeps
+    the encodings and token caches used by requests loaded for the lifetime of the
+    server.
+    """
+
+    daemon_threads = True
+
+    def _Setup(
+        self,
+        encoding: tiktoken.Encoding,
+        cachePaths: list[Path | str] | None = None,
+        token: str | None = None,
+    ) -> None:
+
+        self.defaultEncoding = encoding
+        self._encodings = {(None, None): encoding}
+        self._cachePaths = {
+            str(Path(cachePath).resolve()) for cachePath in (cachePaths or [])
+        }
+        self._caches: dict[str, TokenCache] = {}
+        self._token = token
+        self._lock = threading.Lock()
+
+    def CheckToken(self, request: dict) -> None:
+        """
+        Check that a request carries the server's access token, if it has one.
+        """
+
+        if self._token is None:
+
+            return
+
+        token = request.get("token")
+
+        if not isinstance(token, str) or not hmac.compare_digest(
+            token.encode("utf-8"), self._token.encode("utf-8")
+        ):
+
+            raise PermissionError("Missing or invalid server access token.")
+
+    def GetRequestEncoding(
+        self, model: str | None, encodingName: str | None
+    ) -> tiktoken.Encoding:
+
+        key = (model, encodingName)
+
+        with self._lock:
+
+            if key not in self._encodings:
+
+                from .core import GetEncoding
+
+                self._encodings[key] = GetEncoding(
+                    model=model, encodingName=encodingName
+                )
+
+            return self._encodings[key]
+
+    def GetRequestCache(self, cachePath: str | None) -> TokenCache | None:
+
+        if cachePath is None:
+
+            return None
+
+        if not isinstance(cachePath, str):
+
+            raise TypeError(
+                f'Unexpected type for parameter "cache". Expected type: str. Given type: {type(cachePath)}'
+            )
+
+        if cachePath:
+
+            if not Path(cachePath).is_absolute():
+
+                raise ValueError(
+                    f'"cache" must be an absolute path. Given value: {cachePath}'
+                )
+
+            # Clients may only use the caches the server was started with
+            cachePath = str(Path(cachePath).resolve())
+
+            if cachePath not in self._cachePaths:
+
+                raise PermissionError(
+                    f"The server does not allow the token cache {cachePath}"
+                )
+
+        with self._lock:
+
+            if cachePath not in self._caches:
+
+                self._caches[cachePath] = TokenCache(path=cachePath or None)
+
+            return self._caches[cachePath]
+
+    def HandleRequest(self, request: dict) -> object:
+        """
+        Run a single request and return its result.
+        """
+
+        from .core import GetNumTokenFile, GetNumTokenStr, TokenizeStr
+
+        if not isinstance(request, dict):
+
+            raise TypeError(
+                f"Unexpected type for request. Expected type: dict. Given type: {type(request)}"
+            )
+
+        self.CheckToken(request)
+        command = request.get("command")
+
+        if command == "ping":
+
+            with self._lock:
+
+                encodingNames = sorted({enc.name for enc in self._encodings.values()})
+
+            return {"pid": os.getpid(), "encodings": encodingNames}
+
+        if command not in SERVER_COMMANDS:
+
+            raise ValueError(
+                f"Invalid command: {command}\n\nValid commands:\n"
+                + "\n".join(SERVER_COMMANDS)
+            )
+
+        encoding = self.GetRequestEncoding(
+            model=request.get("model"), encodingName=request.get("encodingName")
+        )
+
+        if command == "count-str":
+
+            return GetNumTokenStr(
+                string=request.get("string"), encoding=encoding, quiet=True
+            )
+
+        if command == "tokenize-str":
+
+            return TokenizeStr(
+                string=request.get("string"), encoding=encoding, quiet=True
+            )
+
+        filePath = request.get("filePath")
+
+        if not isinstance(filePath, str) or not Path(filePath).is_absolute():
+
+            raise ValueError(
+                f'"filePath" must be an absolute path. Given value: {filePath}'
+            )
+
+        return GetNumTokenFile(
+            filePath=filePath,
+            encoding=encoding,
+            quiet=True,
+            detectionStrategy=request.get("detectionStrategy", "full"),
+            cache=self.GetRequestCache(cachePath=request.get("cache")),
+        )
+
+    def server_close(self) -> None:
+
+        super().server_close()
+
+        with self._lock:
+
+            for cache in self._caches.values():
+
+                cache.Close()
+
+            self._caches.clear()
+
+
+def CreateTokenServer(
+    encoding: tiktoken.Encoding,
+    socketPath: Path | str | None = None,
+    port: int | None = None,
+    host: str = DEFAULT_SERVER_HOST,
+    tokenPath: Path | str | None = None,
+    cachePaths: list[Path | str] | None = None,
+) -> socketserver.BaseServer:
+    """
+    Create a token counting server bound to a Unix domain socket or a TCP port. Call
+    "serve_forever()" on it to start serving, and "shutdown()" and "server_close()"
+    to stop.
+
+    Parameters
+    ----------
+    encoding : tiktoken.Encoding
+        The encoding used for requests that give neither a model nor an encoding.
+    socketPath : Path, str or None, optional
+        The path of the Unix domain socket to listen on. Defaults to
+        GetDefaultSocketPath(). Ignored if "port" is given.
+    port : int or None, optional
+        The TCP port to listen on instead of a Unix domain socket.
+    host : str, optional
+        The loopback address to bind the TCP port to (default is "127.0.0.1").
+    tokenPath : Path, str or None, optional
+        The file to write the TCP server's access token to. Defaults to
+        GetDefaultTokenPath() for the bound port. Ignored without a port.
+    cachePaths : list of Path or str, or None, optional
+        The token cache databases that "count-file" requests may use besides the
+        default cache location.
+
+    Returns
+    -------
+    socketserver.BaseServer
+        The bound server.
+
+    Raises
+    ------
+    ValueError
+        If "host" is not a loopback address.
+    RuntimeError
+        If a server is already listening on the socket, or if the socket's or
+        token file's directory belongs to another user.
+    """
+
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+
+        def setup(self) -> None:
+
+            super().setup()
+
+            if self.connection.family != getattr(socket, "AF_UNIX", None):
+
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def handle(self) -> None:
+
+            while True:
+
+                # Bound the line, so that a client that never sends a newline
+                # cannot make the server buffer without limit
+                line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+
+                if not line:
+
+                    break
+
+                if len(line) > MAX_REQUEST_BYTES:
+
+                    self.Respond(
+                        _EncodeError(
+                            ValueError(
+                                f"Request line exceeds {MAX_REQUEST_BYTES} bytes."
+                            )
+                        )
+                    )
+
+                    break
+
+                if not line.strip():
+
+                    continue
+
+                request = None
+
+                try:
+
+                    request = json.loads(line)
+                    response = {"result": self.server.HandleRequest(request)}
+
+                except Exception as e:
+
+                    response = _EncodeError(e)
+
+                if isinstance(request, dict) and "id" in request:
+
+                    response["id"] = request["id"]
+
+                self.Respond(response)
+
+        def Respond(self, response: dict) -> None:
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    if port is None and not hasattr(socket, "AF_UNIX"):
+
+        raise RuntimeError(
+            "Unix domain sockets are not supported on this platform. Give a port."
+        )
+
+    if port is not None and not _IsLoopbackHost(host):
+
+        raise ValueError(f'"host" must be a loopback address. Given value: {host}')
+
+    token = None
+
+    if port is not None:
+
+        class TCPTokenServer(_TokenServerMixin, socketserver.ThreadingTCPServer):
+
+            allow_reuse_address = True
+
+            def server_close(self) -> None:
+
+                super().server_close()
+                self.tokenPath.unlink(missing_ok=True)
+
+        server = TCPTokenServer((host, port), Handler)
+        server.tokenPath = (
+            Path(tokenPath)
+            if tokenPath is not None
+            else GetDefaultTokenPath(port=server.server_address[1])
+        )
+
+        try:
+
+            token = _WriteToken(tokenPath=server.tokenPath)
+
+        except Exception:
+
+            socketserver.ThreadingTCPServer.server_close(server)
+            raise
+
+    else:
+
+        class UnixTokenServer(
+            _TokenServerMixin, socketserver.ThreadingUnixStreamServer
+        ):
+
+            def server_close(self) -> None:
+
+                super().server_close()
+                Path(self.server_address).unlink(missing_ok=True)
+
+        socketPath = (
+            Path(socketPath) if socketPath is not None else GetDefaultSocketPath()
+        )
+        _MakePrivateDir(socketPath.parent)
+
+        if socketPath.exists():
+
+            try:
+
+                TokenServerClient(socketPath=socketPath).Close()
+
+            except OSError:
+
+                # Left behind by a server that did not shut down cleanly
+                socketPath.unlink()
+
+            else:
+
+                raise RuntimeError(f"A server is already listening on {socketPath}")
+
+        # Only the current user may connect to the socket
+        previousUmask = os.umask(0o177)
+
+        try:
+
+            server = UnixTokenServer(str(socketPath), Handler)
+
+        finally:
+
+            os.umask(previousUmask)
+
+    server._Setup(encoding=encoding, cachePaths=cachePaths, token=token)
+
+    return server
+
+
+def ServeTokens(
+    encoding: tiktoken.Encoding,
+    socketPath: Path | str | None = None,
+    port: int | None = None,
+    host: str = DEFAULT_SERVER_HOST,
+    tokenPath: Path | str | None = None,
+    cachePaths: list[Path | str] | None = None,
+) -> None:
+    """
+    Run a token counting server until it is interrupted. See CreateTokenServer for
+    the parameters.
+    """
+
+    import signal
+
+    if threading.current_thread() is threading.main_thread():
+
+        # Stop cleanly, removing the socket, on SIGTERM as well as on Ctrl+C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with CreateTokenServer(
+        encoding=encoding,
+        socketPath=socketPath,
+        port=port,
+        host=host,
+        tokenPath=tokenPath,
+        cachePaths=cachePaths,
+    ) as server:
+
+        try:
+
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+
+            pass
+
+
+class TokenServerClient:
+    """
+    A connection to a token counting server, for callers that count often enough
+    that keeping one connection open matters, such as editor integrations counting
+    on every keystroke.
+
+    Attributes
+    ----------
+    address : Path or tuple[str, int]
+        The socket path or the (host, port) of the server.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TokenServerClient
+    >>> with TokenServerClient() as client:
+    ...     client.GetNumTokenStr("Hello, world!", model="gpt-4o")
+    4
+    """
+
+    def __init__(
+        self,
+        socketPath: Path | str | None = None,
+        port: int | None = None,
+        host: str = DEFAULT_SERVER_HOST,
+        timeout: float | None = 30.0,
+        tokenPath: Path | str | None = None,
+    ):
+        """
+        Connect to a running server.
+
+        Parameters
+        ----------
+        socketPath : Path, str or None, optional
+            The path of the server's Unix domain socket. Defaults to
+            GetDefaultSocketPath(). Ignored if a port is given or set in
+            TOKENCOUNT_PORT.
+        port : int or None, optional
+            The TCP port of the server. Defaults to GetDefaultServerPort().
+        host : str, optional
+            The host of the TCP server (default is "127.0.0.1").
+        timeout : float or None, optional
+            Seconds to wait for each response (default is 30).
+        tokenPath : Path, str or None, optional
+            The file holding the TCP server's access token. Defaults to
+            GetDefaultTokenPath() for the port. Ignored without a port.
+
+        Raises
+        ------
+        OSError
+            If no server is listening at the address, or if the TCP server's token
+            file cannot be read.
+        """
+
+        if port is None:
+
+            port = GetDefaultServerPort()
+
+        self._token = None
+
+        if port is not None:
+
+            tokenPath = (
+                Path(tokenPath) if tokenPath is not None else GetDefaultTokenPath(port)
+            )
+            self._token = tokenPath.read_text(encoding="ascii").strip()
+            self.address = (host, port)
+            self._socket = socket.create_connection(self.address, timeout=timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        else:
+
+            if not hasattr(socket, "AF_UNIX"):
+
+                raise ConnectionRefusedError(
+                    "Unix domain sockets are not supported on this platform."
+                )
+
+            self.address = (
+                Path(socketPath) if socketPath is not None else GetDefaultSocketPath()
+            )
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+
+            try:
+
+                self._socket.connect(str(self.address))
+
+            except OSError:
+
+                self._socket.close()
+                raise
+
+        self._file = self._socket.makefile("rwb")
+
+    def __repr__(self) -> str:
+
+        return f"TokenServerClient(address={self.address!r})"
+
+    def Request(self, command: str, **params) -> object:
+        """
+        Send a request to the server and wait for its result.
+
+        Parameters
+        ----------
+        command : str
+            The command to run. See SERVER_COMMANDS.
+        **params
+            The parameters of the command.
+
+        Returns
+        -------
+        object
+            The result of the request.
+
+        Raises
+        ------
+        Exception
+            The error raised by the request on the server, rebuilt with the same
+            type where possible.
+        ConnectionError
+            If the server closed the connection.
+        """
+
+        request = {"command": command, **params}
+
+        if self._token is not None:
+
+            request["token"] = self._token
+
+        try:
+
+            self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+            self._file.flush()
+
+        except (BrokenPipeError, ConnectionResetError):
+
+            # The server stops reading a request it refuses, such as one longer
+            # than MAX_REQUEST_BYTES, but may have sent the reason before closing
+            pass
+
+        try:
+
+            line = self._file.readline()
+
+        except ConnectionResetError:
+
+            line = b""
+
+        if not line:
+
+            raise ConnectionError(
+                f"The server at {self.address} closed the connection."
+            )
+
+        response = json.loads(line)
+
+        if "error" in response:
+
+            raise _DecodeError(response)
+
+        return response["result"]
+
+    def Ping(self) -> dict:
+        """
+        Check that the server is responding.
+
+        Returns
+        -------
+        dict
+            The server's process ID as "pid" and its loaded encodings as "encodings".
+        """
+
+        return self.Request("ping")
+
+    def GetNumTokenStr(
+        self, string: str, model: str | None = None, encodingName: str | None = None
+    ) -> int:
+        """
+        Count the tokens in a string on the server. Without a model or encoding
+        name, the server's default encoding is used.
+        """
+
+        return self.Request(
+            "count-str", string=string, model=model, encodingName=encodingName
+        )
+
+    def TokenizeStr(
+        self, string: str, model: str | None = None, encodingName: str | None = None
+    ) -> list[int]:
+        """
+        Tokenize a string on the server. Without a model or encoding name, the
+        server's default encoding is used.
+        """
+
+        return self.Request(
+            "tokenize-str", string=string, model=model, encodingName=encodingName
+        )
+
+    def GetNumTokenFile(
+        self,
+        filePath: Path | str,
+        model: str | None = None,
+        encodingName: str | None = None,
+        detectionStrategy: str = "full",
+        cachePath: Path | str | None = None,
+    ) -> int:
+        """
+        Count the tokens in a file on the server. Relative file and cache paths are
+        resolved against this process's working directory. "cachePath" selects a
+        token cache on the server: "" for the default location, one of the caches
+        the server was started with, or None for no cache.
+        """
+
+        if cachePath not in (None, ""):
+
+            cachePath = Path(cachePath).resolve()
+
+        return self.Request(
+            "count-file",
+            filePath=str(Path(filePath).resolve()),
+            model=model,
+            encodingName=encodingName,
+            detectionStrategy=detectionStrategy,
+            cache=None if cachePath is None else str(cachePath),
+        )
+
+    def Close(self) -> None:
+        """
+        Close the connection to the server.
+        """
+
+        try:
+
+            self._file.close()
+
+        except OSError:
+
+            # The server closed the connection before reading a pending request
+            pass
+
+        self._socket.close()
+
+    def __enter__(self) -> "TokenServerClient":
+
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+
+        self.Close()
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TokenServerClient.__module__ = "PyTokenCounter"
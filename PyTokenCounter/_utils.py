@@ -3,11 +3,174 @@ _utils.py
 
 Utilities for file operations, including reading text files with UTF-8 encoding.
 Provides a custom exception for unsupported encodings.
+
+Files are read from disk exactly once. The raw bytes are decoded as strict UTF-8
+first, and `chardet` is only consulted on that same buffer when the UTF-8 decode
+fails.
+
+Detection Strategies
+--------------------
+When a file is not valid UTF-8, the detection strategy decides how much of the
+buffer `chardet` is shown:
+
+- "full": Detect over the whole buffer. Most accurate, but the cost grows with the
+  file size and can take seconds on files of hundreds of megabytes.
+- "sampled-prefix": Detect over the first `DETECTION_SAMPLE_SIZE` bytes. Constant
+  cost per file. Accurate when the start of the file is representative, but can
+  miss an encoding whose distinctive bytes only appear later on.
+- "sampled-stripes": Detect over `DETECTION_NUM_STRIPES` evenly spaced stripes that
+  together total `DETECTION_SAMPLE_SIZE` bytes. Same cost cap as "sampled-prefix",
+  but better at catching non-ASCII content that is spread through the file.
+- "utf8-only": Never run `chardet`. Anything that is not valid UTF-8 raises
+  `UnsupportedEncodingError`. Fastest, and the right choice for corpora known to
+  be UTF-8 or ASCII.
+
+`chardet` itself is imported on first use, since most files never need it.
+
+Line Endings
+------------
+As when reading a file in text mode, "\\r\\n" and lone "\\r" line endings in the
+decoded text are translated to "\\n", so a file tokenizes the same whichever
+platform's line endings it was saved with.
+
+Binary Files
+------------
+Before any of that, the first `BINARY_SNIFF_SIZE` bytes of a file are checked for
+signs of binary content, so that images, archives, executables and other binary
+files are rejected with `UnsupportedEncodingError` without being decoded or run
+through `chardet`, and without the rest of the file being read. A sample is
+binary when it:
+
+- Starts with the magic number of a common binary format (`BINARY_SIGNATURES`).
+- Contains a NUL byte, unless it starts with a UTF-8, UTF-16 or UTF-32 byte order
+  mark.
+- Is not valid UTF-8 and the file has a common binary extension
+  (`BINARY_EXTENSIONS`).
 """
 
+import codecs
+import io
+from collections.abc import Iterator
 from pathlib import Path
 
-import chardet
+DETECTION_STRATEGIES = ["full", "sampled-prefix", "sampled-stripes", "utf8-only"]
+DETECTION_STRATEGIES_STR = "\n".join(DETECTION_STRATEGIES)
+
+DETECTION_SAMPLE_SIZE = 64 * 1024
+DETECTION_NUM_STRIPES = 8
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+BINARY_SNIFF_SIZE = 8 * 1024
+
+# Byte order marks, whose text can legitimately contain NUL bytes
+TEXT_BOMS = (
+    codecs.BOM_UTF8,
+    codecs.BOM_UTF32_LE,
+    codecs.BOM_UTF32_BE,
+    codecs.BOM_UTF16_LE,
+    codecs.BOM_UTF16_BE,
+)
+
+# (offset, magic number) pairs of common binary formats. Magic numbers that ordinary
+# text could start with, such as "ID3" or "RIFF", are left out
+BINARY_SIGNATURES = (
+    (0, b"\x89PNG\r\n\x1a\n"),
+    (0, b"\xff\xd8\xff"),
+    (0, b"GIF87a"),
+    (0, b"GIF89a"),
+    (0, b"II*\x00"),
+    (0, b"MM\x00*"),
+    (0, b"%PDF-"),
+    (0, b"PK\x03\x04"),
+    (0, b"PK\x05\x06"),
+    (0, b"\x1f\x8b"),
+    (0, b"\xfd7zXZ\x00"),
+    (0, b"(\xb5/\xfd"),
+    (0, b"7z\xbc\xaf\x27\x1c"),
+    (0, b"Rar!\x1a\x07"),
+    (0, b"\x7fELF"),
+    (0, b"\xcf\xfa\xed\xfe"),
+    (0, b"\xce\xfa\xed\xfe"),
+    (0, b"\xca\xfe\xba\xbe"),
+    (0, b"\x00asm"),
+    (0, b"SQLite format 3\x00"),
+    (0, b"\x1aE\xdf\xa3"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),
+)
+
+# Extensions of common binary formats, checked when a sample is not valid UTF-8
+BINARY_EXTENSIONS = frozenset(
+    {
+        ".7z",
+        ".a",
+        ".avi",
+        ".avif",
+        ".bin",
+        ".bmp",
+        ".bz2",
+        ".class",
+        ".dll",
+        ".dmg",
+        ".doc",
+        ".docx",
+        ".dylib",
+        ".eot",
+        ".exe",
+        ".flac",
+        ".gif",
+        ".gz",
+        ".heic",
+        ".ico",
+        ".iso",
+        ".jar",
+        ".jpeg",
+        ".jpg",
+        ".lib",
+        ".m4a",
+        ".mkv",
+        ".mov",
+        ".mp3",
+        ".mp4",
+        ".npy",
+        ".npz",
+        ".o",
+        ".obj",
+        ".ogg",
+        ".otf",
+        ".parquet",
+        ".pdf",
+        ".pickle",
+        ".pkl",
+        ".png",
+        ".ppt",
+        ".pptx",
+        ".psd",
+        ".pyc",
+        ".pyd",
+        ".pyo",
+        ".rar",
+        ".so",
+        ".sqlite",
+        ".tar",
+        ".tgz",
+        ".tif",
+        ".tiff",
+        ".ttf",
+        ".wasm",
+        ".wav",
+        ".webm",
+        ".webp",
+        ".whl",
+        ".woff",
+        ".woff2",
+        ".xls",
+        ".xlsx",
+        ".xz",
+        ".zip",
+        ".zst",
+    }
+)
 
 
 class UnsupportedEncodingError(Exception):
@@ -32,24 +195,237 @@ class UnsupportedEncodingError(Exception):
     ):
         self.encoding = encoding
         self.filePath = filePath
+        self._baseMessage = message
         self.message = (
             f"{message}. Detected encoding: {encoding}. File path: {filePath}"
         )
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Rebuild from the constructor arguments so that the error survives being
+        # pickled back from a worker process
+        return (self.__class__, (self.encoding, self.filePath, self._baseMessage))
+
 
 # Set the module to 'PyTokenCounter' to reflect in tracebacks
 UnsupportedEncodingError.__module__ = "PyTokenCounter"
 
 
-def ReadTextFile(filePath: Path | str) -> str:
+def IsBinarySample(sample: bytes, filePath: Path | str | None = None) -> bool:
+    """
+    Classifies a file as binary or text from the first bytes of its contents. See
+    the module docstring for the checks made.
+
+    Parameters
+    ----------
+    sample : bytes
+        The first bytes of the file. Only the first `BINARY_SNIFF_SIZE` are checked.
+    filePath : pathlib.Path or str or None, optional
+        The path of the file, whose extension is checked when the sample is not
+        valid UTF-8 (default is None).
+
+    Returns
+    -------
+    bool
+        Whether the file is binary.
+
+    Examples
+    --------
+    >>> IsBinarySample(b"\\x89PNG\\r\\n\\x1a\\n\\x00\\x00\\x00\\rIHDR")
+    True
+    >>> IsBinarySample("Hail to the Victors!".encode("utf-8"))
+    False
+    """
+
+    sample = sample[:BINARY_SNIFF_SIZE]
+
+    if sample.startswith(TEXT_BOMS):
+
+        return False
+
+    if any(
+        sample.startswith(signature, offset) for offset, signature in BINARY_SIGNATURES
+    ):
+
+        return True
+
+    if b"\x00" in sample:
+
+        return True
+
+    if filePath is None or Path(filePath).suffix.lower() not in BINARY_EXTENSIONS:
+
+        return False
+
+    try:
+
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+
+    except UnicodeDecodeError:
+
+        return True
+
+    return False
+
+
+def _RaiseIfBinary(sample: bytes, filePath: Path | str) -> None:
+    """
+    Internal function to raise `UnsupportedEncodingError` for a file whose first
+    bytes are classified as binary by `IsBinarySample`.
+    """
+
+    if IsBinarySample(sample=sample, filePath=filePath):
+
+        raise UnsupportedEncodingError(
+            encoding=None, filePath=filePath, message="File appears to be binary"
+        )
+
+
+def _GetDetectionSample(data: bytes, detectionStrategy: str) -> bytes:
+    """
+    Internal function to select the bytes `chardet` is run over.
+
+    Parameters
+    ----------
+    data : bytes
+        The raw contents of the file.
+    detectionStrategy : str
+        One of "full", "sampled-prefix" or "sampled-stripes".
+
+    Returns
+    -------
+    bytes
+        The whole buffer for "full", otherwise at most `DETECTION_SAMPLE_SIZE` bytes.
+    """
+
+    if detectionStrategy == "full" or len(data) <= DETECTION_SAMPLE_SIZE:
+
+        return data
+
+    if detectionStrategy == "sampled-prefix":
+
+        return data[:DETECTION_SAMPLE_SIZE]
+
+    stripeSize = DETECTION_SAMPLE_SIZE // DETECTION_NUM_STRIPES
+    stride = (len(data) - stripeSize) // (DETECTION_NUM_STRIPES - 1)
+
+    return b"".join(
+        data[stripe * stride : stripe * stride + stripeSize]
+        for stripe in range(DETECTION_NUM_STRIPES)
+    )
+
+
+def _TranslateNewlines(text: str) -> str:
+    """
+    Internal function to translate "\\r\\n" and lone "\\r" line endings to "\\n", as
+    reading a file in text mode does.
+    """
+
+    if "\r" not in text:
+
+        return text
+
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def DecodeTextBytes(
+    data: bytes,
+    filePath: Path | str,
+    detectionStrategy: str = "full",
+    checkBinary: bool = True,
+) -> str:
+    """
+    Decodes the raw bytes of a text file. Binary contents are rejected first, then
+    strict UTF-8 is tried, and `chardet` detection is only run when the buffer is
+    not valid UTF-8. Line endings are translated to "\\n".
+
+    Parameters
+    ----------
+    data : bytes
+        The raw contents of the file.
+    filePath : pathlib.Path or str
+        The path the bytes were read from. Only used for error reporting.
+    detectionStrategy : str, optional
+        How much of the buffer to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only"
+        (default is "full"). See the module docstring for the trade-offs.
+    checkBinary : bool, optional
+        Whether to check the first bytes for binary contents (default is True).
+        Callers that already checked them while reading the file pass False.
+
+    Returns
+    -------
+    str
+        The decoded contents of the file.
+
+    Raises
+    ------
+    ValueError
+        Raised if `detectionStrategy` is not a valid detection strategy.
+    UnsupportedEncodingError
+        Raised if the bytes are binary, if the encoding cannot be determined, or if
+        the bytes cannot be decoded with the detected encoding.
+
+    Examples
+    --------
+    >>> DecodeTextBytes("Hail to the Victors!".encode("utf-8"), "example.txt")
+    'Hail to the Victors!'
+    """
+
+    import chardet
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if checkBinary:
+
+        _RaiseIfBinary(sample=data[:BINARY_SNIFF_SIZE], filePath=filePath)
+
+    try:
+
+        return _TranslateNewlines(data.decode("utf-8"))
+
+    except UnicodeDecodeError:
+
+        if detectionStrategy == "utf8-only":
+
+            raise UnsupportedEncodingError(encoding=None, filePath=filePath)
+
+    detection = chardet.detect(_GetDetectionSample(data, detectionStrategy))
+    encoding = detection["encoding"]
+
+    if not encoding:
+
+        raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+    try:
+
+        return _TranslateNewlines(data.decode(encoding))
+
+    except (UnicodeDecodeError, LookupError):
+
+        raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+
+def ReadTextFile(filePath: Path | str, detectionStrategy: str = "full") -> str:
     """
     Reads a text file using its detected encoding. Supports any encoding identified by `chardet`.
 
+    The file is read once. Its first bytes are checked for binary contents before
+    the rest is read, and its bytes are then decoded as UTF-8 when valid, and
+    otherwise decoded with the encoding `chardet` detects on the same buffer.
+
     Parameters
     ----------
     filePath : pathlib.Path or str
         The path to the file to be read. Can be provided as a string or a `Path` object.
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only"
+        (default is "full").
 
     Returns
     -------
@@ -62,8 +438,10 @@ def ReadTextFile(filePath: Path | str) -> str:
         Raised if the input `filePath` is not of type `str` or `pathlib.Path`.
     FileNotFoundError
         Raised if the specified file does not exist.
+    ValueError
+        Raised if `detectionStrategy` is not a valid detection strategy.
     UnsupportedEncodingError
-        Raised if the file's encoding cannot be determined.
+        Raised if the file is binary or its encoding cannot be determined.
 
     Examples
     --------
@@ -109,15 +487,241 @@ def ReadTextFile(filePath: Path | str) -> str:
 
     with file.open("rb") as binaryFile:
 
-        detection = chardet.detect(binaryFile.read())
-        encoding = detection["encoding"]
+        data = binaryFile.read(BINARY_SNIFF_SIZE)
+        _RaiseIfBinary(sample=data, filePath=filePath)
 
-    if encoding:
+        if len(data) == BINARY_SNIFF_SIZE:
 
-        encoding = "utf-8"
+            # Read the whole file into one buffer from the start, rather than
+            # joining the sample and the rest, which would hold the file twice
+            if binaryFile.seekable():
 
-        return file.read_text(encoding=encoding)
+                binaryFile.seek(0)
+                data = binaryFile.read()
+
+            else:
+
+                data += binaryFile.read()
+
+    return DecodeTextBytes(
+        data=data,
+        filePath=filePath,
+        detectionStrategy=detectionStrategy,
+        checkBinary=False,
+    )
+
+
+def _DetectStreamEncoding(
+    binaryFile, fileSize: int, filePath: Path | str, detectionStrategy: str
+) -> str:
+    """
+    Internal function to detect the encoding of an open binary file without loading
+    it into memory. The file position is left unspecified.
+
+    Parameters
+    ----------
+    binaryFile : io.BufferedReader
+        The file, opened in binary mode.
+    fileSize : int
+        The size of the file in bytes.
+    filePath : pathlib.Path or str
+        The path of the file. Only used for error reporting.
+    detectionStrategy : str
+        One of "full", "sampled-prefix" or "sampled-stripes". "full" feeds the whole
+        file through an incremental `chardet` detector, reading it once more.
+
+    Returns
+    -------
+    str
+        The detected encoding.
+
+    Raises
+    ------
+    UnsupportedEncodingError
+        Raised if the encoding cannot be determined.
+    """
+
+    import chardet
+
+    if detectionStrategy == "full":
+
+        detector = chardet.UniversalDetector()
+        binaryFile.seek(0)
+
+        while not detector.done:
+
+            block = binaryFile.read(STREAM_CHUNK_SIZE)
+
+            if not block:
+
+                break
+
+            detector.feed(block)
+
+        detector.close()
+        encoding = detector.result["encoding"]
 
     else:
 
+        if detectionStrategy == "sampled-prefix" or fileSize <= DETECTION_SAMPLE_SIZE:
+
+            offsets = [0]
+            readSize = DETECTION_SAMPLE_SIZE
+
+        else:
+
+            readSize = DETECTION_SAMPLE_SIZE // DETECTION_NUM_STRIPES
+            stride = (fileSize - readSize) // (DETECTION_NUM_STRIPES - 1)
+            offsets = [stripe * stride for stripe in range(DETECTION_NUM_STRIPES)]
+
+        sample = bytearray()
+
+        for offset in offsets:
+
+            binaryFile.seek(offset)
+            sample += binaryFile.read(readSize)
+
+        encoding = chardet.detect(bytes(sample))["encoding"]
+
+    if not encoding:
+
         raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+    return encoding
+
+
+def IterTextFileChunks(
+    filePath: Path | str,
+    chunkSize: int = STREAM_CHUNK_SIZE,
+    detectionStrategy: str = "full",
+) -> Iterator[tuple[str, int]]:
+    """
+    Reads a text file incrementally, yielding decoded text in chunks so that the
+    file is never held in memory as a whole.
+
+    The first bytes of the file are checked for binary contents, and the encoding is
+    decided from the first chunk: if it is valid UTF-8 the whole file is decoded as
+    UTF-8, otherwise the encoding is detected according to `detectionStrategy`. A
+    file whose first chunk is UTF-8 but which later contains invalid UTF-8 raises
+    `UnsupportedEncodingError` at that point. Line endings are translated to "\\n",
+    and a "\\r" that ends a chunk is held back until the next chunk is decoded.
+
+    Parameters
+    ----------
+    filePath : pathlib.Path or str
+        The path to the file to be read.
+    chunkSize : int, optional
+        The number of bytes to read per chunk (default is 1 MiB).
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only"
+        (default is "full").
+
+    Yields
+    ------
+    tuple[str, int]
+        The decoded text of each chunk and the number of raw bytes it was decoded from.
+
+    Raises
+    ------
+    TypeError
+        Raised if `filePath` is not of type `str` or `pathlib.Path`, or `chunkSize`
+        is not an `int`.
+    ValueError
+        Raised if `chunkSize` is not positive or `detectionStrategy` is not a valid
+        detection strategy.
+    FileNotFoundError
+        Raised if the specified file does not exist.
+    UnsupportedEncodingError
+        Raised if the file is binary, if its encoding cannot be determined, or if
+        the file cannot be decoded with it.
+
+    Examples
+    --------
+    >>> numChars = 0
+    >>> for text, numBytes in IterTextFileChunks('example.txt', chunkSize=65536):
+    ...     numChars += len(text)
+    """
+
+    if not isinstance(filePath, str) and not isinstance(filePath, Path):
+
+        raise TypeError(
+            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+        )
+
+    if not isinstance(chunkSize, int) or isinstance(chunkSize, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "chunkSize". Expected type: int. Given type: {type(chunkSize)}'
+        )
+
+    if chunkSize <= 0:
+
+        raise ValueError(f"chunkSize must be positive. Given: {chunkSize}")
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    file = Path(filePath).resolve()
+
+    if not file.exists():
+
+        raise FileNotFoundError(f"File not found: {file}")
+
+    with file.open("rb") as binaryFile:
+
+        _RaiseIfBinary(sample=binaryFile.read(BINARY_SNIFF_SIZE), filePath=filePath)
+        binaryFile.seek(0)
+        block = binaryFile.read(chunkSize)
+        encoding = "utf-8"
+
+        try:
+
+            codecs.getincrementaldecoder("utf-8")().decode(block, final=False)
+
+        except UnicodeDecodeError:
+
+            if detectionStrategy == "utf8-only":
+
+                raise UnsupportedEncodingError(encoding=None, filePath=filePath)
+
+            encoding = _DetectStreamEncoding(
+                binaryFile=binaryFile,
+                fileSize=file.stat().st_size,
+                filePath=filePath,
+                detectionStrategy=detectionStrategy,
+            )
+            binaryFile.seek(0)
+            block = binaryFile.read(chunkSize)
+
+        try:
+
+            # Translates line endings, holding back a trailing "\r" until the next
+            # chunk shows whether it starts a "\r\n"
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder(encoding)(), translate=True
+            )
+
+        except LookupError:
+
+            raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+        try:
+
+            while block:
+
+                yield decoder.decode(block, final=False), len(block)
+                block = binaryFile.read(chunkSize)
+
+            tail = decoder.decode(b"", final=True)
+
+        except UnicodeDecodeError:
+
+            raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+        if tail:
+
+            yield tail, 0
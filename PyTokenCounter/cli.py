@@ -22,6 +22,9 @@ Subcommands:
     count-dir      Count tokens in all files within a directory.
     get-model      Retrieves the model name from the provided encoding.
     get-encoding   Retrieves the encoding name from the provided model.
+    chunk          Split files or directories into token chunks, printed as NDJSON.
+    cache          Show statistics for, prune or clear the token cache.
+    serve          Run a server that keeps encodings loaded between calls.
 
 Options:
     -m, --model      Model to use for encoding.
@@ -29,6 +32,16 @@ Options:
     -nr, --no-recursive Do not tokenize files in subdirectories
                         if a directory is given.
     -q, --quiet      Silence progress bars and minimize output.
+    -d, --detection  Encoding detection strategy for non-UTF-8 files
+                     (full, sampled-prefix, sampled-stripes, utf8-only).
+    -j, --jobs       Number of workers to use for multiple files or directories.
+    -b, --backend    Worker pool to use with --jobs (process, thread).
+    --cache [PATH]   Use a persistent token cache for the count commands.
+    --manifest [PATH] Recount only files changed since the last count-dir run.
+    -f, --format     Print one record per file as it is done (ndjson, json, csv)
+                     from tokenize-files, tokenize-dir, count-files or count-dir.
+    --no-server      Do not hand tokenize-str, count-str or count-file to a running
+                     "tokencount serve" server.
 
 
 For detailed help on each subcommand, use:
@@ -42,28 +55,56 @@ Example:
     tokencount tokenize-dir ./my_directory -m gpt-4o -nr
     tokencount count-files ./my_directory -m gpt-4o
     tokencount count-dir ./my_directory -m gpt-4o
+    tokencount count-dir ./my_directory -m gpt-4o -j 8
+    tokencount count-files ./my_directory -m gpt-4o -f ndjson
     tokencount get-model cl100k_base
     tokencount get-encoding gpt-4o
+    tokencount count-dir ./my_directory -m gpt-4o --cache
+    tokencount count-dir ./my_directory -m gpt-4o --manifest
+    tokencount chunk ./my_directory -m gpt-4o -n 512 --overlap 64 -j 8
+    tokencount cache stats
+    tokencount serve -m gpt-4o
 """
 
+from __future__ import annotations
+
 import argparse
+import csv
+import json
 import logging
 import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from ._cache import DEFAULT_CACHE_MAX_SIZE, TokenCache
+from ._chunk import ChunkDir, ChunkFile
+from ._manifest import TokenManifest
+from ._server import GetDefaultSocketPath, ServeTokens, TokenServerClient
+from ._utils import DETECTION_STRATEGIES, UnsupportedEncodingError
 from .core import (
+    PARALLEL_BACKENDS,
     VALID_ENCODINGS,
     VALID_MODELS,
     GetEncoding,
     GetModelForEncodingName,
     GetNumTokenDir,
+    GetNumTokenDirIncremental,
     GetNumTokenFiles,
     GetNumTokenStr,
     TokenizeDir,
     TokenizeFiles,
     TokenizeStr,
+    _GetPathFilter,
+    _IterCountFileJobs,
+    _IterFileJobs,
+    _WalkDirFiles,
 )
 
+if TYPE_CHECKING:
+
+    import tiktoken
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -73,6 +114,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+OUTPUT_FORMATS = ["ndjson", "json", "csv"]
+
 
 class CustomFormatter(
     argparse.ArgumentDefaultsHelpFormatter, argparse.RawTextHelpFormatter
@@ -144,6 +187,459 @@ def AddCommonArgs(subParser: argparse.ArgumentParser) -> None:
     )
 
 
+def AddFileArgs(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds arguments shared by the subcommands that read files.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the arguments will be added.
+    """
+
+    subParser.add_argument(
+        "-d",
+        "--detection",
+        type=str,
+        choices=DETECTION_STRATEGIES,
+        default="full",
+        metavar="STRATEGY",
+        help="""\
+How much of a non-UTF-8 file to run encoding detection over.
+Valid options are:
+  - full             Detect over the whole file. Most accurate, slowest.
+  - sampled-prefix   Detect over the first 64 KB only.
+  - sampled-stripes  Detect over 64 KB of stripes spread through the file.
+  - utf8-only        Never detect; skip files that are not UTF-8.""",
+    )
+
+
+def AddJobsArg(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds the worker pool arguments to a subparser that accepts multiple files or a
+    directory.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the argument will be added.
+    """
+
+    subParser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of workers to spread the files across (default: 1).",
+    )
+    subParser.add_argument(
+        "-b",
+        "--backend",
+        type=str,
+        choices=PARALLEL_BACKENDS,
+        default="process",
+        metavar="BACKEND",
+        help="""\
+Kind of worker pool to use with --jobs.
+Valid options are:
+  - process  Worker processes (default).
+  - thread   Worker threads. Faster to start, no pickling of results.""",
+    )
+
+
+def AddFormatArg(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds the per-file output format argument to a subparser that accepts multiple
+    files or a directory.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the argument will be added.
+    """
+
+    subParser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        choices=OUTPUT_FORMATS,
+        default=None,
+        metavar="FORMAT",
+        help="""\
+Print one record per file, with its path, encoding, token count and, for the
+tokenize commands, its tokens, as soon as the file is done, instead of printing
+the whole result at the end. Progress bars are not shown.
+Valid options are:
+  - ndjson  One JSON object per line.
+  - json    A JSON array of the records.
+  - csv     Comma-separated rows after a header row, with space-separated tokens.""",
+    )
+
+
+def AddFilterArgs(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds the directory filter arguments to a subparser that accepts a directory.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the arguments will be added.
+    """
+
+    subParser.add_argument(
+        "--include",
+        type=str,
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="""\
+Only read the files of a directory matching GLOB, in .gitignore syntax, or inside a
+matching directory. Can be given more than once.""",
+    )
+    subParser.add_argument(
+        "--exclude",
+        type=str,
+        action="append",
+        default=None,
+        metavar="GLOB",
+        help="""\
+Leave out the files and directories of a directory matching GLOB, in .gitignore
+syntax, without descending into excluded directories. Can be given more than once.""",
+    )
+    subParser.add_argument(
+        "--gitignore",
+        action="store_true",
+        help="""\
+Leave out the files and directories of a directory ignored by its .gitignore files,
+and by those of its parents up to the root of its git repository, and .git itself.""",
+    )
+    subParser.add_argument(
+        "--max-file-size",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Leave out the files of a directory larger than BYTES without reading them.",
+    )
+
+
+def AddCacheArg(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds the token cache argument to a counting subparser.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the argument will be added.
+    """
+
+    subParser.add_argument(
+        "--cache",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="""\
+Look files up in a persistent token cache and store the counts of new files.
+Uses the default cache location unless a database PATH is given.""",
+    )
+
+
+def OpenCache(cachePath: str | None) -> TokenCache | None:
+    """
+    Opens the token cache requested by the --cache argument.
+
+    Parameters
+    ----------
+    cachePath : str or None
+        The value of the --cache argument: None if it was not given, an empty
+        string for the default location, or the path to the database.
+
+    Returns
+    -------
+    TokenCache or None
+        The opened cache, or None if no cache was requested.
+    """
+
+    if cachePath is None:
+
+        return None
+
+    return TokenCache(path=cachePath or None)
+
+
+def AddServerArg(subParser: argparse.ArgumentParser) -> None:
+    """
+    Adds the argument to opt out of the token counting server to a subparser the
+    server can handle.
+
+    Parameters
+    ----------
+    subParser : argparse.ArgumentParser
+        The subparser to which the argument will be added.
+    """
+
+    subParser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="""\
+Do not hand the request to a running "tokencount serve" server, even if one is
+listening on the default socket or on $TOKENCOUNT_PORT.""",
+    )
+
+
+def RequestServer(args: argparse.Namespace) -> object | None:
+    """
+    Hands a tokenize-str, count-str or count-file request to a running token
+    counting server.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command-line arguments.
+
+    Returns
+    -------
+    object or None
+        The result of the request, or None if no server is running or the request
+        is left to this process.
+    """
+
+    if args.command == "count-file" and not Path(args.file).is_file():
+
+        # Leave errors for paths that are not files to the local command
+        return None
+
+    # Match the default model of the local commands
+    model = args.model if args.model or args.encoding else "gpt-4o"
+
+    try:
+
+        client = TokenServerClient()
+
+    except OSError:
+
+        return None
+
+    with client:
+
+        try:
+
+            if args.command == "tokenize-str":
+
+                return client.TokenizeStr(
+                    string=args.string, model=model, encodingName=args.encoding
+                )
+
+            if args.command == "count-str":
+
+                return client.GetNumTokenStr(
+                    string=args.string, model=model, encodingName=args.encoding
+                )
+
+            return client.GetNumTokenFile(
+                filePath=args.file,
+                model=model,
+                encodingName=args.encoding,
+                detectionStrategy=args.detection,
+                cachePath=args.cache,
+            )
+
+        except (ConnectionError, PermissionError, TimeoutError):
+
+            # Count locally when the server is gone, refuses the request's token
+            # cache or times out
+            return None
+
+
+def IterFileRecords(
+    inputPaths: list[Path],
+    encoding: tiktoken.Encoding,
+    countOnly: bool,
+    recursive: bool,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> Iterator[dict]:
+    """
+    Tokenizes or counts the tokens of a directory or a list of files, yielding a
+    record for each file as soon as its result arrives, in the order the files are
+    walked or given.
+
+    Parameters
+    ----------
+    inputPaths : list[Path]
+        A single directory, or the files to tokenize.
+    encoding : tiktoken.Encoding
+        The encoding to tokenize with.
+    countOnly : bool
+        Whether to count the tokens of each file rather than tokenize it.
+    recursive : bool
+        Whether to include files in subdirectories of a directory.
+    detectionStrategy : str
+        The encoding detection strategy for files that are not UTF-8.
+    workers : int
+        The number of workers to spread the files across.
+    backend : str
+        The kind of worker pool to use when "workers" is greater than 1.
+    cache : TokenCache or None, optional
+        A token cache to count files through.
+    include : list[str] or None, optional
+        Glob patterns of the files of a directory to keep.
+    exclude : list[str] or None, optional
+        Glob patterns of the files and directories of a directory to leave out.
+    respectGitignore : bool, optional
+        Whether to leave out the files and directories of a directory ignored by
+        ".gitignore" files.
+    maxFileSize : int or None, optional
+        The size in bytes above which the files of a directory are left out.
+
+    Yields
+    ------
+    dict
+        The file's "path", the "encoding" name, its "numTokens" and, unless
+        "countOnly", its "tokens".
+
+    Raises
+    ------
+    ValueError
+        If a directory is not given alone and the inputs are not all files, if
+        "workers" is less than 1, or if "maxFileSize" is negative.
+    UnsupportedEncodingError
+        If a file in a list of files has an unsupported encoding. Such files are
+        skipped within a directory.
+    """
+
+    if workers < 1:
+
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    isDir = len(inputPaths) == 1 and inputPaths[0].is_dir()
+
+    if isDir:
+
+        filePaths = _WalkDirFiles(
+            dirPath=inputPaths[0],
+            recursive=recursive,
+            pathFilter=_GetPathFilter(
+                include=include,
+                exclude=exclude,
+                respectGitignore=respectGitignore,
+                maxFileSize=maxFileSize,
+            ),
+        )
+
+    else:
+
+        nonFiles = [entry for entry in inputPaths if not entry.is_file()]
+
+        if nonFiles:
+
+            raise ValueError(f"Given list contains non-file entries: {nonFiles}")
+
+        filePaths = inputPaths
+
+    if countOnly:
+
+        results = _IterCountFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+        )
+
+    else:
+
+        results = _IterFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+        )
+
+    for filePath, result in results:
+
+        if isinstance(result, UnsupportedEncodingError):
+
+            if isDir:
+
+                continue
+
+            raise result
+
+        record = {"path": filePath.as_posix(), "encoding": encoding.name}
+
+        if countOnly:
+
+            record["numTokens"] = result
+
+        else:
+
+            record["numTokens"] = len(result)
+            record["tokens"] = result
+
+        yield record
+
+
+def WriteRecords(
+    records: Iterable[dict], outputFormat: str, fieldNames: list[str]
+) -> None:
+    """
+    Prints records to standard output as they arrive, flushing after each one so
+    that they can be piped into other tools while the rest are produced.
+
+    Parameters
+    ----------
+    records : Iterable[dict]
+        The records to print.
+    outputFormat : str
+        One of OUTPUT_FORMATS. "json" prints a single array, opened before the
+        first record and closed after the last.
+    fieldNames : list[str]
+        The keys of the records, in the order of the CSV columns.
+    """
+
+    if outputFormat == "ndjson":
+
+        for record in records:
+
+            print(json.dumps(record), flush=True)
+
+    elif outputFormat == "json":
+
+        separator = "[\n"
+
+        for record in records:
+
+            print(separator + json.dumps(record), end="", flush=True)
+            separator = ",\n"
+
+        print("[]" if separator == "[\n" else "\n]", flush=True)
+
+    elif outputFormat == "csv":
+
+        writer = csv.DictWriter(sys.stdout, fieldnames=fieldNames, lineterminator="\n")
+        writer.writeheader()
+
+        for record in records:
+
+            if "tokens" in record:
+
+                record["tokens"] = " ".join(map(str, record["tokens"]))
+
+            writer.writerow(record)
+            sys.stdout.flush()
+
+
 def main() -> None:
     """
     Entry point for the CLI. Parses command-line arguments and invokes the appropriate
@@ -170,6 +666,7 @@ def main() -> None:
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserTokenizeStr)
+    AddServerArg(parserTokenizeStr)
     parserTokenizeStr.add_argument("string", type=str, help="The string to tokenize.")
 
     # Subparser for tokenizing a file
@@ -180,6 +677,7 @@ def main() -> None:
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserTokenizeFile)
+    AddFileArgs(parserTokenizeFile)
     parserTokenizeFile.add_argument(
         "file",
         type=str,
@@ -194,6 +692,10 @@ def main() -> None:
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserTokenizeFiles)
+    AddFileArgs(parserTokenizeFiles)
+    AddJobsArg(parserTokenizeFiles)
+    AddFormatArg(parserTokenizeFiles)
+    AddFilterArgs(parserTokenizeFiles)
     parserTokenizeFiles.add_argument(
         "input",
         type=str,
@@ -218,6 +720,10 @@ Multiple files can be separated by spaces or commas.
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserTokenizeDir)
+    AddFileArgs(parserTokenizeDir)
+    AddJobsArg(parserTokenizeDir)
+    AddFormatArg(parserTokenizeDir)
+    AddFilterArgs(parserTokenizeDir)
     parserTokenizeDir.add_argument(
         "directory",
         type=str,
@@ -238,6 +744,7 @@ Multiple files can be separated by spaces or commas.
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserCountStr)
+    AddServerArg(parserCountStr)
     parserCountStr.add_argument(
         "string", type=str, help="The string to count tokens for."
     )
@@ -250,6 +757,9 @@ Multiple files can be separated by spaces or commas.
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserCountFile)
+    AddFileArgs(parserCountFile)
+    AddCacheArg(parserCountFile)
+    AddServerArg(parserCountFile)
     parserCountFile.add_argument(
         "file",
         type=str,
@@ -264,6 +774,11 @@ Multiple files can be separated by spaces or commas.
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserCountFiles)
+    AddFileArgs(parserCountFiles)
+    AddCacheArg(parserCountFiles)
+    AddJobsArg(parserCountFiles)
+    AddFormatArg(parserCountFiles)
+    AddFilterArgs(parserCountFiles)
     parserCountFiles.add_argument(
         "input",
         type=str,
@@ -288,6 +803,11 @@ Multiple files can be separated by spaces or commas.
         formatter_class=CustomFormatter,
     )
     AddCommonArgs(parserCountDir)
+    AddFileArgs(parserCountDir)
+    AddCacheArg(parserCountDir)
+    AddJobsArg(parserCountDir)
+    AddFormatArg(parserCountDir)
+    AddFilterArgs(parserCountDir)
     parserCountDir.add_argument(
         "directory",
         type=str,
@@ -299,6 +819,18 @@ Multiple files can be separated by spaces or commas.
         action="store_true",
         help="Do not count tokens in subdirectories.",
     )
+    parserCountDir.add_argument(
+        "--manifest",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="""\
+Recount only the files whose size, modification time or inode changed since the
+previous run, print their token counts and then the updated total.
+Uses the default manifest location unless a database PATH is given.""",
+    )
 
     # Subparser for getting the model from an encoding
     parserGetModel = subParsers.add_parser(
@@ -332,6 +864,125 @@ Multiple files can be separated by spaces or commas.
         + FormatChoices(VALID_MODELS),
     )
 
+    # Subparser for chunking files or directories
+    parserChunk = subParsers.add_parser(
+        "chunk",
+        help="Split files or directories into token chunks, printed as NDJSON.",
+        description="""\
+Split the contents of files, or of every file within directories, into chunks of at
+most --tokens tokens, ending chunks at paragraph or line breaks where possible.
+Each chunk is printed as one JSON object per line, with the "path" of its file, its
+"text", its exact "numTokens" and the "byteOffset" of its first character.""",
+        formatter_class=CustomFormatter,
+    )
+    AddCommonArgs(parserChunk)
+    AddFileArgs(parserChunk)
+    AddJobsArg(parserChunk)
+    AddFilterArgs(parserChunk)
+    parserChunk.add_argument(
+        "input",
+        type=str,
+        nargs="+",
+        help="""\
+Paths to the files or directories to chunk.
+Multiple paths can be separated by spaces or commas.
+""",
+    )
+    parserChunk.add_argument(
+        "-n",
+        "--tokens",
+        type=int,
+        required=True,
+        metavar="N",
+        help="Maximum number of tokens in a chunk.",
+    )
+    parserChunk.add_argument(
+        "--overlap",
+        type=int,
+        default=0,
+        metavar="M",
+        help="Number of tokens each chunk repeats from the end of the previous one.",
+    )
+    parserChunk.add_argument(
+        "-nr",
+        "--no-recursive",
+        action="store_true",
+        help="Do not chunk files in subdirectories of a directory.",
+    )
+
+    # Subparser for managing the token cache
+    parserCache = subParsers.add_parser(
+        "cache",
+        help="Show statistics for, prune or clear the token cache.",
+        description="Show statistics for, prune or clear the persistent token cache used by --cache.",
+        formatter_class=CustomFormatter,
+    )
+    parserCache.add_argument(
+        "action",
+        type=str,
+        choices=["stats", "prune", "clear"],
+        metavar="ACTION",
+        help="""\
+What to do with the cache.
+Valid options are:
+  - stats  Show the location, number of entries and size of the cache.
+  - prune  Evict the least recently used entries until the cache is under --max-size.
+  - clear  Remove every entry from the cache.""",
+    )
+    parserCache.add_argument(
+        "-p",
+        "--path",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Path to the cache database (default: the default cache location).",
+    )
+    parserCache.add_argument(
+        "--max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE,
+        metavar="BYTES",
+        help=f"Size limit in bytes to prune the cache down to (default: {DEFAULT_CACHE_MAX_SIZE}).",
+    )
+
+    # Subparser for running the token counting server
+    parserServe = subParsers.add_parser(
+        "serve",
+        help="Run a server that keeps encodings loaded between calls.",
+        description="""\
+Run a long-lived server that keeps encodings loaded, and answers tokenize-str,
+count-str and count-file requests over a local socket in a line-delimited JSON
+protocol. While it runs, those subcommands hand their requests to it instead of
+loading an encoding themselves. The model or encoding given here is loaded at
+startup; others are loaded on first use.""",
+        formatter_class=CustomFormatter,
+    )
+    AddCommonArgs(parserServe)
+    parserServe.add_argument(
+        "-s",
+        "--socket",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Path of the Unix domain socket to listen on (default: $TOKENCOUNT_SOCKET or a per-user runtime directory).",
+    )
+    parserServe.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Listen on this localhost TCP port instead of a Unix domain socket. Clients find it through $TOKENCOUNT_PORT and read its access token from a file only the current user can read.",
+    )
+    parserServe.add_argument(
+        "--cache-path",
+        type=str,
+        action="append",
+        default=None,
+        metavar="PATH",
+        help="A token cache database that count-file requests may use besides the default cache location. Can be given more than once.",
+    )
+
     # Parse the arguments
 
     if len(sys.argv) == 1:
@@ -340,8 +991,48 @@ Multiple files can be separated by spaces or commas.
 
     args = parser.parse_args()
 
+    if (
+        getattr(args, "format", None) is not None
+        and getattr(args, "manifest", None) is not None
+    ):
+
+        parser.error("argument -f/--format: not allowed with argument --manifest")
+
     try:
 
+        if args.command == "cache":
+
+            with TokenCache(path=args.path, maxSize=args.max_size) as cache:
+
+                if args.action == "stats":
+
+                    for key, value in cache.Stats().items():
+
+                        print(f"{key}: {value}")
+
+                elif args.action == "prune":
+
+                    print(f"Evicted {cache.Prune()} entries")
+
+                elif args.action == "clear":
+
+                    print(f"Removed {cache.Clear()} entries")
+
+            return
+
+        if (
+            args.command in ("tokenize-str", "count-str", "count-file")
+            and not args.no_server
+        ):
+
+            result = RequestServer(args)
+
+            if result is not None:
+
+                print(result)
+
+                return
+
         encoding = None
         if args.model and args.encoding:
             encoding = GetEncoding(model=args.model, encodingName=args.encoding)
@@ -352,6 +1043,71 @@ Multiple files can be separated by spaces or commas.
         else:
             encoding = GetEncoding(model="gpt-4o")
 
+        cache = OpenCache(cachePath=getattr(args, "cache", None))
+
+        if args.command == "serve":
+
+            if not args.quiet:
+
+                address = (
+                    f"port {args.port}"
+                    if args.port is not None
+                    else args.socket or GetDefaultSocketPath()
+                )
+                logger.info(f"Serving {encoding.name} on {address}")
+
+            ServeTokens(
+                encoding=encoding,
+                socketPath=args.socket,
+                port=args.port,
+                cachePaths=args.cache_path,
+            )
+
+            return
+
+        if getattr(args, "format", None) is not None:
+
+            countOnly = args.command.startswith("count")
+
+            if args.command in ("tokenize-dir", "count-dir"):
+
+                inputPaths = [Path(args.directory)]
+
+                if not inputPaths[0].is_dir():
+
+                    raise ValueError(
+                        f'Given directory path "{args.directory}" is not a directory.'
+                    )
+
+            else:
+
+                # Split inputs by commas and flatten the list
+                inputPaths = [
+                    Path(p.strip()) for arg in args.input for p in arg.split(",")
+                ]
+
+            WriteRecords(
+                IterFileRecords(
+                    inputPaths=inputPaths,
+                    encoding=encoding,
+                    countOnly=countOnly,
+                    recursive=not args.no_recursive,
+                    include=args.include,
+                    exclude=args.exclude,
+                    respectGitignore=args.gitignore,
+                    maxFileSize=args.max_file_size,
+                    detectionStrategy=args.detection,
+                    workers=args.jobs,
+                    backend=args.backend,
+                    cache=cache,
+                ),
+                outputFormat=args.format,
+                fieldNames=["path", "encoding", "numTokens"]
+                + ([] if countOnly else ["tokens"]),
+            )
+
+            return
+
         if args.command == "tokenize-str":
 
             tokens = TokenizeStr(
@@ -371,6 +1127,7 @@ Multiple files can be separated by spaces or commas.
                 encodingName=args.encoding,
                 encoding=encoding,
                 quiet=args.quiet,
+                detectionStrategy=args.detection,
             )
 
             print(tokens)
@@ -389,7 +1146,14 @@ Multiple files can be separated by spaces or commas.
                     encodingName=args.encoding,
                     encoding=encoding,
                     recursive=not args.no_recursive,
+                    include=args.include,
+                    exclude=args.exclude,
+                    respectGitignore=args.gitignore,
+                    maxFileSize=args.max_file_size,
                     quiet=args.quiet,
+                    detectionStrategy=args.detection,
+                    workers=args.jobs,
+                    backend=args.backend,
                 )
 
             else:
@@ -400,6 +1164,9 @@ Multiple files can be separated by spaces or commas.
                     encodingName=args.encoding,
                     encoding=encoding,
                     quiet=args.quiet,
+                    detectionStrategy=args.detection,
+                    workers=args.jobs,
+                    backend=args.backend,
                 )
             print(tokenLists)
 
@@ -411,7 +1178,14 @@ Multiple files can be separated by spaces or commas.
                 encodingName=args.encoding,
                 encoding=encoding,
                 recursive=not args.no_recursive,
+                include=args.include,
+                exclude=args.exclude,
+                respectGitignore=args.gitignore,
+                maxFileSize=args.max_file_size,
                 quiet=args.quiet,
+                detectionStrategy=args.detection,
+                workers=args.jobs,
+                backend=args.backend,
             )
 
             print(tokenizedDir)
@@ -435,6 +1209,8 @@ Multiple files can be separated by spaces or commas.
                 encodingName=args.encoding,
                 encoding=encoding,
                 quiet=args.quiet,
+                detectionStrategy=args.detection,
+                cache=cache,
             )
 
             print(count)
@@ -452,7 +1228,15 @@ Multiple files can be separated by spaces or commas.
                     encodingName=args.encoding,
                     encoding=encoding,
                     recursive=not args.no_recursive,
+                    include=args.include,
+                    exclude=args.exclude,
+                    respectGitignore=args.gitignore,
+                    maxFileSize=args.max_file_size,
                     quiet=args.quiet,
+                    detectionStrategy=args.detection,
+                    cache=cache,
+                    workers=args.jobs,
+                    backend=args.backend,
                 )
 
             else:
@@ -463,9 +1247,43 @@ Multiple files can be separated by spaces or commas.
                     encodingName=args.encoding,
                     encoding=encoding,
                     quiet=args.quiet,
+                    detectionStrategy=args.detection,
+                    cache=cache,
+                    workers=args.jobs,
+                    backend=args.backend,
                 )
             print(totalCount)
 
+        elif args.command == "count-dir" and args.manifest is not None:
+
+            with TokenManifest(path=args.manifest or None) as manifest:
+
+                result = GetNumTokenDirIncremental(
+                    dirPath=args.directory,
+                    model=args.model,
+                    encodingName=args.encoding,
+                    encoding=encoding,
+                    recursive=not args.no_recursive,
+                    include=args.include,
+                    exclude=args.exclude,
+                    respectGitignore=args.gitignore,
+                    maxFileSize=args.max_file_size,
+                    quiet=args.quiet,
+                    detectionStrategy=args.detection,
+                    cache=cache,
+                    workers=args.jobs,
+                    backend=args.backend,
+                    manifest=manifest,
+                )
+
+            for marker, key in (("+", "added"), ("~", "changed"), ("-", "removed")):
+
+                for relativePath, numTokens in result[key].items():
+
+                    print(f"{marker} {relativePath}: {numTokens}")
+
+            print(result["numTokens"])
+
         elif args.command == "count-dir":
 
             count = GetNumTokenDir(
@@ -474,11 +1292,65 @@ Multiple files can be separated by spaces or commas.
                 encodingName=args.encoding,
                 encoding=encoding,
                 recursive=not args.no_recursive,
+                include=args.include,
+                exclude=args.exclude,
+                respectGitignore=args.gitignore,
+                maxFileSize=args.max_file_size,
                 quiet=args.quiet,
+                detectionStrategy=args.detection,
+                cache=cache,
+                workers=args.jobs,
+                backend=args.backend,
             )
 
             print(count)
 
+        elif args.command == "chunk":
+
+            # Split inputs by commas and flatten the list
+            inputPaths = [Path(p.strip()) for arg in args.input for p in arg.split(",")]
+
+            for inputPath in inputPaths:
+
+                if inputPath.is_dir():
+
+                    chunks = (
+                        ((inputPath / relativePath).as_posix(), chunk)
+                        for relativePath, chunk in ChunkDir(
+                            dirPath=inputPath,
+                            chunkTokens=args.tokens,
+                            overlapTokens=args.overlap,
+                            encoding=encoding,
+                            recursive=not args.no_recursive,
+                            include=args.include,
+                            exclude=args.exclude,
+                            respectGitignore=args.gitignore,
+                            maxFileSize=args.max_file_size,
+                            detectionStrategy=args.detection,
+                            workers=args.jobs,
+                            backend=args.backend,
+                        )
+                    )
+
+                else:
+
+                    chunks = (
+                        (inputPath.as_posix(), chunk)
+                        for chunk in ChunkFile(
+                            filePath=inputPath,
+                            chunkTokens=args.tokens,
+                            overlapTokens=args.overlap,
+                            encoding=encoding,
+                            detectionStrategy=args.detection,
+                        )
+                    )
+
+                for path, chunk in chunks:
+
+                    # Flush each record so that a downstream tool reading from a
+                    # pipe receives the chunks as they are cut
+                    print(json.dumps({"path": path, **chunk._asdict()}), flush=True)
+
         elif args.command == "get-model":
             model_name = GetModelForEncodingName(encodingName=args.encoding)
             print(model_name)
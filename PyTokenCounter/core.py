@@ -17,29 +17,74 @@ Key Functions
 - "GetEncoding": Obtain the "tiktoken.Encoding" based on a model or encoding name.
 - "TokenizeStr": Tokenize a single string into token IDs.
 - "GetNumTokenStr": Count the number of tokens in a string.
+- "IsWithinTokenLimit": Check whether a string is within a token limit, stopping as soon as it is crossed.
+- "TruncateStr": Truncate a string to a token budget, tokenizing only what is kept.
+- "TokenizeStrs": Tokenize a list of strings into token IDs in batches.
+- "GetNumTokenStrs": Count the number of tokens in each of a list of strings in batches.
 - "TokenizeFile": Tokenize the contents of a file into token IDs.
 - "GetNumTokenFile": Count the number of tokens in a file.
+- "IterTokenizeFile": Stream the token IDs of a file segment by segment in constant memory.
+- "IterCountFile": Stream the running token count of a file in constant memory.
+- "TruncateFile": Truncate the contents of a file to a token budget.
 - "TokenizeFiles": Tokenize multiple files or a directory into token IDs.
 - "GetNumTokenFiles": Count the number of tokens across multiple files or in a directory.
 - "TokenizeDir": Tokenize all files within a directory.
+- "IterTokenizeDir": Yield the tokens of each file within a directory as it is done.
 - "GetNumTokenDir": Count the number of tokens within a directory.
+- "IterCountDir": Yield the token count of each file within a directory as it is done.
+- "GetNumTokenDirIncremental": Recount the tokens within a directory, reading only the files changed since the previous run.
+
+Imports
+-------
+"tiktoken" is imported inside the functions that use it, and "rich" only once a
+progress bar is first shown, so that importing this module, and running the CLI
+with "--quiet", stays fast.
+
+Progress
+--------
+Each call reports its progress to its own task on the ProgressReporter given as
+"progress", or on a new RichProgressReporter, and nothing when "quiet" is True.
+No progress state is kept in this module, so concurrent calls are independent.
 
 """
 
+from __future__ import annotations
+
+import os
+import re
+import time
+import weakref
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache, partial
 from pathlib import Path
-
-import tiktoken
-from rich.progress import (
-    BarColumn,
-    MofNCompleteColumn,
-    Progress,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
+from typing import TYPE_CHECKING, NamedTuple
+
+from ._cache import HashBytes, HashFile, TokenCache
+from ._filter import PathFilter
+from ._manifest import ManifestEntry, TokenManifest
+from ._progress import NULL_PROGRESS_REPORTER, GetProgressReporter, ProgressReporter
+from ._utils import (
+    DETECTION_STRATEGIES,
+    DETECTION_STRATEGIES_STR,
+    STREAM_CHUNK_SIZE,
+    DecodeTextBytes,
+    IterTextFileChunks,
+    ReadTextFile,
+    UnsupportedEncodingError,
 )
-from rich.table import Column
 
-from ._utils import ReadTextFile, UnsupportedEncodingError
+if TYPE_CHECKING:
+
+    import numpy
+    import tiktoken
 
 MODEL_MAPPINGS = {
     "gpt-4o": "o200k_base",
@@ -76,456 +121,568 @@ VALID_ENCODINGS = ["o200k_base", "cl100k_base", "p50k_base", "r50k_base"]
 VALID_MODELS_STR = "\n".join(VALID_MODELS)
 VALID_ENCODINGS_STR = "\n".join(VALID_ENCODINGS)
 
+PARALLEL_BACKENDS = ["process", "thread"]
+PARALLEL_BACKENDS_STR = "\n".join(PARALLEL_BACKENDS)
 
-_progressInstance = Progress(
-    TextColumn(
-        "[bold blue]{task.description}",
-        justify="left",
-        table_column=Column(width=50),
-    ),
-    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-    BarColumn(bar_width=None),
-    MofNCompleteColumn(),
-    TextColumn("•"),
-    TimeElapsedColumn(),
-    TextColumn("•"),
-    TimeRemainingColumn(),
-    expand=True,
-)
-_tasks = {}
+RETURN_TYPES = ["list", "array", "numpy", "buffer"]
+RETURN_TYPES_STR = "\n".join(RETURN_TYPES)
+
+RESULT_ORDERS = ["walk", "completion"]
+RESULT_ORDERS_STR = "\n".join(RESULT_ORDERS)
+
+TRUNCATE_SIDES = ["head", "tail", "middle"]
+TRUNCATE_SIDES_STR = "\n".join(TRUNCATE_SIDES)
 
+# Upper bounds on the strings handed to a single _EncodeBatch call, which keep
+# the decoded text held at once bounded while amortising the per-call overhead
+BATCH_MAX_CHARS = 4 * 1024 * 1024
+BATCH_MAX_ITEMS = 1024
+BATCH_MAX_THREADS = 8
 
-def _InitializeTask(taskName: str, total: int, quiet: bool = False) -> int | None:
+# The length of the segments _CountTokens splits longer texts into, which bounds
+# the token IDs held at once while counting to those of a single segment
+COUNT_SEGMENT_CHARS = 1024 * 1024
+
+# Texts up to this many characters are counted through encode_ordinary(), whose
+# list is cheaper to build than the token buffer's fixed setup for short texts
+SHORT_COUNT_CHARS = 512
+
+# With "maxTokens", texts are counted in segments of this many characters per token
+# of the limit, within these bounds. Most text averages more characters per token,
+# so the limit is usually crossed within the first few segments.
+LIMIT_SEGMENT_CHARS_PER_TOKEN = 4
+LIMIT_MIN_SEGMENT_CHARS = 4096
+
+# How recently a file may have been modified, relative to the start of an
+# incremental run, before its stat signature is no longer trusted on the next run
+_MANIFEST_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+class TokenLimitResult(NamedTuple):
     """
-    Internal function to initialize a task in the progress bar.
+    The result of IsWithinTokenLimit. It is truthy only when the string is within
+    the limit, so it can be used directly as a condition.
 
-    Parameters
+    Attributes
     ----------
-    taskName : str
-        The description of the task to display in the progress bar.
-    total : int
-        The total work required for the task.
-    quiet : bool, optional
-        If True, suppress the progress bar (default is False).
-
-    Returns
-    -------
-    int or None
-        Task ID for the initialized task, or None if quiet is True.
+    withinLimit : bool
+        Whether the string has no more tokens than the limit.
+    numTokens : int
+        The exact token count if the string is within the limit. Otherwise, the
+        number of tokens counted before counting stopped, which is greater than the
+        limit.
     """
 
-    if quiet:
+    withinLimit: bool
+    numTokens: int
 
-        return None
+    def __bool__(self) -> bool:
 
-    if not _progressInstance.live.is_started:
+        return self.withinLimit
 
-        _progressInstance.start()
 
-    if taskName in _tasks:
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TokenLimitResult.__module__ = "PyTokenCounter"
 
-        return _tasks[taskName]
 
-    taskId = _progressInstance.add_task(taskName, total=total)
-    _tasks[taskName] = taskId
+class TruncateResult(NamedTuple):
+    """
+    The result of TruncateStr and TruncateFile.
 
-    return taskId
+    Attributes
+    ----------
+    text : str
+        The truncated text, which is the whole input if it was within the limit.
+    numTokens : int
+        The exact number of tokens in "text".
+    """
 
+    text: str
+    numTokens: int
 
-def _UpdateTask(
-    taskName: str,
-    advance: int,
-    description: str = None,
-    appendDescription: str = None,
-    quiet: bool = False,
-) -> None:
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+TruncateResult.__module__ = "PyTokenCounter"
+
+
+class DirFileResult(NamedTuple):
     """
-    Internal function to update a task's progress and optionally its description.
+    The result for a single file yielded by IterTokenizeDir and IterCountDir.
 
-    Parameters
+    Attributes
     ----------
-    taskName : str
-        The name of the task to update.
-    advance : int
-        The amount of work to add to the task's progress.
-    description : str, optional
-        A new description for the task (default is None).
-    appendDescription : str, optional
-        Text to append to the current description of the task (default is None).
-    quiet : bool, optional
-        If True, suppress the progress bar update (default is False).
+    path : str
+        The POSIX-style path of the file relative to the directory.
+    numTokens : int or None
+        The number of tokens in the file, or None if it was skipped.
+    tokens : list[int], array.array, numpy.ndarray, memoryview or None
+        The token IDs of the file from IterTokenizeDir, in the container named by
+        "returnType". None from IterCountDir, or if the file was skipped.
+    status : str
+        "ok" if the file was tokenized, or "skipped" if its encoding is not
+        supported.
+    """
 
-    Raises
-    ------
-    ValueError
-        If the specified task name is not found.
+    path: str
+    numTokens: int | None
+    tokens: list[int] | array | memoryview | numpy.ndarray | None
+    status: str
+
+
+# Set the module to 'PyTokenCounter' to reflect in tracebacks
+DirFileResult.__module__ = "PyTokenCounter"
+
+
+# The encoding and token cache each process pool worker uses, set once per worker
+# by _InitFileWorker so that they are not pickled again for every file.
+_workerEncoding: tiktoken.Encoding | None = None
+_workerCache: TokenCache | None = None
+
+# Patterns matching the special tokens of each encoding, built by
+# _GetSpecialTokenPattern
+_specialTokenPatterns: dict[frozenset[str], re.Pattern | None] = {}
+
+# The same patterns looked up by encoding object, which avoids rebuilding the set
+# of special tokens on every call
+_specialTokenPatternsByEncoding: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Positions where every supported encoding's pre-tokenizer is guaranteed to start a
+# new piece, no matter what follows: after a newline that follows a non-whitespace
+# character and precedes a non-whitespace character other than "/", or before a
+# single space between two ASCII letters. Encoding the text on either side of such
+# a position separately gives exactly the same tokens as encoding it whole. The
+# newline must not follow whitespace, which r50k_base and p50k_base would join to
+# it at the end of a segment, nor precede whitespace or "/", which cl100k_base and
+# o200k_base join to the newline's piece. Every line of a JSONL file, or of most
+# text, starts at such a position.
+_SAFE_SPLIT_PATTERN = re.compile(r"(?<=\S\n)(?=[^\s/])|(?<=[A-Za-z])(?= [A-Za-z])")
+
+# Characters before and after a position that _SAFE_SPLIT_PATTERN looks at
+_SAFE_SPLIT_CONTEXT = 2
+
+
+def _GetPathFilter(
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> PathFilter | None:
+    """
+    Internal function to validate the directory filter parameters shared by the
+    directory functions and build the PathFilter they describe, or None when they
+    leave every file in.
     """
 
-    if quiet:
+    for name, patterns in (("include", include), ("exclude", exclude)):
 
-        return
+        if patterns is not None and not (
+            isinstance(patterns, str)
+            or (
+                isinstance(patterns, list)
+                and all(isinstance(pattern, str) for pattern in patterns)
+            )
+        ):
 
-    if taskName not in _tasks:
+            raise TypeError(
+                f'Unexpected type for parameter "{name}". Expected type: str or list of str. Given type: {type(patterns)}'
+            )
 
-        raise ValueError(f"Task '{taskName}' not found.")
+    if not isinstance(respectGitignore, bool):
 
-    currentTask = _progressInstance.tasks[_tasks[taskName]]
-    currentDescription = currentTask.description if currentTask.description else ""
+        raise TypeError(
+            f'Unexpected type for parameter "respectGitignore". Expected type: bool. Given type: {type(respectGitignore)}'
+        )
 
-    if appendDescription is not None:
+    if maxFileSize is not None and (
+        not isinstance(maxFileSize, int) or isinstance(maxFileSize, bool)
+    ):
 
-        description = f"{currentDescription} {appendDescription}".strip()
+        raise TypeError(
+            f'Unexpected type for parameter "maxFileSize". Expected type: int. Given type: {type(maxFileSize)}'
+        )
 
-    elif description is None:
+    if maxFileSize is not None and maxFileSize < 0:
 
-        description = currentDescription
+        raise ValueError(
+            f'"maxFileSize" must be at least 0. Given value: {maxFileSize}'
+        )
 
-    _progressInstance.update(_tasks[taskName], advance=advance, description=description)
+    if not (include or exclude or respectGitignore or maxFileSize is not None):
 
-    if all(task.finished for task in _progressInstance.tasks):
+        return None
 
-        _progressInstance.stop()
-        _tasks.clear()
+    return PathFilter(
+        include=[include] if isinstance(include, str) else include,
+        exclude=[exclude] if isinstance(exclude, str) else exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
 
 
-def _CountDirFiles(dirPath: Path, recursive: bool = True) -> int:
+def _WalkDirFiles(
+    dirPath: Path, recursive: bool = True, pathFilter: PathFilter | None = None
+) -> list[Path]:
     """
-    Count the number of files in a directory.
+    List the files in a directory in a single pass, in the order TokenizeDir visits
+    them: the files directly inside each directory first, then the files of its
+    subdirectories.
 
-    This function traverses the specified directory and counts the number of files it contains.
-    It can operate recursively to include files in subdirectories if desired.
+    Directories are read with os.scandir, whose entries carry the file type from
+    the directory listing itself, so telling files from subdirectories needs no
+    extra stat call per entry except for symbolic links. Subdirectories are walked
+    with an explicit stack rather than by recursion, so deep trees are neither
+    listed twice nor limited by the recursion limit.
+
+    With a "pathFilter", entries are filtered as they are listed: excluded and
+    ignored subdirectories are never opened, and files left out are never read.
 
     Parameters
     ----------
     dirPath : Path
-        The path to the directory in which to count files.
+        The path to the directory to list.
     recursive : bool, optional
-        Whether to count files in subdirectories recursively (default is True).
+        Whether to list files in subdirectories recursively (default is True).
+    pathFilter : PathFilter or None, optional
+        The include, exclude, ".gitignore" and file size rules to apply (default
+        is None, which lists every file).
 
     Returns
     -------
-    int
-        The total number of files in the directory.
-
-    Raises
-    ------
-    ValueError
-        If the provided `dirPath` is not a directory.
+    list[Path]
+        The paths of the files in the directory.
     """
 
-    if not dirPath.is_dir():
-
-        raise ValueError(f"Given path '{dirPath}' is not a directory.")
+    filePaths: list[Path] = []
+    rootRules = (
+        ()
+        if pathFilter is None
+        else pathFilter.GetRootRules(dirPath=Path(dirPath).resolve())
+    )
 
-    numFiles = 0
+    # Each directory with its path relative to "dirPath" and its ignore rules
+    pendingDirs = [(str(dirPath), "", rootRules)]
 
-    if recursive:
+    while pendingDirs:
 
-        for entry in dirPath.iterdir():
+        currentPath, relativeDir, rules = pendingDirs.pop()
+        subDirs = []
 
-            if entry.is_dir():
+        if pathFilter is not None:
 
-                numFiles += _CountDirFiles(entry, recursive=recursive)
+            rules = pathFilter.GetDirRules(
+                dirPath=currentPath, relativeDir=relativeDir, rules=rules
+            )
 
-            else:
+        with os.scandir(currentPath) as entries:
 
-                numFiles += 1
+            for entry in entries:
 
-    else:
+                isDir = entry.is_dir()
 
-        numFiles = sum(1 for entry in dirPath.iterdir() if entry.is_file())
+                if pathFilter is not None and not pathFilter.Accepts(
+                    entry=entry,
+                    relativePath=relativeDir + entry.name,
+                    isDir=isDir,
+                    rules=rules,
+                ):
 
-    return numFiles
+                    continue
 
+                if isDir:
 
-def GetModelMappings() -> dict:
-    """
-    Get the mappings between models and their encodings.
+                    subDirs.append((entry.path, f"{relativeDir}{entry.name}/", rules))
 
-    Returns
-    -------
-    dict
-        A dictionary where keys are model names and values are their corresponding encodings.
+                else:
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetModelMappings
-    >>> mappings = GetModelMappings()
-    >>> print(mappings)
-    {'gpt-4o': 'o200k_base', 'gpt-4o-mini': 'o200k_base', 'gpt-4-turbo': 'cl100k_base', 'gpt-4': 'cl100k_base', 'gpt-3.5-turbo': 'cl100k_base', 'text-embedding-ada-002': 'cl100k_base', 'text-embedding-3-small': 'cl100k_base', 'text-embedding-3-large': 'cl100k_base', 'Codex models': 'p50k_base', 'text-davinci-002': 'p50k_base', 'text-davinci-003': 'p50k_base', 'GPT-3 models like davinci': 'r50k_base'}
-    """
+                    filePaths.append(Path(entry.path))
 
-    return MODEL_MAPPINGS
+        if recursive:
 
+            pendingDirs.extend(reversed(subDirs))
 
-def GetValidModels() -> list[str]:
-    """
-    Get a list of valid models.
+    return filePaths
 
-    Returns
-    -------
-    list of str
-        A list of valid model names.
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetValidModels
-    >>> models = GetValidModels()
-    >>> print(models)
-    ['gpt-4o', 'gpt-4o-mini', 'gpt-4-turbo', 'gpt-4', 'gpt-3.5-turbo', 'text-embedding-ada-002', 'text-embedding-3-small', 'text-embedding-3-large', 'Codex models', 'text-davinci-002', 'text-davinci-003', 'GPT-3 models like davinci']
+def _GetRelativePathPrefixLength(dirPath: Path) -> int:
+    """
+    Internal function to get the length of the prefix that _WalkDirFiles puts
+    before the path of each file relative to "dirPath". Slicing it off is far
+    cheaper than Path.relative_to, which parses both paths again for every file.
     """
 
-    return VALID_MODELS
+    dirString = str(Path(dirPath))
 
+    # Path drops the leading "./" of the files listed in the current directory
+    if dirString == ".":
 
-def GetValidEncodings() -> list[str]:
-    """
-    Get a list of valid encodings.
+        return 0
 
-    Returns
-    -------
-    list of str
-        A list of valid encoding names.
+    return len(os.path.join(dirString, ""))
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetValidEncodings
-    >>> encodings = GetValidEncodings()
-    >>> print(encodings)
-    ['o200k_base', 'cl100k_base', 'p50k_base', 'r50k_base']
+
+def _GetRelativePath(filePath: Path, prefixLength: int) -> str:
+    """
+    Internal function to get the relative path, with forward slashes, of a file
+    listed by _WalkDirFiles, given the length of the prefix to slice off.
     """
 
-    return VALID_ENCODINGS
+    relativePath = str(filePath)[prefixLength:]
 
+    return relativePath if os.sep == "/" else relativePath.replace(os.sep, "/")
 
-def GetModelForEncoding(encoding: tiktoken.Encoding) -> list[str] | str:
+
+@lru_cache(maxsize=None)
+def _GetEncodingByName(
+    model: str | None, encodingName: str | None
+) -> tiktoken.Encoding | None:
+    """
+    Internal function to validate a model and/or an encoding name and get the
+    encoding they name, or None if neither is given. Memoized by (model,
+    encodingName), so that each combination is validated and looked up once per
+    process. Invalid combinations raise every time, since errors are not cached.
     """
-    Get the model name for a given encoding.
 
-    Parameters
-    ----------
-    encoding : tiktoken.Encoding
-        The encoding to get the model for.
+    import tiktoken
 
-    Returns
-    -------
-    str
-        The model name corresponding to the given encoding.
+    _encodingName = None
 
-    Raises
-    ------
-    ValueError
-        If the encoding name is not valid.
+    if model is not None:
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetModelForEncoding
-    >>> import tiktoken
-    >>> encoding = tiktoken.get_encoding('cl100k_base')
-    >>> model = GetModelForEncoding(encoding=encoding)
-    >>> print(model)
-    ['gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo', 'text-embedding-3-large', 'text-embedding-3-small', 'text-embedding-ada-002']
-    """
-    encodingName = encoding.name
+        if model not in MODEL_MAPPINGS:
 
-    if encodingName not in VALID_ENCODINGS:
+            raise ValueError(
+                f"Invalid model: {model}\n\nValid models:\n{VALID_MODELS_STR}"
+            )
 
-        raise ValueError(
-            f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
-        )
+        else:
 
-    else:
+            _encodingName = tiktoken.encoding_name_for_model(model_name=model)
 
-        modelMatches = []
+    if encodingName is not None:
 
-        for model, encoding in MODEL_MAPPINGS.items():
+        if encodingName not in VALID_ENCODINGS:
 
-            if encoding == encodingName:
+            raise ValueError(
+                f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
+            )
 
-                modelMatches.append(model)
+        if model is not None and _encodingName != encodingName:
 
-        if len(modelMatches) == 1:
+            raise ValueError(
+                f'Model {model} does not have encoding name {encodingName}\n\nValid encoding names for model {model}: "{MODEL_MAPPINGS[model]}"'
+            )
 
-            return modelMatches[0]
+        _encodingName = encodingName
 
-        else:
+    if _encodingName is None:
 
-            return sorted(modelMatches)
+        return None
+
+    return tiktoken.get_encoding(encoding_name=_encodingName)
 
 
-def GetModelForEncodingName(encodingName: str) -> list[str] | str:
+def _ResolveEncoding(
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+) -> tiktoken.Encoding:
     """
-    Get the model name for a given encoding.
+    Internal function to resolve the encoding to use from a model, an encoding name
+    and/or an encoding, checking that any combination given is consistent. Models
+    and encoding names are resolved through the memoized _GetEncodingByName, and a
+    lone encoding is returned as is.
 
     Parameters
     ----------
-    encodingName : str
-        The name of the encoding.
+    model : str or None, optional
+        The name of the model to use for encoding.
+    encodingName : str or None, optional
+        The name of the encoding to use.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use.
 
     Returns
     -------
-    str
-        The model name corresponding to the given encoding.
+    tiktoken.Encoding
+        The resolved encoding.
 
     Raises
     ------
     ValueError
-        If the encoding name is not valid.
-
-    Examples
-    --------
-    >>> from PyTokenCounter import GetModelForEncodingName
-    >>> model = GetModelForEncodingName('cl100k_base')
-    >>> print(model)
-    ['gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo', 'text-embedding-3-large', 'text-embedding-3-small', 'text-embedding-ada-002']
+        If the provided "model" or "encodingName" is invalid, if the arguments do not
+        match each other, or if none of them is provided.
     """
 
-    if encodingName not in VALID_ENCODINGS:
+    if model is None and encodingName is None:
 
-        raise ValueError(
-            f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
-        )
+        if encoding is None:
 
-    else:
+            raise ValueError(
+                "Either model, encoding name, or encoding must be provided. Valid models:\n"
+                f"{VALID_MODELS_STR}\n\nValid encodings:\n{VALID_ENCODINGS_STR}"
+            )
 
-        modelMatches = []
+        return encoding
 
-        for model, encoding in MODEL_MAPPINGS.items():
+    _encoding = _GetEncodingByName(model, encodingName)
 
-            if encoding == encodingName:
+    if encoding is None or encoding is _encoding:
 
-                modelMatches.append(model)
+        return _encoding
 
-        if len(modelMatches) == 1:
+    if encodingName is not None and model is not None:
 
-            return modelMatches[0]
+        raise ValueError(
+            f"Model {model} does not have encoding {encoding}.\n\nValid encoding name for model {model}: \n{_encoding.name}\n"
+        )
 
-        else:
+    elif encodingName is not None:
 
-            return sorted(modelMatches)
+        raise ValueError(
+            f'Encoding name {encodingName} does not match provided encoding "{encoding}"'
+        )
 
+    else:
 
-def GetEncodingForModel(modelName: str, quiet: bool = False) -> tiktoken.Encoding:
+        raise ValueError(
+            f'Model {model} does not have provided encoding "{encoding}".\n\nValid encoding name for model {model}: \n{_encoding.name}\n'
+        )
+
+
+def _FindSafeSplit(text: str, end: int | None = None, start: int = 0) -> int | None:
     """
-    Get the encoding for a given model name.
+    Internal function to find the last position in a text at which it can be split
+    without changing how it tokenizes.
 
     Parameters
     ----------
-    modelName : str
-        The name of the model.
-    quiet : bool, optional
-        If True, suppress progress updates (default is False).
+    text : str
+        The text to search.
+    end : int or None, optional
+        Search only "text[:end]", without copying it (default is the whole text).
+    start : int, optional
+        Search only positions from "start" on (default is 0). The characters before
+        it are still looked at to tell whether a position is safe.
 
     Returns
     -------
-    str
-        The encoding corresponding to the given model.
+    int or None
+        The index of the last safe split position, or None if there is none.
+    """
 
-    Raises
-    ------
-    ValueError
-        If the model name is not valid.
+    windowSize = 4096
+    end = len(text) if end is None else end
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetEncodingNameForModel
-    >>> encoding = GetEncodingNameForModel('gpt-3.5-turbo')
-    >>> print(encoding)
-    'cl100k_base'
-    """
+    while True:
 
-    if modelName not in VALID_MODELS:
+        windowStart = max(start, end - windowSize)
+        lastMatch = None
 
-        raise ValueError(
-            f"Invalid model: {modelName}\n\nValid models:\n{VALID_MODELS_STR}"
-        )
+        for lastMatch in _SAFE_SPLIT_PATTERN.finditer(text, windowStart, end):
 
-    else:
+            pass
 
-        encodingName = MODEL_MAPPINGS[modelName]
+        if lastMatch is not None:
 
-        return tiktoken.get_encoding(encoding_name=encodingName)
+            return lastMatch.start()
 
+        if windowStart == start:
 
-def GetEncodingNameForModel(modelName: str, quiet: bool = False) -> str:
+            return None
+
+        windowSize *= 4
+
+
+def _IterSafeSegments(textChunks: Iterable[str]) -> Iterator[str]:
     """
-    Get the encoding for a given model name.
+    Internal function to regroup arbitrary chunks of a text into segments that can
+    each be tokenized on their own with the same result as tokenizing the whole text.
 
     Parameters
     ----------
-    modelName : str
-        The name of the model.
-    quiet : bool, optional
-        If True, suppress progress updates (default is False).
+    textChunks : Iterable[str]
+        Consecutive pieces of the text, split at arbitrary positions.
 
-    Returns
-    -------
+    Yields
+    ------
     str
-        The encoding corresponding to the given model.
+        Consecutive segments of the text, split only at safe positions.
+
+    Notes
+    -----
+    Each chunk is searched once, along with the last few characters before it, so
+    text without a safe split position is held in a list of chunks, neither
+    searched again nor copied, until a split position or the end of the text is
+    reached. Such text, a single line of minified JSON for instance, is held whole.
+    """
 
-    Raises
-    ------
-    ValueError
-        If the model name is not valid.
+    pendingChunks: list[str] = []
+    pendingChars = 0
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetEncodingNameForModel
-    >>> encoding = GetEncodingNameForModel('gpt-3.5-turbo')
-    >>> print(encoding)
-    'cl100k_base'
-    """
+    # The last characters of the pending text, which decide whether the positions
+    # at the start of the next chunk are safe
+    tail = ""
 
-    if modelName not in VALID_MODELS:
+    for chunk in textChunks:
 
-        raise ValueError(
-            f"Invalid model: {modelName}\n\nValid models:\n{VALID_MODELS_STR}"
+        if not chunk:
+
+            continue
+
+        window = tail + chunk
+        splitIndex = _FindSafeSplit(
+            text=window, start=max(1, len(tail) - _SAFE_SPLIT_CONTEXT + 1)
         )
 
-    else:
+        if splitIndex is None:
 
-        return MODEL_MAPPINGS[modelName]
+            pendingChunks.append(chunk)
+            pendingChars += len(chunk)
+            tail = window[-2 * _SAFE_SPLIT_CONTEXT :]
+            continue
 
+        pendingChunks.append(chunk)
+        text = "".join(pendingChunks)
+        splitIndex += pendingChars - len(tail)
 
-def GetEncoding(
-    model: str | None = None,
-    encodingName: str | None = None,
-) -> tiktoken.Encoding:
-    """
-    Get the tiktoken Encoding based on the specified model or encoding name.
+        yield text[:splitIndex]
 
-    Parameters
-    ----------
-    model : str or None, optional
-        The name of the model to retrieve the encoding for. If provided,
-        the encoding associated with the model will be used.
-    encodingName : str or None, optional
-        The name of the encoding to use. If provided, it must match the encoding
-        associated with the specified model.
+        carry = text[splitIndex:]
+        pendingChunks = [carry]
+        pendingChars = len(carry)
+        tail = carry[-2 * _SAFE_SPLIT_CONTEXT :]
+
+    if pendingChars:
+
+        yield "".join(pendingChunks)
+
+
+def _PrepareFileStream(
+    filePath: Path | str,
+    model: str | None,
+    encodingName: str | None,
+    encoding: tiktoken.Encoding | None,
+    chunkSize: int,
+    detectionStrategy: str,
+) -> tuple[tiktoken.Encoding, Iterator[str]]:
+    """
+    Internal function to validate the arguments of the streaming file functions and
+    set up the stream, so that errors are raised on the call rather than on the
+    first iteration.
 
     Returns
     -------
-    tiktoken.Encoding
-        The encoding corresponding to the specified model or encoding name.
+    tuple[tiktoken.Encoding, Iterator[str]]
+        The resolved encoding and an iterator over the decoded text of the file.
+    """
 
-    Raises
-    ------
-    TypeError
-        If the type of "model" or "encodingName" is not a string.
-    ValueError
-        If the provided "model" or "encodingName" is invalid, or if there
-        is a mismatch between the model and encoding name.
+    import tiktoken
 
-    Examples
-    --------
-    >>> from PyTokenCounter import GetEncoding
-    >>> encoding = GetEncoding(model='gpt-3.5-turbo')
-    >>> print(encoding)
-    <Encoding cl100k_base>
-    >>> encoding = GetEncoding(encodingName='p50k_base')
-    >>> print(encoding)
-    <Encoding p50k_base>
-    """
+    if not isinstance(filePath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+        )
 
     if model is not None and not isinstance(model, str):
 
@@ -539,426 +696,3556 @@ def GetEncoding(
             f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
         )
 
-    _encodingName = None
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
 
-    if model is not None:
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
 
-        if model not in VALID_MODELS:
+    if not isinstance(chunkSize, int) or isinstance(chunkSize, bool):
 
-            raise ValueError(
-                f"Invalid model: {model}\n\nValid models:\n{VALID_MODELS_STR}"
-            )
+        raise TypeError(
+            f'Unexpected type for parameter "chunkSize". Expected type: int. Given type: {type(chunkSize)}'
+        )
 
-        else:
+    if chunkSize <= 0:
 
-            _encodingName = tiktoken.encoding_name_for_model(model_name=model)
+        raise ValueError(f"chunkSize must be positive. Given: {chunkSize}")
 
-    if encodingName is not None:
+    if detectionStrategy not in DETECTION_STRATEGIES:
 
-        if encodingName not in VALID_ENCODINGS:
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
 
-            raise ValueError(
-                f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
-            )
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
 
-        if model is not None and _encodingName != encodingName:
+    filePath = Path(filePath).resolve()
 
-            if model not in VALID_MODELS:
+    if not filePath.exists():
 
-                raise ValueError(
-                    f"Invalid model: {model}\n\nValid models:\n{VALID_MODELS_STR}"
-                )
+        raise FileNotFoundError(f"File not found: {filePath}")
 
-            else:
+    textChunks = (
+        text
+        for text, _ in IterTextFileChunks(
+            filePath=filePath,
+            chunkSize=chunkSize,
+            detectionStrategy=detectionStrategy,
+        )
+    )
 
-                raise ValueError(
-                    f'Model {model} does not have encoding name {encodingName}\n\nValid encoding names for model {model}: "{MODEL_MAPPINGS[model]}"'
-                )
+    return _encoding, textChunks
 
-        else:
 
-            _encodingName = encodingName
+def _IterRunningCounts(counts: Iterable[int]) -> Iterator[int]:
+    """
+    Internal function to turn per-segment counts into running totals. Always yields
+    at least once, so that an empty file yields 0.
+    """
 
-    if _encodingName is None:
+    runningCount = 0
+    hasYielded = False
 
-        raise ValueError(
-            "Either model or encoding must be provided. Valid models:\n"
-            f"{VALID_MODELS_STR}\n\nValid encodings:\n{VALID_ENCODINGS_STR}"
-        )
+    for count in counts:
 
-    return tiktoken.get_encoding(encoding_name=_encodingName)
+        runningCount += count
+        hasYielded = True
 
+        yield runningCount
 
-def TokenizeStr(
-    string: str,
-    model: str | None = None,
-    encodingName: str | None = None,
-    encoding: tiktoken.Encoding | None = None,
-    quiet: bool = False,
-) -> list[int]:
+    if not hasYielded:
+
+        yield 0
+
+
+def _SplitSafeSegments(text: str, segmentChars: int) -> Iterable[str]:
+    """
+    Internal function to split a text into safe segments of about "segmentChars"
+    characters, or none shorter than that if the text has no safe split positions.
     """
-    Tokenize a string into a list of token IDs using the specified model or encoding.
 
-    Parameters
-    ----------
-    string : str
-        The string to tokenize.
-    model : str or None, optional
-        The name of the model to use for encoding. If provided, the encoding
-        associated with the model will be used.
-    encodingName : str or None, optional
-        The name of the encoding to use. If provided, it must match the encoding
-        associated with the specified model.
-    encoding : tiktoken.Encoding or None, optional
-        An existing tiktoken.Encoding object to use for tokenization. If provided,
-        it must match the encoding derived from the model or encodingName.
-    quiet : bool, optional
-        If True, suppress progress updates (default is False).
+    if len(text) <= segmentChars:
 
-    Returns
-    -------
-    list of int
-        A list of token IDs representing the tokenized string.
+        return (text,)
 
-    Raises
-    ------
-    TypeError
-        If the types of "string", "model", "encodingName", or "encoding" are incorrect.
-    ValueError
-        If the provided "model" or "encodingName" is invalid, or if there is a
-        mismatch between the model and encoding name, or between the provided
-        encoding and the derived encoding.
-    RuntimeError
-        If an unexpected error occurs during encoding.
+    return _IterSafeSegments(
+        text[start : start + segmentChars]
+        for start in range(0, len(text), segmentChars)
+    )
 
-    Examples
-    --------
-    >>> from PyTokenCounter import TokenizeStr
-    >>> tokens = TokenizeStr(string="Hail to the Victors!", model="gpt-4o")
-    >>> print(tokens)
-    [39, 663, 316, 290, ..., 914, 0]
-    >>> import tiktoken
-    >>> encoding = tiktoken.get_encoding("cl100k_base")
-    >>> tokens = TokenizeStr(string="2024 National Champions", encoding=encoding)
-    >>> print(tokens)
-    [1323, 19, 6743, 40544]
+
+def _GetSpecialTokenPattern(encoding: tiktoken.Encoding) -> re.Pattern | None:
+    """
+    Internal function to get a pattern matching the special tokens of an encoding,
+    or None if it has none. Compiled once per set of special tokens.
     """
 
-    if not isinstance(string, str):
+    try:
 
-        raise TypeError(
-            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
-        )
+        return _specialTokenPatternsByEncoding[encoding]
 
-    if model is not None and not isinstance(model, str):
+    except KeyError:
 
-        raise TypeError(
-            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
-        )
+        pass
 
-    if encodingName is not None and not isinstance(encodingName, str):
+    specialTokens = frozenset(encoding.special_tokens_set)
 
-        raise TypeError(
-            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+    if specialTokens not in _specialTokenPatterns:
+
+        _specialTokenPatterns[specialTokens] = (
+            re.compile("|".join(re.escape(token) for token in specialTokens))
+            if specialTokens
+            else None
         )
 
-    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+    _specialTokenPatternsByEncoding[encoding] = _specialTokenPatterns[specialTokens]
 
-        raise TypeError(
-            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
-        )
+    return _specialTokenPatterns[specialTokens]
 
-    _encodingName = None
 
-    if model is not None:
+def _RaiseOnSpecialTokens(encoding: tiktoken.Encoding, text: str) -> None:
+    """
+    Internal function to raise the error "encoding.encode(text)" raises if the text
+    contains a special token, for the paths that bypass encode().
+    """
 
-        if model not in VALID_MODELS:
+    specialTokenPattern = _GetSpecialTokenPattern(encoding)
 
-            raise ValueError(
-                f"Invalid model: {model}\n\nValid models:\n{VALID_MODELS_STR}"
-            )
+    if specialTokenPattern is not None and specialTokenPattern.search(text):
 
-        else:
+        encoding.encode(text=text)
 
-            _encodingName = tiktoken.encoding_name_for_model(model_name=model)
 
-    if encodingName is not None:
+def _GetLimitSegmentChars(maxTokens: int, maxChars: int) -> int:
+    """
+    Internal function to get how many characters to tokenize at a time when
+    counting up to "maxTokens", at most "maxChars".
+    """
 
-        if encodingName not in VALID_ENCODINGS:
+    return min(
+        maxChars,
+        max(LIMIT_MIN_SEGMENT_CHARS, LIMIT_SEGMENT_CHARS_PER_TOKEN * maxTokens),
+    )
 
-            raise ValueError(
-                f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
-            )
 
-        if model is not None and _encodingName != encodingName:
+def _CountTokens(
+    encoding: tiktoken.Encoding, text: str, maxTokens: int | None = None
+) -> int:
+    """
+    Internal function to count the tokens of a string without building a list of
+    token IDs, returning the same count as "len(encoding.encode(text))" and raising
+    the same error for text that contains a special token.
+
+    The text is encoded into tiktoken's packed 32-bit token buffer rather than a
+    Python list, which would hold a pointer and usually a separate int object per
+    token. Texts longer than COUNT_SEGMENT_CHARS are counted one safe segment at a
+    time, so that only the buffer of a single segment is held at once. Texts of at
+    most SHORT_COUNT_CHARS characters are counted through encode_ordinary(), which
+    is faster than setting up the buffer for them.
+
+    With "maxTokens", the text is counted in shorter segments sized from the limit,
+    and counting stops after the first segment that takes the count past it. Only
+    the segments counted are checked for special tokens.
+    """
 
-            if model not in VALID_MODELS:
+    segmentChars = COUNT_SEGMENT_CHARS
 
-                raise ValueError(
-                    f"Invalid model: {model}\n\nValid models:\n{VALID_MODELS_STR}"
-                )
+    if maxTokens is None:
 
-            else:
+        _RaiseOnSpecialTokens(encoding=encoding, text=text)
 
-                raise ValueError(
-                    f'Model {model} does not have encoding name {encodingName}\n\nValid encoding names for model {model}: "{MODEL_MAPPINGS[model]}"'
-                )
+        if len(text) <= SHORT_COUNT_CHARS:
 
-        else:
+            return len(encoding.encode_ordinary(text))
 
-            _encodingName = encodingName
+    else:
 
-    _encoding = None
+        segmentChars = _GetLimitSegmentChars(
+            maxTokens=maxTokens, maxChars=COUNT_SEGMENT_CHARS
+        )
 
-    if _encodingName is not None:
+    encodeToBuffer = getattr(encoding._core_bpe, "encode_to_tiktoken_buffer", None)
 
-        _encoding = tiktoken.get_encoding(encoding_name=_encodingName)
+    numTokens = 0
 
-    if encoding is not None:
+    for segment in _SplitSafeSegments(text=text, segmentChars=segmentChars):
 
-        if _encodingName is not None and _encoding != encoding:
+        if maxTokens is not None:
 
-            if encodingName is not None and model is not None:
+            _RaiseOnSpecialTokens(encoding=encoding, text=segment)
 
-                raise ValueError(
-                    f"Model {model} does not have encoding {encoding}.\n\nValid encoding name for model {model}: \n{_encodingName}\n"
-                )
+        if encodeToBuffer is None:
 
-            elif encodingName is not None:
+            numTokens += len(encoding.encode(text=segment, disallowed_special=()))
 
-                raise ValueError(
-                    f'Encoding name {encodingName} does not match provided encoding "{encoding}"'
-                )
+        else:
 
-            elif model is not None:
+            try:
 
-                raise ValueError(
-                    f'Model {model} does not have provided encoding "{encoding}".\n\nValid encoding name for model {model}: \n{_encodingName}\n'
-                )
+                # One unsigned 32-bit token ID per token
+                numTokens += memoryview(encodeToBuffer(segment, set())).nbytes // 4
 
-            else:
+            except UnicodeEncodeError:
 
-                raise RuntimeError(
-                    f'Unexpected error. Given model "{model}" and encoding name "{encodingName}" resulted in encoding "{_encoding}".\nFor unknown reasons, this encoding doesn\'t match given encoding "{encoding}".\nPlease report this error.'
-                )
+                # Lone surrogates, which encode() replaces before tokenizing
+                numTokens += len(encoding.encode(text=segment, disallowed_special=()))
 
-        else:
+        if maxTokens is not None and numTokens > maxTokens:
 
-            _encoding = encoding
+            break
 
-        if _encodingName is None and _encoding is None:
+    return numTokens
 
-            raise ValueError(
-                "Either model, encoding name, or encoding must be provided. Valid models:\n"
-                f"{VALID_MODELS_STR}\n\nValid encodings:\n{VALID_ENCODINGS_STR}"
-            )
 
-    hasBar = False
-    taskName = None
+def _EncodeToBuffer(encoding: tiktoken.Encoding, text: str) -> memoryview:
+    """
+    Internal function to tokenize a string into a memoryview of unsigned 32-bit
+    token IDs through tiktoken's buffer-returning encode, without building a list.
+    Special tokens are encoded as ordinary text, so callers check for them first.
+    """
 
-    displayString = f"{string[:30]}..." if len(string) > 33 else string
+    encodeToBuffer = getattr(encoding._core_bpe, "encode_to_tiktoken_buffer", None)
 
-    if len(_tasks) == 0 and not quiet:
+    if encodeToBuffer is not None:
 
-        hasBar = True
-        taskName = f'Tokenizing "{displayString}"'
-        _InitializeTask(taskName=taskName, total=1, quiet=quiet)
+        try:
 
-    tokenizedStr = _encoding.encode(text=string)
+            # The buffer reports its length in bytes rather than items, so it is
+            # recast to get one item per token
+            return memoryview(encodeToBuffer(text, set())).cast("B").cast("I")
 
-    if hasBar:
+        except UnicodeEncodeError:
 
-        _UpdateTask(
-            taskName=taskName,
-            advance=1,
-            description=f'Done Tokenizing "{displayString}"',
-            quiet=quiet,
-        )
+            pass
 
-    return tokenizedStr
+    return memoryview(array("I", encoding.encode(text=text, disallowed_special=())))
 
 
-def GetNumTokenStr(
-    string: str,
-    model: str | None = None,
-    encodingName: str | None = None,
-    encoding: tiktoken.Encoding | None = None,
-    quiet: bool = False,
-) -> int:
+def _ImportNumpy():
+    """
+    Internal function to import NumPy, which is only needed for returnType="numpy".
     """
-    Get the number of tokens in a string based on the specified model or encoding.
 
-    Parameters
-    ----------
-    string : str
-        The string to count tokens for.
-    model : str or None, optional
-        The name of the model to use for encoding. If provided, the encoding
-        associated with the model will be used.
-    encodingName : str or None, optional
-        The name of the encoding to use. If provided, it must match the encoding
-        associated with the specified model.
-    encoding : tiktoken.Encoding or None, optional
-        An existing tiktoken.Encoding object to use for tokenization. If provided,
-        it must match the encoding derived from the model or encodingName.
-    quiet : bool, optional
-        If True, suppress progress updates (default is False).
+    try:
 
-    Returns
-    -------
-    int
-        The number of tokens in the string.
+        import numpy
 
-    Raises
-    ------
-    TypeError
-        If the types of "string", "model", "encodingName", or "encoding" are incorrect.
-    ValueError
-        If the provided "model" or "encodingName" is invalid, or if there is a
-        mismatch between the model and encoding name, or between the provided
+    except ImportError as e:
+
+        raise ImportError(
+            'returnType="numpy" requires NumPy. Install it with "pip install numpy".'
+        ) from e
+
+    return numpy
+
+
+def _PackTokens(
+    tokens: list[int] | array | memoryview,
+    encoding: tiktoken.Encoding,
+    returnType: str,
+) -> list[int] | array | memoryview:
+    """
+    Internal function to convert token IDs to the container named by "returnType".
+
+    The packed containers hold unsigned 16-bit IDs when every token of the encoding
+    fits, and unsigned 32-bit IDs otherwise. An array or memoryview that already
+    holds IDs of that width is wrapped rather than copied, except for "array" from
+    a memoryview, which copies the IDs once.
+    """
+
+    if returnType == "list":
+
+        return tokens if isinstance(tokens, list) else tokens.tolist()
+
+    typeCode = "H" if encoding.max_token_value < 1 << 16 else "I"
+    itemFormat = tokens.typecode if isinstance(tokens, array) else None
+
+    if isinstance(tokens, memoryview):
+
+        itemFormat = tokens.format
+
+    if itemFormat != typeCode:
+
+        tokens = array(typeCode, tokens)
+
+    if returnType == "array":
+
+        if isinstance(tokens, memoryview):
+
+            packed = array(typeCode)
+            packed.frombytes(tokens.cast("B"))
+
+            return packed
+
+        return tokens
+
+    if returnType == "buffer":
+
+        return memoryview(tokens)
+
+    numpy = _ImportNumpy()
+
+    return numpy.frombuffer(
+        tokens, dtype=numpy.uint16 if typeCode == "H" else numpy.uint32
+    )
+
+
+def _EncodeText(
+    encoding: tiktoken.Encoding, text: str, returnType: str = "list"
+) -> list[int] | array | memoryview:
+    """
+    Internal function to tokenize a string into the container named by
+    "returnType". The packed containers are built from tiktoken's token buffer
+    without an intermediate list.
+    """
+
+    if returnType == "list":
+
+        return encoding.encode(text=text)
+
+    _RaiseOnSpecialTokens(encoding=encoding, text=text)
+
+    return _PackTokens(
+        tokens=_EncodeToBuffer(encoding=encoding, text=text),
+        encoding=encoding,
+        returnType=returnType,
+    )
+
+
+def _CountDecodedChars(encoding: tiktoken.Encoding, tokens: memoryview) -> int:
+    """
+    Internal function to count the whole characters a run of token IDs decodes to.
+    The bytes of a character cut off at either end of the run are not counted.
+    """
+
+    return len(
+        encoding.decode_bytes(tokens=tokens.tolist()).decode("utf-8", errors="ignore")
+    )
+
+
+def _TruncateHead(
+    encoding: tiktoken.Encoding, segments: Iterable[str], maxTokens: int
+) -> TruncateResult:
+    """
+    Internal function to keep the longest start of a text that has at most
+    "maxTokens" tokens.
+
+    The safe segments of the text are tokenized in order only until the count passes
+    "maxTokens". The first "maxTokens" token IDs are decoded to find how many
+    characters they cover, and the text is cut there rather than replaced with the
+    decoded text, so the result is always a prefix of the input. Re-tokenized on its
+    own, the prefix can end in different tokens than it did inside the whole text,
+    so it is counted again and shortened until it fits.
+    """
+
+    keptSegments = []
+    tokens = array("I")
+
+    for segment in segments:
+
+        _RaiseOnSpecialTokens(encoding=encoding, text=segment)
+
+        keptSegments.append(segment)
+        tokens.frombytes(_EncodeToBuffer(encoding=encoding, text=segment).cast("B"))
+
+        if len(tokens) > maxTokens:
+
+            break
+
+    else:
+
+        return TruncateResult(text="".join(keptSegments), numTokens=len(tokens))
+
+    text = "".join(keptSegments)
+    tokens = memoryview(tokens)
+    numKept = maxTokens
+
+    while True:
+
+        headText = text[
+            : _CountDecodedChars(encoding=encoding, tokens=tokens[:numKept])
+        ]
+        numTokens = _CountTokens(encoding=encoding, text=headText)
+
+        if numTokens <= maxTokens:
+
+            return TruncateResult(text=headText, numTokens=numTokens)
+
+        numKept = max(0, numKept - (numTokens - maxTokens))
+
+
+def _TruncateTail(
+    encoding: tiktoken.Encoding, text: str, maxTokens: int
+) -> TruncateResult:
+    """
+    Internal function to keep the longest end of a text that has at most
+    "maxTokens" tokens.
+
+    Only a suffix of the text starting at a safe split position is tokenized, and it
+    is widened until it has more than "maxTokens" tokens or covers the whole text.
+    The last "maxTokens" token IDs of the suffix are then cut from it as in
+    _TruncateHead.
+    """
+
+    windowChars = max(
+        LIMIT_MIN_SEGMENT_CHARS, LIMIT_SEGMENT_CHARS_PER_TOKEN * maxTokens
+    )
+
+    while True:
+
+        start = 0
+
+        if windowChars < len(text):
+
+            start = _FindSafeSplit(text=text, end=len(text) - windowChars) or 0
+
+        suffix = text[start:]
+
+        _RaiseOnSpecialTokens(encoding=encoding, text=suffix)
+
+        tokens = _EncodeToBuffer(encoding=encoding, text=suffix)
+
+        if len(tokens) > maxTokens or start == 0:
+
+            break
+
+        windowChars *= 4
+
+    numKept = min(maxTokens, len(tokens))
+
+    while True:
+
+        numChars = _CountDecodedChars(
+            encoding=encoding, tokens=tokens[len(tokens) - numKept :]
+        )
+        tailText = suffix[len(suffix) - numChars :]
+        numTokens = _CountTokens(encoding=encoding, text=tailText)
+
+        if numTokens <= maxTokens:
+
+            return TruncateResult(text=tailText, numTokens=numTokens)
+
+        numKept = max(0, numKept - (numTokens - maxTokens))
+
+
+def _TruncateMiddle(
+    encoding: tiktoken.Encoding, text: str, maxTokens: int
+) -> TruncateResult:
+    """
+    Internal function to keep the start and end of a text that has more than
+    "maxTokens" tokens, dropping its middle, so that the two joined have at most
+    "maxTokens" tokens. The budget is split evenly, with any odd token going to the
+    start.
+    """
+
+    tailTokens = maxTokens // 2
+    headTokens = maxTokens - tailTokens
+
+    while True:
+
+        head = _TruncateHead(
+            encoding=encoding,
+            segments=_SplitSafeSegments(
+                text=text,
+                segmentChars=_GetLimitSegmentChars(
+                    maxTokens=headTokens, maxChars=COUNT_SEGMENT_CHARS
+                ),
+            ),
+            maxTokens=headTokens,
+        )
+        tail = _TruncateTail(encoding=encoding, text=text, maxTokens=tailTokens)
+
+        joinedText = head.text + tail.text
+        numTokens = _CountTokens(encoding=encoding, text=joinedText)
+
+        if numTokens <= maxTokens:
+
+            return TruncateResult(text=joinedText, numTokens=numTokens)
+
+        # The two halves merged into more tokens where they meet
+        excess = numTokens - maxTokens
+
+        if tailTokens > 0:
+
+            tailTokens = max(0, tailTokens - excess)
+
+        else:
+
+            headTokens = max(0, headTokens - excess)
+
+
+def _TruncateText(
+    encoding: tiktoken.Encoding, text: str, maxTokens: int, side: str
+) -> TruncateResult:
+    """
+    Internal function to truncate a text to "maxTokens" tokens, keeping the side
+    named by "side".
+    """
+
+    segmentChars = _GetLimitSegmentChars(
+        maxTokens=maxTokens, maxChars=COUNT_SEGMENT_CHARS
+    )
+
+    if side == "head":
+
+        return _TruncateHead(
+            encoding=encoding,
+            segments=_SplitSafeSegments(text=text, segmentChars=segmentChars),
+            maxTokens=maxTokens,
+        )
+
+    numTokens = _CountTokens(encoding=encoding, text=text, maxTokens=maxTokens)
+
+    if numTokens <= maxTokens:
+
+        return TruncateResult(text=text, numTokens=numTokens)
+
+    if side == "tail":
+
+        return _TruncateTail(encoding=encoding, text=text, maxTokens=maxTokens)
+
+    return _TruncateMiddle(encoding=encoding, text=text, maxTokens=maxTokens)
+
+
+def _IterTextBatches(
+    items: Iterable,
+    getText: Callable[[object], str] = None,
+    maxChars: int = BATCH_MAX_CHARS,
+) -> Iterator[list]:
+    """
+    Internal function to group items into batches of at most BATCH_MAX_ITEMS items
+    whose texts add up to at most "maxChars" characters. A single item longer than
+    "maxChars" forms a batch of its own. "getText" returns the text of an item and
+    defaults to the item itself.
+    """
+
+    batch = []
+    batchChars = 0
+
+    for item in items:
+
+        itemChars = len(item if getText is None else getText(item))
+
+        if batch and (
+            len(batch) >= BATCH_MAX_ITEMS or batchChars + itemChars > maxChars
+        ):
+
+            yield batch
+
+            batch = []
+            batchChars = 0
+
+        batch.append(item)
+        batchChars += itemChars
+
+    if batch:
+
+        yield batch
+
+
+def _EncodeBatch(
+    encoding: tiktoken.Encoding,
+    texts: list[str],
+    countOnly: bool = False,
+    returnType: str = "list",
+) -> list[list[int] | array | memoryview] | list[int]:
+    """
+    Internal function to tokenize a batch of strings, returning their tokens in the
+    container named by "returnType", or their token counts with "countOnly", in
+    order.
+
+    tiktoken releases the GIL while encoding, so on machines with several cores the
+    batch is split into one contiguous group of similar total length per thread,
+    and each thread tokenizes its group. "encode_batch" instead submits every
+    string to its thread pool as a task of its own, which for many short strings
+    costs more than the encoding itself.
+    """
+
+    if countOnly:
+
+        encodeText = partial(_CountTokens, encoding)
+
+    else:
+
+        encodeText = partial(_EncodeText, encoding, returnType=returnType)
+
+    numThreads = min(BATCH_MAX_THREADS, len(texts), os.cpu_count() or 1)
+
+    if numThreads <= 1:
+
+        return [encodeText(text) for text in texts]
+
+    targetChars = sum(len(text) for text in texts) / numThreads
+    groups: list[list[str]] = []
+    groupStart = 0
+    groupChars = 0
+
+    for index, text in enumerate(texts):
+
+        groupChars += len(text)
+
+        if groupChars >= targetChars and len(groups) < numThreads - 1:
+
+            groups.append(texts[groupStart : index + 1])
+            groupStart = index + 1
+            groupChars = 0
+
+    groups.append(texts[groupStart:])
+
+    with ThreadPoolExecutor(max_workers=numThreads) as executor:
+
+        groupResults = executor.map(
+            lambda group: [encodeText(text) for text in group], groups
+        )
+
+        return [result for results in groupResults for result in results]
+
+
+def _IterBatchedFileJobs(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    detectionStrategy: str,
+    countOnly: bool = False,
+    returnType: str = "list",
+    maxBatchChars: int = BATCH_MAX_CHARS,
+) -> Iterator[
+    tuple[Path, list[int] | array | memoryview | int | UnsupportedEncodingError]
+]:
+    """
+    Internal function to tokenize files in this process, yielding each file with its
+    tokens in the container named by "returnType", or its token count with
+    "countOnly", or with its error if its encoding is unsupported, in the order
+    given. Decoded files are grouped into batches of up to "maxBatchChars"
+    characters that are each tokenized with _EncodeBatch.
+    """
+
+    def IterDecodedFiles() -> Iterator[tuple[Path, str | UnsupportedEncodingError]]:
+
+        for filePath in filePaths:
+
+            try:
+
+                yield filePath, ReadTextFile(
+                    filePath=filePath, detectionStrategy=detectionStrategy
+                )
+
+            except UnsupportedEncodingError as e:
+
+                yield filePath, e
+
+    for batch in _IterTextBatches(
+        IterDecodedFiles(),
+        getText=lambda item: item[1] if isinstance(item[1], str) else "",
+        maxChars=maxBatchChars,
+    ):
+
+        results = iter(
+            _EncodeBatch(
+                encoding=encoding,
+                texts=[text for _, text in batch if isinstance(text, str)],
+                countOnly=countOnly,
+                returnType=returnType,
+            )
+        )
+
+        for filePath, text in batch:
+
+            yield filePath, next(results) if isinstance(text, str) else text
+
+
+def _GetCachedFileResult(
+    filePath: Path,
+    encoding: tiktoken.Encoding,
+    cache: TokenCache,
+    detectionStrategy: str,
+    countOnly: bool,
+    chunkSize: int | None = None,
+    returnType: str = "list",
+) -> list[int] | array | memoryview | int:
+    """
+    Internal function to tokenize or count the tokens of a file through a token
+    cache. The file's raw bytes are hashed and looked up first, and only decoded
+    and tokenized on a miss, after which the result is stored. With "chunkSize",
+    the file is hashed and counted in constant memory instead of being read whole.
+    Tokens are returned in the container named by "returnType".
+    """
+
+    resolvedPath = filePath.resolve()
+
+    if not resolvedPath.exists():
+
+        raise FileNotFoundError(f"File not found: {resolvedPath}")
+
+    if chunkSize is not None:
+
+        digest = HashFile(filePath=resolvedPath)
+        numTokens = cache.GetNumTokens(digest, encoding.name, detectionStrategy)
+
+        if numTokens is None:
+
+            for numTokens in IterCountFile(
+                filePath=filePath,
+                encoding=encoding,
+                chunkSize=chunkSize,
+                detectionStrategy=detectionStrategy,
+            ):
+
+                pass
+
+            cache.Set(
+                digest=digest,
+                encodingName=encoding.name,
+                numTokens=numTokens,
+                detectionStrategy=detectionStrategy,
+            )
+
+        return numTokens
+
+    data = resolvedPath.read_bytes()
+    digest = HashBytes(data=data)
+
+    if countOnly:
+
+        numTokens = cache.GetNumTokens(digest, encoding.name, detectionStrategy)
+
+        if numTokens is not None:
+
+            return numTokens
+
+    else:
+
+        tokens = cache.GetTokens(digest, encoding.name, detectionStrategy)
+
+        if tokens is not None:
+
+            return _PackTokens(tokens=tokens, encoding=encoding, returnType=returnType)
+
+    text = DecodeTextBytes(
+        data=data, filePath=filePath, detectionStrategy=detectionStrategy
+    )
+
+    if countOnly and not cache.storeTokens:
+
+        numTokens = _CountTokens(encoding=encoding, text=text)
+        cache.Set(
+            digest=digest,
+            encodingName=encoding.name,
+            numTokens=numTokens,
+            detectionStrategy=detectionStrategy,
+        )
+
+        return numTokens
+
+    tokens = encoding.encode(text=text)
+    cache.Set(
+        digest=digest,
+        encodingName=encoding.name,
+        numTokens=len(tokens),
+        tokens=tokens,
+        detectionStrategy=detectionStrategy,
+    )
+
+    if countOnly:
+
+        return len(tokens)
+
+    return _PackTokens(tokens=tokens, encoding=encoding, returnType=returnType)
+
+
+def _InitFileWorker(
+    encoding: tiktoken.Encoding, cache: TokenCache | None = None
+) -> None:
+    """
+    Internal function run once in each process pool worker to store the encoding
+    and token cache used by _ProcessFileJob.
+    """
+
+    global _workerEncoding, _workerCache
+
+    _workerEncoding = encoding
+    _workerCache = cache
+
+
+def _ProcessFileJob(
+    filePath: Path,
+    countOnly: bool,
+    detectionStrategy: str,
+    encoding: tiktoken.Encoding | None = None,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+) -> list[int] | array | memoryview | int | UnsupportedEncodingError:
+    """
+    Internal function run by a pool worker to tokenize or count the tokens of a
+    single file. Process workers use the encoding and cache stored by
+    _InitFileWorker and thread workers are given them directly. A file with an
+    unsupported encoding returns its error rather than raising it, so that the
+    caller decides whether to skip the file or stop.
+    """
+
+    if encoding is None:
+
+        encoding = _workerEncoding
+        cache = _workerCache
+
+    try:
+
+        if countOnly:
+
+            return GetNumTokenFile(
+                filePath=filePath,
+                encoding=encoding,
+                quiet=True,
+                detectionStrategy=detectionStrategy,
+                cache=cache,
+            )
+
+        return TokenizeFile(
+            filePath=filePath,
+            encoding=encoding,
+            quiet=True,
+            detectionStrategy=detectionStrategy,
+            cache=cache,
+            returnType=returnType,
+        )
+
+    except UnsupportedEncodingError as e:
+
+        return e
+
+
+def _ProcessFileBatch(
+    filePaths: list[Path],
+    countOnly: bool,
+    detectionStrategy: str,
+    encoding: tiktoken.Encoding | None = None,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+) -> list[list[int] | array | memoryview | int | UnsupportedEncodingError]:
+    """
+    Internal function run by a pool worker to tokenize or count the tokens of a
+    batch of files with _ProcessFileJob, returning their results in order.
+    """
+
+    return [
+        _ProcessFileJob(
+            filePath=filePath,
+            countOnly=countOnly,
+            detectionStrategy=detectionStrategy,
+            encoding=encoding,
+            cache=cache,
+            returnType=returnType,
+        )
+        for filePath in filePaths
+    ]
+
+
+def _CreateFileExecutor(
+    encoding: tiktoken.Encoding,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None = None,
+) -> Executor:
+    """
+    Internal function to create the worker pool _MapFileJobs runs its batches on.
+    Process workers are initialized with the encoding and cache by _InitFileWorker,
+    so a process pool can only be reused for that encoding and cache.
+    """
+
+    if backend == "thread":
+
+        return ThreadPoolExecutor(max_workers=workers)
+
+    # Imported here as it pulls in multiprocessing, which is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_InitFileWorker,
+        initargs=(encoding, cache),
+    )
+
+
+def _MapFileJobs(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    workers: int,
+    backend: str,
+    countOnly: bool,
+    detectionStrategy: str,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+    order: str = "walk",
+    executor: Executor | None = None,
+) -> Iterator[
+    tuple[Path, list[int] | array | memoryview | int | UnsupportedEncodingError]
+]:
+    """
+    Internal function to tokenize or count the tokens of files across a pool of
+    workers, yielding each file with its result in the order given, or with
+    "order" set to "completion", batch by batch as they finish.
+
+    Files are handed to workers in batches to keep the overhead per file low on
+    many small files. With the "thread" backend, worker threads share this
+    process's encoding and return token lists without pickling them; tiktoken
+    releases the GIL while encoding, so threads still tokenize in parallel. Process
+    workers send packed tokens back as arrays, which pickle compactly, and they are
+    converted to "returnType" here.
+
+    At most two batches per worker are in flight at once, so results that the
+    consumer has not reached yet do not pile up in memory.
+
+    A TokenCounter passes in its own "executor", created by _CreateFileExecutor,
+    which is left running afterwards; otherwise a pool is created for the call and
+    shut down once it is done.
+    """
+
+    ownsExecutor = executor is None
+
+    if ownsExecutor:
+
+        executor = _CreateFileExecutor(
+            encoding=encoding, workers=workers, backend=backend, cache=cache
+        )
+
+    if backend == "thread":
+
+        job = partial(
+            _ProcessFileBatch,
+            countOnly=countOnly,
+            detectionStrategy=detectionStrategy,
+            encoding=encoding,
+            cache=cache,
+            returnType=returnType,
+        )
+
+    else:
+
+        job = partial(
+            _ProcessFileBatch,
+            countOnly=countOnly,
+            detectionStrategy=detectionStrategy,
+            returnType="list" if returnType == "list" else "array",
+        )
+
+    batchSize = max(1, min(64, len(filePaths) // (workers * 4)))
+
+    # Futures in the order they were submitted, with the files of their batch
+    inFlight: dict[Future, list[Path]] = {}
+    batchStarts = iter(range(0, len(filePaths), batchSize))
+
+    try:
+
+        while True:
+
+            for batchStart in batchStarts:
+
+                batch = filePaths[batchStart : batchStart + batchSize]
+                inFlight[executor.submit(job, batch)] = batch
+
+                if len(inFlight) >= workers * 2:
+
+                    break
+
+            if not inFlight:
+
+                return
+
+            if order == "completion":
+
+                done, _ = wait(inFlight, return_when=FIRST_COMPLETED)
+                future = next(future for future in inFlight if future in done)
+
+            else:
+
+                future = next(iter(inFlight))
+
+            batch = inFlight.pop(future)
+
+            for filePath, result in zip(batch, future.result()):
+
+                if isinstance(result, array) and backend != "thread":
+
+                    result = _PackTokens(
+                        tokens=result, encoding=encoding, returnType=returnType
+                    )
+
+                yield filePath, result
+
+    finally:
+
+        if ownsExecutor:
+
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        else:
+
+            for future in inFlight:
+
+                future.cancel()
+
+
+def _IterFileJobs(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    returnType: str = "list",
+    order: str = "walk",
+    executor: Executor | None = None,
+) -> Iterator[tuple[Path, list[int] | array | memoryview | UnsupportedEncodingError]]:
+    """
+    Internal function to tokenize files, yielding each file with its tokens in the
+    container named by "returnType", or with its error if its encoding is
+    unsupported, in the order given or, with "order" set to "completion", as they
+    finish. Files are tokenized in batches in this process when "workers" is 1, and
+    across a worker pool otherwise.
+    """
+
+    if workers > 1:
+
+        return _MapFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            workers=workers,
+            backend=backend,
+            countOnly=False,
+            detectionStrategy=detectionStrategy,
+            returnType=returnType,
+            order=order,
+            executor=executor,
+        )
+
+    return _IterBatchedFileJobs(
+        filePaths=filePaths,
+        encoding=encoding,
+        detectionStrategy=detectionStrategy,
+        returnType=returnType,
+    )
+
+
+def _IterCountFileJobs(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None,
+    maxTokens: int | None = None,
+    order: str = "walk",
+    executor: Executor | None = None,
+) -> Iterator[tuple[Path, int | UnsupportedEncodingError]]:
+    """
+    Internal function to count the tokens of files, yielding each file with its
+    token count, or with its error if its encoding is unsupported, in the order
+    given or, with "order" set to "completion", as they finish. Files are counted
+    across a worker pool when "workers" is greater than 1, and in this process
+    otherwise: in batches, or one at a time through the cache. With a "maxTokens"
+    budget, batches are sized from it so that a caller that stops once the budget
+    is exceeded does not tokenize far past it.
+    """
+
+    if workers > 1:
+
+        return _MapFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            workers=workers,
+            backend=backend,
+            countOnly=True,
+            detectionStrategy=detectionStrategy,
+            cache=cache,
+            order=order,
+            executor=executor,
+        )
+
+    if cache is None:
+
+        return _IterBatchedFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            countOnly=True,
+            maxBatchChars=(
+                BATCH_MAX_CHARS
+                if maxTokens is None
+                else _GetLimitSegmentChars(
+                    maxTokens=maxTokens, maxChars=BATCH_MAX_CHARS
+                )
+            ),
+        )
+
+    return (
+        (
+            filePath,
+            _ProcessFileJob(
+                filePath=filePath,
+                countOnly=True,
+                detectionStrategy=detectionStrategy,
+                encoding=encoding,
+                cache=cache,
+            ),
+        )
+        for filePath in filePaths
+    )
+
+
+def _IterDirResults(
+    dirPath: Path,
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    countOnly: bool,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+    order: str = "walk",
+    maxTokens: int | None = None,
+    executor: Executor | None = None,
+) -> Iterator[DirFileResult]:
+    """
+    Internal function backing IterTokenizeDir and IterCountDir, and through them
+    TokenizeDir and GetNumTokenDir. Tokenizes or counts the tokens of the files of
+    a directory, yielding a DirFileResult for each file, including skipped ones, in
+    the order given or as they finish. Only the results of the files in flight are
+    held, never those of the whole directory.
+    """
+
+    if countOnly:
+
+        results = _IterCountFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+            maxTokens=maxTokens,
+            order=order,
+            executor=executor,
+        )
+
+    else:
+
+        results = _IterFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            returnType=returnType,
+            order=order,
+            executor=executor,
+        )
+
+    prefixLength = _GetRelativePathPrefixLength(dirPath=dirPath)
+
+    for filePath, result in results:
+
+        relativePath = _GetRelativePath(filePath=filePath, prefixLength=prefixLength)
+
+        if isinstance(result, UnsupportedEncodingError):
+
+            yield DirFileResult(
+                path=relativePath, numTokens=None, tokens=None, status="skipped"
+            )
+
+        elif countOnly:
+
+            yield DirFileResult(
+                path=relativePath, numTokens=result, tokens=None, status="ok"
+            )
+
+        else:
+
+            yield DirFileResult(
+                path=relativePath, numTokens=len(result), tokens=result, status="ok"
+            )
+
+
+def _TokenizeDirFiles(
+    dirPath: Path,
+    encoding: tiktoken.Encoding,
+    recursive: bool,
+    progress: ProgressReporter,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    returnType: str = "list",
+    pathFilter: PathFilter | None = None,
+    executor: Executor | None = None,
+) -> dict[str, list[int] | dict]:
+    """
+    Internal function backing TokenizeDir. Lists the files of the directory up
+    front and builds the nested dictionary from their results, with files in
+    the order the directory is walked and empty subdirectories left out. The
+    progress task is updated from this process as results arrive.
+    """
+
+    filePaths = _WalkDirFiles(
+        dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+    )
+
+    if not filePaths:
+
+        return {}
+
+    tokenizedDir: dict[str, list[int] | dict] = {}
+
+    with progress.StartTask(
+        description="Tokenizing Directory", total=len(filePaths)
+    ) as task:
+
+        for result in _IterDirResults(
+            dirPath=dirPath,
+            filePaths=filePaths,
+            encoding=encoding,
+            countOnly=False,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            returnType=returnType,
+            executor=executor,
+        ):
+
+            if result.status == "skipped":
+
+                task.Advance(
+                    advance=1, description=lambda path=result.path: f"Skipping {path}"
+                )
+
+                continue
+
+            *parts, fileName = result.path.split("/")
+            subDir = tokenizedDir
+
+            for part in parts:
+
+                subDir = subDir.setdefault(part, {})
+
+            subDir[fileName] = result.tokens
+
+            task.Advance(
+                advance=1,
+                description=lambda path=result.path: f"Done Tokenizing {path}",
+            )
+
+    return tokenizedDir
+
+
+def _GetNumTokenDirFiles(
+    dirPath: Path,
+    encoding: tiktoken.Encoding,
+    recursive: bool,
+    progress: ProgressReporter,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None,
+    maxTokens: int | None = None,
+    pathFilter: PathFilter | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Internal function backing GetNumTokenDir. Lists the files of the directory
+    once, up front, which sizes the progress task, and sums their token counts. The
+    progress task is updated from this process as results arrive. With
+    "maxTokens", no further files are counted once the total exceeds it.
+    """
+
+    filePaths = _WalkDirFiles(
+        dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+    )
+
+    if not filePaths:
+
+        return 0
+
+    runningTokenTotal = 0
+
+    with progress.StartTask(
+        description="Counting Tokens in Directory", total=len(filePaths)
+    ) as task:
+
+        for result in _IterDirResults(
+            dirPath=dirPath,
+            filePaths=filePaths,
+            encoding=encoding,
+            countOnly=True,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+            maxTokens=maxTokens,
+            executor=executor,
+        ):
+
+            if result.status == "skipped":
+
+                task.Advance(
+                    advance=1, description=lambda path=result.path: f"Skipping {path}"
+                )
+
+                continue
+
+            runningTokenTotal += result.numTokens
+
+            task.Advance(
+                advance=1,
+                description=lambda path=result.path: f"Done Counting Tokens in {path}",
+            )
+
+            if maxTokens is not None and runningTokenTotal > maxTokens:
+
+                break
+
+    return runningTokenTotal
+
+
+def _TokenizeFileList(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    progress: ProgressReporter,
+    exitOnListError: bool,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    returnType: str = "list",
+    executor: Executor | None = None,
+) -> dict[str, list[int]]:
+    """
+    Internal function backing TokenizeFiles for a list of files. Files with an
+    unsupported encoding raise their error in list order if "exitOnListError" is
+    True, and are skipped otherwise.
+    """
+
+    tokenizedFiles: dict[str, list[int]] = dict()
+
+    with progress.StartTask(
+        description="Tokenizing File List", total=len(filePaths)
+    ) as task:
+
+        for filePath, tokens in _IterFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            returnType=returnType,
+            executor=executor,
+        ):
+
+            if isinstance(tokens, UnsupportedEncodingError):
+
+                if exitOnListError:
+
+                    raise tokens
+
+                task.Advance(
+                    advance=1, description=lambda name=filePath.name: f"Skipping {name}"
+                )
+
+                continue
+
+            tokenizedFiles[filePath.name] = tokens
+
+            task.Advance(
+                advance=1,
+                description=lambda name=filePath.name: f"Done Tokenizing {name}",
+            )
+
+    return tokenizedFiles
+
+
+def _GetNumTokenFileListParallel(
+    filePaths: list[Path],
+    encoding: tiktoken.Encoding,
+    progress: ProgressReporter,
+    exitOnListError: bool,
+    detectionStrategy: str,
+    workers: int,
+    backend: str,
+    cache: TokenCache | None,
+    maxTokens: int | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """
+    Internal function backing GetNumTokenFiles for a list of files when "workers"
+    is greater than 1. Files with an unsupported encoding raise their error in list
+    order if "exitOnListError" is True, and are skipped otherwise. With
+    "maxTokens", no further files are counted once the total exceeds it.
+    """
+
+    runningTokenTotal = 0
+
+    with progress.StartTask(
+        description="Counting Tokens in File List", total=len(filePaths)
+    ) as task:
+
+        for filePath, numTokens in _MapFileJobs(
+            filePaths=filePaths,
+            encoding=encoding,
+            workers=workers,
+            backend=backend,
+            countOnly=True,
+            detectionStrategy=detectionStrategy,
+            cache=cache,
+            executor=executor,
+        ):
+
+            if isinstance(numTokens, UnsupportedEncodingError):
+
+                if exitOnListError:
+
+                    raise numTokens
+
+                task.Advance(
+                    advance=1, description=lambda name=filePath.name: f"Skipping {name}"
+                )
+
+                continue
+
+            runningTokenTotal += numTokens
+
+            task.Advance(
+                advance=1,
+                description=lambda name=filePath.name: f"Done Counting Tokens in {name}",
+            )
+
+            if maxTokens is not None and runningTokenTotal > maxTokens:
+
+                break
+
+    return runningTokenTotal
+
+
+def GetModelMappings() -> dict:
+    """
+    Get the mappings between models and their encodings.
+
+    Returns
+    -------
+    dict
+        A dictionary where keys are model names and values are their corresponding encodings.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetModelMappings
+    >>> mappings = GetModelMappings()
+    >>> print(mappings)
+    {'gpt-4o': 'o200k_base', 'gpt-4o-mini': 'o200k_base', 'gpt-4-turbo': 'cl100k_base', 'gpt-4': 'cl100k_base', 'gpt-3.5-turbo': 'cl100k_base', 'text-embedding-ada-002': 'cl100k_base', 'text-embedding-3-small': 'cl100k_base', 'text-embedding-3-large': 'cl100k_base', 'Codex models': 'p50k_base', 'text-davinci-002': 'p50k_base', 'text-davinci-003': 'p50k_base', 'GPT-3 models like davinci': 'r50k_base'}
+    """
+
+    return MODEL_MAPPINGS
+
+
+def GetValidModels() -> list[str]:
+    """
+    Get a list of valid models.
+
+    Returns
+    -------
+    list of str
+        A list of valid model names.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetValidModels
+    >>> models = GetValidModels()
+    >>> print(models)
+    ['gpt-4o', 'gpt-4o-mini', 'gpt-4-turbo', 'gpt-4', 'gpt-3.5-turbo', 'text-embedding-ada-002', 'text-embedding-3-small', 'text-embedding-3-large', 'Codex models', 'text-davinci-002', 'text-davinci-003', 'GPT-3 models like davinci']
+    """
+
+    return VALID_MODELS
+
+
+def GetValidEncodings() -> list[str]:
+    """
+    Get a list of valid encodings.
+
+    Returns
+    -------
+    list of str
+        A list of valid encoding names.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetValidEncodings
+    >>> encodings = GetValidEncodings()
+    >>> print(encodings)
+    ['o200k_base', 'cl100k_base', 'p50k_base', 'r50k_base']
+    """
+
+    return VALID_ENCODINGS
+
+
+def GetModelForEncoding(encoding: tiktoken.Encoding) -> list[str] | str:
+    """
+    Get the model name for a given encoding.
+
+    Parameters
+    ----------
+    encoding : tiktoken.Encoding
+        The encoding to get the model for.
+
+    Returns
+    -------
+    str
+        The model name corresponding to the given encoding.
+
+    Raises
+    ------
+    ValueError
+        If the encoding name is not valid.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetModelForEncoding
+    >>> import tiktoken
+    >>> encoding = tiktoken.get_encoding('cl100k_base')
+    >>> model = GetModelForEncoding(encoding=encoding)
+    >>> print(model)
+    ['gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo', 'text-embedding-3-large', 'text-embedding-3-small', 'text-embedding-ada-002']
+    """
+    encodingName = encoding.name
+
+    if encodingName not in VALID_ENCODINGS:
+
+        raise ValueError(
+            f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
+        )
+
+    else:
+
+        modelMatches = []
+
+        for model, encoding in MODEL_MAPPINGS.items():
+
+            if encoding == encodingName:
+
+                modelMatches.append(model)
+
+        if len(modelMatches) == 1:
+
+            return modelMatches[0]
+
+        else:
+
+            return sorted(modelMatches)
+
+
+def GetModelForEncodingName(encodingName: str) -> list[str] | str:
+    """
+    Get the model name for a given encoding.
+
+    Parameters
+    ----------
+    encodingName : str
+        The name of the encoding.
+
+    Returns
+    -------
+    str
+        The model name corresponding to the given encoding.
+
+    Raises
+    ------
+    ValueError
+        If the encoding name is not valid.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetModelForEncodingName
+    >>> model = GetModelForEncodingName('cl100k_base')
+    >>> print(model)
+    ['gpt-3.5-turbo', 'gpt-4', 'gpt-4-turbo', 'text-embedding-3-large', 'text-embedding-3-small', 'text-embedding-ada-002']
+    """
+
+    if encodingName not in VALID_ENCODINGS:
+
+        raise ValueError(
+            f"Invalid encoding name: {encodingName}\n\nValid encoding names:\n{VALID_ENCODINGS_STR}"
+        )
+
+    else:
+
+        modelMatches = []
+
+        for model, encoding in MODEL_MAPPINGS.items():
+
+            if encoding == encodingName:
+
+                modelMatches.append(model)
+
+        if len(modelMatches) == 1:
+
+            return modelMatches[0]
+
+        else:
+
+            return sorted(modelMatches)
+
+
+def GetEncodingForModel(modelName: str, quiet: bool = False) -> tiktoken.Encoding:
+    """
+    Get the encoding for a given model name.
+
+    Parameters
+    ----------
+    modelName : str
+        The name of the model.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+
+    Returns
+    -------
+    str
+        The encoding corresponding to the given model.
+
+    Raises
+    ------
+    ValueError
+        If the model name is not valid.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetEncodingNameForModel
+    >>> encoding = GetEncodingNameForModel('gpt-3.5-turbo')
+    >>> print(encoding)
+    'cl100k_base'
+    """
+
+    import tiktoken
+
+    if modelName not in VALID_MODELS:
+
+        raise ValueError(
+            f"Invalid model: {modelName}\n\nValid models:\n{VALID_MODELS_STR}"
+        )
+
+    else:
+
+        encodingName = MODEL_MAPPINGS[modelName]
+
+        return tiktoken.get_encoding(encoding_name=encodingName)
+
+
+def GetEncodingNameForModel(modelName: str, quiet: bool = False) -> str:
+    """
+    Get the encoding for a given model name.
+
+    Parameters
+    ----------
+    modelName : str
+        The name of the model.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+
+    Returns
+    -------
+    str
+        The encoding corresponding to the given model.
+
+    Raises
+    ------
+    ValueError
+        If the model name is not valid.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetEncodingNameForModel
+    >>> encoding = GetEncodingNameForModel('gpt-3.5-turbo')
+    >>> print(encoding)
+    'cl100k_base'
+    """
+
+    if modelName not in VALID_MODELS:
+
+        raise ValueError(
+            f"Invalid model: {modelName}\n\nValid models:\n{VALID_MODELS_STR}"
+        )
+
+    else:
+
+        return MODEL_MAPPINGS[modelName]
+
+
+def GetEncoding(
+    model: str | None = None,
+    encodingName: str | None = None,
+) -> tiktoken.Encoding:
+    """
+    Get the tiktoken Encoding based on the specified model or encoding name.
+
+    Parameters
+    ----------
+    model : str or None, optional
+        The name of the model to retrieve the encoding for. If provided,
+        the encoding associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+
+    Returns
+    -------
+    tiktoken.Encoding
+        The encoding corresponding to the specified model or encoding name.
+
+    Raises
+    ------
+    TypeError
+        If the type of "model" or "encodingName" is not a string.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, or if there
+        is a mismatch between the model and encoding name.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetEncoding
+    >>> encoding = GetEncoding(model='gpt-3.5-turbo')
+    >>> print(encoding)
+    <Encoding cl100k_base>
+    >>> encoding = GetEncoding(encodingName='p50k_base')
+    >>> print(encoding)
+    <Encoding p50k_base>
+    """
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    _encoding = _GetEncodingByName(model, encodingName)
+
+    if _encoding is None:
+
+        raise ValueError(
+            "Either model or encoding must be provided. Valid models:\n"
+            f"{VALID_MODELS_STR}\n\nValid encodings:\n{VALID_ENCODINGS_STR}"
+        )
+
+    return _encoding
+
+
+def TokenizeStr(
+    string: str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    returnType: str = "list",
+) -> list[int] | array | memoryview | numpy.ndarray:
+    """
+    Tokenize a string into a list of token IDs using the specified model or encoding.
+
+    Parameters
+    ----------
+    string : str
+        The string to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    returnType : str, optional
+        The container to return the token IDs in (default is "list"). One of "list",
+        "array" (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+
+    Returns
+    -------
+    list of int, array.array, numpy.ndarray or memoryview
+        The token IDs representing the tokenized string, in the container named by
+        "returnType".
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "model", "encodingName", "encoding", or "returnType" are incorrect.
+    ValueError
+        If the provided "model", "encodingName" or "returnType" is invalid, or if
+        there is a mismatch between the model and encoding name, or between the
+        provided encoding and the derived encoding.
+    ImportError
+        If "returnType" is "numpy" and NumPy is not installed.
+    RuntimeError
+        If an unexpected error occurs during encoding.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TokenizeStr
+    >>> tokens = TokenizeStr(string="Hail to the Victors!", model="gpt-4o")
+    >>> print(tokens)
+    [39, 663, 316, 290, ..., 914, 0]
+    >>> import tiktoken
+    >>> encoding = tiktoken.get_encoding("cl100k_base")
+    >>> tokens = TokenizeStr(string="2024 National Champions", encoding=encoding)
+    >>> print(tokens)
+    [1323, 19, 6743, 40544]
+    """
+
+    import tiktoken
+
+    if not isinstance(string, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+
+    if reporter is NULL_PROGRESS_REPORTER:
+
+        return _EncodeText(encoding=_encoding, text=string, returnType=returnType)
+
+    displayString = f"{string[:30]}..." if len(string) > 33 else string
+
+    with reporter.StartTask(
+        description=f'Tokenizing "{displayString}"', total=1
+    ) as task:
+
+        tokenizedStr = _EncodeText(
+            encoding=_encoding, text=string, returnType=returnType
+        )
+
+        task.Advance(advance=1, description=f'Done Tokenizing "{displayString}"')
+
+    return tokenizedStr
+
+
+def GetNumTokenStr(
+    string: str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    maxTokens: int | None = None,
+) -> int:
+    """
+    Get the number of tokens in a string based on the specified model or encoding.
+
+    Parameters
+    ----------
+    string : str
+        The string to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    maxTokens : int or None, optional
+        Stop counting as soon as the count exceeds this many tokens (default is
+        None). The count returned is then greater than "maxTokens", but may be less
+        than the full count.
+
+    Returns
+    -------
+    int
+        The number of tokens in the string, or a partial count greater than
+        "maxTokens" if counting stopped early.
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "model", "encodingName", "encoding", or "maxTokens" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model and encoding name, or between the provided
+        encoding and the derived encoding, or if "maxTokens" is negative.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetNumTokenStr
+    >>> numTokens = GetNumTokenStr(string="Hail to the Victors!", model="gpt-4o")
+    >>> print(numTokens)
+    7
+    >>> numTokens = GetNumTokenStr(string="2024 National Champions", model="gpt-4o")
+    >>> print(numTokens)
+    4
+    >>> numTokens = GetNumTokenStr(string="Corum 4 Heisman", encoding=tiktoken.get_encoding("cl100k_base"))
+    >>> print(numTokens)
+    6
+    """
+
+    import tiktoken
+
+    if not isinstance(string, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if maxTokens is not None and (
+        not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens is not None and maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+
+    if reporter is NULL_PROGRESS_REPORTER:
+
+        return _CountTokens(encoding=_encoding, text=string, maxTokens=maxTokens)
+
+    displayString = f"{string[:22]}..." if len(string) > 25 else string
+
+    with reporter.StartTask(
+        description=f'Counting Tokens in "{displayString}"', total=1
+    ) as task:
+
+        numTokens = _CountTokens(encoding=_encoding, text=string, maxTokens=maxTokens)
+
+        task.Advance(
+            advance=1, description=f'Done Counting Tokens in "{displayString}"'
+        )
+
+    return numTokens
+
+
+def IsWithinTokenLimit(
+    string: str,
+    limit: int,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+) -> TokenLimitResult:
+    """
+    Check whether a string has no more tokens than a limit, stopping as soon as the
+    limit is crossed rather than tokenizing the whole string.
+
+    Parameters
+    ----------
+    string : str
+        The string to check.
+    limit : int
+        The maximum number of tokens allowed.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+
+    Returns
+    -------
+    TokenLimitResult
+        A named tuple of "withinLimit" and "numTokens", which is truthy only when
+        the string is within the limit. "numTokens" is the exact count within the
+        limit, and a partial count greater than "limit" otherwise.
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "limit", "model", "encodingName", or "encoding" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model and encoding name, or between the provided
+        encoding and the derived encoding, or if "limit" is negative.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import IsWithinTokenLimit
+    >>> IsWithinTokenLimit("Hail to the Victors!", limit=8000, model="gpt-4o")
+    TokenLimitResult(withinLimit=True, numTokens=7)
+    >>> if not IsWithinTokenLimit(prompt, limit=8000, model="gpt-4o"):
+    ...     raise ValueError("Prompt is too long.")
+    """
+
+    if not isinstance(string, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+        )
+
+    if not isinstance(limit, int) or isinstance(limit, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "limit". Expected type: int. Given type: {type(limit)}'
+        )
+
+    if limit < 0:
+
+        raise ValueError(f'"limit" must be at least 0. Given value: {limit}')
+
+    numTokens = GetNumTokenStr(
+        string=string,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        quiet=True,
+        maxTokens=limit,
+    )
+
+    return TokenLimitResult(withinLimit=numTokens <= limit, numTokens=numTokens)
+
+
+def TruncateStr(
+    string: str,
+    maxTokens: int,
+    side: str = "head",
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+) -> TruncateResult:
+    """
+    Truncate a string to at most a number of tokens, tokenizing only as much of it
+    as needed rather than the whole string.
+
+    The truncated text is always cut from the string itself, at a character
+    boundary, so it is never altered by decoding partial tokens.
+
+    Parameters
+    ----------
+    string : str
+        The string to truncate.
+    maxTokens : int
+        The maximum number of tokens to keep.
+    side : str, optional
+        The part of the string to keep (default is "head"). One of "head" (the
+        start), "tail" (the end) or "middle" (the start and end, dropping the
+        middle, with the budget split evenly between them).
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+
+    Returns
+    -------
+    TruncateResult
+        A named tuple of "text", the truncated string, and "numTokens", its exact
+        token count. If the string is within the limit, "text" is the whole string.
+
+    Raises
+    ------
+    TypeError
+        If the types of "string", "maxTokens", "side", "model", "encodingName", or "encoding" are incorrect.
+    ValueError
+        If the provided "model", "encodingName" or "side" is invalid, if there is a
+        mismatch between the model and encoding name, or between the provided
+        encoding and the derived encoding, if "maxTokens" is negative, or if the
+        tokenized part of the string contains a special token.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TruncateStr
+    >>> TruncateStr("Hail to the Victors! Hail to the conquering heroes!", maxTokens=5, model="gpt-4o")
+    TruncateResult(text='Hail to the Victors', numTokens=5)
+    >>> TruncateStr("Hail to the Victors! Hail to the conquering heroes!", maxTokens=5, side="tail", model="gpt-4o")
+    TruncateResult(text=' the conquering heroes!', numTokens=4)
+    """
+
+    import tiktoken
+
+    if not isinstance(string, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
+        )
+
+    if not isinstance(maxTokens, int) or isinstance(maxTokens, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
+    if not isinstance(side, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "side". Expected type: str. Given type: {type(side)}'
+        )
+
+    if side not in TRUNCATE_SIDES:
+
+        raise ValueError(f"Invalid side: {side}\n\nValid sides:\n{TRUNCATE_SIDES_STR}")
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    return _TruncateText(
+        encoding=_encoding, text=string, maxTokens=maxTokens, side=side
+    )
+
+
+def TokenizeStrs(
+    strings: list[str],
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    returnType: str = "list",
+) -> list[list[int] | array | memoryview | numpy.ndarray]:
+    """
+    Tokenize a list of strings into lists of token IDs using the specified model or encoding.
+
+    The strings are tokenized in size-bounded batches spread over several threads
+    on multi-core machines, which avoids the per-call overhead of tokenizing many
+    short strings one at a time.
+
+    Parameters
+    ----------
+    strings : list of str
+        The strings to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    returnType : str, optional
+        The container to return the token IDs in (default is "list"). One of "list",
+        "array" (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+
+    Returns
+    -------
+    list of list of int, array.array, numpy.ndarray or memoryview
+        The token IDs of each string, in the container named by "returnType", in
+        the order of "strings".
+
+    Raises
+    ------
+    TypeError
+        If the types of "strings", "model", "encodingName", "encoding", or "returnType" are incorrect.
+    ValueError
+        If the provided "model", "encodingName" or "returnType" is invalid, or if
+        there is a mismatch between the model and encoding name, or between the
+        provided encoding and the derived encoding.
+    ImportError
+        If "returnType" is "numpy" and NumPy is not installed.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TokenizeStrs
+    >>> tokenLists = TokenizeStrs(strings=["Hail to the Victors!", "Go Blue!"], model="gpt-4o")
+    >>> print(tokenLists)
+    [[39, 663, 316, 290, ..., 914, 0], [12438, 8184, 0]]
+    """
+
+    import tiktoken
+
+    if not isinstance(strings, list):
+
+        raise TypeError(
+            f'Unexpected type for parameter "strings". Expected type: list. Given type: {type(strings)}'
+        )
+
+    if not all(isinstance(string, str) for string in strings):
+
+        listTypes = set(type(string) for string in strings)
+
+        raise TypeError(
+            f'Unexpected type for parameter "strings". Expected type: list of str. Given list contains types: {listTypes}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+    tokenizedStrs: list[list[int] | array | memoryview | numpy.ndarray] = []
+
+    if not strings:
+
+        return tokenizedStrs
+
+    with reporter.StartTask(
+        description="Tokenizing String List", total=len(strings)
+    ) as task:
+
+        for batch in _IterTextBatches(strings):
+
+            tokenizedStrs.extend(
+                _EncodeBatch(encoding=_encoding, texts=batch, returnType=returnType)
+            )
+
+            task.Advance(
+                advance=len(batch),
+                description=f"Tokenized {len(tokenizedStrs)} of {len(strings)} Strings",
+            )
+
+    return tokenizedStrs
+
+
+def GetNumTokenStrs(
+    strings: list[str],
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+) -> list[int]:
+    """
+    Get the number of tokens in each of a list of strings based on the specified model or encoding.
+
+    The strings are tokenized in size-bounded batches spread over several threads
+    on multi-core machines, which avoids the per-call overhead of counting many
+    short strings one at a time.
+
+    Parameters
+    ----------
+    strings : list of str
+        The strings to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+
+    Returns
+    -------
+    list of int
+        The number of tokens in each string, in the order of "strings".
+
+    Raises
+    ------
+    TypeError
+        If the types of "strings", "model", "encodingName", or "encoding" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, or if there is a
+        mismatch between the model and encoding name, or between the provided
         encoding and the derived encoding.
 
     Examples
     --------
-    >>> from PyTokenCounter import GetNumTokenStr
-    >>> numTokens = GetNumTokenStr(string="Hail to the Victors!", model="gpt-4o")
-    >>> print(numTokens)
-    7
-    >>> numTokens = GetNumTokenStr(string="2024 National Champions", model="gpt-4o")
-    >>> print(numTokens)
-    4
-    >>> numTokens = GetNumTokenStr(string="Corum 4 Heisman", encoding=tiktoken.get_encoding("cl100k_base"))
-    >>> print(numTokens)
-    6
+    >>> from PyTokenCounter import GetNumTokenStrs
+    >>> numTokens = GetNumTokenStrs(strings=["Hail to the Victors!", "2024 National Champions"], model="gpt-4o")
+    >>> print(numTokens)
+    [7, 4]
+    >>> print(sum(numTokens))
+    11
+    """
+
+    import tiktoken
+
+    if not isinstance(strings, list):
+
+        raise TypeError(
+            f'Unexpected type for parameter "strings". Expected type: list. Given type: {type(strings)}'
+        )
+
+    if not all(isinstance(string, str) for string in strings):
+
+        listTypes = set(type(string) for string in strings)
+
+        raise TypeError(
+            f'Unexpected type for parameter "strings". Expected type: list of str. Given list contains types: {listTypes}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    _encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+    numTokens: list[int] = []
+
+    if not strings:
+
+        return numTokens
+
+    with reporter.StartTask(
+        description="Counting Tokens in String List", total=len(strings)
+    ) as task:
+
+        for batch in _IterTextBatches(strings):
+
+            numTokens.extend(
+                _EncodeBatch(encoding=_encoding, texts=batch, countOnly=True)
+            )
+
+            task.Advance(
+                advance=len(batch),
+                description=f"Counted Tokens in {len(numTokens)} of {len(strings)} Strings",
+            )
+
+    return numTokens
+
+
+def TokenizeFile(
+    filePath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    detectionStrategy: str = "full",
+    cache: TokenCache | None = None,
+    returnType: str = "list",
+) -> list[int] | array | memoryview | numpy.ndarray:
+    """
+    Tokenize the contents of a file into a list of token IDs using the specified model or encoding.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used. Default is None.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model. Default is None.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName. Default is None.
+    quiet : bool, optional
+        If True, suppress progress updates. Default is False.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    detectionStrategy : str, optional
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+
+    cache : TokenCache or None, optional
+        A persistent token cache to look file contents up in before tokenizing them,
+        and to store the results of files that miss (default is None).
+    returnType : str, optional
+        The container to return the token IDs in (default is "list"). One of "list",
+        "array" (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+
+    Returns
+    -------
+    list of int, array.array, numpy.ndarray or memoryview
+        The token IDs representing the tokenized file contents, in the container
+        named by "returnType".
+
+    Raises
+    ------
+    TypeError
+        If the types of `filePath`, `model`, `encodingName`, `encoding`, or `returnType` are incorrect.
+    ValueError
+        If the provided `model`, `encodingName` or `returnType` is invalid, or if
+        there is a mismatch between the model and encoding name, or between the
+        provided encoding and the derived encoding.
+    ImportError
+        If `returnType` is "numpy" and NumPy is not installed.
+    UnsupportedEncodingError
+        If the file's encoding is not supported (i.e., not UTF-8, ASCII, or another
+        text encoding format supported by the chardet package).
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    Tokenizing a file with a specified model:
+
+    >>> from pathlib import Path
+    >>> from PyTokenCounter import TokenizeFile
+    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile1.txt")
+    >>> tokens = TokenizeFile(filePath=filePath, model="gpt-4o")
+    >>> print(tokens)
+    [2305, 290, 7334, 132491, 11, 290, ..., 11526, 13]
+
+    Tokenizing a file with an existing encoding object:
+
+    >>> from pathlib import Path
+    >>> from PyTokenCounter import TokenizeFile
+    >>> import tiktoken
+    >>> encoding = tiktoken.get_encoding("p50k_base")
+    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile2.txt")
+    >>> tokens = TokenizeFile(filePath=filePath, encoding=encoding)
+    >>> print(tokens)
+    [976, 13873, 10377, 472, 261, ..., 3333, 13]
+    """
+
+    import tiktoken
+
+    if not isinstance(filePath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+    filePath = Path(filePath)
+
+    if cache is None:
+
+        fileContents = ReadTextFile(
+            filePath=filePath, detectionStrategy=detectionStrategy
+        )
+
+        if not isinstance(fileContents, str):
+
+            raise UnsupportedEncodingError(encoding=fileContents[1], filePath=filePath)
+
+    with reporter.StartTask(description=f"Tokenizing {filePath.name}", total=1) as task:
+
+        if cache is None:
+
+            tokens = TokenizeStr(
+                string=fileContents,
+                model=model,
+                encodingName=encodingName,
+                encoding=encoding,
+                quiet=True,
+                returnType=returnType,
+            )
+
+        else:
+
+            tokens = _GetCachedFileResult(
+                filePath=filePath,
+                encoding=_ResolveEncoding(
+                    model=model, encodingName=encodingName, encoding=encoding
+                ),
+                cache=cache,
+                detectionStrategy=detectionStrategy,
+                countOnly=False,
+                returnType=returnType,
+            )
+
+        task.Advance(
+            advance=1, description=lambda name=filePath.name: f"Done Tokenizing {name}"
+        )
+
+    return tokens
+
+
+def GetNumTokenFile(
+    filePath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    detectionStrategy: str = "full",
+    chunkSize: int | None = None,
+    cache: TokenCache | None = None,
+    maxTokens: int | None = None,
+) -> int:
+    """
+    Get the number of tokens in a file based on the specified model or encoding.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    quiet : bool, optional
+        If True, suppress progress updates (default is False).
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    detectionStrategy : str, optional
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+    chunkSize : int or None, optional
+        If given, stream the file in chunks of this many bytes instead of loading it
+        whole, so that memory use stays constant regardless of the file size
+        (default is None). The count is the same as without "chunkSize" for any
+        file whose encoding is decided the same way, but streaming decides the
+        encoding from the first chunk alone: a file that is UTF-8 in its first
+        chunk and not valid UTF-8 later raises UnsupportedEncodingError, where
+        loading it whole would detect its encoding.
+    cache : TokenCache or None, optional
+        A persistent token cache to look file contents up in before tokenizing them,
+        and to store the results of files that miss (default is None).
+    maxTokens : int or None, optional
+        Stop counting as soon as the count exceeds this many tokens (default is
+        None). The count returned is then greater than "maxTokens", but may be less
+        than the full count. A count found in "cache" is always returned in full.
+
+    Returns
+    -------
+    int
+        The number of tokens in the file, or a partial count greater than
+        "maxTokens" if counting stopped early.
+
+    Raises
+    ------
+    TypeError
+        If the types of "filePath", "model", "encodingName", "encoding", or "maxTokens" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model and encoding name, or between the provided
+        encoding and the derived encoding, or if "maxTokens" is negative.
+    UnsupportedEncodingError
+        If the file's encoding is not supported (i.e., not UTF-8, ASCII, or another
+        text encoding format supported by the chardet package).
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import GetNumTokenFile
+    >>> from pathlib import Path
+    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile1.txt")
+    >>> numTokens = GetNumTokenFile(filePath=filePath, model="gpt-4o")
+    >>> print(numTokens)
+    221
+    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile2.txt")
+    >>> numTokens = GetNumTokenFile(filePath=filePath, model="gpt-4o")
+    >>> print(numTokens)
+    213
+    >>> numTokens = GetNumTokenFile(filePath=filePath, model="gpt-4o", chunkSize=1024 * 1024)
+    >>> print(numTokens)
+    213
+    """
+
+    import tiktoken
+
+    if not isinstance(filePath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if chunkSize is not None and (
+        not isinstance(chunkSize, int) or isinstance(chunkSize, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "chunkSize". Expected type: int. Given type: {type(chunkSize)}'
+        )
+
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if maxTokens is not None and (
+        not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens is not None and maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
+    filePath = Path(filePath)
+
+    if cache is None and chunkSize is None:
+
+        fileContents = ReadTextFile(
+            filePath=filePath, detectionStrategy=detectionStrategy
+        )
+
+        if not isinstance(fileContents, str):
+
+            raise UnsupportedEncodingError(encoding=fileContents[1], filePath=filePath)
+
+    with reporter.StartTask(
+        description=f"Counting Tokens in {filePath.name}", total=1
+    ) as task:
+
+        if cache is not None:
+
+            numTokens = _GetCachedFileResult(
+                filePath=filePath,
+                encoding=_ResolveEncoding(
+                    model=model, encodingName=encodingName, encoding=encoding
+                ),
+                cache=cache,
+                detectionStrategy=detectionStrategy,
+                countOnly=True,
+                chunkSize=chunkSize,
+            )
+
+        elif chunkSize is None:
+
+            numTokens = _CountTokens(
+                encoding=_ResolveEncoding(
+                    model=model, encodingName=encodingName, encoding=encoding
+                ),
+                text=fileContents,
+                maxTokens=maxTokens,
+            )
+
+        else:
+
+            numTokens = 0
+
+            for numTokens in IterCountFile(
+                filePath=filePath,
+                model=model,
+                encodingName=encodingName,
+                encoding=encoding,
+                chunkSize=chunkSize,
+                detectionStrategy=detectionStrategy,
+            ):
+
+                if maxTokens is not None and numTokens > maxTokens:
+
+                    break
+
+        task.Advance(
+            advance=1,
+            description=lambda name=filePath.name: f"Done Counting Tokens in {name}",
+        )
+
+    return numTokens
+
+
+def IterTokenizeFile(
+    filePath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    chunkSize: int = STREAM_CHUNK_SIZE,
+    detectionStrategy: str = "full",
+    returnType: str = "list",
+) -> Iterator[list[int] | array | memoryview | numpy.ndarray]:
+    """
+    Tokenize a file incrementally, yielding token IDs one segment at a time so that
+    neither the file contents nor all of its tokens are held in memory at once.
+
+    The file is read in chunks of `chunkSize` bytes and only split at positions where
+    the encoding's pre-tokenizer is guaranteed to start a new piece, so the
+    concatenation of everything yielded is identical to `TokenizeFile`, except that
+    the file's encoding is decided from the first chunk alone. A file that is UTF-8
+    in its first chunk but not valid UTF-8 later raises UnsupportedEncodingError
+    rather than having its encoding detected.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    chunkSize : int, optional
+        The number of bytes to read from the file at a time (default is 1 MiB).
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        In streaming mode the encoding is decided from the first chunk.
+    returnType : str, optional
+        The container to return the token IDs in (default is "list"). One of "list",
+        "array" (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+
+    Yields
+    ------
+    list of int, array.array, numpy.ndarray or memoryview
+        The token IDs of each consecutive segment of the file, in the container
+        named by "returnType".
+
+    Raises
+    ------
+    TypeError
+        If the types of "filePath", "model", "encodingName", "encoding",
+        "chunkSize" or "returnType" are incorrect.
+    ValueError
+        If the provided "model", "encodingName" or "returnType" is invalid, if
+        there is a mismatch between the model, encoding name and encoding, or if
+        "chunkSize" is not positive.
+    ImportError
+        If "returnType" is "numpy" and NumPy is not installed.
+    UnsupportedEncodingError
+        If the file's encoding is not supported.
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import IterTokenizeFile
+    >>> tokens = []
+    >>> for segmentTokens in IterTokenizeFile("./PyTokenCounter/Tests/Input/TestFile1.txt", model="gpt-4o"):
+    ...     tokens.extend(segmentTokens)
+    >>> print(len(tokens))
+    221
+    """
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    _encoding, textChunks = _PrepareFileStream(
+        filePath=filePath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        chunkSize=chunkSize,
+        detectionStrategy=detectionStrategy,
+    )
+
+    return (
+        _EncodeText(encoding=_encoding, text=segment, returnType=returnType)
+        for segment in _IterSafeSegments(textChunks)
+    )
+
+
+def IterCountFile(
+    filePath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    chunkSize: int = STREAM_CHUNK_SIZE,
+    detectionStrategy: str = "full",
+) -> Iterator[int]:
+    """
+    Count the tokens in a file incrementally, yielding the running total after each
+    segment. Memory use is bounded by the chunk size, not the file size.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to count tokens for.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    chunkSize : int, optional
+        The number of bytes to read from the file at a time (default is 1 MiB).
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        In streaming mode the encoding is decided from the first chunk.
+
+    Yields
+    ------
+    int
+        The running token count. The last value yielded is the total for the file.
+
+    Raises
+    ------
+    TypeError
+        If the types of "filePath", "model", "encodingName", "encoding" or
+        "chunkSize" are incorrect.
+    ValueError
+        If the provided "model" or "encodingName" is invalid, if there is a
+        mismatch between the model, encoding name and encoding, or if "chunkSize"
+        is not positive.
+    UnsupportedEncodingError
+        If the file's encoding is not supported.
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import IterCountFile
+    >>> for runningCount in IterCountFile("./PyTokenCounter/Tests/Input/TestFile1.txt", model="gpt-4o"):
+    ...     print(runningCount)
+    221
+    """
+
+    _encoding, textChunks = _PrepareFileStream(
+        filePath=filePath,
+        model=model,
+        encodingName=encodingName,
+        encoding=encoding,
+        chunkSize=chunkSize,
+        detectionStrategy=detectionStrategy,
+    )
+
+    return _IterRunningCounts(
+        _CountTokens(encoding=_encoding, text=segment)
+        for segment in _IterSafeSegments(textChunks)
+    )
+
+
+def TruncateFile(
+    filePath: Path | str,
+    maxTokens: int,
+    side: str = "head",
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    chunkSize: int = STREAM_CHUNK_SIZE,
+    detectionStrategy: str = "full",
+) -> TruncateResult:
+    """
+    Truncate the contents of a file to at most a number of tokens, tokenizing only
+    as much of it as needed rather than the whole file.
+
+    With side="head", the file is streamed in chunks of `chunkSize` bytes and only
+    read up to the point where the limit is crossed. Otherwise, the file is read
+    whole, and only its start, up to the limit, and its end are tokenized.
+
+    Parameters
+    ----------
+    filePath : Path or str
+        The path to the file to truncate.
+    maxTokens : int
+        The maximum number of tokens to keep.
+    side : str, optional
+        The part of the file to keep (default is "head"). One of "head" (the
+        start), "tail" (the end) or "middle" (the start and end, dropping the
+        middle, with the budget split evenly between them).
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    chunkSize : int, optional
+        The number of bytes to read from the file at a time with side="head"
+        (default is 1 MiB).
+    detectionStrategy : str, optional
+        How much of the file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        With side="head", the encoding is decided from the first chunk.
+
+    Returns
+    -------
+    TruncateResult
+        A named tuple of "text", the truncated contents, and "numTokens", their
+        exact token count. If the file is within the limit, "text" is its whole
+        contents.
+
+    Raises
+    ------
+    TypeError
+        If the types of "filePath", "maxTokens", "side", "model", "encodingName",
+        "encoding" or "chunkSize" are incorrect.
+    ValueError
+        If the provided "model", "encodingName" or "side" is invalid, if there is a
+        mismatch between the model, encoding name and encoding, if "maxTokens" is
+        negative, if "chunkSize" is not positive, or if the tokenized part of the
+        file contains a special token.
+    UnsupportedEncodingError
+        If the file's encoding is not supported.
+    FileNotFoundError
+        If the specified file does not exist.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import TruncateFile
+    >>> result = TruncateFile("./PyTokenCounter/Tests/Input/TestFile1.txt", maxTokens=100, model="gpt-4o")
+    >>> print(result.numTokens)
+    100
     """
 
-    if not isinstance(string, str):
-
-        raise TypeError(
-            f'Unexpected type for parameter "string". Expected type: str. Given type: {type(string)}'
-        )
-
-    if model is not None and not isinstance(model, str):
+    if not isinstance(maxTokens, int) or isinstance(maxTokens, bool):
 
         raise TypeError(
-            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
         )
 
-    if encodingName is not None and not isinstance(encodingName, str):
+    if maxTokens < 0:
 
-        raise TypeError(
-            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
-        )
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
 
-    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+    if not isinstance(side, str):
 
         raise TypeError(
-            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+            f'Unexpected type for parameter "side". Expected type: str. Given type: {type(side)}'
         )
 
-    hasBar = False
-    taskName = None
-
-    displayString = f"{string[:22]}..." if len(string) > 25 else string
-
-    if len(_tasks) == 0 and not quiet:
+    if side not in TRUNCATE_SIDES:
 
-        hasBar = True
-        taskName = f'Counting Tokens in "{displayString}"'
-        _InitializeTask(taskName=taskName, total=1, quiet=quiet)
+        raise ValueError(f"Invalid side: {side}\n\nValid sides:\n{TRUNCATE_SIDES_STR}")
 
-    tokens = TokenizeStr(
-        string=string,
+    _encoding, textChunks = _PrepareFileStream(
+        filePath=filePath,
         model=model,
         encodingName=encodingName,
         encoding=encoding,
-        quiet=quiet,
+        chunkSize=chunkSize,
+        detectionStrategy=detectionStrategy,
     )
 
-    if hasBar:
+    if side != "head":
 
-        _UpdateTask(
-            taskName=taskName,
-            advance=1,
-            description=f'Done Counting Tokens in "{displayString}"',
-            quiet=quiet,
+        return _TruncateText(
+            encoding=_encoding,
+            text=ReadTextFile(filePath=filePath, detectionStrategy=detectionStrategy),
+            maxTokens=maxTokens,
+            side=side,
         )
 
-    return len(tokens)
+    # Each chunk's safe segments are split again to the size _TruncateText uses for
+    # strings, so that a small limit does not tokenize a whole chunk
+    segmentChars = _GetLimitSegmentChars(
+        maxTokens=maxTokens, maxChars=COUNT_SEGMENT_CHARS
+    )
 
+    return _TruncateHead(
+        encoding=_encoding,
+        segments=(
+            piece
+            for segment in _IterSafeSegments(textChunks)
+            for piece in _SplitSafeSegments(text=segment, segmentChars=segmentChars)
+        ),
+        maxTokens=maxTokens,
+    )
 
-def TokenizeFile(
-    filePath: Path | str,
+
+def TokenizeDir(
+    dirPath: Path | str,
     model: str | None = None,
     encodingName: str | None = None,
     encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
     quiet: bool = False,
-) -> list[int]:
+    progress: ProgressReporter | None = None,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    returnType: str = "list",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> dict[str, list[int] | array | memoryview | numpy.ndarray | dict]:
     """
-    Tokenize the contents of a file into a list of token IDs using the specified model or encoding.
+    Tokenize all files in a directory into lists of token IDs using the specified model or encoding.
 
     Parameters
     ----------
-    filePath : Path or str
-        The path to the file to tokenize.
+    dirPath : Path or str
+        The path to the directory to tokenize.
     model : str or None, optional
         The name of the model to use for encoding. If provided, the encoding
-        associated with the model will be used. Default is None.
+        associated with the model will be used.
     encodingName : str or None, optional
         The name of the encoding to use. If provided, it must match the encoding
-        associated with the specified model. Default is None.
+        associated with the specified model.
     encoding : tiktoken.Encoding or None, optional
         An existing tiktoken.Encoding object to use for tokenization. If provided,
-        it must match the encoding derived from the model or encodingName. Default is None.
-    quiet : bool, optional
-        If True, suppress progress updates. Default is False.
+        it must match the encoding derived from the model or encodingName.
+    recursive : bool, default True
+        Whether to tokenize files in subdirectories recursively.
+    quiet : bool, default False
+        If True, suppress progress updates.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing files
+        across. With 1, files are tokenized in batches in this process.
+        The result is the same for any number of workers.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1. "process"
+        spreads the work across processes; "thread" uses threads, which start
+        faster and hand token lists back without pickling them.
+    returnType : str, default "list"
+        The container to return the token IDs in. One of "list", "array"
+        (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
 
     Returns
     -------
-    list of int
-        A list of token IDs representing the tokenized file contents.
+    dict[str, list[int] | dict]
+        A nested dictionary where each key is a file or subdirectory name:
+        - If the key is a file, its value is its token IDs, in the container named
+          by "returnType".
+        - If the key is a subdirectory, its value is another dictionary following the same structure.
 
     Raises
     ------
     TypeError
-        If the types of `filePath`, `model`, `encodingName`, or `encoding` are incorrect.
+        If the types of "dirPath", "model", "encodingName", "encoding", "recursive", "workers", "backend", "returnType", "include", "exclude", "respectGitignore", or "maxFileSize" are incorrect.
     ValueError
-        If the provided `model` or `encodingName` is invalid, or if there is a
-        mismatch between the model and encoding name, or between the provided
-        encoding and the derived encoding.
-    UnsupportedEncodingError
-        If the file's encoding is not supported (i.e., not UTF-8, ASCII, or another
-        text encoding format supported by the chardet package).
-    FileNotFoundError
-        If the specified file does not exist.
+        If the provided "dirPath" is not a directory, if "workers" is less than 1,
+        if "backend" or "returnType" is not valid, or if "maxFileSize" is negative.
+    ImportError
+        If "returnType" is "numpy" and NumPy is not installed.
+    RuntimeError
+        If an unexpected error occurs during tokenization.
 
     Examples
     --------
-    Tokenizing a file with a specified model:
-
+    >>> from PyTokenCounter import TokenizeDir
     >>> from pathlib import Path
-    >>> from PyTokenCounter import TokenizeFile
-    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile1.txt")
-    >>> tokens = TokenizeFile(filePath=filePath, model="gpt-4o")
-    >>> print(tokens)
-    [2305, 290, 7334, 132491, 11, 290, ..., 11526, 13]
+    >>> dirPath = Path("./PyTokenCounter/Tests/Input/TestDirectory")
+    >>> tokenizedDir = TokenizeDir(dirPath=dirPath, model='gpt-4o')
+    >>> print(tokenizedDir)
+    {
+            'TestDir1.txt': [
+                976, 19458, 5831, 23757, 306, 290, ..., 26321, 13
+            ],
+            'TestDir2.txt': {
+                'numTokens': 132,
+            'tokens':
+            [
+                976,
+                5030,
+                45940,
+                295,
+                483,
+               ...,
+               1665,
+               4717,
+               13
+            ]
+        },
+        'TestDir3.txt': {
+            'numTokens': 140,
+            'tokens':
+            [
+                976, 29011, 38841, 306, 483,  ..., 16592, 316, 21846, 4194, 483, 290, 69214, 13
+            ]
+        },
+        'TestSubDir': {
+            'TestDir4.txt': {
+                'numTokens': 127,
+                'tokens': [
+                    976,
+                    21689,
+                    12761,
+                    50217,
+                    71327,
+                    412,
+                    ...,
+                    10740,
+                    13
+                ]
+            },
+            'TestDir5.txt': {
+                'numTokens': 128,
+                'tokens': [
+                    65307,
+                    16953,
+                    34531,
+                    290,
+                    37603,
+                    306,
+                   ...,
+                   34618,
+                   13
+                ]
+            }
+        }
+    }
+    """
 
-    Tokenizing a file with an existing encoding object:
+    import tiktoken
+
+    if not isinstance(dirPath, (str, Path)):
+
+        raise TypeError(
+            f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
+        )
+
+    if model is not None and not isinstance(model, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+        )
+
+    if encodingName is not None and not isinstance(encodingName, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+        )
+
+    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+
+        raise TypeError(
+            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+        )
+
+    if not isinstance(recursive, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
+
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if not isinstance(workers, int) or isinstance(workers, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
+
+    if workers < 1:
+
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    if not isinstance(backend, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
+
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
+
+    if not isinstance(returnType, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    dirPath = Path(dirPath).resolve()
+
+    if not dirPath.is_dir():
+
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+    return _TokenizeDirFiles(
+        dirPath=dirPath,
+        encoding=_ResolveEncoding(
+            model=model, encodingName=encodingName, encoding=encoding
+        ),
+        recursive=recursive,
+        pathFilter=pathFilter,
+        progress=GetProgressReporter(quiet=quiet, progress=progress),
+        detectionStrategy=detectionStrategy,
+        workers=workers,
+        backend=backend,
+        returnType=returnType,
+    )
+
+
+def IterTokenizeDir(
+    dirPath: Path | str,
+    model: str | None = None,
+    encodingName: str | None = None,
+    encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    returnType: str = "list",
+    order: str = "walk",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> Iterator[DirFileResult]:
+    """
+    Tokenize all files in a directory, yielding the result of each file as soon as
+    it is done instead of building a nested dictionary of the whole directory.
+
+    Only the results of the files in flight are held in memory, so the memory used
+    depends on the number of workers and the size of the files, not on the size of
+    the directory. TokenizeDir is built on the same results.
+
+    Parameters
+    ----------
+    dirPath : Path or str
+        The path to the directory to tokenize.
+    model : str or None, optional
+        The name of the model to use for encoding. If provided, the encoding
+        associated with the model will be used.
+    encodingName : str or None, optional
+        The name of the encoding to use. If provided, it must match the encoding
+        associated with the specified model.
+    encoding : tiktoken.Encoding or None, optional
+        An existing tiktoken.Encoding object to use for tokenization. If provided,
+        it must match the encoding derived from the model or encodingName.
+    recursive : bool, default True
+        Whether to include files in subdirectories recursively.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing files
+        across. At most two batches of files per worker are in flight at once.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1: "process"
+        or "thread".
+    returnType : str, default "list"
+        The container to yield the token IDs in. One of "list", "array"
+        (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview).
+    order : str, default "walk"
+        "walk" yields files in the order the directory is walked, like
+        TokenizeDir. "completion" yields them as workers finish them, so that
+        one slow file does not hold back the others.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
+
+    Yields
+    ------
+    DirFileResult
+        The relative path, token count, token IDs and status of each file. Files
+        with an unsupported encoding are yielded with the status "skipped".
+
+    Raises
+    ------
+    TypeError
+        If the types of the parameters are incorrect.
+    ValueError
+        If the provided "dirPath" is not a directory, if "workers" is less than 1, or
+        if "backend", "returnType" or "order" is not valid.
+    ImportError
+        If "returnType" is "numpy" and NumPy is not installed.
 
-    >>> from pathlib import Path
-    >>> from PyTokenCounter import TokenizeFile
-    >>> import tiktoken
-    >>> encoding = tiktoken.get_encoding("p50k_base")
-    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile2.txt")
-    >>> tokens = TokenizeFile(filePath=filePath, encoding=encoding)
-    >>> print(tokens)
-    [976, 13873, 10377, 472, 261, ..., 3333, 13]
+    Examples
+    --------
+    >>> from PyTokenCounter import IterTokenizeDir
+    >>> for result in IterTokenizeDir("./Tests/Input/TestDirectory", model="gpt-4o"):
+    ...     print(result.path, result.numTokens, result.status)
+    TestDir1.txt 128 ok
+    TestDir2.txt 132 ok
+    TestDir3.txt 140 ok
+    TestSubDir/TestDir4.txt 127 ok
+    TestSubDir/TestDir5.txt 128 ok
     """
 
-    if not isinstance(filePath, (str, Path)):
+    import tiktoken
+
+    if not isinstance(dirPath, (str, Path)):
 
         raise TypeError(
-            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+            f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
         )
 
     if model is not None and not isinstance(model, str):
@@ -979,57 +4266,129 @@ def TokenizeFile(
             f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
         )
 
-    filePath = Path(filePath)
+    if not isinstance(recursive, bool):
 
-    fileContents = ReadTextFile(filePath=filePath)
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
 
-    if not isinstance(fileContents, str):
+    if not isinstance(detectionStrategy, str):
 
-        raise UnsupportedEncodingError(encoding=fileContents[1], filePath=filePath)
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
 
-    hasBar = False
-    taskName = None
+    if detectionStrategy not in DETECTION_STRATEGIES:
 
-    if len(_tasks) == 0 and not quiet:
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
 
-        hasBar = True
-        taskName = f"Tokenizing {filePath.name}"
-        _InitializeTask(taskName=taskName, total=1, quiet=quiet)
+    if not isinstance(workers, int) or isinstance(workers, bool):
 
-    tokens = TokenizeStr(
-        string=fileContents,
-        model=model,
-        encodingName=encodingName,
-        encoding=encoding,
-        quiet=quiet,
-    )
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
 
-    if hasBar:
+    if workers < 1:
 
-        _UpdateTask(
-            taskName=taskName,
-            advance=1,
-            description=f"Done Tokenizing {filePath.name}",
-            quiet=quiet,
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    if not isinstance(backend, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
         )
 
-    return tokens
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
 
+    if not isinstance(returnType, str):
 
-def GetNumTokenFile(
-    filePath: Path | str,
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
+
+    if returnType not in RETURN_TYPES:
+
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
+
+    if returnType == "numpy":
+
+        _ImportNumpy()
+
+    if not isinstance(order, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "order". Expected type: str. Given type: {type(order)}'
+        )
+
+    if order not in RESULT_ORDERS:
+
+        raise ValueError(
+            f"Invalid order: {order}\n\nValid orders:\n{RESULT_ORDERS_STR}"
+        )
+
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    dirPath = Path(dirPath).resolve()
+
+    if not dirPath.is_dir():
+
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+    return _IterDirResults(
+        dirPath=dirPath,
+        filePaths=_WalkDirFiles(
+            dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+        ),
+        encoding=_ResolveEncoding(
+            model=model, encodingName=encodingName, encoding=encoding
+        ),
+        countOnly=False,
+        detectionStrategy=detectionStrategy,
+        workers=workers,
+        backend=backend,
+        returnType=returnType,
+        order=order,
+    )
+
+
+def GetNumTokenDir(
+    dirPath: Path | str,
     model: str | None = None,
     encodingName: str | None = None,
     encoding: tiktoken.Encoding | None = None,
+    recursive: bool = True,
     quiet: bool = False,
+    progress: ProgressReporter | None = None,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    cache: TokenCache | None = None,
+    maxTokens: int | None = None,
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
 ) -> int:
     """
-    Get the number of tokens in a file based on the specified model or encoding.
+    Get the number of tokens in all files within a directory based on the specified model or encoding.
 
     Parameters
     ----------
-    filePath : Path or str
-        The path to the file to count tokens for.
+    dirPath : Path or str
+        The path to the directory to count tokens for.
     model : str or None, optional
         The name of the model to use for encoding. If provided, the encoding
         associated with the model will be used.
@@ -1039,46 +4398,91 @@ def GetNumTokenFile(
     encoding : tiktoken.Encoding or None, optional
         An existing tiktoken.Encoding object to use for tokenization. If provided,
         it must match the encoding derived from the model or encodingName.
-    quiet : bool, optional
-        If True, suppress progress updates (default is False).
+    recursive : bool, default True
+        Whether to count tokens in files in subdirectories recursively.
+    quiet : bool, default False
+        If True, suppress progress updates.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing files
+        across. With 1, files are processed one at a time in this process.
+        The result is the same for any number of workers.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1. "process"
+        spreads the work across processes; "thread" uses threads, which start
+        faster and hand token lists back without pickling them.
+    cache : TokenCache or None, optional
+        A persistent token cache to look file contents up in before tokenizing them,
+        and to store the results of files that miss (default is None).
+    maxTokens : int or None, optional
+        A total token budget (default is None). No further files are counted once
+        the running total exceeds it, and the total returned is then greater than
+        "maxTokens", but may be less than the full total.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
 
     Returns
     -------
     int
-        The number of tokens in the file.
+        The total number of tokens across all files in the directory, or a partial
+        total greater than "maxTokens" if counting stopped early.
 
     Raises
     ------
     TypeError
-        If the types of "filePath", "model", "encodingName", or "encoding" are incorrect.
+        If the types of "dirPath", "model", "encodingName", "encoding", "recursive", "workers", "backend", "maxTokens", "include", "exclude", "respectGitignore", or "maxFileSize" are incorrect.
     ValueError
-        If the provided "model" or "encodingName" is invalid, or if there is a
-        mismatch between the model and encoding name, or between the provided
-        encoding and the derived encoding.
-    UnsupportedEncodingError
-        If the file's encoding is not supported (i.e., not UTF-8, ASCII, or another
-        text encoding format supported by the chardet package).
-    FileNotFoundError
-        If the specified file does not exist.
+        If the provided "dirPath" is not a directory, if "workers" is less than 1,
+        if "backend" is not a valid backend, or if "maxTokens" or "maxFileSize" is
+        negative.
+    RuntimeError
+        If an unexpected error occurs during token counting.
 
     Examples
     --------
-    >>> from PyTokenCounter import GetNumTokenFile
+    >>> from PyTokenCounter import GetNumTokenDir
     >>> from pathlib import Path
-    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile1.txt")
-    >>> numTokens = GetNumTokenFile(filePath=filePath, model="gpt-4o")
-    >>> print(numTokens)
-    221
-    >>> filePath = Path("./PyTokenCounter/Tests/Input/TestFile2.txt")
-    >>> numTokens = GetNumTokenFile(filePath=filePath, model="gpt-4o")
-    >>> print(numTokens)
-    213
+    >>> dirPath = Path("./PyTokenCounter/Tests/Input/TestDirectory")
+    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, model='gpt-4o')
+    >>> print(total_tokens)
+    1500
+    >>> import tiktoken
+    >>> encoding = tiktoken.get_encoding('p50k_base')
+    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, encoding=encoding, recursive=False)
+    >>> print(total_tokens)
+    2000
+    >>> # Counting tokens with recursion
+    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, model='gpt-3.5-turbo', recursive=True)
+    >>> print(total_tokens)
+    3000
     """
 
-    if not isinstance(filePath, (str, Path)):
+    import tiktoken
+
+    if not isinstance(dirPath, (str, Path)):
 
         raise TypeError(
-            f'Unexpected type for parameter "filePath". Expected type: str or pathlib.Path. Given type: {type(filePath)}'
+            f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
         )
 
     if model is not None and not isinstance(model, str):
@@ -1099,54 +4503,117 @@ def GetNumTokenFile(
             f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
         )
 
-    filePath = Path(filePath)
+    if not isinstance(recursive, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+        )
 
-    hasBar = False
-    taskName = None
+    if not isinstance(detectionStrategy, str):
 
-    if len(_tasks) == 0 and not quiet:
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
 
-        hasBar = True
-        taskName = f"Counting Tokens in {filePath.name}"
-        _InitializeTask(taskName=taskName, total=1, quiet=quiet)
+    if detectionStrategy not in DETECTION_STRATEGIES:
 
-    numTokens = len(
-        TokenizeFile(
-            filePath=filePath,
-            model=model,
-            encodingName=encodingName,
-            encoding=encoding,
-            quiet=quiet,
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
         )
-    )
 
-    if hasBar:
+    if not isinstance(workers, int) or isinstance(workers, bool):
 
-        _UpdateTask(
-            taskName=taskName,
-            advance=1,
-            description=f"Done Counting Tokens in {filePath.name}",
-            quiet=quiet,
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
         )
 
-    return numTokens
+    if workers < 1:
 
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
 
-def TokenizeDir(
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if not isinstance(backend, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
+
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
+
+    if maxTokens is not None and (
+        not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens is not None and maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
+    dirPath = Path(dirPath).resolve()
+
+    if not dirPath.is_dir():
+
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
+
+    return _GetNumTokenDirFiles(
+        dirPath=dirPath,
+        encoding=_ResolveEncoding(
+            model=model, encodingName=encodingName, encoding=encoding
+        ),
+        recursive=recursive,
+        pathFilter=pathFilter,
+        progress=GetProgressReporter(quiet=quiet, progress=progress),
+        detectionStrategy=detectionStrategy,
+        workers=workers,
+        backend=backend,
+        cache=cache,
+        maxTokens=maxTokens,
+    )
+
+
+def IterCountDir(
     dirPath: Path | str,
     model: str | None = None,
     encodingName: str | None = None,
     encoding: tiktoken.Encoding | None = None,
     recursive: bool = True,
-    quiet: bool = False,
-) -> dict[str, list[int] | dict]:
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    cache: TokenCache | None = None,
+    order: str = "walk",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> Iterator[DirFileResult]:
     """
-    Tokenize all files in a directory into lists of token IDs using the specified model or encoding.
+    Count the tokens of all files in a directory, yielding the count of each file
+    as soon as it is done. GetNumTokenDir is built on the same results.
 
     Parameters
     ----------
     dirPath : Path or str
-        The path to the directory to tokenize.
+        The path to the directory to count tokens for.
     model : str or None, optional
         The name of the model to use for encoding. If provided, the encoding
         associated with the model will be used.
@@ -1157,92 +4624,63 @@ def TokenizeDir(
         An existing tiktoken.Encoding object to use for tokenization. If provided,
         it must match the encoding derived from the model or encodingName.
     recursive : bool, default True
-        Whether to tokenize files in subdirectories recursively.
-    quiet : bool, default False
-        If True, suppress progress updates.
-
-    Returns
-    -------
-    dict[str, list[int] | dict]
-        A nested dictionary where each key is a file or subdirectory name:
-        - If the key is a file, its value is a list of token IDs.
-        - If the key is a subdirectory, its value is another dictionary following the same structure.
+        Whether to include files in subdirectories recursively.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing files
+        across. At most two batches of files per worker are in flight at once.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1: "process"
+        or "thread".
+    cache : TokenCache or None, optional
+        A persistent token cache to look file contents up in before tokenizing them,
+        and to store the results of files that miss (default is None).
+    order : str, default "walk"
+        "walk" yields files in the order the directory is walked, like
+        GetNumTokenDir. "completion" yields them as workers finish them, so that
+        one slow file does not hold back the others.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
+
+    Yields
+    ------
+    DirFileResult
+        The relative path, token count and status of each file, with "tokens" set
+        to None. Files with an unsupported encoding are yielded with the status
+        "skipped".
 
     Raises
     ------
     TypeError
-        If the types of "dirPath", "model", "encodingName", "encoding", or "recursive" are incorrect.
-    ValueError
-        If the provided "dirPath" is not a directory.
-    RuntimeError
-        If an unexpected error occurs during tokenization.
-
-    Examples
-    --------
-    >>> from PyTokenCounter import TokenizeDir
-    >>> from pathlib import Path
-    >>> dirPath = Path("./PyTokenCounter/Tests/Input/TestDirectory")
-    >>> tokenizedDir = TokenizeDir(dirPath=dirPath, model='gpt-4o')
-    >>> print(tokenizedDir)
-    {
-            'TestDir1.txt': [
-                976, 19458, 5831, 23757, 306, 290, ..., 26321, 13
-            ],
-            'TestDir2.txt': {
-                'numTokens': 132,
-            'tokens':
-            [
-                976,
-                5030,
-                45940,
-                295,
-                483,
-               ...,
-               1665,
-               4717,
-               13
-            ]
-        },
-        'TestDir3.txt': {
-            'numTokens': 140,
-            'tokens':
-            [
-                976, 29011, 38841, 306, 483,  ..., 16592, 316, 21846, 4194, 483, 290, 69214, 13
-            ]
-        },
-        'TestSubDir': {
-            'TestDir4.txt': {
-                'numTokens': 127,
-                'tokens': [
-                    976,
-                    21689,
-                    12761,
-                    50217,
-                    71327,
-                    412,
-                    ...,
-                    10740,
-                    13
-                ]
-            },
-            'TestDir5.txt': {
-                'numTokens': 128,
-                'tokens': [
-                    65307,
-                    16953,
-                    34531,
-                    290,
-                    37603,
-                    306,
-                   ...,
-                   34618,
-                   13
-                ]
-            }
-        }
-    }
+        If the types of the parameters are incorrect.
+    ValueError
+        If the provided "dirPath" is not a directory, if "workers" is less than 1, or
+        if "backend" or "order" is not valid.
+
+    Examples
+    --------
+    >>> from PyTokenCounter import IterCountDir
+    >>> for result in IterCountDir("./Tests/Input", model="gpt-4o", workers=4, order="completion"):
+    ...     print(result.path, result.numTokens)
     """
 
+    import tiktoken
+
     if not isinstance(dirPath, (str, Path)):
 
         raise TypeError(
@@ -1273,106 +4711,114 @@ def TokenizeDir(
             f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
         )
 
-    dirPath = Path(dirPath).resolve()
-
-    if not dirPath.is_dir():
-
-        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
-
-    numFiles = _CountDirFiles(dirPath=dirPath, recursive=recursive)
-
-    if not quiet:
+    if not isinstance(detectionStrategy, str):
 
-        taskName = "Tokenizing Directory"
-        _InitializeTask(taskName=taskName, total=numFiles, quiet=quiet)
-
-    else:
-
-        taskName = None
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
 
-    tokenizedDir: dict[str, list[int] | dict] = {}
-    subDirPaths: list[Path] = []
+    if detectionStrategy not in DETECTION_STRATEGIES:
 
-    for entry in dirPath.iterdir():
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
 
-        if entry.is_dir():
+    if not isinstance(workers, int) or isinstance(workers, bool):
 
-            subDirPaths.append(entry)
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
 
-        else:
+    if workers < 1:
 
-            if not quiet:
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
 
-                _UpdateTask(
-                    taskName=taskName,
-                    advance=0,
-                    description=f"Tokenizing {entry.relative_to(dirPath)}",
-                    quiet=quiet,
-                )
+    if not isinstance(backend, str):
 
-            try:
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
 
-                tokenizedFile = TokenizeFile(
-                    filePath=entry,
-                    model=model,
-                    encodingName=encodingName,
-                    encoding=encoding,
-                    quiet=quiet,
-                )
-                tokenizedDir[entry.name] = tokenizedFile
+    if backend not in PARALLEL_BACKENDS:
 
-                if not quiet:
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
 
-                    _UpdateTask(
-                        taskName=taskName,
-                        advance=1,
-                        description=f"Done Tokenizing {entry.relative_to(dirPath)}",
-                        quiet=quiet,
-                    )
+    if cache is not None and not isinstance(cache, TokenCache):
 
-            except UnsupportedEncodingError as e:
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
 
-                if not quiet:
+    if not isinstance(order, str):
 
-                    _UpdateTask(
-                        taskName=taskName,
-                        advance=1,
-                        description=f"Skipping {entry.relative_to(dirPath)}",
-                        quiet=quiet,
-                    )
+        raise TypeError(
+            f'Unexpected type for parameter "order". Expected type: str. Given type: {type(order)}'
+        )
 
-                continue
+    if order not in RESULT_ORDERS:
 
-    if recursive:
+        raise ValueError(
+            f"Invalid order: {order}\n\nValid orders:\n{RESULT_ORDERS_STR}"
+        )
 
-        for subDirPath in subDirPaths:
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
 
-            tokenizedSubDir = TokenizeDir(
-                dirPath=subDirPath,
-                model=model,
-                encodingName=encodingName,
-                encoding=encoding,
-                recursive=recursive,
-                quiet=quiet,
-            )
+    dirPath = Path(dirPath).resolve()
 
-            if tokenizedSubDir:
+    if not dirPath.is_dir():
 
-                tokenizedDir[subDirPath.name] = tokenizedSubDir
+        raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
 
-    return tokenizedDir
+    return _IterDirResults(
+        dirPath=dirPath,
+        filePaths=_WalkDirFiles(
+            dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+        ),
+        encoding=_ResolveEncoding(
+            model=model, encodingName=encodingName, encoding=encoding
+        ),
+        countOnly=True,
+        detectionStrategy=detectionStrategy,
+        workers=workers,
+        backend=backend,
+        cache=cache,
+        order=order,
+    )
 
 
-def GetNumTokenDir(
+def GetNumTokenDirIncremental(
     dirPath: Path | str,
     model: str | None = None,
     encodingName: str | None = None,
     encoding: tiktoken.Encoding | None = None,
     recursive: bool = True,
     quiet: bool = False,
-) -> int:
+    progress: ProgressReporter | None = None,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    cache: TokenCache | None = None,
+    manifest: TokenManifest | None = None,
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> dict:
     """
-    Get the number of tokens in all files within a directory based on the specified model or encoding.
+    Get the number of tokens in all files within a directory, recounting only the
+    files that changed since the previous run recorded in a manifest.
+
+    Every file in the directory is stat'ed, and a file whose size, modification time
+    and inode still match its manifest entry is not read again. Only new and
+    modified files are read and tokenized, and the manifest is then updated to
+    match the directory.
 
     Parameters
     ----------
@@ -1391,38 +4837,67 @@ def GetNumTokenDir(
         Whether to count tokens in files in subdirectories recursively.
     quiet : bool, default False
         If True, suppress progress updates.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing the new
+        and modified files across.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1, "process"
+        or "thread".
+    cache : TokenCache or None, optional
+        A persistent token cache to look the contents of new and modified files up
+        in before tokenizing them (default is None).
+    manifest : TokenManifest or None, optional
+        The manifest recording the previous run. Defaults to a TokenManifest at
+        the default location, which is closed again before returning.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep (default
+        is None, which keeps every file). A file inside a matching directory is
+        kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
 
     Returns
     -------
-    int
-        The total number of tokens across all files in the directory.
+    dict
+        "numTokens", the total number of tokens across all files in the directory,
+        and the files whose token counts changed since the previous run, keyed by
+        POSIX-style path relative to the directory: "added" maps new files to their
+        token counts, "changed" maps modified files to their new token counts and
+        "removed" maps removed files to their previous token counts. On the first
+        run, every file is "added". Files with an unsupported encoding are
+        skipped.
 
     Raises
     ------
     TypeError
-        If the types of "dirPath", "model", "encodingName", "encoding", or "recursive" are incorrect.
+        If the types of "dirPath", "model", "encodingName", "encoding", "recursive", "workers", "backend", "cache", "manifest", "include", "exclude", "respectGitignore" or "maxFileSize" are incorrect.
     ValueError
-        If the provided "dirPath" is not a directory.
-    RuntimeError
-        If an unexpected error occurs during token counting.
+        If the provided "dirPath" is not a directory, if "workers" is less than 1,
+        if "backend" is not a valid backend, or if "maxFileSize" is negative.
 
     Examples
     --------
-    >>> from PyTokenCounter import GetNumTokenDir
-    >>> from pathlib import Path
-    >>> dirPath = Path("./PyTokenCounter/Tests/Input/TestDirectory")
-    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, model='gpt-4o')
-    >>> print(total_tokens)
-    1500
-    >>> import tiktoken
-    >>> encoding = tiktoken.get_encoding('p50k_base')
-    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, encoding=encoding, recursive=False)
-    >>> print(total_tokens)
-    2000
-    >>> # Counting tokens with recursion
-    >>> total_tokens = GetNumTokenDir(dirPath=dirPath, model='gpt-3.5-turbo', recursive=True)
-    >>> print(total_tokens)
-    3000
+    >>> from PyTokenCounter import GetNumTokenDirIncremental
+    >>> GetNumTokenDirIncremental(dirPath="./Data", model="gpt-4o")
+    {'numTokens': 1500, 'added': {'a.txt': 1000, 'b.txt': 500}, 'changed': {}, 'removed': {}}
+    >>> # After editing a.txt and deleting b.txt
+    >>> GetNumTokenDirIncremental(dirPath="./Data", model="gpt-4o")
+    {'numTokens': 1100, 'added': {}, 'changed': {'a.txt': 1100}, 'removed': {'b.txt': 500}}
     """
 
     if not isinstance(dirPath, (str, Path)):
@@ -1431,111 +4906,235 @@ def GetNumTokenDir(
             f'Unexpected type for parameter "dirPath". Expected type: str or pathlib.Path. Given type: {type(dirPath)}'
         )
 
-    if model is not None and not isinstance(model, str):
+    if not isinstance(recursive, bool):
 
         raise TypeError(
-            f'Unexpected type for parameter "model". Expected type: str. Given type: {type(model)}'
+            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
         )
 
-    if encodingName is not None and not isinstance(encodingName, str):
+    if not isinstance(detectionStrategy, str):
 
         raise TypeError(
-            f'Unexpected type for parameter "encodingName". Expected type: str. Given type: {type(encodingName)}'
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
         )
 
-    if encoding is not None and not isinstance(encoding, tiktoken.Encoding):
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if not isinstance(workers, int) or isinstance(workers, bool):
 
         raise TypeError(
-            f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
         )
 
-    if not isinstance(recursive, bool):
+    if workers < 1:
+
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    if not isinstance(backend, str):
 
         raise TypeError(
-            f'Unexpected type for parameter "recursive". Expected type: bool. Given type: {type(recursive)}'
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
+
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
+
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if manifest is not None and not isinstance(manifest, TokenManifest):
+
+        raise TypeError(
+            f'Unexpected type for parameter "manifest". Expected type: PyTokenCounter.TokenManifest. Given type: {type(manifest)}'
         )
 
+    encoding = _ResolveEncoding(
+        model=model, encodingName=encodingName, encoding=encoding
+    )
+
+    pathFilter = _GetPathFilter(
+        include=include,
+        exclude=exclude,
+        respectGitignore=respectGitignore,
+        maxFileSize=maxFileSize,
+    )
+
     dirPath = Path(dirPath).resolve()
 
     if not dirPath.is_dir():
 
         raise ValueError(f'Given directory path "{dirPath}" is not a directory.')
 
-    numFiles = _CountDirFiles(dirPath=dirPath, recursive=recursive)
+    if manifest is None:
+
+        with TokenManifest() as defaultManifest:
+
+            return GetNumTokenDirIncremental(
+                dirPath=dirPath,
+                encoding=encoding,
+                recursive=recursive,
+                include=include,
+                exclude=exclude,
+                respectGitignore=respectGitignore,
+                maxFileSize=maxFileSize,
+                quiet=quiet,
+                progress=progress,
+                detectionStrategy=detectionStrategy,
+                workers=workers,
+                backend=backend,
+                cache=cache,
+                manifest=defaultManifest,
+            )
+
+    reporter = GetProgressReporter(quiet=quiet, progress=progress)
 
-    if not quiet:
+    # A file modified again within the same timestamp tick as this run's stat would
+    # keep its recorded signature, so files this recent are recorded unverified and
+    # read again on the next run.
+    racyMtimeNs = time.time_ns() - _MANIFEST_RACY_WINDOW_NS
 
-        taskName = "Counting Tokens in Directory"
-        _InitializeTask(taskName=taskName, total=numFiles, quiet=quiet)
+    previousEntries = manifest.Load(
+        root=dirPath, encodingName=encoding.name, detectionStrategy=detectionStrategy
+    )
+    currentEntries: dict[str, ManifestEntry] = {}
+    pendingStats: dict[Path, tuple[str, os.stat_result]] = {}
+    prefixLength = _GetRelativePathPrefixLength(dirPath=dirPath)
 
-    else:
+    for filePath in _WalkDirFiles(
+        dirPath=dirPath, recursive=recursive, pathFilter=pathFilter
+    ):
 
-        taskName = None
+        relativePath = _GetRelativePath(filePath=filePath, prefixLength=prefixLength)
 
-    runningTokenTotal = 0
-    subDirPaths: list[Path] = []
+        try:
+
+            stat = filePath.stat()
 
-    for entry in dirPath.iterdir():
+        except FileNotFoundError:
 
-        if entry.is_dir():
+            continue
 
-            subDirPaths.append(entry)
+        previousEntry = previousEntries.get(relativePath)
+
+        if (
+            previousEntry is not None
+            and previousEntry.size == stat.st_size
+            and previousEntry.mtimeNs == stat.st_mtime_ns
+            and previousEntry.inode == stat.st_ino
+        ):
+
+            currentEntries[relativePath] = previousEntry
 
         else:
 
-            if not quiet:
+            pendingStats[filePath] = (relativePath, stat)
 
-                _UpdateTask(
-                    taskName=taskName,
-                    advance=0,
-                    description=f"Counting Tokens in {entry.relative_to(dirPath)}",
-                    quiet=quiet,
-                )
+    updatedEntries: list[tuple[str, ManifestEntry]] = []
 
-            try:
+    if pendingStats:
+
+        pendingPaths = list(pendingStats)
+
+        results = _IterCountFileJobs(
+            filePaths=pendingPaths,
+            encoding=encoding,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+        )
 
-                runningTokenTotal += GetNumTokenFile(
-                    filePath=entry,
-                    model=model,
-                    encodingName=encodingName,
-                    encoding=encoding,
-                    quiet=quiet,
+        with reporter.StartTask(
+            description="Counting Tokens in Directory", total=len(pendingPaths)
+        ) as task:
+
+            for filePath, numTokens in results:
+
+                relativePath, stat = pendingStats[filePath]
+
+                if isinstance(numTokens, UnsupportedEncodingError):
+
+                    numTokens = None
+                    description = f"Skipping {relativePath}"
+
+                else:
+
+                    description = f"Done Counting Tokens in {relativePath}"
+
+                entry = ManifestEntry(
+                    size=stat.st_size,
+                    mtimeNs=stat.st_mtime_ns if stat.st_mtime_ns < racyMtimeNs else -1,
+                    inode=stat.st_ino,
+                    numTokens=numTokens,
                 )
+                currentEntries[relativePath] = entry
+                updatedEntries.append((relativePath, entry))
+
+                task.Advance(advance=1, description=description)
+
+    removedPaths = [
+        relativePath
+        for relativePath in previousEntries
+        if relativePath not in currentEntries
+    ]
+
+    manifest.Update(
+        root=dirPath,
+        encodingName=encoding.name,
+        entries=updatedEntries,
+        removed=removedPaths,
+        detectionStrategy=detectionStrategy,
+    )
 
-                if not quiet:
+    added: dict[str, int] = {}
+    changed: dict[str, int] = {}
+    removed: dict[str, int] = {}
 
-                    _UpdateTask(
-                        taskName=taskName,
-                        advance=1,
-                        description=f"Done Counting Tokens in {entry.relative_to(dirPath)}",
-                        quiet=quiet,
-                    )
+    for relativePath, entry in updatedEntries:
 
-            except UnsupportedEncodingError:
+        previousEntry = previousEntries.get(relativePath)
+        previousNumTokens = previousEntry.numTokens if previousEntry else None
 
-                if not quiet:
+        if entry.numTokens is None:
 
-                    _UpdateTask(
-                        taskName=taskName,
-                        advance=1,
-                        description=f"Skipping {entry.relative_to(dirPath)}",
-                        quiet=quiet,
-                    )
+            if previousNumTokens is not None:
 
-                continue
+                removed[relativePath] = previousNumTokens
 
-    for subDirPath in subDirPaths:
+        elif previousNumTokens is None:
 
-        runningTokenTotal += GetNumTokenDir(
-            dirPath=subDirPath,
-            model=model,
-            encodingName=encodingName,
-            encoding=encoding,
-            recursive=recursive,
-            quiet=quiet,
-        )
+            added[relativePath] = entry.numTokens
 
-    return runningTokenTotal
+        elif entry.numTokens != previousNumTokens:
+
+            changed[relativePath] = entry.numTokens
+
+    for relativePath in removedPaths:
+
+        if previousEntries[relativePath].numTokens is not None:
+
+            removed[relativePath] = previousEntries[relativePath].numTokens
+
+    return {
+        "numTokens": sum(
+            entry.numTokens
+            for entry in currentEntries.values()
+            if entry.numTokens is not None
+        ),
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+    }
 
 
 def TokenizeFiles(
@@ -1546,8 +5145,23 @@ def TokenizeFiles(
     encoding: tiktoken.Encoding | None = None,
     recursive: bool = True,
     quiet: bool = False,
+    progress: ProgressReporter | None = None,
     exitOnListError: bool = True,
-) -> list[int] | dict[str, list[int] | dict]:
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    returnType: str = "list",
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
+) -> (
+    list[int]
+    | array
+    | memoryview
+    | numpy.ndarray
+    | dict[str, list[int] | array | memoryview | numpy.ndarray | dict]
+):
     """
     Tokenize multiple files or all files within a directory into lists of token IDs using the specified model or encoding.
 
@@ -1569,13 +5183,50 @@ def TokenizeFiles(
         recursively.
     quiet : bool, default False
         If True, suppress progress updates.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
     exitOnListError : bool, default True
         If True, stop processing the list upon encountering an error. If False,
         skip files that cause errors.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing the files
+        across, for a list of files or a directory.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1. "process"
+        spreads the work across processes; "thread" uses threads, which start
+        faster and hand token lists back without pickling them.
+    returnType : str, default "list"
+        The container to return the token IDs in. One of "list", "array"
+        (array.array), "numpy" (numpy.ndarray, requires NumPy) or "buffer"
+        (memoryview). The packed containers hold unsigned 16-bit IDs when every
+        token of the encoding fits, and unsigned 32-bit IDs otherwise.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep when inputPath
+        is a directory (default is None, which keeps every file). A file inside a
+        matching directory is kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
 
     Returns
     -------
     list[int] | dict[str, list[int] | dict]
+        Token IDs are returned in the container named by "returnType", shown here
+        for the default "list".
         - If `inputPath` is a file, returns a list of token IDs for that file.
         - If `inputPath` is a list of files, returns a dictionary where each key is
           the file name and the value is the list of token IDs for that file.
@@ -1588,15 +5239,19 @@ def TokenizeFiles(
     Raises
     ------
     TypeError
-        If the types of `inputPath`, `model`, `encodingName`, `encoding`, or
-        `recursive` are incorrect.
+        If the types of `inputPath`, `model`, `encodingName`, `encoding`,
+        `recursive`, `workers`, `backend`, `returnType`, `include`, `exclude`,
+        `respectGitignore`, or `maxFileSize` are incorrect.
     ValueError
-        If any of the provided file paths in a list are not files, or if a provided
-        directory path is not a directory.
+        If any of the provided file paths in a list are not files, if a provided
+        directory path is not a directory, if `workers` is less than 1, if
+        `backend` or `returnType` is not valid, or if `maxFileSize` is negative.
     UnsupportedEncodingError
         If any of the files to be tokenized have an unsupported encoding.
     RuntimeError
         If the provided `inputPath` is neither a file, a directory, nor a list.
+    ImportError
+        If `returnType` is "numpy" and NumPy is not installed.
 
     Examples
     --------
@@ -1697,6 +5352,8 @@ def TokenizeFiles(
     }
     """
 
+    import tiktoken
+
     if not isinstance(inputPath, (str, Path, list)):
 
         raise TypeError(
@@ -1731,92 +5388,76 @@ def TokenizeFiles(
             f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
         )
 
-    if isinstance(inputPath, list):
-
-        inputPath = [Path(entry) for entry in inputPath]
-
-        if not all(entry.is_file() for entry in inputPath):
-
-            nonFiles = [entry for entry in inputPath if not entry.is_file()]
+    if not isinstance(detectionStrategy, str):
 
-            raise ValueError(f"Given list contains non-file entries: {nonFiles}")
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
 
-        else:
+    if detectionStrategy not in DETECTION_STRATEGIES:
 
-            tokenizedFiles: dict[str, list[int]] = dict()
-            numFiles = len(inputPath)
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
 
-            if not quiet:
+    if not isinstance(workers, int) or isinstance(workers, bool):
 
-                _InitializeTask(
-                    taskName="Tokenizing File List", total=numFiles, quiet=quiet
-                )
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
 
-            for file in inputPath:
+    if workers < 1:
 
-                if not quiet:
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
 
-                    _UpdateTask(
-                        taskName="Tokenizing File List",
-                        advance=0,
-                        description=f"Tokenizing {file.name}",
-                        quiet=quiet,
-                    )
+    if not isinstance(backend, str):
 
-                if exitOnListError:
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
 
-                    tokenizedFiles[file.name] = TokenizeFile(
-                        filePath=file,
-                        model=model,
-                        encodingName=encodingName,
-                        encoding=encoding,
-                        quiet=quiet,
-                    )
+    if backend not in PARALLEL_BACKENDS:
 
-                    if not quiet:
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
 
-                        _UpdateTask(
-                            taskName="Tokenizing File List",
-                            advance=1,
-                            description=f"Done Tokenizing {file.name}",
-                            quiet=quiet,
-                        )
+    if not isinstance(returnType, str):
 
-                else:
+        raise TypeError(
+            f'Unexpected type for parameter "returnType". Expected type: str. Given type: {type(returnType)}'
+        )
 
-                    try:
+    if returnType not in RETURN_TYPES:
 
-                        tokenizedFiles[file.name] = TokenizeFile(
-                            filePath=file,
-                            model=model,
-                            encodingName=encodingName,
-                            encoding=encoding,
-                            quiet=quiet,
-                        )
+        raise ValueError(
+            f"Invalid return type: {returnType}\n\nValid return types:\n{RETURN_TYPES_STR}"
+        )
 
-                        if not quiet:
+    if isinstance(inputPath, list):
 
-                            _UpdateTask(
-                                taskName="Tokenizing File List",
-                                advance=1,
-                                description=f"Done Tokenizing {file.name}",
-                                quiet=quiet,
-                            )
+        inputPath = [Path(entry) for entry in inputPath]
 
-                    except UnsupportedEncodingError:
+        if not all(entry.is_file() for entry in inputPath):
 
-                        if not quiet:
+            nonFiles = [entry for entry in inputPath if not entry.is_file()]
 
-                            _UpdateTask(
-                                taskName="Tokenizing File List",
-                                advance=1,
-                                description=f"Skipping {file.name}",
-                                quiet=quiet,
-                            )
+            raise ValueError(f"Given list contains non-file entries: {nonFiles}")
 
-                        continue
+        else:
 
-            return tokenizedFiles
+            return _TokenizeFileList(
+                filePaths=inputPath,
+                encoding=_ResolveEncoding(
+                    model=model, encodingName=encodingName, encoding=encoding
+                ),
+                progress=GetProgressReporter(quiet=quiet, progress=progress),
+                exitOnListError=exitOnListError,
+                detectionStrategy=detectionStrategy,
+                workers=workers,
+                backend=backend,
+                returnType=returnType,
+            )
 
     else:
 
@@ -1830,6 +5471,9 @@ def TokenizeFiles(
             encodingName=encodingName,
             encoding=encoding,
             quiet=quiet,
+            progress=progress,
+            detectionStrategy=detectionStrategy,
+            returnType=returnType,
         )
 
     elif inputPath.is_dir():
@@ -1840,7 +5484,16 @@ def TokenizeFiles(
             encodingName=encodingName,
             encoding=encoding,
             recursive=recursive,
+            include=include,
+            exclude=exclude,
+            respectGitignore=respectGitignore,
+            maxFileSize=maxFileSize,
             quiet=quiet,
+            progress=progress,
+            detectionStrategy=detectionStrategy,
+            workers=workers,
+            backend=backend,
+            returnType=returnType,
         )
 
     else:
@@ -1858,7 +5511,17 @@ def GetNumTokenFiles(
     encoding: tiktoken.Encoding | None = None,
     recursive: bool = True,
     quiet: bool = False,
+    progress: ProgressReporter | None = None,
     exitOnListError: bool = True,
+    detectionStrategy: str = "full",
+    workers: int = 1,
+    backend: str = "process",
+    cache: TokenCache | None = None,
+    maxTokens: int | None = None,
+    include: str | list[str] | None = None,
+    exclude: str | list[str] | None = None,
+    respectGitignore: bool = False,
+    maxFileSize: int | None = None,
 ) -> int:
     """
     Get the number of tokens in multiple files or all files within a directory based on the specified model or encoding.
@@ -1881,23 +5544,64 @@ def GetNumTokenFiles(
         subdirectories recursively.
     quiet : bool, default False
         If True, suppress progress updates.
+    progress : ProgressReporter or None, optional
+        The reporter to report progress to (default is None, which draws progress
+        bars with "rich"). Ignored if "quiet" is True.
     exitOnListError : bool, default True
         If True, stop processing the list upon encountering an error. If False,
         skip files that cause errors.
+    detectionStrategy : str, default "full"
+        How much of each file to run encoding detection over when it is not valid
+        UTF-8. One of "full", "sampled-prefix", "sampled-stripes" or "utf8-only".
+        The sampled strategies cap detection at a fixed number of bytes per file,
+        and "utf8-only" skips detection entirely.
+    workers : int, default 1
+        The number of workers to spread reading, decoding and tokenizing the files
+        across, for a list of files or a directory.
+    backend : str, default "process"
+        The kind of worker pool used when "workers" is greater than 1. "process"
+        spreads the work across processes; "thread" uses threads, which start
+        faster and hand token lists back without pickling them.
+    cache : TokenCache or None, optional
+        A persistent token cache to look file contents up in before tokenizing them,
+        and to store the results of files that miss (default is None).
+    maxTokens : int or None, optional
+        A total token budget (default is None). No further files are counted once
+        the running total exceeds it, and the total returned is then greater than
+        "maxTokens", but may be less than the full total.
+    include : str, list[str] or None, optional
+        Glob patterns, in ".gitignore" syntax, of the files to keep when inputPath
+        is a directory (default is None, which keeps every file). A file inside a
+        matching directory is kept too.
+    exclude : str, list[str] or None, optional
+        Glob patterns of the files and directories to leave out (default is None).
+        Excluded directories are never descended into.
+    respectGitignore : bool, default False
+        Whether to leave out the files and directories ignored by the ".gitignore"
+        files of the directory and of its parents up to the root of its git
+        repository, and ".git" itself. Ignored directories are never descended
+        into.
+    maxFileSize : int or None, optional
+        The size in bytes above which files are left out without being read
+        (default is None).
 
     Returns
     -------
     int
-        The total number of tokens in the specified files or directory.
+        The total number of tokens in the specified files or directory, or a
+        partial total greater than "maxTokens" if counting stopped early.
 
     Raises
     ------
     TypeError
-        If the types of `inputPath`, `model`, `encodingName`, `encoding`, or
-        `recursive` are incorrect.
+        If the types of `inputPath`, `model`, `encodingName`, `encoding`,
+        `recursive`, `workers`, `backend`, `maxTokens`, `include`, `exclude`,
+        `respectGitignore`, or `maxFileSize` are incorrect.
     ValueError
-        If any of the provided file paths in a list are not files, or if a provided
-        directory path is not a directory.
+        If any of the provided file paths in a list are not files, if a provided
+        directory path is not a directory, if `workers` is less than 1, if
+        `backend` is not a valid backend, or if `maxTokens` or `maxFileSize` is
+        negative.
     UnsupportedEncodingError
         If any of the files to be tokenized have an unsupported encoding.
     RuntimeError
@@ -1926,6 +5630,8 @@ def GetNumTokenFiles(
     657
     """
 
+    import tiktoken
+
     if not isinstance(inputPath, (str, Path, list)):
 
         raise TypeError(
@@ -1960,6 +5666,58 @@ def GetNumTokenFiles(
             f'Unexpected type for parameter "encoding". Expected type: tiktoken.Encoding. Given type: {type(encoding)}'
         )
 
+    if not isinstance(detectionStrategy, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "detectionStrategy". Expected type: str. Given type: {type(detectionStrategy)}'
+        )
+
+    if detectionStrategy not in DETECTION_STRATEGIES:
+
+        raise ValueError(
+            f"Invalid detection strategy: {detectionStrategy}\n\nValid detection strategies:\n{DETECTION_STRATEGIES_STR}"
+        )
+
+    if not isinstance(workers, int) or isinstance(workers, bool):
+
+        raise TypeError(
+            f'Unexpected type for parameter "workers". Expected type: int. Given type: {type(workers)}'
+        )
+
+    if workers < 1:
+
+        raise ValueError(f'"workers" must be at least 1. Given value: {workers}')
+
+    if cache is not None and not isinstance(cache, TokenCache):
+
+        raise TypeError(
+            f'Unexpected type for parameter "cache". Expected type: PyTokenCounter.TokenCache. Given type: {type(cache)}'
+        )
+
+    if not isinstance(backend, str):
+
+        raise TypeError(
+            f'Unexpected type for parameter "backend". Expected type: str. Given type: {type(backend)}'
+        )
+
+    if backend not in PARALLEL_BACKENDS:
+
+        raise ValueError(
+            f"Invalid backend: {backend}\n\nValid backends:\n{PARALLEL_BACKENDS_STR}"
+        )
+
+    if maxTokens is not None and (
+        not isinstance(maxTokens, int) or isinstance(maxTokens, bool)
+    ):
+
+        raise TypeError(
+            f'Unexpected type for parameter "maxTokens". Expected type: int. Given type: {type(maxTokens)}'
+        )
+
+    if maxTokens is not None and maxTokens < 0:
+
+        raise ValueError(f'"maxTokens" must be at least 0. Given value: {maxTokens}')
+
     if isinstance(inputPath, list):
 
         inputPath = [Path(entry) for entry in inputPath]
@@ -1972,47 +5730,45 @@ def GetNumTokenFiles(
 
         else:
 
+            if workers > 1:
+
+                return _GetNumTokenFileListParallel(
+                    filePaths=inputPath,
+                    encoding=_ResolveEncoding(
+                        model=model, encodingName=encodingName, encoding=encoding
+                    ),
+                    progress=GetProgressReporter(quiet=quiet, progress=progress),
+                    exitOnListError=exitOnListError,
+                    detectionStrategy=detectionStrategy,
+                    cache=cache,
+                    workers=workers,
+                    backend=backend,
+                    maxTokens=maxTokens,
+                )
+
             runningTokenTotal = 0
-            numFiles = len(inputPath)
+            reporter = GetProgressReporter(quiet=quiet, progress=progress)
 
-            if not quiet:
+            with reporter.StartTask(
+                description="Counting Tokens in File List", total=len(inputPath)
+            ) as task:
 
-                _InitializeTask(
-                    taskName="Counting Tokens in File List", total=numFiles, quiet=quiet
-                )
+                for file in inputPath:
 
-            for file in inputPath:
+                    if maxTokens is not None and runningTokenTotal > maxTokens:
 
-                if not quiet:
+                        break
 
-                    _UpdateTask(
-                        taskName="Counting Tokens in File List",
-                        advance=0,
-                        description=f"Counting Tokens in {file.name}",
-                        quiet=quiet,
+                    # Each file only needs counting up to the budget left
+                    remainingTokens = (
+                        None if maxTokens is None else maxTokens - runningTokenTotal
                     )
 
-                if exitOnListError:
-
-                    runningTokenTotal += GetNumTokenFile(
-                        filePath=file,
-                        model=model,
-                        encodingName=encodingName,
-                        encoding=encoding,
-                        quiet=quiet,
+                    task.Advance(
+                        advance=0,
+                        description=lambda name=file.name: f"Counting Tokens in {name}",
                     )
 
-                    if not quiet:
-
-                        _UpdateTask(
-                            taskName="Counting Tokens in File List",
-                            advance=1,
-                            description=f"Done Counting Tokens in {file.name}",
-                            quiet=quiet,
-                        )
-
-                else:
-
                     try:
 
                         runningTokenTotal += GetNumTokenFile(
@@ -2020,31 +5776,30 @@ def GetNumTokenFiles(
                             model=model,
                             encodingName=encodingName,
                             encoding=encoding,
-                            quiet=quiet,
+                            quiet=True,
+                            detectionStrategy=detectionStrategy,
+                            cache=cache,
+                            maxTokens=remainingTokens,
                         )
 
-                        if not quiet:
-
-                            _UpdateTask(
-                                taskName="Counting Tokens in File List",
-                                advance=1,
-                                description=f"Done Counting Tokens in {file.name}",
-                                quiet=quiet,
-                            )
-
                     except UnsupportedEncodingError:
 
-                        if not quiet:
+                        if exitOnListError:
 
-                            _UpdateTask(
-                                taskName="Counting Tokens in File List",
-                                advance=1,
-                                description=f"Skipping {file.name}",
-                                quiet=quiet,
-                            )
+                            raise
+
+                        task.Advance(
+                            advance=1,
+                            description=lambda name=file.name: f"Skipping {name}",
+                        )
 
                         continue
 
+                    task.Advance(
+                        advance=1,
+                        description=lambda name=file.name: f"Done Counting Tokens in {name}",
+                    )
+
             return runningTokenTotal
 
     else:
@@ -2059,6 +5814,10 @@ def GetNumTokenFiles(
             encodingName=encodingName,
             encoding=encoding,
             quiet=quiet,
+            progress=progress,
+            detectionStrategy=detectionStrategy,
+            cache=cache,
+            maxTokens=maxTokens,
         )
 
     elif inputPath.is_dir():
@@ -2069,7 +5828,17 @@ def GetNumTokenFiles(
             encodingName=encodingName,
             encoding=encoding,
             recursive=recursive,
+            include=include,
+            exclude=exclude,
+            respectGitignore=respectGitignore,
+            maxFileSize=maxFileSize,
             quiet=quiet,
+            progress=progress,
+            detectionStrategy=detectionStrategy,
+            cache=cache,
+            workers=workers,
+            backend=backend,
+            maxTokens=maxTokens,
         )
 
     else:
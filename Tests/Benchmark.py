@@ -0,0 +1,1706 @@
+"""
+Benchmarks for PyTokenCounter.
+
+Run from the Tests directory:
+
+    python Benchmark.py              # run every benchmark
+    python Benchmark.py read-text    # run a single benchmark
+    python Benchmark.py workers      # GetNumTokenDir scaling with worker processes
+
+Each benchmark builds its own corpus in a temporary directory, so no extra
+fixtures are required.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import chardet
+
+from PyTokenCounter import (
+    CallbackProgressReporter,
+    GetEncoding,
+    GetNumTokenDir,
+    GetNumTokenDirIncremental,
+    GetNumTokenStr,
+    IsWithinTokenLimit,
+    LoggingProgressReporter,
+    ProgressUpdate,
+    RichProgressReporter,
+    TokenCache,
+    TokenCounter,
+    TokenizeFiles,
+    TokenizeStr,
+    TokenizeStrs,
+    TokenManifest,
+    TokenServerClient,
+    TruncateStr,
+    aGetNumTokenDir,
+    aGetNumTokenFile,
+    aGetNumTokenStr,
+)
+from PyTokenCounter._server import CreateTokenServer
+from PyTokenCounter._utils import (
+    DETECTION_STRATEGIES,
+    ReadTextFile,
+    UnsupportedEncodingError,
+)
+from PyTokenCounter.core import PARALLEL_BACKENDS, _GetPathFilter, _WalkDirFiles
+
+testInputDir = Path("./Input")
+
+# Target for the cumulative "-X importtime" of PyTokenCounter and its CLI, which
+# are imported on every tokencount call
+IMPORT_TIME_BUDGET_MS = 25
+
+# Size of the corpus the count-memory benchmark counts. Counting it through the
+# token list path needs several times its size in memory.
+COUNT_MEMORY_CORPUS_MB = 1024
+
+# Size of the file the chunk benchmark splits, and the chunk size and overlap
+CHUNK_CORPUS_MB = 64
+CHUNK_TOKENS = 512
+CHUNK_OVERLAP_TOKENS = 64
+
+LATIN1_SENTENCE = (
+    "Le garçon a mangé une crème brûlée à côté de la fenêtre. "
+    "Où est la bibliothèque? Il était très content de voir sa soeur, déjà arrivée. "
+    "Ça coûte cher, mais c'est délicieux. "
+)
+
+
+def ReadBytesCounter() -> int | None:
+    """
+    Return the number of bytes this process has read so far, or None if the
+    platform does not expose it (only Linux's /proc/self/io is supported).
+    """
+
+    try:
+
+        with open("/proc/self/io", "r") as ioFile:
+
+            for line in ioFile:
+
+                if line.startswith("rchar:"):
+
+                    return int(line.split()[1])
+
+    except OSError:
+
+        return None
+
+    return None
+
+
+def MeasureCall(func, *args, repeat: int = 5) -> tuple[float, int | None]:
+    """
+    Run `func(*args)` `repeat` times and return the best wall time in seconds and
+    the number of bytes read during a single call.
+    """
+
+    bestTime = float("inf")
+    bytesRead = None
+
+    for _ in range(repeat):
+
+        startBytes = ReadBytesCounter()
+        startTime = time.perf_counter()
+
+        func(*args)
+
+        elapsed = time.perf_counter() - startTime
+        endBytes = ReadBytesCounter()
+
+        bestTime = min(bestTime, elapsed)
+
+        if startBytes is not None and endBytes is not None:
+
+            bytesRead = endBytes - startBytes
+
+    return bestTime, bytesRead
+
+
+def FormatBytes(numBytes: int | None) -> str:
+    """
+    Format a byte count for display.
+    """
+
+    if numBytes is None:
+
+        return "n/a"
+
+    for unit in ("B", "KB", "MB", "GB"):
+
+        if numBytes < 1024 or unit == "GB":
+
+            return f"{numBytes:.0f} {unit}" if unit == "B" else f"{numBytes:.1f} {unit}"
+
+        numBytes /= 1024
+
+
+def LegacyReadTextFile(filePath: Path) -> str:
+    """
+    The pre-single-pass reader: run chardet over the whole file, then read it again.
+    """
+
+    with filePath.open("rb") as binaryFile:
+
+        encoding = chardet.detect(binaryFile.read())["encoding"]
+
+    if not encoding:
+
+        raise UnsupportedEncodingError(encoding=encoding, filePath=filePath)
+
+    return filePath.read_text(encoding="utf-8")
+
+
+def LegacyWalkDir(dirPath: Path) -> list[Path]:
+    """
+    The pre-scandir walk of GetNumTokenDir: count the files of the whole subtree to
+    size the progress bar, then walk it with Path.iterdir and Path.is_dir, repeating
+    both for every subdirectory.
+    """
+
+    def CountDirFiles(countPath: Path) -> int:
+
+        numFiles = 0
+
+        for entry in countPath.iterdir():
+
+            if entry.is_dir():
+
+                numFiles += CountDirFiles(entry)
+
+            else:
+
+                numFiles += 1
+
+        return numFiles
+
+    CountDirFiles(dirPath)
+    filePaths = []
+    subDirPaths = []
+
+    for entry in dirPath.iterdir():
+
+        if entry.is_dir():
+
+            subDirPaths.append(entry)
+
+        else:
+
+            filePaths.append(entry)
+
+    for subDirPath in subDirPaths:
+
+        filePaths.extend(LegacyWalkDir(subDirPath))
+
+    return filePaths
+
+
+def CountFileSystemCalls(func, *args) -> tuple[float, int]:
+    """
+    Time `func(*args)` and count the directory listing and stat calls it makes
+    through the os module, the calls behind both pathlib and os.scandir.
+    """
+
+    numCalls = 0
+    originals = {
+        name: getattr(os, name) for name in ("stat", "lstat", "listdir", "scandir")
+    }
+
+    def Counted(original):
+
+        def Wrapper(*wrappedArgs, **wrappedKwargs):
+
+            nonlocal numCalls
+            numCalls += 1
+
+            return original(*wrappedArgs, **wrappedKwargs)
+
+        return Wrapper
+
+    for name, original in originals.items():
+
+        setattr(os, name, Counted(original))
+
+    try:
+
+        startTime = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - startTime
+
+    finally:
+
+        for name, original in originals.items():
+
+            setattr(os, name, original)
+
+    return elapsed, numCalls
+
+
+def BuildTextCorpus(outDir: Path) -> list[Path]:
+    """
+    Write UTF-8 and Latin-1 text files of increasing size into `outDir`.
+    """
+
+    paragraph = (
+        Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+    ) * 4
+    files = []
+
+    for sizeName, repeats in (("4KB", 1), ("1MB", 256), ("16MB", 4096)):
+
+        utf8Path = Path(outDir, f"utf8_{sizeName}.txt")
+        utf8Path.write_text(paragraph * repeats, encoding="utf-8")
+        files.append(utf8Path)
+
+    latinPath = Path(outDir, "latin1_1MB.txt")
+    latinPath.write_bytes((LATIN1_SENTENCE * 6000).encode("latin-1"))
+    files.append(latinPath)
+
+    return files
+
+
+def BenchReadTextFile() -> None:
+    """
+    Compare bytes read and wall time per file for the legacy chardet-then-reread
+    path against the single-pass ReadTextFile.
+    """
+
+    print("read-text: legacy chardet + reread vs single-pass ReadTextFile")
+    print(
+        f"{'file':<18}{'size':>10}{'legacy read':>14}{'legacy time':>14}"
+        f"{'new read':>12}{'new time':>12}{'speedup':>10}"
+    )
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for filePath in BuildTextCorpus(Path(tempDir)):
+
+            repeat = 1 if filePath.stat().st_size > 4 * 1024 * 1024 else 5
+
+            try:
+
+                legacyTime, legacyBytes = MeasureCall(
+                    LegacyReadTextFile, filePath, repeat=repeat
+                )
+                legacyTimeStr = f"{legacyTime * 1000:.2f} ms"
+
+            except UnicodeDecodeError:
+
+                # The legacy path forces UTF-8 and cannot read Latin-1 at all
+                legacyBytes, legacyTime, legacyTimeStr = None, None, "error"
+
+            newTime, newBytes = MeasureCall(ReadTextFile, filePath, repeat=repeat)
+            speedup = f"{legacyTime / newTime:.1f}x" if legacyTime else "-"
+
+            print(
+                f"{filePath.name:<18}{FormatBytes(filePath.stat().st_size):>10}"
+                f"{FormatBytes(legacyBytes):>14}{legacyTimeStr:>14}"
+                f"{FormatBytes(newBytes):>12}{newTime * 1000:>9.2f} ms{speedup:>10}"
+            )
+
+
+def BenchDetectionStrategies() -> None:
+    """
+    Time each detection strategy on a large non-UTF-8 file, where detection runs.
+    """
+
+    print("detection: ReadTextFile on a 32 MB Latin-1 file per detection strategy")
+    print(f"{'strategy':<18}{'time':>12}{'decoded':>10}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        filePath = Path(tempDir, "latin1_32MB.txt")
+        filePath.write_bytes((LATIN1_SENTENCE * 192000).encode("latin-1"))
+
+        for strategy in DETECTION_STRATEGIES:
+
+            try:
+
+                elapsed, _ = MeasureCall(ReadTextFile, filePath, strategy, repeat=1)
+                print(f"{strategy:<18}{elapsed * 1000:>9.2f} ms{'yes':>10}")
+
+            except UnsupportedEncodingError:
+
+                print(f"{strategy:<18}{'-':>12}{'no':>10}")
+
+
+def BuildDirCorpus(outDir: Path, numFiles: int, textRepeats: int = 1) -> None:
+    """
+    Write `numFiles` distinct text files, each `textRepeats` paragraphs long, into
+    `outDir`, spread over nested subdirectories.
+    """
+
+    text = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+
+    for fileIndex in range(numFiles):
+
+        subDir = Path(outDir, f"dir{fileIndex % 16}", f"sub{fileIndex % 7}")
+        subDir.mkdir(parents=True, exist_ok=True)
+        Path(subDir, f"file{fileIndex}.txt").write_text(
+            f"{text * textRepeats}\n{fileIndex}", encoding="utf-8"
+        )
+
+
+def BenchDirWorkers() -> None:
+    """
+    Time GetNumTokenDir over a directory of small files for increasing numbers of
+    worker processes.
+    """
+
+    numFiles = 20000
+    cpuCount = os.cpu_count() or 1
+    workerCounts = sorted(
+        {1, *(count for count in (2, 4, 8, 16, 32) if count <= cpuCount), cpuCount}
+    )
+
+    print(f"workers: GetNumTokenDir over {numFiles} files ({cpuCount} CPUs)")
+    print(f"{'workers':<10}{'time':>12}{'speedup':>10}{'tokens':>12}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        BuildDirCorpus(Path(tempDir), numFiles)
+        baseTime = None
+
+        for workers in workerCounts:
+
+            startTime = time.perf_counter()
+            numTokens = GetNumTokenDir(
+                tempDir, model="gpt-4o", quiet=True, workers=workers
+            )
+            elapsed = time.perf_counter() - startTime
+            baseTime = baseTime or elapsed
+
+            print(
+                f"{workers:<10}{elapsed:>10.2f} s{baseTime / elapsed:>9.1f}x{numTokens:>12}"
+            )
+
+
+def BenchBackends() -> None:
+    """
+    Time TokenizeFiles over many small files and over a few huge ones, sequentially
+    and with the thread and process backends.
+    """
+
+    workers = max(2, os.cpu_count() or 1)
+    text = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+
+    print(f"backends: TokenizeFiles with {workers} workers")
+    print(f"{'corpus':<22}{'sequential':>14}{'thread':>14}{'process':>14}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        corpora = {
+            "5000 x 2 KB": [
+                Path(tempDir, "small", f"file{fileIndex}.txt")
+                for fileIndex in range(5000)
+            ],
+            "4 x 32 MB": [
+                Path(tempDir, "huge", f"file{fileIndex}.txt") for fileIndex in range(4)
+            ],
+        }
+
+        for filePaths, repeats in zip(
+            corpora.values(), (1, 32 * 1024 * 1024 // len(text))
+        ):
+
+            filePaths[0].parent.mkdir()
+
+            for filePath in filePaths:
+
+                filePath.write_text(text * repeats, encoding="utf-8")
+
+        for corpusName, filePaths in corpora.items():
+
+            times = []
+
+            for runWorkers, backend in (
+                (1, "process"),
+                (workers, "thread"),
+                (workers, "process"),
+            ):
+
+                startTime = time.perf_counter()
+                TokenizeFiles(
+                    filePaths,
+                    model="gpt-4o",
+                    quiet=True,
+                    workers=runWorkers,
+                    backend=backend,
+                )
+                times.append(time.perf_counter() - startTime)
+
+            print(
+                f"{corpusName:<22}"
+                + "".join(f"{elapsed:>12.2f} s" for elapsed in times)
+            )
+
+
+def BenchStrBatches() -> None:
+    """
+    Time tokenizing many short records one call at a time with TokenizeStr against
+    a single batched TokenizeStrs call.
+    """
+
+    numRecords = 200000
+    words = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8").split()
+    records = [
+        " ".join(words[recordIndex % 50 : recordIndex % 50 + 5 + recordIndex % 40])
+        for recordIndex in range(numRecords)
+    ]
+
+    print(f"batch: tokenizing {numRecords} short records ({os.cpu_count()} CPUs)")
+    print(f"{'method':<22}{'time':>12}")
+
+    startTime = time.perf_counter()
+    expected = [TokenizeStr(record, model="gpt-4o", quiet=True) for record in records]
+    print(f"{'TokenizeStr loop':<22}{time.perf_counter() - startTime:>10.2f} s")
+
+    startTime = time.perf_counter()
+    actual = TokenizeStrs(records, model="gpt-4o", quiet=True)
+    print(f"{'TokenizeStrs':<22}{time.perf_counter() - startTime:>10.2f} s")
+
+    if actual != expected:
+
+        print("TokenizeStrs returned different tokens than TokenizeStr")
+
+
+def BenchTokenCache() -> None:
+    """
+    Time GetNumTokenDir over a directory of files without a cache, with a cold
+    cache, with a warm cache, and with a warm cache after 1% of the files changed.
+    """
+
+    numFiles = 5000
+
+    print(f"cache: GetNumTokenDir over {numFiles} files of about 25 KB")
+    print(f"{'run':<22}{'time':>12}{'tokens':>12}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        corpusDir = Path(tempDir, "corpus")
+        BuildDirCorpus(corpusDir, numFiles, textRepeats=20)
+
+        with TokenCache(path=Path(tempDir, "tokens.sqlite")) as cache:
+
+            for runName in ("no cache", "cold cache", "warm cache", "1% changed"):
+
+                if runName == "1% changed":
+
+                    for filePath in sorted(corpusDir.rglob("*.txt"))[: numFiles // 100]:
+
+                        filePath.write_text(
+                            filePath.read_text(encoding="utf-8") + " changed",
+                            encoding="utf-8",
+                        )
+
+                startTime = time.perf_counter()
+                numTokens = GetNumTokenDir(
+                    corpusDir,
+                    model="gpt-4o",
+                    quiet=True,
+                    cache=None if runName == "no cache" else cache,
+                )
+                elapsed = time.perf_counter() - startTime
+
+                print(f"{runName:<22}{elapsed:>10.2f} s{numTokens:>12}")
+
+
+def BenchIncrementalDir() -> None:
+    """
+    Time GetNumTokenDirIncremental over a directory of files on the first run, with
+    nothing changed, and after 1% of the files changed, against a plain
+    GetNumTokenDir.
+    """
+
+    numFiles = 5000
+
+    print(f"manifest: GetNumTokenDirIncremental over {numFiles} files of about 25 KB")
+    print(f"{'run':<22}{'time':>12}{'tokens':>12}{'recounted':>12}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        corpusDir = Path(tempDir, "corpus")
+        BuildDirCorpus(corpusDir, numFiles, textRepeats=20)
+
+        # Age the files so that their stat signatures are trusted on later runs
+        agedTime = time.time() - 60
+
+        for filePath in corpusDir.rglob("*.txt"):
+
+            os.utime(filePath, (agedTime, agedTime))
+
+        startTime = time.perf_counter()
+        numTokens = GetNumTokenDir(corpusDir, model="gpt-4o", quiet=True)
+        elapsed = time.perf_counter() - startTime
+
+        print(f"{'GetNumTokenDir':<22}{elapsed:>10.2f} s{numTokens:>12}{numFiles:>12}")
+
+        with TokenManifest(path=Path(tempDir, "manifest.sqlite")) as manifest:
+
+            for runName in ("first run", "unchanged", "1% changed"):
+
+                if runName == "1% changed":
+
+                    for filePath in sorted(corpusDir.rglob("*.txt"))[: numFiles // 100]:
+
+                        filePath.write_text(
+                            filePath.read_text(encoding="utf-8") + " changed",
+                            encoding="utf-8",
+                        )
+
+                startTime = time.perf_counter()
+                result = GetNumTokenDirIncremental(
+                    corpusDir, model="gpt-4o", quiet=True, manifest=manifest
+                )
+                elapsed = time.perf_counter() - startTime
+                numRecounted = len(result["added"]) + len(result["changed"])
+
+                print(
+                    f"{runName:<22}{elapsed:>10.2f} s{result['numTokens']:>12}{numRecounted:>12}"
+                )
+
+
+def BenchDirWalk() -> None:
+    """
+    Count the file system calls and time taken to list the files of deep and wide
+    directory trees with the legacy walk and with _WalkDirFiles.
+    """
+
+    print("walk: listing the files of a directory tree")
+    print(f"{'tree':<22}{'walker':<10}{'files':>8}{'fs calls':>10}{'time':>12}")
+
+    # (name, depth, subdirectories per directory, files per directory)
+    trees = [("deep (depth 40)", 40, 1, 25), ("wide (depth 3)", 3, 12, 10)]
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for treeName, depth, fanOut, filesPerDir in trees:
+
+            rootDir = Path(tempDir, treeName.split()[0])
+            levelDirs = [rootDir]
+
+            for level in range(depth + 1):
+
+                nextLevelDirs = []
+
+                for levelDir in levelDirs:
+
+                    levelDir.mkdir(parents=True, exist_ok=True)
+
+                    for fileIndex in range(filesPerDir):
+
+                        Path(levelDir, f"file{fileIndex}.txt").touch()
+
+                    if level < depth:
+
+                        nextLevelDirs.extend(
+                            Path(levelDir, f"sub{subIndex}")
+                            for subIndex in range(fanOut)
+                        )
+
+                levelDirs = nextLevelDirs
+
+            for walkerName, walker in (
+                ("legacy", LegacyWalkDir),
+                ("scandir", _WalkDirFiles),
+            ):
+
+                filePaths: list[Path] = []
+                elapsed, numCalls = CountFileSystemCalls(
+                    lambda: filePaths.extend(walker(rootDir))
+                )
+
+                print(
+                    f"{treeName:<22}{walkerName:<10}{len(filePaths):>8}{numCalls:>10}{elapsed * 1000:>10.1f} ms"
+                )
+
+
+def MeasureImportTime(moduleName: str) -> int:
+    """
+    Import `moduleName` in a fresh interpreter with "-X importtime" and return its
+    cumulative import time in microseconds.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {moduleName}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    for line in result.stderr.splitlines():
+
+        _, cumulative, name = line.split("|")
+
+        if name.strip() == moduleName:
+
+            return int(cumulative)
+
+    raise RuntimeError(f"{moduleName} not found in the -X importtime output")
+
+
+def BenchImportTime() -> None:
+    """
+    Measure the import time of the package and its CLI against IMPORT_TIME_BUDGET_MS,
+    and the end-to-end time of a quiet "tokencount count-str" call.
+    """
+
+    repeats = 7
+
+    print(
+        f"import-time: median of {repeats} fresh interpreters (budget: {IMPORT_TIME_BUDGET_MS} ms)"
+    )
+    print(f"{'measurement':<32}{'time':>12}{'budget':>10}")
+
+    for moduleName in ("PyTokenCounter", "PyTokenCounter.cli"):
+
+        importTime = statistics.median(
+            MeasureImportTime(moduleName) for _ in range(repeats)
+        )
+        verdict = "ok" if importTime / 1000 <= IMPORT_TIME_BUDGET_MS else "OVER"
+
+        print(f"{'import ' + moduleName:<32}{importTime / 1000:>9.1f} ms{verdict:>10}")
+
+    cliTimes = []
+
+    for _ in range(repeats):
+
+        startTime = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from PyTokenCounter.cli import main; sys.argv[0] = 'tokencount'; main()",
+                "count-str",
+                "hi",
+                "-m",
+                "gpt-4o",
+                "-q",
+            ],
+            capture_output=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        cliTimes.append(time.perf_counter() - startTime)
+
+    print(
+        f"{'tokencount count-str hi -q':<32}{statistics.median(cliTimes) * 1000:>9.1f} ms{'-':>10}"
+    )
+
+
+def BenchTokenServer() -> None:
+    """
+    Time counting a short string through a warm token counting server, per request
+    on an open connection and per "tokencount count-str" process, against counting
+    it in a fresh process without the server.
+    """
+
+    repeats = 7
+    numRequests = 5000
+    cliArgs = [
+        sys.executable,
+        "-c",
+        "import sys; from PyTokenCounter.cli import main; sys.argv[0] = 'tokencount'; main()",
+        "count-str",
+        "def Keystroke(self): return self",
+        "-m",
+        "gpt-4o",
+        "-q",
+    ]
+
+    print("server: counting a short string")
+    print(f"{'run':<36}{'time':>14}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        socketPath = Path(tempDir, "tokencount.sock")
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(sys.path),
+            "TOKENCOUNT_SOCKET": str(socketPath),
+        }
+
+        cliTimes = []
+
+        for _ in range(repeats):
+
+            startTime = time.perf_counter()
+            subprocess.run(cliArgs, capture_output=True, check=True, env=env)
+            cliTimes.append(time.perf_counter() - startTime)
+
+        print(
+            f"{'tokencount, no server':<36}{statistics.median(cliTimes) * 1000:>11.1f} ms"
+        )
+
+        server = CreateTokenServer(
+            encoding=GetEncoding(model="gpt-4o"), socketPath=socketPath
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        try:
+
+            cliTimes = []
+
+            for _ in range(repeats):
+
+                startTime = time.perf_counter()
+                subprocess.run(cliArgs, capture_output=True, check=True, env=env)
+                cliTimes.append(time.perf_counter() - startTime)
+
+            print(
+                f"{'tokencount, with server':<36}{statistics.median(cliTimes) * 1000:>11.1f} ms"
+            )
+
+            with TokenServerClient(socketPath=socketPath) as client:
+
+                startTime = time.perf_counter()
+
+                for requestIndex in range(numRequests):
+
+                    client.GetNumTokenStr(
+                        f"def Keystroke(self): return {requestIndex}", model="gpt-4o"
+                    )
+
+                elapsed = time.perf_counter() - startTime
+
+            print(
+                f"{'TokenServerClient, open connection':<36}{elapsed / numRequests * 1e6:>11.1f} us"
+            )
+
+        finally:
+
+            server.shutdown()
+            server.server_close()
+
+
+def MeasurePeakRss(code: str) -> tuple[int, str]:
+    """
+    Run `code` in a fresh interpreter and return its peak resident set size in
+    bytes, along with the last line it printed.
+    """
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    *_, output, peakRss = result.stdout.splitlines()
+
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    peakRss = int(peakRss) if sys.platform == "darwin" else int(peakRss) * 1024
+
+    return peakRss, output
+
+
+def BenchCountMemory() -> None:
+    """
+    Compare the peak RSS of counting a COUNT_MEMORY_CORPUS_MB file by taking the
+    length of its token list against the count-only GetNumTokenFile, with the
+    peak of only reading the file as the floor.
+    """
+
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+    blockSize = 1024 * 1024
+    block = (paragraph * (blockSize // len(paragraph) + 1))[:blockSize]
+
+    print(f"count-memory: peak RSS counting a {COUNT_MEMORY_CORPUS_MB} MB text file")
+    print(f"{'path':<30}{'peak RSS':>12}{'time':>10}{'tokens':>14}")
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+
+        corpusPath = Path(tmpDir, "corpus.txt")
+
+        with corpusPath.open("w", encoding="utf-8") as corpusFile:
+
+            for _ in range(COUNT_MEMORY_CORPUS_MB):
+
+                corpusFile.write(block)
+
+        setup = (
+            "from PyTokenCounter import GetEncoding, GetNumTokenFile, TokenizeFile\n"
+            "from PyTokenCounter._utils import ReadTextFile\n"
+            "encoding = GetEncoding(model='gpt-4o')\n"
+            f"path = {str(corpusPath)!r}\n"
+        )
+        paths = (
+            ("read only", "numTokens = '-'; ReadTextFile(path)"),
+            (
+                "len(TokenizeFile)",
+                "numTokens = len(TokenizeFile(path, encoding=encoding, quiet=True))",
+            ),
+            (
+                "GetNumTokenFile",
+                "numTokens = GetNumTokenFile(path, encoding=encoding, quiet=True)",
+            ),
+        )
+
+        for name, code in paths:
+
+            startTime = time.perf_counter()
+            peakRss, numTokens = MeasurePeakRss(f"{setup}{code}\nprint(numTokens)")
+            elapsed = time.perf_counter() - startTime
+
+            print(
+                f"{name:<30}{FormatBytes(peakRss):>12}{elapsed:>9.1f}s{numTokens:>14}"
+            )
+
+
+def BenchReturnTypes() -> None:
+    """
+    Compare the peak RSS and wall time of TokenizeDir over a directory corpus for
+    each returnType, with NumPy only when it is installed.
+    """
+
+    returnTypes = ["list", "array", "buffer"]
+
+    try:
+
+        import numpy  # noqa: F401
+
+        returnTypes.append("numpy")
+
+    except ImportError:
+
+        pass
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+
+        BuildDirCorpus(Path(tmpDir), numFiles=256, textRepeats=256)
+        corpusBytes = sum(
+            filePath.stat().st_size for filePath in _WalkDirFiles(Path(tmpDir))
+        )
+
+        print(
+            f"return-types: peak RSS of TokenizeDir over 256 files ({FormatBytes(corpusBytes)})"
+        )
+        print(f"{'returnType':<14}{'peak RSS':>12}{'time':>10}{'tokens':>14}")
+
+        for returnType in returnTypes:
+
+            code = (
+                "from PyTokenCounter import TokenizeDir\n"
+                f"tokenizedDir = TokenizeDir({tmpDir!r}, model='gpt-4o', quiet=True, returnType={returnType!r})\n"
+                "stack = [tokenizedDir]\n"
+                "numTokens = 0\n"
+                "while stack:\n"
+                "    for value in stack.pop().values():\n"
+                "        if isinstance(value, dict):\n"
+                "            stack.append(value)\n"
+                "        else:\n"
+                "            numTokens += len(value)\n"
+                "print(numTokens)"
+            )
+
+            startTime = time.perf_counter()
+            peakRss, numTokens = MeasurePeakRss(code)
+            elapsed = time.perf_counter() - startTime
+
+            print(
+                f"{returnType:<14}{FormatBytes(peakRss):>12}{elapsed:>9.1f}s{numTokens:>14}"
+            )
+
+
+def BenchTokenLimit() -> None:
+    """
+    Time checking a 2 MB string against an 8,000 token limit with
+    IsWithinTokenLimit against counting it whole, and counting a directory with
+    and without a total token budget.
+    """
+
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+    prompt = paragraph * (2 * 1024 * 1024 // len(paragraph))
+    encoding = GetEncoding(model="gpt-4o")
+    limit = 8000
+
+    print(f"token-limit: {len(prompt) / 1024 / 1024:.1f} MB string, limit {limit}")
+    print(f"{'method':<36}{'time':>12}{'tokens':>12}")
+
+    for name, func in (
+        (
+            "GetNumTokenStr",
+            lambda: GetNumTokenStr(prompt, encoding=encoding, quiet=True),
+        ),
+        (
+            "IsWithinTokenLimit",
+            lambda: IsWithinTokenLimit(
+                prompt, limit=limit, encoding=encoding
+            ).numTokens,
+        ),
+    ):
+
+        elapsed, _ = MeasureCall(func)
+        print(f"{name:<36}{elapsed * 1000:>9.2f} ms{func():>12}")
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+
+        BuildDirCorpus(Path(tmpDir), numFiles=512, textRepeats=64)
+
+        for name, maxTokens in (
+            ("GetNumTokenDir", None),
+            ("GetNumTokenDir maxTokens=100000", 100000),
+        ):
+
+            func = partial(
+                GetNumTokenDir,
+                tmpDir,
+                encoding=encoding,
+                quiet=True,
+                maxTokens=maxTokens,
+            )
+            elapsed, _ = MeasureCall(func, repeat=3)
+            print(f"{name:<36}{elapsed * 1000:>9.2f} ms{func():>12}")
+
+
+def BenchTruncate() -> None:
+    """
+    Time truncating a 2 MB string to 8,000 tokens by tokenizing it whole, slicing
+    the token IDs and decoding them, against TruncateStr for each side.
+    """
+
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+    document = paragraph * (2 * 1024 * 1024 // len(paragraph))
+    encoding = GetEncoding(model="gpt-4o")
+    maxTokens = 8000
+
+    print(f"truncate: {len(document) / 1024 / 1024:.1f} MB string, {maxTokens} tokens")
+    print(f"{'method':<36}{'time':>12}")
+
+    def TokenizeSliceDecode() -> str:
+
+        tokens = TokenizeStr(document, encoding=encoding, quiet=True)
+
+        return encoding.decode(tokens[:maxTokens])
+
+    elapsed, _ = MeasureCall(TokenizeSliceDecode)
+    print(f"{'TokenizeStr + slice + decode':<36}{elapsed * 1000:>9.2f} ms")
+
+    for side in ("head", "tail", "middle"):
+
+        elapsed, _ = MeasureCall(
+            partial(
+                TruncateStr, document, maxTokens=maxTokens, side=side, encoding=encoding
+            )
+        )
+        print(f"{f'TruncateStr side={side}':<36}{elapsed * 1000:>9.2f} ms")
+
+
+def BenchChunk() -> None:
+    """
+    Compare the peak RSS and wall time of splitting a CHUNK_CORPUS_MB file into
+    overlapping chunks by tokenizing it whole, slicing the token list and decoding
+    each slice, against streaming ChunkFile.
+    """
+
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8") + "\n"
+    blockSize = 1024 * 1024
+    block = (paragraph * (blockSize // len(paragraph) + 1))[:blockSize]
+    stride = CHUNK_TOKENS - CHUNK_OVERLAP_TOKENS
+
+    print(
+        f"chunk: {CHUNK_CORPUS_MB} MB text file, {CHUNK_TOKENS} token chunks, "
+        f"{CHUNK_OVERLAP_TOKENS} token overlap"
+    )
+    print(f"{'path':<30}{'peak RSS':>12}{'time':>10}{'chunks':>10}")
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+
+        corpusPath = Path(tmpDir, "corpus.txt")
+
+        with corpusPath.open("w", encoding="utf-8") as corpusFile:
+
+            for _ in range(CHUNK_CORPUS_MB):
+
+                corpusFile.write(block)
+
+        setup = (
+            "from PyTokenCounter import ChunkFile, GetEncoding, TokenizeFile\n"
+            "encoding = GetEncoding(model='gpt-4o')\n"
+            f"path = {str(corpusPath)!r}\n"
+        )
+        paths = (
+            (
+                "TokenizeFile + slice + decode",
+                "tokens = TokenizeFile(path, encoding=encoding, quiet=True)\n"
+                "numChunks = sum(1 for start in range(0, len(tokens), "
+                f"{stride}) if encoding.decode(tokens[start : start + {CHUNK_TOKENS}]))",
+            ),
+            (
+                "ChunkFile",
+                f"numChunks = sum(1 for _ in ChunkFile(path, chunkTokens={CHUNK_TOKENS}, "
+                f"overlapTokens={CHUNK_OVERLAP_TOKENS}, encoding=encoding))",
+            ),
+        )
+
+        for name, code in paths:
+
+            startTime = time.perf_counter()
+            peakRss, numChunks = MeasurePeakRss(f"{setup}{code}\nprint(numChunks)")
+            elapsed = time.perf_counter() - startTime
+
+            print(
+                f"{name:<30}{FormatBytes(peakRss):>12}{elapsed:>9.1f}s{numChunks:>10}"
+            )
+
+
+def BenchCliFormat() -> None:
+    """
+    Compare the time to the first output line, the total time and the peak RSS of
+    "tokencount tokenize-dir" printing the whole nested dictionary against printing
+    one NDJSON record per file with --format.
+    """
+
+    numFiles = 2000
+    textRepeats = 50
+
+    print(f"cli-format: tokenize-dir over {numFiles} files of {textRepeats} paragraphs")
+    print(f"{'output':<20}{'first line':>12}{'total':>10}{'peak RSS':>12}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        BuildDirCorpus(Path(tempDir), numFiles, textRepeats=textRepeats)
+        argv = ["tokenize-dir", tempDir, "-m", "gpt-4o", "-q"]
+
+        for name, extraArgs in (
+            ("nested dict", []),
+            ("--format ndjson", ["-f", "ndjson"]),
+        ):
+
+            startTime = time.perf_counter()
+
+            with subprocess.Popen(
+                [sys.executable, "-m", "PyTokenCounter.cli", *argv, *extraArgs],
+                stdout=subprocess.PIPE,
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            ) as process:
+
+                process.stdout.readline()
+                firstLine = time.perf_counter() - startTime
+
+                for _ in process.stdout:
+
+                    pass
+
+            elapsed = time.perf_counter() - startTime
+            peakRss, _ = MeasurePeakRss(
+                "import contextlib, os, sys\n"
+                "from PyTokenCounter.cli import main\n"
+                f"sys.argv = ['tokencount', *{argv + extraArgs!r}]\n"
+                "with open(os.devnull, 'w') as out, contextlib.redirect_stdout(out):\n"
+                "    main()\n"
+                "print('-')"
+            )
+
+            print(
+                f"{name:<20}{firstLine:>10.2f} s{elapsed:>8.2f} s{FormatBytes(peakRss):>12}"
+            )
+
+
+def BenchIterDir() -> None:
+    """
+    Compare the peak RSS and wall time of summing the token counts of a directory
+    corpus through the nested dictionary of TokenizeDir against consuming the
+    results of IterTokenizeDir one file at a time.
+    """
+
+    numFiles = 2000
+    textRepeats = 50
+
+    print(f"iter-dir: {numFiles} files of {textRepeats} paragraphs")
+    print(f"{'path':<30}{'peak RSS':>12}{'time':>10}{'tokens':>12}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        BuildDirCorpus(Path(tempDir), numFiles, textRepeats=textRepeats)
+        setup = (
+            "from PyTokenCounter import IterTokenizeDir, TokenizeDir\n"
+            f"path = {tempDir!r}\n"
+            "def SumDir(tree):\n"
+            "    return sum(SumDir(value) if isinstance(value, dict) else len(value) "
+            "for value in tree.values())\n"
+        )
+        paths = (
+            (
+                "TokenizeDir",
+                "numTokens = SumDir(TokenizeDir(path, model='gpt-4o', quiet=True))",
+            ),
+            (
+                "IterTokenizeDir",
+                "numTokens = sum(len(result.tokens) for result in "
+                "IterTokenizeDir(path, model='gpt-4o'))",
+            ),
+            (
+                "IterTokenizeDir (2 threads)",
+                "numTokens = sum(len(result.tokens) for result in "
+                "IterTokenizeDir(path, model='gpt-4o', workers=2, backend='thread', "
+                "order='completion'))",
+            ),
+        )
+
+        for name, code in paths:
+
+            startTime = time.perf_counter()
+            peakRss, numTokens = MeasurePeakRss(f"{setup}{code}\nprint(numTokens)")
+            elapsed = time.perf_counter() - startTime
+
+            print(
+                f"{name:<30}{FormatBytes(peakRss):>12}{elapsed:>9.1f}s{numTokens:>12}"
+            )
+
+
+def BenchDirFilter() -> None:
+    """
+    Time GetNumTokenDir over a repository-like tree, with source files next to
+    ".git" objects, "node_modules" and binary build outputs, unfiltered and with
+    the directory filters.
+    """
+
+    numSourceFiles = 200
+    numVendorFiles = 2000
+    numBinaryFiles = 300
+
+    print(
+        f"dir-filter: {numSourceFiles} source files, {numVendorFiles} vendored "
+        f"files, {numBinaryFiles} binary objects and build outputs"
+    )
+    print(f"{'filter':<34}{'files':>8}{'time':>10}{'tokens':>12}")
+
+    text = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    randomGen = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        rootDir = Path(tempDir)
+        Path(rootDir, ".gitignore").write_text(
+            "node_modules/\nbuild/\n", encoding="utf-8"
+        )
+
+        for fileIndex in range(numSourceFiles):
+
+            subDir = Path(rootDir, "src", f"pkg{fileIndex % 10}")
+            subDir.mkdir(parents=True, exist_ok=True)
+            Path(subDir, f"module{fileIndex}.py").write_text(
+                f"{text}\n{fileIndex}", encoding="utf-8"
+            )
+
+        for fileIndex in range(numVendorFiles):
+
+            subDir = Path(rootDir, "node_modules", f"dep{fileIndex % 50}", "lib")
+            subDir.mkdir(parents=True, exist_ok=True)
+            Path(subDir, f"index{fileIndex}.js").write_text(
+                f"{text[:1000]}\n{fileIndex}", encoding="utf-8"
+            )
+
+        for fileIndex in range(numBinaryFiles):
+
+            for subDir in (
+                Path(rootDir, ".git", "objects", f"{fileIndex % 256:02x}"),
+                Path(rootDir, "build"),
+            ):
+
+                subDir.mkdir(parents=True, exist_ok=True)
+                Path(subDir, f"object{fileIndex}").write_bytes(
+                    randomGen.randbytes(8192)
+                )
+
+        filters = (
+            ("none", {}),
+            ("respectGitignore", {"respectGitignore": True}),
+            (
+                "exclude .git, node_modules, build",
+                {"exclude": [".git", "node_modules", "build"]},
+            ),
+            ("include *.py", {"include": "*.py"}),
+            ("maxFileSize 4096", {"maxFileSize": 4096}),
+        )
+
+        for name, kwargs in filters:
+
+            numFiles = len(_WalkDirFiles(rootDir, pathFilter=_GetPathFilter(**kwargs)))
+            startTime = time.perf_counter()
+            numTokens = GetNumTokenDir(rootDir, model="gpt-4o", quiet=True, **kwargs)
+            elapsed = time.perf_counter() - startTime
+
+            print(f"{name:<34}{numFiles:>8}{elapsed:>9.2f}s{numTokens:>12}")
+
+
+def BenchBinarySniff() -> None:
+    """
+    Time rejecting binary files by sniffing their first bytes against reading them
+    whole and running chardet over them, as was done before sniffing, and time
+    GetNumTokenDir over a directory of them.
+    """
+
+    numFiles = 20
+    fileSize = 1024 * 1024
+    randomGen = random.Random(0)
+    kinds = (
+        ("JPEG magic number", ".jpg", b"\xff\xd8\xff\xe0", range(256)),
+        ("NUL bytes", ".dat", b"", range(256)),
+        ("binary extension", ".bin", b"", range(1, 256)),
+    )
+
+    print(f"binary-sniff: {numFiles} files of {FormatBytes(fileSize)} per kind")
+    print(f"{'kind':<20}{'read + chardet':>16}{'sniff':>12}{'speedup':>10}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for name, extension, header, byteValues in kinds:
+
+            filePaths = []
+
+            for fileIndex in range(numFiles):
+
+                filePath = Path(tempDir, f"{name.split()[0]}{fileIndex}{extension}")
+                filePath.write_bytes(
+                    header + bytes(randomGen.choices(byteValues, k=fileSize))
+                )
+                filePaths.append(filePath)
+
+            startTime = time.perf_counter()
+
+            for filePath in filePaths:
+
+                chardet.detect(filePath.read_bytes())
+
+            detectTime = (time.perf_counter() - startTime) / numFiles
+            startTime = time.perf_counter()
+
+            for filePath in filePaths:
+
+                try:
+
+                    ReadTextFile(filePath)
+
+                except UnsupportedEncodingError:
+
+                    pass
+
+            sniffTime = (time.perf_counter() - startTime) / numFiles
+
+            print(
+                f"{name:<20}{detectTime * 1000:>13.2f} ms{sniffTime * 1000:>9.3f} ms"
+                f"{detectTime / sniffTime:>9.0f}x"
+            )
+
+        elapsed, bytesRead = MeasureCall(
+            partial(GetNumTokenDir, encoding=GetEncoding(model="gpt-4o"), quiet=True),
+            tempDir,
+            repeat=1,
+        )
+        print(
+            f"GetNumTokenDir over all {numFiles * len(kinds)} files: "
+            f"{elapsed * 1000:.1f} ms, "
+            f"{'-' if bytesRead is None else FormatBytes(bytesRead)} read"
+        )
+
+
+def BenchCallOverhead() -> None:
+    """
+    Time the per-call cost of counting a short string with the model named on
+    every call, with a pre-resolved encoding and with a TokenCounter, against
+    calling tiktoken directly.
+    """
+
+    text = "Hail to the Victors! " * 3
+    encoding = GetEncoding(model="gpt-4o")
+    counter = TokenCounter(encoding=encoding, quiet=True)
+    numCalls = 100000
+
+    print(f"call-overhead: {numCalls} calls on a {len(text)} character string")
+    print(f"{'method':<36}{'per call':>12}")
+
+    for name, func in (
+        (
+            "GetNumTokenStr model=",
+            lambda: GetNumTokenStr(text, model="gpt-4o", quiet=True),
+        ),
+        (
+            "GetNumTokenStr encoding=",
+            lambda: GetNumTokenStr(text, encoding=encoding, quiet=True),
+        ),
+        ("TokenCounter.GetNumTokenStr", lambda: counter.GetNumTokenStr(text)),
+        ("GetEncoding", lambda: GetEncoding(model="gpt-4o")),
+        ("len(encoding.encode())", lambda: len(encoding.encode(text))),
+    ):
+
+        times = []
+
+        for _ in range(3):
+
+            startTime = time.perf_counter()
+
+            for _ in range(numCalls):
+
+                func()
+
+            times.append(time.perf_counter() - startTime)
+
+        print(f"{name:<36}{min(times) / numCalls * 1e6:>9.2f} us")
+
+
+def BenchCounterPool() -> None:
+    """
+    Time repeated GetNumTokenDir calls on a small directory with 4 workers, each
+    starting and shutting down its own pool, against a TokenCounter that keeps its
+    pool between calls.
+    """
+
+    numCalls = 20
+    workers = 4
+    encoding = GetEncoding(model="gpt-4o")
+
+    print(f"counter-pool: {numCalls} calls on 32 files with {workers} workers")
+    print(f"{'backend':<12}{'GetNumTokenDir':>18}{'TokenCounter':>16}{'speedup':>10}")
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+
+        BuildDirCorpus(Path(tmpDir), numFiles=32)
+
+        for backend in PARALLEL_BACKENDS:
+
+            startTime = time.perf_counter()
+
+            for _ in range(numCalls):
+
+                GetNumTokenDir(
+                    tmpDir,
+                    encoding=encoding,
+                    quiet=True,
+                    workers=workers,
+                    backend=backend,
+                )
+
+            funcTime = (time.perf_counter() - startTime) / numCalls
+
+            with TokenCounter(
+                encoding=encoding, quiet=True, workers=workers, backend=backend
+            ) as counter:
+
+                startTime = time.perf_counter()
+
+                for _ in range(numCalls):
+
+                    counter.GetNumTokenDir(tmpDir)
+
+                counterTime = (time.perf_counter() - startTime) / numCalls
+
+            print(
+                f"{backend:<12}{funcTime * 1000:>15.2f} ms{counterTime * 1000:>13.2f} ms"
+                f"{funcTime / counterTime:>9.1f}x"
+            )
+
+
+def BenchProgressThreads() -> None:
+    """
+    Time 8 threads counting short strings concurrently, quietly and reporting to a
+    shared CallbackProgressReporter and LoggingProgressReporter, each call on its
+    own task.
+    """
+
+    numThreads = 8
+    numCalls = 5000
+    text = "Hail to the Victors! " * 3
+    encoding = GetEncoding(model="gpt-4o")
+    numUpdates = [0]
+
+    def CountUpdate(update: ProgressUpdate) -> None:
+
+        numUpdates[0] += 1
+
+    print(f"progress-threads: {numThreads} threads x {numCalls} GetNumTokenStr calls")
+    print(f"{'reporter':<28}{'time':>12}{'per call':>12}")
+
+    for name, kwargs in (
+        ("quiet", {"quiet": True}),
+        (
+            "CallbackProgressReporter",
+            {"progress": CallbackProgressReporter(CountUpdate)},
+        ),
+        ("LoggingProgressReporter", {"progress": LoggingProgressReporter(level=5)}),
+    ):
+
+        def CountStrings() -> None:
+
+            for _ in range(numCalls):
+
+                GetNumTokenStr(text, encoding=encoding, **kwargs)
+
+        threads = [threading.Thread(target=CountStrings) for _ in range(numThreads)]
+        startTime = time.perf_counter()
+
+        for thread in threads:
+
+            thread.start()
+
+        for thread in threads:
+
+            thread.join()
+
+        elapsed = time.perf_counter() - startTime
+        print(
+            f"{name:<28}{elapsed * 1000:>9.1f} ms"
+            f"{elapsed / (numThreads * numCalls) * 1e6:>9.2f} us"
+        )
+
+
+def BenchProgress100k() -> None:
+    """
+    Time GetNumTokenDir over 100,000 one-line files quietly and reporting to
+    callback and rich reporters that report every update or at most once per
+    0.1 second, and time the updates of a task on their own.
+    """
+
+    numDirs = 100
+    numFiles = 100_000
+    encoding = GetEncoding(model="gpt-4o")
+
+    def CountUpdate(update: ProgressUpdate) -> None:
+
+        pass
+
+    reporters = (
+        ("quiet", lambda: None),
+        ("callback, every update", lambda: CallbackProgressReporter(CountUpdate, 0)),
+        ("callback, 0.1 s", lambda: CallbackProgressReporter(CountUpdate)),
+        ("rich, every update", lambda: RichProgressReporter(refreshInterval=0)),
+        ("rich, 0.1 s", lambda: RichProgressReporter()),
+    )
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for i in range(numDirs):
+
+            subDir = Path(tempDir, f"dir{i}")
+            subDir.mkdir()
+
+            for j in range(numFiles // numDirs):
+
+                Path(subDir, f"file{j}.txt").write_text(
+                    f"Line {j} of directory {i}.\n", encoding="utf-8"
+                )
+
+        # Warm the page cache before timing
+        GetNumTokenDir(tempDir, encoding=encoding, quiet=True)
+
+        print(f"progress-100k: GetNumTokenDir over {numFiles} one-line files")
+        print(f"{'reporter':<28}{'time':>12}")
+
+        for name, CreateReporter in reporters:
+
+            reporter = CreateReporter()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+
+                startTime = time.perf_counter()
+                GetNumTokenDir(
+                    tempDir,
+                    encoding=encoding,
+                    quiet=reporter is None,
+                    progress=reporter,
+                )
+                elapsed = time.perf_counter() - startTime
+
+            print(f"{name:<28}{elapsed:>10.2f} s")
+
+    print()
+    print(f"{numFiles} task updates on their own")
+    print(f"{'reporter':<28}{'time':>12}{'per update':>12}")
+
+    for name, CreateReporter in reporters[1:]:
+
+        reporter = CreateReporter()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+
+            startTime = time.perf_counter()
+
+            with reporter.StartTask(description="Updating", total=numFiles) as task:
+
+                for i in range(numFiles):
+
+                    task.Advance(advance=1, description=f"Done Counting file{i}.txt")
+
+            elapsed = time.perf_counter() - startTime
+
+        print(
+            f"{name:<28}{elapsed * 1000:>9.1f} ms"
+            f"{elapsed / numFiles * 1e6:>9.2f} us"
+        )
+
+
+def BenchAsync() -> None:
+    """
+    Time how long the event loop is blocked while a 4 MB string is counted, by a
+    synchronous call and by aGetNumTokenStr, and time counting the files of a
+    directory and many files at once with the synchronous and asynchronous
+    functions.
+    """
+
+    encoding = GetEncoding(model="gpt-4o")
+    text = "Hail to the Victors! " * 200000
+
+    async def MeasureLag(Count) -> tuple[float, float]:
+
+        maxLag = 0.0
+        isCounting = True
+
+        async def Tick() -> None:
+
+            nonlocal maxLag
+
+            while isCounting:
+
+                before = time.perf_counter()
+                await asyncio.sleep(0.001)
+                maxLag = max(maxLag, time.perf_counter() - before - 0.001)
+
+        ticker = asyncio.create_task(Tick())
+        await asyncio.sleep(0.01)
+        startTime = time.perf_counter()
+        await Count()
+        elapsed = time.perf_counter() - startTime
+        isCounting = False
+        await ticker
+
+        return elapsed, maxLag
+
+    async def CountSync() -> None:
+
+        GetNumTokenStr(text, encoding=encoding, quiet=True)
+
+    async def CountAsync() -> None:
+
+        await aGetNumTokenStr(text, encoding=encoding)
+
+    print(f"async: counting a {len(text) / 1e6:.1f} MB string inside an event loop")
+    print(f"{'call':<28}{'time':>12}{'max loop lag':>16}")
+
+    for name, Count in (("GetNumTokenStr", CountSync), ("aGetNumTokenStr", CountAsync)):
+
+        elapsed, maxLag = asyncio.run(MeasureLag(Count))
+        print(f"{name:<28}{elapsed * 1000:>9.1f} ms{maxLag * 1000:>13.1f} ms")
+
+    numFiles = 2000
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for i in range(numFiles):
+
+            Path(tempDir, f"file{i}.txt").write_text(
+                f"File {i}: " + "Hail to the Victors! " * 50, encoding="utf-8"
+            )
+
+        filePaths = sorted(Path(tempDir).iterdir())
+
+        async def CountFiles() -> list[int]:
+
+            return await asyncio.gather(
+                *(
+                    aGetNumTokenFile(filePath, encoding=encoding)
+                    for filePath in filePaths
+                )
+            )
+
+        # Warm the page cache and the shared pool before timing
+        GetNumTokenDir(tempDir, encoding=encoding, quiet=True)
+        asyncio.run(aGetNumTokenDir(tempDir, encoding=encoding))
+
+        print()
+        print(f"{numFiles} files")
+        print(f"{'call':<28}{'time':>12}")
+
+        for name, Count in (
+            (
+                "GetNumTokenDir",
+                lambda: GetNumTokenDir(tempDir, encoding=encoding, quiet=True),
+            ),
+            (
+                "aGetNumTokenDir",
+                lambda: asyncio.run(aGetNumTokenDir(tempDir, encoding=encoding)),
+            ),
+            (
+                "aGetNumTokenDir, 1 in flight",
+                lambda: asyncio.run(
+                    aGetNumTokenDir(tempDir, encoding=encoding, concurrency=1)
+                ),
+            ),
+            ("gather of aGetNumTokenFile", lambda: asyncio.run(CountFiles())),
+        ):
+
+            startTime = time.perf_counter()
+            Count()
+            elapsed = time.perf_counter() - startTime
+            print(f"{name:<28}{elapsed * 1000:>9.1f} ms")
+
+
+BENCHMARKS = {
+    "read-text": BenchReadTextFile,
+    "detection": BenchDetectionStrategies,
+    "workers": BenchDirWorkers,
+    "backends": BenchBackends,
+    "batch": BenchStrBatches,
+    "cache": BenchTokenCache,
+    "manifest": BenchIncrementalDir,
+    "walk": BenchDirWalk,
+    "import-time": BenchImportTime,
+    "server": BenchTokenServer,
+    "count-memory": BenchCountMemory,
+    "return-types": BenchReturnTypes,
+    "token-limit": BenchTokenLimit,
+    "truncate": BenchTruncate,
+    "chunk": BenchChunk,
+    "cli-format": BenchCliFormat,
+    "iter-dir": BenchIterDir,
+    "dir-filter": BenchDirFilter,
+    "binary-sniff": BenchBinarySniff,
+    "call-overhead": BenchCallOverhead,
+    "counter-pool": BenchCounterPool,
+    "progress-threads": BenchProgressThreads,
+    "progress-100k": BenchProgress100k,
+    "async": BenchAsync,
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run PyTokenCounter benchmarks.")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        metavar="BENCHMARK",
+        help=f"Benchmarks to run (default: all). Choices: {', '.join(BENCHMARKS)}",
+    )
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+
+    if unknown:
+
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.benchmarks or BENCHMARKS:
+
+        BENCHMARKS[name]()
+        print()
@@ -1,12 +1,33 @@
+import asyncio
+import contextlib
+import csv
+import importlib.util
 import inspect
 import io
 import json
+import logging
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import tiktoken
 
 import PyTokenCounter as tc
+import PyTokenCounter._server as tokenServer
+from PyTokenCounter._server import CreateTokenServer
+from PyTokenCounter._utils import (
+    BINARY_SNIFF_SIZE,
+    IsBinarySample,
+    IterTextFileChunks,
+    ReadTextFile,
+)
+from PyTokenCounter.core import COUNT_SEGMENT_CHARS, _CountTokens, _WalkDirFiles
 
 testInputDir = Path("./Input")
 testAnswersDir = Path("./Answers")
@@ -750,6 +771,48 @@ def TestStr():
             )
 
 
+def TestStrs():
+    """
+    Test batched tokenization of a list of strings, including lists longer than a
+    single batch.
+    """
+
+    expectedStrings = {
+        "Hail to the Victors!": [39, 663, 316, 290, 16566, 914, 0],
+        "2024 National Champions": [1323, 19, 6743, 40544],
+        "Corum 4 Heisman": [11534, 394, 220, 19, 1679, 107107],
+        "": [],
+    }
+
+    strings = list(expectedStrings) * 1000
+    expectedTokens = [expectedStrings[string] for string in strings]
+
+    actualTokens = tc.TokenizeStrs(strings=strings, model="gpt-4o", quiet=True)
+
+    if actualTokens != expectedTokens:
+        RaiseTestAssertion(
+            "TokenizeStrs does not match the expected tokens for each string."
+        )
+
+    actualCounts = tc.GetNumTokenStrs(strings=strings, model="gpt-4o", quiet=True)
+
+    if actualCounts != [len(tokens) for tokens in expectedTokens]:
+        RaiseTestAssertion(
+            "GetNumTokenStrs does not match the expected count for each string."
+        )
+
+    if tc.TokenizeStrs(strings=[], model="gpt-4o", quiet=True) != []:
+        RaiseTestAssertion("Expected TokenizeStrs to return [] for an empty list.")
+
+    try:
+        tc.TokenizeStrs(strings=["Go Blue!", 1], model="gpt-4o", quiet=True)
+        RaiseTestAssertion(
+            "Expected TypeError for a list containing a non-string, but none was raised."
+        )
+    except TypeError:
+        pass
+
+
 def TestFile(inputName, answerName):
     """
     Test file tokenization.
@@ -844,10 +907,2437 @@ def TestFileError(imgPath):
         )
 
 
+def TestReadTextFileEncodings():
+    """
+    Test that ReadTextFile decodes UTF-8 directly and falls back to detection for other encodings.
+    """
+
+    expectedText = "Hail to the Victors! Café, naïve, déjà vu.\n" * 20
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for encodingName in ("utf-8", "utf-16"):
+
+            filePath = Path(tempDir, f"{encodingName}.txt")
+            filePath.write_bytes(expectedText.encode(encodingName))
+
+            actualText = ReadTextFile(filePath=filePath)
+
+            if actualText != expectedText:
+                RaiseTestAssertion(
+                    f"ReadTextFile mismatch for a {encodingName} file.\n"
+                    f"Expected: {expectedText[:60]!r}...\n"
+                    f"Got: {actualText[:60]!r}..."
+                )
+
+
+def TestDetectionStrategies():
+    """
+    Test that each detection strategy decodes or rejects a non-UTF-8 file as documented.
+    """
+
+    expectedText = (
+        "Le garçon a mangé une crème brûlée à côté de la fenêtre. "
+        "Où est la bibliothèque? Il était très content de voir sa soeur, déjà arrivée. "
+        "Ça coûte cher, mais c'est délicieux. "
+    ) * 1000
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        filePath = Path(tempDir, "latin1.txt")
+        filePath.write_bytes(expectedText.encode("latin-1"))
+
+        for strategy in ("full", "sampled-prefix", "sampled-stripes"):
+
+            actualText = ReadTextFile(filePath=filePath, detectionStrategy=strategy)
+
+            if actualText != expectedText:
+                RaiseTestAssertion(
+                    f"Detection strategy '{strategy}' did not decode the Latin-1 file correctly.\n"
+                    f"Got: {actualText[:60]!r}..."
+                )
+
+        try:
+            ReadTextFile(filePath=filePath, detectionStrategy="utf8-only")
+        except tc.UnsupportedEncodingError:
+            pass
+        else:
+            RaiseTestAssertion(
+                "Test Failed: No error was raised for a non-UTF-8 file with detectionStrategy='utf8-only'."
+            )
+
+        try:
+            tc.GetNumTokenFile(
+                filePath=filePath, model="gpt-4o", quiet=True, detectionStrategy="fast"
+            )
+        except ValueError as e:
+            expectedMessage = "Invalid detection strategy: fast"
+            if expectedMessage not in str(e):
+                RaiseTestAssertion(
+                    f"Unexpected error message for an invalid detection strategy.\n"
+                    f"Expected to contain: '{expectedMessage}'\n"
+                    f"Got: '{e}'"
+                )
+        else:
+            RaiseTestAssertion(
+                "Test Failed: No error was raised for an invalid detection strategy."
+            )
+
+
+def TestLineEndings():
+    """
+    Test that "\\r\\n" and lone "\\r" line endings are translated to "\\n" when files
+    are read, whole or streamed, whatever their encoding.
+    """
+
+    expectedTokens = [1074, 832, 198, 1074, 1403, 198]
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        crlfPath = Path(tempDir, "Crlf.txt")
+        crlfPath.write_bytes(b"line one\r\nline two\r\n")
+        tokens = tc.TokenizeFile(crlfPath, encodingName="cl100k_base", quiet=True)
+
+        if tokens != expectedTokens:
+            RaiseTestAssertion(
+                f"CRLF file tokens mismatch.\nExpected: {expectedTokens}, Got: {tokens}"
+            )
+
+        text = "Caf\u00e9 one\r\ntwo\rthree\n\r\r\nfour\r" * 20
+        expectedText = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        for encodingName in ("utf-8", "latin-1"):
+
+            filePath = Path(tempDir, f"Mixed-{encodingName}.txt")
+            filePath.write_bytes(text.encode(encodingName))
+            readText = ReadTextFile(filePath)
+
+            if readText != expectedText:
+                RaiseTestAssertion(
+                    f"Line endings of a {encodingName} file not translated."
+                )
+
+            # Streaming decides the encoding from the first chunk, which must then
+            # hold the whole of a file that is not UTF-8
+            chunkSizes = (1, 2, 7, 4096) if encodingName == "utf-8" else (4096,)
+
+            for chunkSize in chunkSizes:
+
+                streamedText = "".join(
+                    chunk
+                    for chunk, _ in IterTextFileChunks(filePath, chunkSize=chunkSize)
+                )
+
+                if streamedText != expectedText:
+                    RaiseTestAssertion(
+                        f"Line endings of a {encodingName} file not translated when "
+                        f"streamed in chunks of {chunkSize} bytes."
+                    )
+
+
+def TestStreamingFile(inputName, answerName):
+    """
+    Test that streaming tokenization in small chunks matches whole-file tokenization.
+    """
+
+    answerPath = Path(testAnswersDir, answerName)
+    with answerPath.open("r") as file:
+        expected = json.load(file)
+
+    filePath = Path(testInputDir, inputName)
+
+    for chunkSize in (1, 64, 4096):
+
+        actualTokens = [
+            token
+            for segmentTokens in tc.IterTokenizeFile(
+                filePath=filePath, model="gpt-4o", chunkSize=chunkSize
+            )
+            for token in segmentTokens
+        ]
+
+        if actualTokens != expected["tokens"]:
+            RaiseTestAssertion(
+                f"Streaming tokenization mismatch for file '{filePath}' with chunkSize={chunkSize}."
+            )
+
+        runningCounts = list(
+            tc.IterCountFile(filePath=filePath, model="gpt-4o", chunkSize=chunkSize)
+        )
+        actualCount = tc.GetNumTokenFile(
+            filePath=filePath, model="gpt-4o", quiet=True, chunkSize=chunkSize
+        )
+
+        if (
+            runningCounts[-1] != expected["numTokens"]
+            or actualCount != expected["numTokens"]
+        ):
+            RaiseTestAssertion(
+                f"Streaming token count mismatch for file '{filePath}' with chunkSize={chunkSize}.\n"
+                f"Expected Count: {expected['numTokens']}, "
+                f"Got Running Count: {runningCounts[-1]}, GetNumTokenFile: {actualCount}"
+            )
+
+    # Numeric JSONL, whose lines all start with "{", is split between its lines
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        jsonlPath = Path(tempDir, "records.jsonl")
+        jsonlPath.write_text(
+            "".join(
+                json.dumps({"id": i, "values": [i * 0.5, -i, i**2]}) + "\n"
+                for i in range(5000)
+            )
+            + '{"id": "last"}\n/end\n  \n',
+            encoding="utf-8",
+        )
+        expectedTokens = tc.TokenizeFile(filePath=jsonlPath, model="gpt-4o", quiet=True)
+
+        for chunkSize in (1, 100, 4096):
+
+            segments = list(
+                tc.IterTokenizeFile(
+                    filePath=jsonlPath, model="gpt-4o", chunkSize=chunkSize
+                )
+            )
+
+            if [token for tokens in segments for token in tokens] != expectedTokens:
+                RaiseTestAssertion(
+                    f"Streaming tokenization mismatch for JSONL with chunkSize={chunkSize}."
+                )
+
+            if chunkSize > 1 and len(segments) < jsonlPath.stat().st_size // (
+                2 * chunkSize
+            ):
+                RaiseTestAssertion(
+                    f"JSONL was not split between lines with chunkSize={chunkSize}: "
+                    f"{len(segments)} segments."
+                )
+
+
+def TestDirectoryWorkers():
+    """
+    Test that tokenizing and counting a directory or a file list across worker
+    processes or threads gives the same results as doing it sequentially.
+    """
+
+    dirPath = Path(testInputDir, "TestDirectory")
+    fileList = [
+        Path(testInputDir, "TestFile1.txt"),
+        Path(testInputDir, "TestImg.jpg"),
+        Path(testInputDir, "TestFile2.txt"),
+    ]
+
+    for backend in ("process", "thread"):
+
+        for recursive, answerName in (
+            (True, "TestDirectory.json"),
+            (False, "TestDirectoryNoRecursion.json"),
+        ):
+
+            with Path(testAnswersDir, answerName).open("r") as file:
+                expected = json.load(file)
+
+            tokenizedDir = tc.TokenizeDir(
+                dirPath=dirPath,
+                model="gpt-4o",
+                recursive=recursive,
+                quiet=True,
+                workers=2,
+                backend=backend,
+            )
+
+            CompareTokenDicts(expected, tokenizedDir)
+
+            if list(tokenizedDir) != list(
+                tc.TokenizeDir(
+                    dirPath=dirPath, model="gpt-4o", recursive=recursive, quiet=True
+                )
+            ):
+                RaiseTestAssertion(
+                    f"TokenizeDir with workers=2 and backend '{backend}' returned entries in a different order for recursive={recursive}."
+                )
+
+            sequentialCount = tc.GetNumTokenDir(
+                dirPath=dirPath, model="gpt-4o", recursive=recursive, quiet=True
+            )
+            parallelCount = tc.GetNumTokenDir(
+                dirPath=dirPath,
+                model="gpt-4o",
+                recursive=recursive,
+                quiet=True,
+                workers=2,
+                backend=backend,
+            )
+
+            if parallelCount != sequentialCount:
+                RaiseTestAssertion(
+                    f"GetNumTokenDir with workers=2 and backend '{backend}' mismatch for recursive={recursive}.\n"
+                    f"Expected: {sequentialCount}, Got: {parallelCount}"
+                )
+
+        sequentialFiles = tc.TokenizeFiles(
+            fileList, model="gpt-4o", quiet=True, exitOnListError=False
+        )
+        parallelFiles = tc.TokenizeFiles(
+            fileList,
+            model="gpt-4o",
+            quiet=True,
+            exitOnListError=False,
+            workers=2,
+            backend=backend,
+        )
+
+        if parallelFiles != sequentialFiles:
+            RaiseTestAssertion(
+                f"TokenizeFiles with workers=2 and backend '{backend}' does not match sequential tokenization."
+            )
+
+        try:
+            tc.GetNumTokenFiles(fileList, model="gpt-4o", quiet=True, workers=2)
+            RaiseTestAssertion(
+                "Expected UnsupportedEncodingError for a file list with workers=2, but none was raised."
+            )
+        except tc.UnsupportedEncodingError:
+            pass
+
+    try:
+        tc.GetNumTokenDir(dirPath=dirPath, model="gpt-4o", quiet=True, workers=0)
+        RaiseTestAssertion("Expected ValueError for workers=0, but none was raised.")
+    except ValueError:
+        pass
+
+    try:
+        tc.GetNumTokenDir(
+            dirPath=dirPath, model="gpt-4o", quiet=True, workers=2, backend="fiber"
+        )
+        RaiseTestAssertion(
+            "Expected ValueError for backend='fiber', but none was raised."
+        )
+    except ValueError:
+        pass
+
+
+def TestTokenCache():
+    """
+    Test that counts and tokens served from a persistent token cache match
+    uncached results, and that the cache can be pruned and cleared.
+    """
+
+    dirPath = Path(testInputDir, "TestDirectory")
+    filePath = Path(testInputDir, "TestFile1.txt")
+    expectedCount = tc.GetNumTokenDir(dirPath=dirPath, model="gpt-4o", quiet=True)
+    expectedTokens = tc.TokenizeFile(filePath=filePath, model="gpt-4o", quiet=True)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        with tc.TokenCache(
+            path=Path(tempDir, "tokens.sqlite"), storeTokens=True
+        ) as cache:
+
+            for run in ("cold", "warm"):
+
+                actualCount = tc.GetNumTokenDir(
+                    dirPath=dirPath, model="gpt-4o", quiet=True, cache=cache
+                )
+
+                if actualCount != expectedCount:
+                    RaiseTestAssertion(
+                        f"GetNumTokenDir with a {run} cache mismatch.\n"
+                        f"Expected: {expectedCount}, Got: {actualCount}"
+                    )
+
+                actualTokens = tc.TokenizeFile(
+                    filePath=filePath, model="gpt-4o", quiet=True, cache=cache
+                )
+
+                if actualTokens != expectedTokens:
+                    RaiseTestAssertion(
+                        f"TokenizeFile with a {run} cache does not match uncached tokens."
+                    )
+
+            numEntries = cache.Stats()["entries"]
+
+            if numEntries != sum(1 for _ in dirPath.rglob("*.txt")) + 1:
+                RaiseTestAssertion(
+                    f"Unexpected number of cache entries after counting: {numEntries}"
+                )
+
+            cache.Prune(maxSize=0)
+
+            if cache.Stats()["entries"] != 0:
+                RaiseTestAssertion("Expected Prune(maxSize=0) to evict every entry.")
+
+            tc.GetNumTokenFile(
+                filePath=filePath, model="gpt-4o", quiet=True, cache=cache
+            )
+            cache.Clear()
+
+            if cache.Stats()["entries"] != 0:
+                RaiseTestAssertion("Expected Clear() to remove every entry.")
+
+
+def TestIncrementalDir():
+    """
+    Test that GetNumTokenDirIncremental matches GetNumTokenDir and reports only the
+    files added, changed or removed since the previous run.
+    """
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        dirPath = Path(tempDir, "TestDirectory")
+        shutil.copytree(Path(testInputDir, "TestDirectory"), dirPath)
+
+        # Age the files so that their stat signatures are trusted on the next run
+        agedTime = time.time() - 60
+
+        for filePath in dirPath.rglob("*"):
+
+            os.utime(filePath, (agedTime, agedTime))
+
+        with tc.TokenManifest(path=Path(tempDir, "manifest.sqlite")) as manifest:
+
+            firstRun = tc.GetNumTokenDirIncremental(
+                dirPath=dirPath, model="gpt-4o", quiet=True, manifest=manifest
+            )
+            expectedCount = tc.GetNumTokenDir(
+                dirPath=dirPath, model="gpt-4o", quiet=True
+            )
+
+            if firstRun["numTokens"] != expectedCount:
+                RaiseTestAssertion(
+                    f"First incremental run mismatch.\n"
+                    f"Expected: {expectedCount}, Got: {firstRun['numTokens']}"
+                )
+
+            if sum(firstRun["added"].values()) != expectedCount:
+                RaiseTestAssertion("Expected every file to be added on the first run.")
+
+            secondRun = tc.GetNumTokenDirIncremental(
+                dirPath=dirPath, model="gpt-4o", quiet=True, manifest=manifest
+            )
+
+            if secondRun != {
+                "numTokens": expectedCount,
+                "added": {},
+                "changed": {},
+                "removed": {},
+            }:
+                RaiseTestAssertion(
+                    f"Unexpected result for an unchanged directory: {secondRun}"
+                )
+
+            changedPath, removedPath = sorted(firstRun["added"])[:2]
+            Path(dirPath, changedPath).write_text("Hello, world!", encoding="utf-8")
+            Path(dirPath, removedPath).unlink()
+            Path(dirPath, "Added.txt").write_text("Hello there", encoding="utf-8")
+
+            thirdRun = tc.GetNumTokenDirIncremental(
+                dirPath=dirPath,
+                model="gpt-4o",
+                quiet=True,
+                manifest=manifest,
+                workers=2,
+                backend="thread",
+            )
+            expectedCount = tc.GetNumTokenDir(
+                dirPath=dirPath, model="gpt-4o", quiet=True
+            )
+
+            if thirdRun != {
+                "numTokens": expectedCount,
+                "added": {"Added.txt": 2},
+                "changed": {changedPath: 4},
+                "removed": {removedPath: firstRun["added"][removedPath]},
+            }:
+                RaiseTestAssertion(
+                    f"Unexpected result for a modified directory: {thirdRun}"
+                )
+
+    try:
+
+        tc.GetNumTokenDirIncremental(
+            dirPath=testInputDir, model="gpt-4o", manifest="manifest.sqlite"
+        )
+        RaiseTestAssertion("TypeError was not raised for an invalid manifest.")
+
+    except TypeError:
+
+        pass
+
+
+def TestWalkDirFiles():
+    """
+    Test that the directory walker lists each directory's own files before the
+    files of its subdirectories, and honours "recursive".
+    """
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        rootDir = Path(tempDir)
+
+        for relativePath in ("a.txt", "x/b.txt", "x/y/c.txt", "x/y/z/d.txt", "w/e.txt"):
+
+            Path(rootDir, relativePath).parent.mkdir(parents=True, exist_ok=True)
+            Path(rootDir, relativePath).write_text("Hello", encoding="utf-8")
+
+        walked = [
+            filePath.relative_to(rootDir).as_posix()
+            for filePath in _WalkDirFiles(rootDir)
+        ]
+
+        if sorted(walked) != [
+            "a.txt",
+            "w/e.txt",
+            "x/b.txt",
+            "x/y/c.txt",
+            "x/y/z/d.txt",
+        ]:
+            RaiseTestAssertion(f"Unexpected files walked: {walked}")
+
+        if walked[0] != "a.txt" or walked.index("x/b.txt") > walked.index("x/y/c.txt"):
+            RaiseTestAssertion(f"Files walked out of order: {walked}")
+
+        if _WalkDirFiles(rootDir, recursive=False) != [Path(rootDir, "a.txt")]:
+            RaiseTestAssertion("Expected only top-level files without recursion.")
+
+        for recursive, expectedCount in ((True, 5), (False, 1)):
+
+            actualCount = tc.GetNumTokenDir(
+                dirPath=rootDir, model="gpt-4o", recursive=recursive, quiet=True
+            )
+
+            if actualCount != expectedCount:
+                RaiseTestAssertion(
+                    f"GetNumTokenDir with recursive={recursive} mismatch.\n"
+                    f"Expected: {expectedCount}, Got: {actualCount}"
+                )
+
+
+def TestLazyImports():
+    """
+    Test that importing PyTokenCounter does not load rich, chardet or tiktoken, and
+    that a quiet CLI call never loads rich.
+    """
+
+    heavyModules = ["rich", "chardet.detector", "tiktoken.core"]
+    checks = {
+        "import PyTokenCounter": "import PyTokenCounter",
+        "tokencount count-str -q": (
+            "from PyTokenCounter.cli import main; "
+            "sys.argv = ['tokencount', 'count-str', 'Hello', '-m', 'gpt-4o', '-q']; "
+            "main()"
+        ),
+    }
+
+    for checkName, code in checks.items():
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import sys; {code}; print(sorted(m for m in {heavyModules!r} if m in sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        if result.returncode != 0:
+            RaiseTestAssertion(f"{checkName} failed:\n{result.stderr}")
+
+        loaded = result.stdout.strip().splitlines()[-1]
+        expected = "['tiktoken.core']" if "cli" in code else "[]"
+
+        if loaded != expected:
+            RaiseTestAssertion(
+                f"Unexpected modules loaded by {checkName}.\n"
+                f"Expected: {expected}, Got: {loaded}"
+            )
+
+
+def TestConcurrentFirstUse():
+    """
+    Test that the first uses of chardet and tiktoken in a fresh interpreter are safe
+    from several threads at once, by counting a directory of files that are not
+    UTF-8 with the thread backend, and strings from several threads.
+    """
+
+    text = "Café crème, déjà vu à la carte. Naïve façade, señor. " * 50
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for index in range(16):
+
+            Path(tempDir, f"Latin{index}.txt").write_bytes(
+                f"{index} {text}".encode("latin-1")
+            )
+
+        expected = tc.GetNumTokenDir(
+            dirPath=tempDir, model="gpt-4o", quiet=True, workers=1
+        )
+        code = (
+            "import sys\n"
+            "from concurrent.futures import ThreadPoolExecutor\n"
+            "import PyTokenCounter as tc\n"
+            "with ThreadPoolExecutor(max_workers=8) as pool:\n"
+            "    strCounts = set(pool.map(lambda _: tc.GetNumTokenStr("
+            "'Hello, world!', model='gpt-4o', quiet=True), range(8)))\n"
+            f"print(len(strCounts), tc.GetNumTokenDir(dirPath=sys.argv[1], "
+            "model='gpt-4o', quiet=True, workers=8, backend='thread'))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code, tempDir],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+    if result.returncode != 0:
+        RaiseTestAssertion(f"Concurrent first use failed:\n{result.stderr}")
+
+    if result.stdout.split() != ["1", str(expected)]:
+        RaiseTestAssertion(
+            f"Concurrent first use gave {result.stdout.strip()}, expected 1 {expected}."
+        )
+
+
+def TestTokenServer():
+    """
+    Test that the token counting server answers count-str, tokenize-str and
+    count-file requests over both a Unix domain socket and TCP like the local
+    functions, and passes errors back to the client.
+    """
+
+    filePath = Path(testInputDir, "TestFile1.txt")
+    string = "Hello, world! This is a test string."
+    expectedTokens = tc.TokenizeStr(string=string, model="gpt-4o", quiet=True)
+    expectedFileCount = tc.GetNumTokenFile(
+        filePath=filePath, model="gpt-4o", quiet=True
+    )
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        socketPath = Path(tempDir, "tokencount.sock")
+        tokenPath = Path(tempDir, "tokencount.token")
+        cachePath = Path(tempDir, "cache.sqlite")
+        servers = {
+            "unix": CreateTokenServer(
+                encoding=tc.GetEncoding(model="gpt-4o"),
+                socketPath=socketPath,
+                cachePaths=[cachePath],
+            ),
+            "tcp": CreateTokenServer(
+                encoding=tc.GetEncoding(model="gpt-4o"),
+                port=0,
+                tokenPath=tokenPath,
+                cachePaths=[cachePath],
+            ),
+        }
+
+        if tokenPath.stat().st_mode & 0o777 != 0o600:
+            RaiseTestAssertion(
+                f"The token file is not private: {oct(tokenPath.stat().st_mode)}"
+            )
+
+        for serverName, server in servers.items():
+
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+            if serverName == "unix":
+
+                client = tc.TokenServerClient(socketPath=socketPath)
+
+            else:
+
+                client = tc.TokenServerClient(
+                    port=server.server_address[1], tokenPath=tokenPath
+                )
+
+            with client:
+
+                results = {
+                    "tokenize-str": client.TokenizeStr(string=string, model="gpt-4o"),
+                    "count-str": client.GetNumTokenStr(string=string),
+                    "count-file": client.GetNumTokenFile(
+                        filePath=filePath, model="gpt-4o"
+                    ),
+                    "count-file-cached": client.GetNumTokenFile(
+                        filePath=filePath,
+                        model="gpt-4o",
+                        cachePath=os.path.relpath(cachePath),
+                    ),
+                }
+                expected = {
+                    "tokenize-str": expectedTokens,
+                    "count-str": len(expectedTokens),
+                    "count-file": expectedFileCount,
+                    "count-file-cached": expectedFileCount,
+                }
+
+                if results != expected:
+                    RaiseTestAssertion(
+                        f"{serverName} server results mismatch.\n"
+                        f"Expected: {expected}, Got: {results}"
+                    )
+
+                for request, errorType in (
+                    (
+                        lambda: client.GetNumTokenStr(string=string, model="invalid"),
+                        ValueError,
+                    ),
+                    (
+                        lambda: client.GetNumTokenFile(
+                            filePath=Path(testInputDir, "TestImg.jpg")
+                        ),
+                        tc.UnsupportedEncodingError,
+                    ),
+                    (
+                        lambda: client.GetNumTokenFile(
+                            filePath=filePath, cachePath=Path(tempDir, "other.sqlite")
+                        ),
+                        PermissionError,
+                    ),
+                    (
+                        lambda: client.Request(
+                            "count-file", filePath=str(filePath), cache="cache.sqlite"
+                        ),
+                        ValueError,
+                    ),
+                ):
+
+                    try:
+
+                        request()
+                        RaiseTestAssertion(
+                            f"{errorType.__name__} was not raised by the {serverName} server."
+                        )
+
+                    except errorType:
+
+                        pass
+
+                # An over-long request line is refused and the connection closed
+                maxRequestBytes = tokenServer.MAX_REQUEST_BYTES
+                tokenServer.MAX_REQUEST_BYTES = 1024
+
+                try:
+
+                    for request, errorType in (
+                        (lambda: client.GetNumTokenStr(string="x" * 4096), ValueError),
+                        (client.Ping, ConnectionError),
+                    ):
+
+                        try:
+
+                            request()
+                            RaiseTestAssertion(
+                                f"{errorType.__name__} was not raised after an "
+                                f"over-long request to the {serverName} server."
+                            )
+
+                        except errorType:
+
+                            pass
+
+                finally:
+
+                    tokenServer.MAX_REQUEST_BYTES = maxRequestBytes
+
+            if serverName == "tcp":
+
+                # A client without the token is refused
+                tokenPath.write_text("0" * 64, encoding="ascii")
+
+                with tc.TokenServerClient(
+                    port=server.server_address[1], tokenPath=tokenPath
+                ) as client:
+
+                    try:
+
+                        client.Ping()
+                        RaiseTestAssertion(
+                            "The tcp server accepted a request with the wrong token."
+                        )
+
+                    except PermissionError:
+
+                        pass
+
+            server.shutdown()
+            server.server_close()
+
+        if socketPath.exists() or tokenPath.exists():
+            RaiseTestAssertion("The socket or token file was not removed on close.")
+
+        try:
+
+            CreateTokenServer(
+                encoding=tc.GetEncoding(model="gpt-4o"), port=0, host="0.0.0.0"
+            )
+            RaiseTestAssertion("A server was bound to a non-loopback address.")
+
+        except ValueError:
+
+            pass
+
+
+def TestCountOnly():
+    """
+    Test that counting without building token lists matches the length of the
+    token list, for short strings, texts split into several segments, lone
+    surrogates and files, and that disallowed special tokens still raise.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    longText = paragraph * (2 * COUNT_SEGMENT_CHARS // len(paragraph) + 1)
+
+    for text in ("", "Hello, world!", "lone \ud800 surrogate", longText):
+
+        expected = len(encoding.encode(text))
+        actual = _CountTokens(encoding=encoding, text=text)
+
+        if actual != expected:
+            RaiseTestAssertion(
+                f"Count-only mismatch for a {len(text)} character text: {actual} != {expected}"
+            )
+
+    strCount = tc.GetNumTokenStr(longText, encoding=encoding, quiet=True)
+
+    if strCount != len(encoding.encode(longText)):
+        RaiseTestAssertion(f"GetNumTokenStr returned {strCount} for a long text.")
+
+    inputPath = Path(testInputDir, "TestFile1.txt")
+    expected = len(tc.TokenizeFile(inputPath, encoding=encoding, quiet=True))
+
+    if tc.GetNumTokenFile(inputPath, encoding=encoding, quiet=True) != expected:
+        RaiseTestAssertion("GetNumTokenFile does not match TokenizeFile.")
+
+    try:
+
+        tc.GetNumTokenStr("<|endoftext|>", encoding=encoding, quiet=True)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for a disallowed special token.")
+
+
+def TestReturnTypes():
+    """
+    Test that every return type holds the same token IDs as the default list, with
+    the expected item width, across the Tokenize* entry points.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    inputPath = Path(testInputDir, "TestFile1.txt")
+    dirPath = Path(testInputDir, "TestDirectory")
+    expected = tc.TokenizeFile(inputPath, encoding=encoding, quiet=True)
+    expectedDir = tc.TokenizeDir(dirPath, encoding=encoding, quiet=True)
+
+    returnTypes = ["array", "buffer"]
+
+    if importlib.util.find_spec("numpy") is not None:
+
+        returnTypes.append("numpy")
+
+    def FlattenDir(tokenizedDir: dict) -> dict:
+
+        return {
+            name: FlattenDir(value) if isinstance(value, dict) else list(value)
+            for name, value in tokenizedDir.items()
+        }
+
+    for returnType in returnTypes:
+
+        tokens = tc.TokenizeFile(
+            inputPath, encoding=encoding, quiet=True, returnType=returnType
+        )
+
+        if list(tokens) != expected:
+            RaiseTestAssertion(f'TokenizeFile mismatch for returnType="{returnType}".')
+
+        if memoryview(tokens).itemsize != 4:
+            RaiseTestAssertion(
+                f'Expected 4-byte token IDs for returnType="{returnType}".'
+            )
+
+        strTokens = tc.TokenizeStrs(
+            [inputPath.read_text(encoding="utf-8"), ""],
+            encoding=encoding,
+            quiet=True,
+            returnType=returnType,
+        )
+
+        if [list(tokens) for tokens in strTokens] != [expected, []]:
+            RaiseTestAssertion(f'TokenizeStrs mismatch for returnType="{returnType}".')
+
+        streamedTokens = [
+            token
+            for segmentTokens in tc.IterTokenizeFile(
+                inputPath, encoding=encoding, chunkSize=64, returnType=returnType
+            )
+            for token in segmentTokens
+        ]
+
+        if streamedTokens != expected:
+            RaiseTestAssertion(
+                f'IterTokenizeFile mismatch for returnType="{returnType}".'
+            )
+
+        for workers, backend in ((1, "process"), (2, "process"), (2, "thread")):
+
+            tokenizedDir = tc.TokenizeDir(
+                dirPath,
+                encoding=encoding,
+                quiet=True,
+                workers=workers,
+                backend=backend,
+                returnType=returnType,
+            )
+
+            if FlattenDir(tokenizedDir) != expectedDir:
+                RaiseTestAssertion(
+                    f'TokenizeDir mismatch for returnType="{returnType}" with {workers} {backend} workers.'
+                )
+
+    # An encoding whose every token fits in 16 bits is packed into 2-byte IDs
+    smallEncoding = tiktoken.Encoding(
+        name="bytes_only",
+        pat_str=encoding._pat_str,
+        mergeable_ranks={bytes([byte]): byte for byte in range(256)},
+        special_tokens={},
+    )
+    smallTokens = tc.TokenizeStr(
+        "Hail to the Victors!", encoding=smallEncoding, quiet=True, returnType="array"
+    )
+
+    if smallTokens.typecode != "H" or list(smallTokens) != list(
+        b"Hail to the Victors!"
+    ):
+        RaiseTestAssertion(f"Unexpected 16-bit tokens: {smallTokens}")
+
+    try:
+
+        tc.TokenizeStr("Hello", encoding=encoding, returnType="tuple")
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion('Expected ValueError for returnType="tuple".')
+
+
+def TestTokenLimits():
+    """
+    Test that counting with a token limit is exact within the limit, stops early
+    past it, and that file lists and directories stop once a total budget is
+    exceeded.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    numParagraphTokens = len(encoding.encode(paragraph))
+    longText = paragraph * 2000
+    numLongTokens = len(encoding.encode(longText))
+
+    for limit in (0, numParagraphTokens - 1, numParagraphTokens, 10**9):
+
+        result = tc.IsWithinTokenLimit(paragraph, limit=limit, encoding=encoding)
+
+        if bool(result) != (numParagraphTokens <= limit):
+            RaiseTestAssertion(f"Unexpected result {result} for limit {limit}.")
+
+        if result.withinLimit and result.numTokens != numParagraphTokens:
+            RaiseTestAssertion(f"Expected an exact count within the limit: {result}")
+
+        if not result.withinLimit and result.numTokens <= limit:
+            RaiseTestAssertion(f"Expected a count past the limit: {result}")
+
+    boundedCount = tc.GetNumTokenStr(
+        longText, encoding=encoding, quiet=True, maxTokens=8000
+    )
+
+    if not 8000 < boundedCount < numLongTokens:
+        RaiseTestAssertion(f"Counting did not stop early: {boundedCount}")
+
+    if (
+        tc.GetNumTokenStr(
+            longText, encoding=encoding, quiet=True, maxTokens=numLongTokens
+        )
+        != numLongTokens
+    ):
+        RaiseTestAssertion("Expected an exact count at the limit.")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        filePaths = []
+
+        for fileIndex in range(8):
+
+            filePath = Path(tempDir, f"file{fileIndex}.txt")
+            filePath.write_text(paragraph * 10, encoding="utf-8")
+            filePaths.append(filePath)
+
+        numFileTokens = len(encoding.encode(paragraph * 10))
+        budget = numFileTokens * 2 + 1
+
+        numFileCount = tc.GetNumTokenFile(
+            filePaths[0], encoding=encoding, quiet=True, maxTokens=numFileTokens
+        )
+
+        if numFileCount != numFileTokens:
+            RaiseTestAssertion(f"Expected an exact file count: {numFileCount}")
+
+        for workers, backend in ((1, "process"), (2, "thread"), (2, "process")):
+
+            for inputPath in (filePaths, Path(tempDir)):
+
+                total = tc.GetNumTokenFiles(
+                    inputPath,
+                    encoding=encoding,
+                    quiet=True,
+                    workers=workers,
+                    backend=backend,
+                    maxTokens=budget,
+                )
+
+                if not budget < total < numFileTokens * len(filePaths):
+                    RaiseTestAssertion(
+                        f"Budget of {budget} not honoured with {workers} {backend} workers: {total}"
+                    )
+
+    try:
+
+        tc.IsWithinTokenLimit(paragraph, limit=-1, encoding=encoding)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for a negative limit.")
+
+
+def TestTruncate():
+    """
+    Test that truncation keeps the requested side of the text, cut from the text
+    itself, with an exact count within the budget, and that TruncateFile matches
+    TruncateStr on the file's contents.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    numParagraphTokens = len(encoding.encode(paragraph))
+    texts = [paragraph, paragraph * 500, "Grüße aus Ann Arbor 🎉 " * 400]
+
+    for text in texts:
+
+        numTextTokens = len(encoding.encode(text))
+
+        for maxTokens in (0, 1, 7, 100, numTextTokens - 1, numTextTokens):
+
+            for side in ("head", "tail", "middle"):
+
+                result = tc.TruncateStr(
+                    text, maxTokens=maxTokens, side=side, encoding=encoding
+                )
+
+                if result.numTokens != len(encoding.encode(result.text)):
+                    RaiseTestAssertion(f"Inexact count for {side} {maxTokens}.")
+
+                if result.numTokens > maxTokens:
+                    RaiseTestAssertion(f"Budget exceeded for {side} {maxTokens}.")
+
+                if maxTokens == numTextTokens and result.text != text:
+                    RaiseTestAssertion("Text within the limit was truncated.")
+
+                if side == "head" and not text.startswith(result.text):
+                    RaiseTestAssertion(f"Head is not a prefix for {maxTokens}.")
+
+                if side == "tail" and not text.endswith(result.text):
+                    RaiseTestAssertion(f"Tail is not a suffix for {maxTokens}.")
+
+    result = tc.TruncateStr(paragraph, maxTokens=100, encoding=encoding)
+
+    if result.numTokens < 99:
+        RaiseTestAssertion(f"Head is too short: {result.numTokens} tokens.")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        filePath = Path(tempDir, "long.txt")
+        filePath.write_text(paragraph * 500, encoding="utf-8")
+
+        for side in ("head", "tail", "middle"):
+
+            fileResult = tc.TruncateFile(
+                filePath, maxTokens=numParagraphTokens, side=side, encoding=encoding
+            )
+            strResult = tc.TruncateStr(
+                paragraph * 500,
+                maxTokens=numParagraphTokens,
+                side=side,
+                encoding=encoding,
+            )
+
+            if fileResult != strResult:
+                RaiseTestAssertion(f"TruncateFile differs from TruncateStr for {side}.")
+
+    try:
+
+        tc.TruncateStr(paragraph, maxTokens=10, side="start", encoding=encoding)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for an invalid side.")
+
+
+def TestChunk():
+    """
+    Test that chunks cover the text in order within the token budget, with exact
+    counts and byte offsets, that they end at paragraph or line breaks where
+    possible, and that ChunkFile, ChunkDir with any number of workers and the chunk
+    CLI command agree with ChunkStr.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    texts = [paragraph, (paragraph + "\n\n") * 40, "Grüße aus Ann Arbor 🎉\n" * 400]
+
+    for text in texts:
+
+        textBytes = text.encode("utf-8")
+
+        for chunkTokens, overlapTokens in ((1, 0), (7, 3), (100, 0), (256, 32)):
+
+            chunks = list(
+                tc.ChunkStr(
+                    text,
+                    chunkTokens=chunkTokens,
+                    overlapTokens=overlapTokens,
+                    encoding=encoding,
+                )
+            )
+            previousEnd = 0
+
+            for chunk in chunks:
+
+                chunkBytes = chunk.text.encode("utf-8")
+
+                if chunk.numTokens != len(encoding.encode(chunk.text)):
+                    RaiseTestAssertion(f"Inexact count for chunk {chunk}.")
+
+                if chunk.numTokens > chunkTokens and len(chunk.text) > 1:
+                    RaiseTestAssertion(f"Chunk over {chunkTokens} tokens: {chunk}.")
+
+                if (
+                    textBytes[chunk.byteOffset : chunk.byteOffset + len(chunkBytes)]
+                    != chunkBytes
+                ):
+                    RaiseTestAssertion(f"Wrong byte offset for chunk {chunk}.")
+
+                if (
+                    not chunk.byteOffset
+                    <= previousEnd
+                    < chunk.byteOffset + len(chunkBytes)
+                ):
+                    RaiseTestAssertion(f"Chunk {chunk} leaves a gap or repeats.")
+
+                previousEnd = chunk.byteOffset + len(chunkBytes)
+
+            if previousEnd != len(textBytes):
+                RaiseTestAssertion("Chunks do not cover the whole text.")
+
+            if overlapTokens == 0 and "".join(chunk.text for chunk in chunks) != text:
+                RaiseTestAssertion("Chunks without overlap do not join to the text.")
+
+    for chunk in list(
+        tc.ChunkStr((paragraph + "\n\n") * 40, chunkTokens=256, encoding=encoding)
+    )[:-1]:
+
+        if not chunk.text.endswith("\n"):
+            RaiseTestAssertion(f"Chunk does not end at a break: {chunk.text[-40:]!r}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        for fileIndex in range(6):
+
+            filePath = Path(tempDir, f"sub{fileIndex % 2}", f"file{fileIndex}.txt")
+            filePath.parent.mkdir(exist_ok=True)
+            filePath.write_text(
+                (paragraph + "\n\n") * (fileIndex + 1), encoding="utf-8"
+            )
+
+        expected = []
+
+        for filePath in _WalkDirFiles(Path(tempDir).resolve()):
+
+            text = filePath.read_text(encoding="utf-8")
+            strChunks = list(
+                tc.ChunkStr(text, chunkTokens=100, overlapTokens=10, encoding=encoding)
+            )
+            fileChunks = list(
+                tc.ChunkFile(
+                    filePath,
+                    chunkTokens=100,
+                    overlapTokens=10,
+                    encoding=encoding,
+                    chunkSize=1000,
+                )
+            )
+
+            if fileChunks != strChunks:
+                RaiseTestAssertion(f"ChunkFile differs from ChunkStr for {filePath}.")
+
+            relativePath = filePath.relative_to(Path(tempDir).resolve()).as_posix()
+            expected.extend((relativePath, chunk) for chunk in strChunks)
+
+        for workers, backend in ((1, "process"), (2, "thread"), (2, "process")):
+
+            dirChunks = list(
+                tc.ChunkDir(
+                    tempDir,
+                    chunkTokens=100,
+                    overlapTokens=10,
+                    encoding=encoding,
+                    workers=workers,
+                    backend=backend,
+                )
+            )
+
+            if dirChunks != expected:
+                RaiseTestAssertion(
+                    f"ChunkDir differs with {workers} {backend} workers."
+                )
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "PyTokenCounter.cli",
+                "chunk",
+                tempDir,
+                "-n",
+                "100",
+                "--overlap",
+                "10",
+                "-e",
+                encoding.name,
+            ],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        if result.returncode != 0:
+            RaiseTestAssertion(f"tokencount chunk failed:\n{result.stdout}")
+
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+
+        if [
+            (
+                Path(record["path"]).relative_to(tempDir).as_posix(),
+                tc.TextChunk(record["text"], record["numTokens"], record["byteOffset"]),
+            )
+            for record in records
+        ] != expected:
+            RaiseTestAssertion("tokencount chunk output differs from ChunkDir.")
+
+    try:
+
+        tc.ChunkStr(paragraph, chunkTokens=10, overlapTokens=10, encoding=encoding)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for an overlap as large as a chunk.")
+
+
+def TestCliFormats():
+    """
+    Test that the --format option of the file and directory CLI commands prints one
+    record per file, in walk order, matching the library's results in every format,
+    and that files with an unsupported encoding are skipped within a directory.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    filePaths = [
+        filePath
+        for filePath in _WalkDirFiles(dirPath=testInputDir)
+        if filePath.suffix == ".txt"
+    ]
+    expected = [
+        {
+            "path": filePath.as_posix(),
+            "encoding": encoding.name,
+            "numTokens": len(tokens),
+            "tokens": tokens,
+        }
+        for filePath in filePaths
+        for tokens in [tc.TokenizeFile(filePath, encoding=encoding, quiet=True)]
+    ]
+
+    def RunCli(*args: str) -> str:
+
+        result = subprocess.run(
+            [sys.executable, "-m", "PyTokenCounter.cli", *args, "-m", "gpt-4o"],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        if result.returncode != 0:
+            RaiseTestAssertion(f"tokencount {args[0]} failed:\n{result.stdout}")
+
+        return result.stdout
+
+    def ParseRecords(output: str, outputFormat: str) -> list[dict]:
+
+        if outputFormat == "ndjson":
+            return [json.loads(line) for line in output.splitlines()]
+
+        if outputFormat == "json":
+            return json.loads(output)
+
+        return [
+            {
+                **row,
+                "numTokens": int(row["numTokens"]),
+                **(
+                    {"tokens": [int(token) for token in row["tokens"].split()]}
+                    if "tokens" in row
+                    else {}
+                ),
+            }
+            for row in csv.DictReader(io.StringIO(output))
+        ]
+
+    for outputFormat in ("ndjson", "json", "csv"):
+
+        for command, countOnly in (("tokenize-dir", False), ("count-dir", True)):
+
+            records = ParseRecords(
+                RunCli(command, str(testInputDir), "-f", outputFormat, "-j", "2"),
+                outputFormat,
+            )
+            expectedRecords = [
+                (
+                    {key: value for key, value in record.items() if key != "tokens"}
+                    if countOnly
+                    else record
+                )
+                for record in expected
+            ]
+
+            if records != expectedRecords:
+                RaiseTestAssertion(
+                    f"tokencount {command} --format {outputFormat} output differs."
+                )
+
+        records = ParseRecords(
+            RunCli(
+                "tokenize-files",
+                ",".join(str(filePath) for filePath in filePaths),
+                "-f",
+                outputFormat,
+            ),
+            outputFormat,
+        )
+
+        if records != expected:
+            RaiseTestAssertion(
+                f"tokencount tokenize-files --format {outputFormat} output differs."
+            )
+
+    if json.loads(RunCli("count-dir", str(testInputDir), "-nr", "-f", "json")) != [
+        {key: value for key, value in record.items() if key != "tokens"}
+        for record in expected
+        if Path(record["path"]).parent == testInputDir
+    ]:
+        RaiseTestAssertion("tokencount count-dir --no-recursive output differs.")
+
+
+def TestIterDir():
+    """
+    Test that IterTokenizeDir and IterCountDir yield one result per file, skipped
+    files included, in walk order matching TokenizeDir and GetNumTokenDir, and the
+    same results in completion order for any number of workers.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    dirPath = Path(testInputDir, "TestDirectory")
+    expected = [
+        tc.DirFileResult(
+            path=filePath.relative_to(dirPath).as_posix(),
+            numTokens=None if filePath.suffix == ".jpg" else len(tokens),
+            tokens=tokens,
+            status="skipped" if filePath.suffix == ".jpg" else "ok",
+        )
+        for filePath in _WalkDirFiles(dirPath=dirPath)
+        for tokens in [
+            (
+                None
+                if filePath.suffix == ".jpg"
+                else tc.TokenizeFile(filePath, encoding=encoding, quiet=True)
+            )
+        ]
+    ]
+
+    if not any(result.status == "skipped" for result in expected):
+        RaiseTestAssertion("Expected a file with an unsupported encoding.")
+
+    tokenizedDir = tc.TokenizeDir(dirPath, encoding=encoding, quiet=True)
+
+    for result in expected:
+
+        if result.status == "ok":
+
+            subDir = tokenizedDir
+
+            for part in result.path.split("/"):
+
+                subDir = subDir[part]
+
+            if subDir != result.tokens:
+                RaiseTestAssertion(f"TokenizeDir differs for {result.path}.")
+
+    if sum(result.numTokens or 0 for result in expected) != tc.GetNumTokenDir(
+        dirPath, encoding=encoding, quiet=True
+    ):
+        RaiseTestAssertion("GetNumTokenDir differs from the per-file counts.")
+
+    expectedCounts = [result._replace(tokens=None) for result in expected]
+
+    for workers, backend in ((1, "process"), (2, "thread"), (2, "process")):
+
+        for order in ("walk", "completion"):
+
+            results = list(
+                tc.IterTokenizeDir(
+                    dirPath,
+                    encoding=encoding,
+                    workers=workers,
+                    backend=backend,
+                    order=order,
+                )
+            )
+            counts = list(
+                tc.IterCountDir(
+                    dirPath,
+                    encoding=encoding,
+                    workers=workers,
+                    backend=backend,
+                    order=order,
+                )
+            )
+
+            if order == "completion":
+
+                results.sort(key=lambda result: expected.index(result))
+                counts.sort(key=lambda result: expectedCounts.index(result))
+
+            if results != expected:
+                RaiseTestAssertion(
+                    f"IterTokenizeDir differs with {workers} {backend} workers in {order} order."
+                )
+
+            if counts != expectedCounts:
+                RaiseTestAssertion(
+                    f"IterCountDir differs with {workers} {backend} workers in {order} order."
+                )
+
+    packed = list(tc.IterTokenizeDir(dirPath, encoding=encoding, returnType="array"))
+
+    if [
+        list(result.tokens) if result.tokens is not None else None for result in packed
+    ] != [result.tokens for result in expected]:
+        RaiseTestAssertion("IterTokenizeDir differs with returnType array.")
+
+    try:
+
+        tc.IterCountDir(dirPath, encoding=encoding, order="random")
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for an invalid order.")
+
+
+def TestDirFilters():
+    """
+    Test that include and exclude patterns, ".gitignore" files, including those of
+    parent directories, and the maximum file size filter the directory functions.
+    """
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        rootDir = Path(tempDir, "repo")
+        files = {
+            ".gitignore": "build/\n*.log\n!keep.log\n/top.txt\n",
+            ".git/config": "[core]",
+            ".git/info/exclude": "secret.txt\n",
+            "top.txt": "Hello",
+            "sub/top.txt": "Hello",
+            "a.log": "Hello",
+            "keep.log": "Hello",
+            "secret.txt": "Hello",
+            "big.txt": "Hello " * 100,
+            "build/out.txt": "Hello",
+            "node_modules/pkg/m.js": "Hello",
+            "src/.gitignore": "*.tmp\n",
+            "src/main.py": "Hello",
+            "src/debug.log": "Hello",
+            "src/x.tmp": "Hello",
+            "src/deep/y.tmp": "Hello",
+        }
+
+        for relativePath, text in files.items():
+
+            Path(rootDir, relativePath).parent.mkdir(parents=True, exist_ok=True)
+            Path(rootDir, relativePath).write_text(text, encoding="utf-8")
+
+        cases = [
+            ({}, rootDir, sorted(files)),
+            (
+                {"respectGitignore": True},
+                rootDir,
+                [
+                    ".gitignore",
+                    "big.txt",
+                    "keep.log",
+                    "node_modules/pkg/m.js",
+                    "src/.gitignore",
+                    "src/main.py",
+                    "sub/top.txt",
+                ],
+            ),
+            (
+                {"respectGitignore": True},
+                Path(rootDir, "src"),
+                [".gitignore", "main.py"],
+            ),
+            ({"include": "*.py"}, rootDir, ["src/main.py"]),
+            (
+                {"include": ["src/deep", "*.log"]},
+                rootDir,
+                ["a.log", "keep.log", "src/debug.log", "src/deep/y.tmp"],
+            ),
+            (
+                {"exclude": ["node_modules/", ".*", "src", "*.txt"]},
+                rootDir,
+                ["a.log", "keep.log"],
+            ),
+            (
+                {"include": "*.txt", "exclude": "/top.txt", "maxFileSize": 5},
+                rootDir,
+                ["build/out.txt", "secret.txt", "sub/top.txt"],
+            ),
+        ]
+
+        encoding = tc.GetEncoding(model="gpt-4o")
+
+        for kwargs, dirPath, expected in cases:
+
+            walked = sorted(
+                result.path
+                for result in tc.IterCountDir(dirPath, encoding=encoding, **kwargs)
+            )
+
+            if walked != expected:
+                RaiseTestAssertion(
+                    f"Unexpected files walked with {kwargs}.\n"
+                    f"Expected: {expected}, Got: {walked}"
+                )
+
+            expectedCount = sum(
+                tc.GetNumTokenFile(
+                    Path(dirPath, relativePath), encoding=encoding, quiet=True
+                )
+                for relativePath in expected
+            )
+            actualCount = tc.GetNumTokenDir(
+                dirPath, encoding=encoding, quiet=True, **kwargs
+            )
+
+            if actualCount != expectedCount:
+                RaiseTestAssertion(
+                    f"GetNumTokenDir with {kwargs} mismatch.\n"
+                    f"Expected: {expectedCount}, Got: {actualCount}"
+                )
+
+        tokenizedDir = tc.TokenizeDir(
+            rootDir, encoding=encoding, quiet=True, respectGitignore=True
+        )
+
+        if sorted(tokenizedDir) != [
+            ".gitignore",
+            "big.txt",
+            "keep.log",
+            "node_modules",
+            "src",
+            "sub",
+        ] or sorted(tokenizedDir["src"]) != [".gitignore", "main.py"]:
+            RaiseTestAssertion(f"Unexpected TokenizeDir result: {tokenizedDir}")
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "PyTokenCounter.cli",
+                "count-dir",
+                str(rootDir),
+                "--gitignore",
+                "--exclude",
+                "node_modules/",
+                "--exclude",
+                "big.txt",
+                "-f",
+                "ndjson",
+                "-m",
+                "gpt-4o",
+            ],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        cliPaths = sorted(
+            Path(json.loads(line)["path"]).relative_to(rootDir).as_posix()
+            for line in result.stdout.splitlines()
+        )
+
+        if cliPaths != [
+            ".gitignore",
+            "keep.log",
+            "src/.gitignore",
+            "src/main.py",
+            "sub/top.txt",
+        ]:
+            RaiseTestAssertion(f"Unexpected files counted by the CLI: {cliPaths}")
+
+        for kwargs, errorType in (
+            ({"include": 5}, TypeError),
+            ({"exclude": ["*.txt", 1]}, TypeError),
+            ({"respectGitignore": "yes"}, TypeError),
+            ({"maxFileSize": 1.5}, TypeError),
+            ({"maxFileSize": -1}, ValueError),
+        ):
+
+            try:
+
+                tc.GetNumTokenDir(rootDir, encoding=encoding, quiet=True, **kwargs)
+
+            except errorType:
+
+                pass
+
+            else:
+
+                RaiseTestAssertion(f"Expected {errorType.__name__} for {kwargs}.")
+
+
+def TestBinarySniffing():
+    """
+    Test that binary files are rejected from their first bytes by every way of
+    reading a file, and that text files are not mistaken for binary ones.
+    """
+
+    imgPath = Path(testInputDir, "TestImg.jpg")
+
+    if not IsBinarySample(imgPath.read_bytes()[:BINARY_SNIFF_SIZE], filePath=imgPath):
+        RaiseTestAssertion("Expected TestImg.jpg to be classified as binary.")
+
+    latin1Text = "Café, naïve, déjà vu. " * 20
+    samples = [
+        (b"\x89PNG\r\n\x1a\n" + b"IHDR" * 10, None, True),
+        (b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n", None, True),
+        (b"\x7fELF\x02\x01\x01", "program", True),
+        (b"Hello\x00World", None, True),
+        (latin1Text.encode("latin-1"), "photo.png", True),
+        (latin1Text.encode("latin-1"), "notes.txt", False),
+        ("Hello World".encode("utf-8"), "notes.bin", False),
+        ("Hello World".encode("utf-16"), None, False),
+        ("Hello World".encode("utf-32"), None, False),
+        (b"ID3 tags hold the title of a song.", None, False),
+        (b"", None, False),
+    ]
+
+    for sample, fileName, expected in samples:
+
+        if IsBinarySample(sample, filePath=fileName) != expected:
+            RaiseTestAssertion(
+                f"IsBinarySample({sample[:16]!r}, {fileName!r}) should be {expected}."
+            )
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        binaryPath = Path(tempDir, "data.dat")
+        binaryPath.write_bytes(b"Hello World\x00" * 100000)
+        textPath = Path(tempDir, "latin1.txt")
+        textPath.write_bytes(latin1Text.encode("latin-1"))
+
+        readers = (
+            ("ReadTextFile", lambda path: ReadTextFile(path)),
+            (
+                "TokenizeFile",
+                lambda path: tc.TokenizeFile(path, model="gpt-4o", quiet=True),
+            ),
+            (
+                "GetNumTokenFile",
+                lambda path: tc.GetNumTokenFile(path, model="gpt-4o", quiet=True),
+            ),
+            (
+                "IterCountFile",
+                lambda path: list(tc.IterCountFile(path, model="gpt-4o", chunkSize=7)),
+            ),
+            (
+                "ChunkFile",
+                lambda path: list(
+                    tc.ChunkFile(path, chunkTokens=16, model="gpt-4o", chunkSize=7)
+                ),
+            ),
+        )
+
+        for readerName, reader in readers:
+
+            try:
+
+                reader(binaryPath)
+
+            except tc.UnsupportedEncodingError as e:
+
+                if "binary" not in str(e):
+                    RaiseTestAssertion(
+                        f"Unexpected error message from {readerName}: {e}"
+                    )
+
+            else:
+
+                RaiseTestAssertion(f"Expected {readerName} to reject a binary file.")
+
+            reader(textPath)
+
+        results = {
+            result.path: result.status
+            for result in tc.IterCountDir(tempDir, model="gpt-4o")
+        }
+
+        if results != {"data.dat": "skipped", "latin1.txt": "ok"}:
+            RaiseTestAssertion(f"Unexpected IterCountDir statuses: {results}")
+
+
+def TestTokenCounter():
+    """
+    Test that a TokenCounter returns the same tokens and counts as the functions,
+    that encodings are resolved once, that its worker pool is reused between calls
+    and shut down on exit, and that invalid arguments are rejected as they are by
+    the functions.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+
+    if tc.GetEncoding(model="gpt-4o") is not encoding:
+        RaiseTestAssertion("GetEncoding did not return the memoized encoding.")
+
+    counter = tc.TokenCounter(model="gpt-4o", quiet=True)
+
+    if counter.encoding is not encoding:
+        RaiseTestAssertion("TokenCounter did not bind the memoized encoding.")
+
+    paragraph = Path(testInputDir, "TestFile1.txt").read_text(encoding="utf-8")
+    texts = ["", "Hail to the Victors!", paragraph, paragraph * 20, "\ud800 lone"]
+
+    for text in texts:
+
+        if counter.GetNumTokenStr(text) != len(encoding.encode(text)):
+            RaiseTestAssertion(f"Count differs for a {len(text)} character text.")
+
+        if counter.TokenizeStr(text) != encoding.encode(text):
+            RaiseTestAssertion(f"Tokens differ for a {len(text)} character text.")
+
+    if counter.GetNumTokenStr(paragraph * 20, maxTokens=10) <= 10:
+        RaiseTestAssertion("maxTokens did not stop the count past the limit.")
+
+    if counter.GetNumTokenStrs(texts[:4]) != tc.GetNumTokenStrs(
+        texts[:4], encoding=encoding, quiet=True
+    ):
+        RaiseTestAssertion("GetNumTokenStrs differs from the function.")
+
+    if counter.TruncateStr(paragraph, maxTokens=10) != tc.TruncateStr(
+        paragraph, maxTokens=10, encoding=encoding
+    ):
+        RaiseTestAssertion("TruncateStr differs from the function.")
+
+    for text in ("<|endoftext|>", paragraph + "<|endoftext|>"):
+
+        try:
+
+            counter.GetNumTokenStr(text)
+
+        except ValueError:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion("Expected ValueError for a special token.")
+
+    for kwargs, errorType in (
+        ({"model": "gpt-4o", "encodingName": "cl100k_base"}, ValueError),
+        ({"model": "not-a-model"}, ValueError),
+        ({"encodingName": "not-an-encoding"}, ValueError),
+        ({}, ValueError),
+        ({"model": 4}, TypeError),
+        ({"encoding": "o200k_base"}, TypeError),
+        ({"model": "gpt-4o", "quiet": "yes"}, TypeError),
+    ):
+
+        try:
+
+            tc.TokenCounter(**kwargs)
+
+        except errorType:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion(f"Expected {errorType.__name__} for {kwargs}.")
+
+    try:
+
+        counter.GetNumTokenStr(b"bytes")
+
+    except TypeError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected TypeError for a bytes string.")
+
+    filePath = Path(testInputDir, "TestFile1.txt")
+
+    if counter.GetNumTokenFile(filePath) != tc.GetNumTokenFile(
+        filePath, encoding=encoding, quiet=True
+    ):
+        RaiseTestAssertion("GetNumTokenFile differs from the function.")
+
+    if counter.TokenizeFile(filePath) != tc.TokenizeFile(
+        filePath, encoding=encoding, quiet=True
+    ):
+        RaiseTestAssertion("TokenizeFile differs from the function.")
+
+    expectedCount = tc.GetNumTokenDir(testInputDir, encoding=encoding, quiet=True)
+    expectedTokens = tc.TokenizeDir(testInputDir, encoding=encoding, quiet=True)
+
+    for backend in ("thread", "process"):
+
+        with tc.TokenCounter(
+            encoding=encoding, quiet=True, workers=2, backend=backend
+        ) as pooledCounter:
+
+            if pooledCounter.GetNumTokenDir(testInputDir) != expectedCount:
+                RaiseTestAssertion(f"GetNumTokenDir differs with {backend} workers.")
+
+            executor = pooledCounter._executor
+
+            if pooledCounter.TokenizeDir(testInputDir) != expectedTokens:
+                RaiseTestAssertion(f"TokenizeDir differs with {backend} workers.")
+
+            if pooledCounter._executor is not executor:
+                RaiseTestAssertion(f"The {backend} pool was not reused.")
+
+            iterCount = sum(
+                result.numTokens
+                for result in pooledCounter.IterCountDir(
+                    testInputDir, order="completion"
+                )
+                if result.status == "ok"
+            )
+
+            if iterCount != expectedCount:
+                RaiseTestAssertion(f"IterCountDir differs with {backend} workers.")
+
+            # An abandoned iterator leaves the pool usable
+            results = pooledCounter.IterTokenizeDir(testInputDir)
+            next(results)
+            results.close()
+
+            if pooledCounter.GetNumTokenDir(testInputDir) != expectedCount:
+                RaiseTestAssertion(f"The {backend} pool broke after an early stop.")
+
+        if pooledCounter._executor is not None:
+            RaiseTestAssertion(f"The {backend} pool was not shut down on exit.")
+
+    filteredCounter = tc.TokenCounter(
+        encoding=encoding, quiet=True, include="*.txt", recursive=False
+    )
+
+    if filteredCounter.GetNumTokenDir(testInputDir) != tc.GetNumTokenDir(
+        testInputDir, encoding=encoding, quiet=True, include="*.txt", recursive=False
+    ):
+        RaiseTestAssertion("Filtered GetNumTokenDir differs from the function.")
+
+    for kwargs, errorType in (
+        ({"workers": 0}, ValueError),
+        ({"workers": 2.0}, TypeError),
+        ({"backend": "gpu"}, ValueError),
+        ({"detectionStrategy": "guess"}, ValueError),
+        ({"cache": "cache.sqlite"}, TypeError),
+        ({"maxFileSize": -1}, ValueError),
+    ):
+
+        try:
+
+            tc.TokenCounter(encoding=encoding, **kwargs)
+
+        except errorType:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion(f"Expected {errorType.__name__} for {kwargs}.")
+
+    try:
+
+        counter.GetNumTokenDir(filePath)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for a file given as a directory.")
+
+
+def TestProgressReporters():
+    """
+    Test that each call reports its progress to its own task on the reporter it is
+    given, that tasks are finished even when the call raises, that quiet calls
+    report nothing, and that concurrent calls sharing a reporter, or drawing their
+    own progress bars, do not interfere.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    updates = []
+    reporter = tc.CallbackProgressReporter(updates.append)
+
+    numTokens = tc.GetNumTokenDir(testInputDir, encoding=encoding, progress=reporter)
+
+    if numTokens != tc.GetNumTokenDir(testInputDir, encoding=encoding, quiet=True):
+        RaiseTestAssertion("The count differs with a progress reporter.")
+
+    if updates[0].completed != 0 or updates[0].finished:
+        RaiseTestAssertion(f"Unexpected first update: {updates[0]}")
+
+    if not updates[-1].finished or updates[-1].completed != updates[-1].total:
+        RaiseTestAssertion(f"Unexpected last update: {updates[-1]}")
+
+    if sum(update.finished for update in updates) != 1:
+        RaiseTestAssertion("The task was not finished exactly once.")
+
+    updates.clear()
+    tc.GetNumTokenStr("Hail to the Victors!", encoding=encoding, quiet=True)
+    tc.TokenizeStrs(["Go", "Blue"], encoding=encoding, quiet=True, progress=reporter)
+
+    if updates:
+        RaiseTestAssertion(f"Quiet calls reported progress: {updates}")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        textPath = Path(tempDir, "text.txt")
+        textPath.write_text("Hail to the Victors!", encoding="utf-8")
+        binaryPath = Path(tempDir, "binary.dat")
+        binaryPath.write_bytes(b"\x00\x01\x02" * 1000)
+
+        try:
+
+            tc.GetNumTokenFiles(
+                [textPath, binaryPath], encoding=encoding, progress=reporter
+            )
+
+        except tc.UnsupportedEncodingError:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion("Expected UnsupportedEncodingError for a binary file.")
+
+    if not updates or not updates[-1].finished or updates[-1].completed != 1:
+        RaiseTestAssertion(f"The task of a failed call was not finished: {updates}")
+
+    logStream = io.StringIO()
+    logger = logging.getLogger("PyTokenCounter.Tests")
+    handler = logging.StreamHandler(logStream)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    try:
+
+        tc.GetNumTokenStr(
+            "Hail to the Victors!",
+            encoding=encoding,
+            progress=tc.LoggingProgressReporter(logger=logger, refreshInterval=0),
+        )
+
+    finally:
+
+        logger.removeHandler(handler)
+
+    logLines = logStream.getvalue().splitlines()
+
+    if len(logLines) != 3 or "finished, 1/1" not in logLines[-1]:
+        RaiseTestAssertion(f"Unexpected log lines: {logLines}")
+
+    # Tasks of concurrent calls sharing one reporter are kept apart
+    updatesByThread: dict[str, list] = {}
+    updatesLock = threading.Lock()
+
+    def RecordUpdate(update):
+
+        with updatesLock:
+
+            updatesByThread.setdefault(threading.current_thread().name, []).append(
+                update
+            )
+
+    sharedReporter = tc.CallbackProgressReporter(RecordUpdate)
+    strings = ["Hail to the Victors!"] * 50
+    errors = []
+
+    def CountStrings(progress):
+
+        try:
+
+            for string in strings:
+
+                tc.GetNumTokenStr(string, encoding=encoding, progress=progress)
+
+        except Exception as e:
+
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=CountStrings, args=(sharedReporter,)) for _ in range(8)
+    ]
+
+    for thread in threads:
+
+        thread.start()
+
+    for thread in threads:
+
+        thread.join()
+
+    if errors:
+        RaiseTestAssertion(f"Concurrent calls raised: {errors}")
+
+    for threadUpdates in updatesByThread.values():
+
+        if sum(update.finished for update in threadUpdates) != len(strings):
+            RaiseTestAssertion("A concurrent call did not finish its own task.")
+
+    # Concurrent calls drawing their own progress bars with rich
+    threads = [threading.Thread(target=CountStrings, args=(None,)) for _ in range(8)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+
+        for thread in threads:
+
+            thread.start()
+
+        for thread in threads:
+
+            thread.join()
+
+    if errors:
+        RaiseTestAssertion(f"Concurrent calls with progress bars raised: {errors}")
+
+    try:
+
+        tc.GetNumTokenStr("Go Blue", encoding=encoding, progress="rich")
+
+    except TypeError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected TypeError for an invalid progress reporter.")
+
+
+def TestProgressThrottling():
+    """
+    Test that reporters report a task's updates at most once per refresh interval,
+    always reporting its start and its finish with the whole work done, that every
+    update is reported with an interval of 0, and that descriptions given as
+    functions are only called when reported.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        numFiles = 200
+
+        for i in range(numFiles):
+
+            Path(tempDir, f"file{i}.txt").write_text(f"line {i}", encoding="utf-8")
+
+        updates = []
+        tc.GetNumTokenDir(
+            tempDir,
+            encoding=encoding,
+            progress=tc.CallbackProgressReporter(updates.append, refreshInterval=60),
+        )
+
+        if len(updates) != 2:
+            RaiseTestAssertion(f"Expected only a start and a finish update: {updates}")
+
+        if updates[0].completed != 0 or updates[0].finished:
+            RaiseTestAssertion(f"Unexpected first update: {updates[0]}")
+
+        if not updates[-1].finished or updates[-1].completed != numFiles:
+            RaiseTestAssertion(f"Unexpected last update: {updates[-1]}")
+
+        updates.clear()
+        tc.GetNumTokenDir(
+            tempDir,
+            encoding=encoding,
+            progress=tc.CallbackProgressReporter(updates.append, refreshInterval=0),
+        )
+
+        if len(updates) != numFiles + 2:
+            RaiseTestAssertion(f"Expected every update, got {len(updates)}.")
+
+        if [update.completed for update in updates[1:-1]] != list(
+            range(1, numFiles + 1)
+        ):
+            RaiseTestAssertion("Updates were not reported in order.")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+
+            numTokens = tc.GetNumTokenDir(
+                tempDir,
+                encoding=encoding,
+                progress=tc.RichProgressReporter(refreshInterval=60),
+            )
+
+        if numTokens != tc.GetNumTokenDir(tempDir, encoding=encoding, quiet=True):
+            RaiseTestAssertion("The count differs with a throttled progress bar.")
+
+    # Descriptions given as functions are only called when reported
+    updates = []
+    numCalls = 0
+
+    def Describe():
+
+        nonlocal numCalls
+        numCalls += 1
+
+        return "Described"
+
+    reporter = tc.CallbackProgressReporter(updates.append, refreshInterval=60)
+
+    with reporter.StartTask(description="Started", total=100) as task:
+
+        for _ in range(100):
+
+            task.Advance(advance=1, description=Describe)
+
+    if numCalls != 1:
+        RaiseTestAssertion(f"The description was called {numCalls} times, not once.")
+
+    if updates[-1] != tc.ProgressUpdate("Described", 100, 100, True):
+        RaiseTestAssertion(f"Unexpected last update: {updates[-1]}")
+
+    for reporterType in [tc.CallbackProgressReporter, tc.LoggingProgressReporter]:
+
+        arguments = (
+            {"callback": print} if reporterType is tc.CallbackProgressReporter else {}
+        )
+
+        try:
+
+            reporterType(**arguments, refreshInterval="fast")
+
+        except TypeError:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion("Expected TypeError for an invalid refresh interval.")
+
+    try:
+
+        tc.RichProgressReporter(refreshInterval=-1)
+
+    except ValueError:
+
+        pass
+
+    else:
+
+        RaiseTestAssertion("Expected ValueError for a negative refresh interval.")
+
+
+def TestAsync():
+    """
+    Test that the asynchronous functions return what their synchronous
+    counterparts do, keep the event loop responsive while encoding, respect their
+    concurrency limit and executor, and can be cancelled.
+    """
+
+    encoding = tc.GetEncoding(model="gpt-4o")
+    dirPath = Path(testInputDir, "TestDirectory")
+    filePaths = [
+        Path(testInputDir, "TestFile1.txt"),
+        Path(testInputDir, "TestFile2.txt"),
+    ]
+
+    async def CheckResults():
+
+        for string in ["Hail to the Victors!", "Go Blue! " * 100000]:
+
+            if await tc.aGetNumTokenStr(string, model="gpt-4o") != tc.GetNumTokenStr(
+                string, model="gpt-4o", quiet=True
+            ):
+                RaiseTestAssertion("aGetNumTokenStr differs from GetNumTokenStr.")
+
+        if await tc.aGetNumTokenFile(
+            filePaths[0], encoding=encoding
+        ) != tc.GetNumTokenFile(filePaths[0], encoding=encoding, quiet=True):
+            RaiseTestAssertion("aGetNumTokenFile differs from GetNumTokenFile.")
+
+        for options in [
+            {},
+            {"recursive": False},
+            {"concurrency": 1},
+            {"exclude": "TestSubDir"},
+        ]:
+
+            syncOptions = {
+                key: value for key, value in options.items() if key != "concurrency"
+            }
+
+            if await tc.aGetNumTokenDir(
+                dirPath, encoding=encoding, **options
+            ) != tc.GetNumTokenDir(
+                dirPath, encoding=encoding, quiet=True, **syncOptions
+            ):
+                RaiseTestAssertion(f"aGetNumTokenDir differs with options {options}.")
+
+            if await tc.aTokenizeFiles(
+                dirPath, encoding=encoding, **options
+            ) != tc.TokenizeFiles(
+                dirPath, encoding=encoding, quiet=True, **syncOptions
+            ):
+                RaiseTestAssertion(f"aTokenizeFiles differs with options {options}.")
+
+        if await tc.aTokenizeFiles(filePaths, encoding=encoding) != tc.TokenizeFiles(
+            filePaths, encoding=encoding, quiet=True
+        ):
+            RaiseTestAssertion("aTokenizeFiles differs for a list of files.")
+
+        if await tc.aTokenizeFiles(filePaths[0], encoding=encoding) != tc.TokenizeFile(
+            filePaths[0], encoding=encoding, quiet=True
+        ):
+            RaiseTestAssertion("aTokenizeFiles differs for a single file.")
+
+        imgPath = Path(testInputDir, "TestImg.jpg")
+
+        try:
+
+            await tc.aTokenizeFiles([filePaths[0], imgPath], encoding=encoding)
+
+        except tc.UnsupportedEncodingError:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion("Expected UnsupportedEncodingError for an image.")
+
+        tokenizedFiles = await tc.aTokenizeFiles(
+            [filePaths[0], imgPath], encoding=encoding, exitOnListError=False
+        )
+
+        if list(tokenizedFiles) != [filePaths[0].name]:
+            RaiseTestAssertion(f"Unexpected files tokenized: {list(tokenizedFiles)}")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+
+            if await tc.aGetNumTokenDir(
+                dirPath, encoding=encoding, executor=executor
+            ) != tc.GetNumTokenDir(dirPath, encoding=encoding, quiet=True):
+                RaiseTestAssertion("aGetNumTokenDir differs with its own executor.")
+
+    asyncio.run(CheckResults())
+
+    # The event loop keeps running while a long string is encoded
+    async def CountWhileTicking():
+
+        numTicks = 0
+        isCounting = True
+
+        async def Tick():
+
+            nonlocal numTicks
+
+            while isCounting:
+
+                numTicks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.create_task(Tick())
+        await tc.aGetNumTokenStr("Hail to the Victors! " * 200000, encoding=encoding)
+        isCounting = False
+        await ticker
+
+        return numTicks
+
+    if asyncio.run(CountWhileTicking()) < 2:
+        RaiseTestAssertion("The event loop was blocked while encoding.")
+
+    # Cancelling a call cancels the files it has not started
+    with tempfile.TemporaryDirectory() as tempDir:
+
+        numFiles = 100
+
+        for i in range(numFiles):
+
+            Path(tempDir, f"file{i}.txt").write_text(
+                "Hail to the Victors!", encoding="utf-8"
+            )
+
+        numStarted = 0
+        startedLock = threading.Lock()
+        releaseJobs = threading.Event()
+
+        class GatedExecutor(ThreadPoolExecutor):
+            """
+            Holds every job after the first, which lists the directory, until
+            released.
+            """
+
+            def submit(self, function, /, *args, **kwargs):
+
+                def Run():
+
+                    nonlocal numStarted
+
+                    with startedLock:
+
+                        numStarted += 1
+                        isHeld = numStarted > 1
+
+                    if isHeld:
+
+                        releaseJobs.wait()
+
+                    return function(*args, **kwargs)
+
+                return super().submit(Run)
+
+        async def CancelCount(executor):
+
+            task = asyncio.create_task(
+                tc.aGetNumTokenDir(
+                    tempDir, encoding=encoding, concurrency=4, executor=executor
+                )
+            )
+
+            while numStarted < 2:
+
+                await asyncio.sleep(0.01)
+
+            task.cancel()
+
+            try:
+
+                await task
+
+            except asyncio.CancelledError:
+
+                pass
+
+            else:
+
+                RaiseTestAssertion("Expected CancelledError for a cancelled call.")
+
+            finally:
+
+                releaseJobs.set()
+
+        with GatedExecutor(max_workers=1) as executor:
+
+            asyncio.run(CancelCount(executor))
+
+        # Only the listing and the held file ran; the files queued were cancelled
+        if numStarted != 2:
+            RaiseTestAssertion(f"{numStarted} jobs ran, expected 2.")
+
+    async def CheckErrors():
+
+        for options, errorType in [
+            ({"concurrency": 0}, ValueError),
+            ({"concurrency": "4"}, TypeError),
+            ({"executor": "pool"}, TypeError),
+            ({"recursive": "yes"}, TypeError),
+        ]:
+
+            try:
+
+                await tc.aGetNumTokenDir(dirPath, encoding=encoding, **options)
+
+            except errorType:
+
+                pass
+
+            else:
+
+                RaiseTestAssertion(f"Expected {errorType.__name__} for {options}.")
+
+        try:
+
+            await tc.aGetNumTokenStr(7, encoding=encoding)
+
+        except TypeError:
+
+            pass
+
+        else:
+
+            RaiseTestAssertion("Expected TypeError for a non-string.")
+
+    asyncio.run(CheckErrors())
+
+
 if __name__ == "__main__":
 
     # Existing Tests
     TestStr()
+    TestStrs()
     TestFile(answerName="TestFile1.json", inputName="TestFile1.txt")
     TestFile(answerName="TestFile2.json", inputName="TestFile2.txt")
     TestFileError(imgPath=Path(testInputDir, "TestImg.jpg"))
@@ -867,5 +3357,30 @@ if __name__ == "__main__":
     TestTokenizeFilesListQuietFalse()
     TestTokenizeFileWithUnsupportedEncoding()
     TestTokenizeFileErrorType()
+    TestReadTextFileEncodings()
+    TestLineEndings()
+    TestDetectionStrategies()
+    TestStreamingFile(answerName="TestFile1.json", inputName="TestFile1.txt")
+    TestStreamingFile(answerName="TestFile2.json", inputName="TestFile2.txt")
+    TestDirectoryWorkers()
+    TestTokenCache()
+    TestIncrementalDir()
+    TestWalkDirFiles()
+    TestLazyImports()
+    TestConcurrentFirstUse()
+    TestTokenServer()
+    TestCountOnly()
+    TestReturnTypes()
+    TestTokenLimits()
+    TestTruncate()
+    TestChunk()
+    TestCliFormats()
+    TestIterDir()
+    TestDirFilters()
+    TestBinarySniffing()
+    TestTokenCounter()
+    TestProgressReporters()
+    TestProgressThrottling()
+    TestAsync()
 
     print("All tests passed successfully!")